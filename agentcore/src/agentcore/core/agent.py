@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
@@ -51,6 +52,7 @@ class BaseAgent(ABC):
     Subclasses may override:
     - plan(): Custom planning logic
     - execute_step(): Custom step execution
+    - parallel_sub_agents: Sub-agents whose steps may run concurrently
     """
 
     # Agent identity (override in subclass)
@@ -65,6 +67,9 @@ class BaseAgent(ABC):
     domains: list[str] = []
     example_queries: list[str] = []
 
+    # Sub-agents whose steps may run concurrently (override in subclass)
+    parallel_sub_agents: frozenset[str] = frozenset({"researcher", "analyzer"})
+
     def __init__(
         self,
         inference: "InferenceClient",
@@ -232,70 +237,102 @@ class BaseAgent(ABC):
         """Run the ReAct (Reason + Act) loop.
         
         1. Plan: Generate execution plan
-        2. Execute: Run each step with appropriate sub-agent
+        2. Execute: Run ready steps with appropriate sub-agents
         3. Replan: If needed, revise the plan
         4. Synthesize: Generate final response
+        
+        Steps whose dependencies are met run concurrently (up to
+        max_parallel_steps) when their sub-agent is in parallel_sub_agents;
+        each works on a fork of the blackboard that is merged back when it
+        finishes. Other steps run on their own. Replanning and HIL wait for
+        running steps to finish. max_iterations limits the number of steps
+        started.
         """
         iteration = 0
         replan_count = 0
+        stopping = False
+        running: dict[asyncio.Task, tuple[PlanStep, Blackboard]] = {}
 
-        while iteration < self._settings.max_iterations:
-            iteration += 1
-
-            # Plan (or replan)
-            if blackboard.plan is None or (
-                self._settings.enable_replanning and 
-                self._needs_replan(blackboard)
-            ):
-                yield self._progress("Planning...")
-                blackboard.plan = await self._plan(ctx, blackboard)
-                
-                if self._tracing:
-                    trace_ctx = self._tracing.__class__.current()
-                    if trace_ctx:
-                        self._tracing.log_decision(
-                            trace_ctx,
-                            decision_type="plan",
-                            decision=f"Created plan with {len(blackboard.plan.steps)} steps",
-                            reasoning=blackboard.plan.goal,
-                        )
-
-            # Get current step
-            current_step = blackboard.plan.current_step
-            if current_step is None:
-                # All steps complete
-                break
-
-            # Execute current step
-            yield self._progress(f"Working on: {current_step.description}")
-            
-            current_step.start()
-            result = await self._execute_step(ctx, blackboard, current_step)
-
-            if result.success:
-                current_step.complete(result.output)
-                
-                # Check if replan needed
-                if result.replan_needed:
-                    replan_count += 1
-                    if replan_count > self._settings.max_replans:
-                        logger.warning("Max replans exceeded")
+        try:
+            while True:
+                if not running:
+                    # Check for HIL
+                    if blackboard.has_pending_interactions():
+                        yield self._hil_request(blackboard.pending_interactions[-1])
+                        return  # Wait for human input
+
+                    if stopping or iteration >= self._settings.max_iterations:
                         break
-                    # Mark plan for replanning
-                    blackboard.set("_needs_replan", True, source="react")
-                    blackboard.set("_replan_reason", result.replan_reason, source="react")
-            else:
-                current_step.fail(result.error or "Unknown error")
-                
-                # Decide whether to continue or fail
-                if self._should_abort(blackboard, current_step):
-                    yield self._error(f"Failed: {result.error}")
-                    return
 
-            # Check for HIL
-            if blackboard.has_pending_interactions():
-                yield self._hil_request(blackboard.pending_interactions[-1])
-                return  # Wait for human input
+                    # Plan (or replan)
+                    if blackboard.plan is None or (
+                        self._settings.enable_replanning and 
+                        self._needs_replan(blackboard)
+                    ):
+                        yield self._progress("Planning...")
+                        blackboard.plan = await self._plan(ctx, blackboard)
+                        blackboard.set("_needs_replan", False, source="react")
+                        
+                        if self._tracing:
+                            trace_ctx = self._tracing.__class__.current()
+                            if trace_ctx:
+                                self._tracing.log_decision(
+                                    trace_ctx,
+                                    decision_type="plan",
+                                    decision=f"Created plan with {len(blackboard.plan.steps)} steps",
+                                    reasoning=blackboard.plan.goal,
+                                )
+
+                # Start ready steps unless replanning or HIL is waiting
+                # for the running ones to finish
+                if not stopping and not self._is_paused(blackboard):
+                    running_steps = [step for step, _ in running.values()]
+                    for step in self._next_steps(blackboard.plan, running_steps):
+                        if iteration >= self._settings.max_iterations:
+                            break
+                        iteration += 1
+                        yield self._progress(f"Working on: {step.description}")
+                        
+                        step.start()
+                        board = blackboard.fork() if self._runs_concurrently(step) else blackboard
+                        task = asyncio.create_task(self._execute_step(ctx, board, step))
+                        running[task] = (step, board)
+
+                if not running:
+                    # All steps complete (or none can start)
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: blackboard.plan.steps.index(running[t][0])):
+                    step, board = running.pop(task)
+                    if board is not blackboard:
+                        blackboard.merge(board)
+                    result = task.result()
+
+                    if result.success:
+                        step.complete(result.output)
+                        if running:
+                            yield self._progress(f"Finished: {step.description}")
+                        
+                        # Check if replan needed
+                        if result.replan_needed:
+                            replan_count += 1
+                            if replan_count > self._settings.max_replans:
+                                logger.warning("Max replans exceeded")
+                                stopping = True
+                                continue
+                            # Mark plan for replanning
+                            blackboard.set("_needs_replan", True, source="react")
+                            blackboard.set("_replan_reason", result.replan_reason, source="react")
+                    else:
+                        step.fail(result.error or "Unknown error")
+                        
+                        # Decide whether to continue or fail
+                        if self._should_abort(blackboard, step):
+                            yield self._error(f"Failed: {result.error}")
+                            return
+        finally:
+            await self._cancel_steps(running)
 
         # Synthesize final response
         yield self._progress("Generating response...")
@@ -306,6 +343,47 @@ class BaseAgent(ABC):
         if blackboard.plan:
             blackboard.plan.is_complete = True
 
+    def _is_paused(self, blackboard: Blackboard) -> bool:
+        """Whether new steps must wait for a replan or human input."""
+        return (
+            (self._settings.enable_replanning and self._needs_replan(blackboard))
+            or blackboard.has_pending_interactions()
+        )
+
+    def _runs_concurrently(self, step: PlanStep) -> bool:
+        """Whether a step may run alongside other steps."""
+        return self._settings.max_parallel_steps > 1 and step.sub_agent in self.parallel_sub_agents
+
+    def _next_steps(self, plan: ExecutionPlan, running: list[PlanStep]) -> list[PlanStep]:
+        """Ready steps to start now, in plan order.
+        
+        A step that cannot run concurrently starts only when nothing else
+        is running, and later steps wait for it.
+        """
+        if any(not self._runs_concurrently(step) for step in running):
+            return []
+        
+        limit = max(1, self._settings.max_parallel_steps)
+        steps: list[PlanStep] = []
+        for step in plan.ready_steps:
+            if len(running) + len(steps) >= limit:
+                break
+            if not self._runs_concurrently(step):
+                if not running and not steps:
+                    steps.append(step)
+                break
+            steps.append(step)
+        return steps
+
+    async def _cancel_steps(self, running: dict[asyncio.Task, tuple[PlanStep, Blackboard]]) -> None:
+        """Cancel steps still running when the loop exits early."""
+        for task, (step, _) in running.items():
+            task.cancel()
+            step.fail("Cancelled")
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        running.clear()
+
     # =========================================================================
     # Planning
     # =========================================================================
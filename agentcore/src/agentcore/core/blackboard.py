@@ -64,6 +64,7 @@ class Blackboard(BaseModel):
     # Variable storage (private attributes)
     _variables: dict[str, VariableEntry] = PrivateAttr(default_factory=dict)
     _variable_history: list[VariableEntry] = PrivateAttr(default_factory=list)
+    _fork_marks: Optional[dict[str, int]] = PrivateAttr(default=None)
     
     # Tool results
     tool_results: list[ToolResult] = Field(default_factory=list)
@@ -268,6 +269,54 @@ class Blackboard(BaseModel):
         """Add a message to history."""
         self.message_history.append({"role": role, "content": content})
 
+    # Concurrent steps
+    def fork(self) -> "Blackboard":
+        """Create a copy for a plan step that runs concurrently with others.
+        
+        The fork sees everything recorded so far and shares the context and
+        plan; what the step records on it is added back with merge().
+        
+        Returns:
+            Forked blackboard
+        """
+        fork = self.model_copy(update={
+            "tool_results": list(self.tool_results),
+            "findings": list(self.findings),
+            "pending_interactions": list(self.pending_interactions),
+            "message_history": list(self.message_history),
+        })
+        fork._variables = dict(self._variables)
+        fork._variable_history = list(self._variable_history)
+        fork._fork_marks = {
+            "variables": len(self._variable_history),
+            "tool_results": len(self.tool_results),
+            "findings": len(self.findings),
+            "pending_interactions": len(self.pending_interactions),
+            "message_history": len(self.message_history),
+        }
+        return fork
+
+    def merge(self, fork: "Blackboard") -> None:
+        """Add what was recorded on a fork since fork() to this blackboard.
+        
+        Forks are merged in the order their steps finish, so when two steps
+        set the same variable the one that finished last wins.
+        
+        Args:
+            fork: Blackboard returned by fork()
+        """
+        marks = fork._fork_marks
+        if marks is None:
+            raise ValueError("Can only merge a blackboard created by fork()")
+        
+        for entry in fork._variable_history[marks["variables"]:]:
+            self._variables[entry.key] = entry
+            self._variable_history.append(entry)
+        self.tool_results.extend(fork.tool_results[marks["tool_results"]:])
+        self.findings.extend(fork.findings[marks["findings"]:])
+        self.pending_interactions.extend(fork.pending_interactions[marks["pending_interactions"]:])
+        self.message_history.extend(fork.message_history[marks["message_history"]:])
+
     # Context generation for LLM
     def get_context_for_llm(self, max_tokens: int = 8000) -> str:
         """Generate context summary for LLM prompts.
@@ -111,6 +111,14 @@ class ExecutionPlan(BaseModel):
                     return step
         return None
 
+    @property
+    def ready_steps(self) -> list[PlanStep]:
+        """Get all pending steps whose dependencies are met, in plan order."""
+        return [
+            s for s in self.steps
+            if s.status == StepStatus.PENDING and self._dependencies_met(s)
+        ]
+
     @property
     def completed_steps(self) -> list[PlanStep]:
         """Get all completed steps."""
@@ -2,5 +2,14 @@
 
 from agentcore.orchestrator.models import RoutingStrategy, RoutingDecision
 from agentcore.orchestrator.orchestrator import Orchestrator
+from agentcore.orchestrator.pool import AgentConnectionPool, CircuitBreaker
+from agentcore.orchestrator.routing_cache import RoutingCache
 
-__all__ = ["RoutingStrategy", "RoutingDecision", "Orchestrator"]
+__all__ = [
+    "RoutingStrategy",
+    "RoutingDecision",
+    "Orchestrator",
+    "AgentConnectionPool",
+    "CircuitBreaker",
+    "RoutingCache",
+]
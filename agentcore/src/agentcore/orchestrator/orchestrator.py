@@ -1,7 +1,6 @@
 """Orchestrator for multi-agent coordination."""
 
 import asyncio
-import json
 import logging
 import time
 from typing import AsyncIterator, Optional, Protocol
@@ -13,6 +12,8 @@ from agentcore.orchestrator.models import (
     RoutingDecision,
     RoutingStrategy,
 )
+from agentcore.orchestrator.pool import AgentConnectionPool, AgentUnavailableError
+from agentcore.orchestrator.routing_cache import RoutingCache
 from agentcore.prompts import get_prompt_registry
 from agentcore.registry.client import RegistryClient
 from agentcore.registry.models import AgentInfo
@@ -20,6 +21,29 @@ from agentcore.settings.orchestrator import OrchestratorSettings
 
 logger = logging.getLogger(__name__)
 
+LLM_ROUTING_FAILED = "LLM routing failed"
+
+# Queue marker for an agent whose stream has ended
+_AGENT_DONE = object()
+
+
+# Chunk types that answer the query; components (progress, HIL forms and
+# confirmations), suggestions and done do not
+_ANSWER_TYPES = frozenset({"markdown", "assistant_message"})
+
+
+def _is_answer(msg: dict) -> bool:
+    """Whether a streamed chunk carries answer content."""
+    return msg.get("type") in _ANSWER_TYPES
+
+
+def _error_message(msg: dict) -> str:
+    """Error text of an error chunk; agents put it in payload.message."""
+    payload = msg.get("payload")
+    if isinstance(payload, dict) and payload.get("message"):
+        return payload["message"]
+    return msg.get("message") or "Agent call failed"
+
 
 class InferenceClientProtocol(Protocol):
     async def complete(self, messages: list[dict]) -> str: ...
@@ -31,7 +55,7 @@ class Orchestrator:
 
     Flow:
     1. Discover agents (vector search)
-    2. Route query (LLM or rule-based)
+    2. Route query (LLM or rule-based), reusing cached decisions
     3. Invoke agent(s)
     4. Synthesize if parallel
     """
@@ -41,10 +65,33 @@ class Orchestrator:
         registry: RegistryClient,
         inference: Optional[InferenceClientProtocol] = None,
         settings: Optional[OrchestratorSettings] = None,
+        pool: Optional[AgentConnectionPool] = None,
     ):
         self._registry = registry
         self._inference = inference
         self._settings = settings or OrchestratorSettings()
+        self._pool = pool or AgentConnectionPool(self._settings)
+        self._routing_cache: Optional[RoutingCache] = None
+        if self._settings.routing_cache_enabled:
+            self._routing_cache = RoutingCache(
+                max_entries=self._settings.routing_cache_size,
+                ttl_seconds=self._settings.routing_cache_ttl,
+                similarity_threshold=self._settings.routing_cache_similarity,
+            )
+
+    @property
+    def routing_cache(self) -> Optional[RoutingCache]:
+        return self._routing_cache
+
+    async def close(self) -> None:
+        """Close pooled agent connections."""
+        await self._pool.close()
+
+    async def __aenter__(self) -> "Orchestrator":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
 
     async def handle_request(
         self,
@@ -57,12 +104,8 @@ class Orchestrator:
 
         Yields chat-contract style messages.
         """
-        # 1. Discover relevant agents
-        agents = await self._registry.discover(query, top_k=self._settings.discovery_top_k)
-        logger.info(f"Discovered {len(agents)} agents for query: {query[:50]}...")
-
-        # 2. Route
-        routing = await self._route(query, agents)
+        # 1-2. Discover relevant agents and route
+        routing = await self._discover_and_route(query)
         logger.info(f"Routing decision: {routing.strategy} -> {routing.agents}")
 
         # 3. Execute based on strategy
@@ -70,6 +113,11 @@ class Orchestrator:
             async for msg in self._invoke_single(query, routing, session_id, token):
                 yield msg
 
+        elif routing.strategy == RoutingStrategy.PARALLEL and self._settings.parallel_mode != "gather":
+            first_wins = self._settings.parallel_mode == "first"
+            async for msg in self._stream_parallel(query, routing, session_id, token, first_wins):
+                yield msg
+
         elif routing.strategy == RoutingStrategy.PARALLEL:
             results = await self._invoke_parallel(query, routing, session_id, token)
             # Yield combined results
@@ -91,6 +139,66 @@ class Orchestrator:
             async for msg in self._invoke_sequential(query, routing, session_id, token):
                 yield msg
 
+    async def _discover_and_route(self, query: str) -> RoutingDecision:
+        """
+        Discover agents and route, or reuse a cached decision.
+
+        An exact (normalized) query hit skips discovery and routing
+        entirely; a near-duplicate hit still costs the query embedding.
+        A hit is only used while all of its agents are registered and
+        healthy; otherwise every decision routing to them is dropped.
+        Fallbacks after a failed LLM routing call are not cached.
+        """
+        cache = self._routing_cache
+        if cache is None:
+            agents = await self._registry.discover(query, top_k=self._settings.discovery_top_k)
+            logger.info(f"Discovered {len(agents)} agents for query: {query[:50]}...")
+            return await self._route(query, agents)
+
+        generation = await self._registry.generation()
+        decision = cache.get(query, generation)
+        if decision is not None and await self._agents_available(decision):
+            logger.debug(f"Routing cache hit for query: {query[:50]}...")
+            return decision
+
+        query_embedding = await self._registry.embed_query(query)
+        decision = cache.get_similar(query_embedding, generation)
+        if decision is not None and await self._agents_available(decision):
+            logger.debug(f"Routing cache similarity hit for query: {query[:50]}...")
+            return decision
+
+        agents = await self._registry.discover(
+            query,
+            top_k=self._settings.discovery_top_k,
+            query_embedding=query_embedding,
+        )
+        logger.info(f"Discovered {len(agents)} agents for query: {query[:50]}...")
+        decision = await self._route(query, agents)
+        if not decision.reasoning.startswith(LLM_ROUTING_FAILED):
+            cache.put(query, generation, decision, query_embedding)
+        return decision
+
+    async def _agents_available(self, decision: RoutingDecision) -> bool:
+        """
+        Whether every agent of a cached decision is still live and healthy.
+
+        Agents that expired or turned unhealthy do not change the registry
+        generation, so this is checked on each hit; decisions routing to
+        unavailable agents are dropped from the cache.
+        """
+        agents = await asyncio.gather(*(self._registry.get(a) for a in decision.agents))
+        gone = [a for a, agent in zip(decision.agents, agents) if agent is None or not agent.is_healthy]
+        if not gone:
+            return True
+        dropped = self._routing_cache.invalidate_agents(gone)
+        logger.info(f"Dropped {dropped} cached routing decisions for unavailable agents {gone}")
+        return False
+
+    def invalidate_routing_cache(self) -> None:
+        """Drop cached routing decisions, e.g. after changing routing prompts."""
+        if self._routing_cache is not None:
+            self._routing_cache.invalidate()
+
     async def _route(self, query: str, agents: list[AgentInfo]) -> RoutingDecision:
         """Decide how to route the query."""
         if not agents:
@@ -138,7 +246,7 @@ class Orchestrator:
             return RoutingDecision(
                 strategy=RoutingStrategy.SINGLE,
                 agents=[agents[0].agent_id],
-                reasoning=f"LLM routing failed: {e}",
+                reasoning=f"{LLM_ROUTING_FAILED}: {e}",
             )
 
     async def _invoke_single(
@@ -209,6 +317,105 @@ class Orchestrator:
             if isinstance(r, AgentInvocationResult)
         }
 
+    async def _stream_parallel(
+        self,
+        query: str,
+        routing: RoutingDecision,
+        session_id: str,
+        token: str,
+        first_wins: bool = False,
+    ) -> AsyncIterator[dict]:
+        """
+        Invoke multiple agents in parallel and stream their messages as they arrive.
+
+        Every message is tagged with its agent_id. Each agent ends with an
+        agent_complete or agent_error message; agents still running at
+        parallel_deadline are cancelled and reported as timed out. An agent
+        that streams no markdown or assistant_message chunk fails. The
+        agents' own done chunks are dropped and a single done ends the
+        merged stream.
+
+        With first_wins, an agent's messages are held back until it
+        finishes. The first agent that answers without an error is yielded
+        and all other agents are cancelled.
+        """
+        max_agents = min(len(routing.agents), self._settings.max_parallel_agents)
+        agent_ids = list(dict.fromkeys(routing.agents[:max_agents]))
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump(agent_id: str) -> None:
+            try:
+                agent = await self._registry.get(agent_id)
+                if not agent:
+                    await queue.put((agent_id, {"type": "error", "message": "Agent not found"}))
+                    return
+                async for msg in self._call_agent(agent, query, session_id, token):
+                    await queue.put((agent_id, msg))
+            except Exception as e:
+                await queue.put((agent_id, {"type": "error", "message": str(e)}))
+            finally:
+                await queue.put((agent_id, _AGENT_DONE))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._settings.parallel_deadline
+        start = time.time()
+        tasks = [asyncio.create_task(pump(agent_id)) for agent_id in agent_ids]
+        running = set(agent_ids)
+        answered: set[str] = set()
+        errors: dict[str, str] = {}
+        held: dict[str, list[dict]] = {agent_id: [] for agent_id in agent_ids}
+
+        try:
+            while running:
+                try:
+                    agent_id, msg = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+
+                if msg is not _AGENT_DONE:
+                    if msg.get("type") == "error":
+                        errors.setdefault(agent_id, _error_message(msg))
+                        continue
+                    if msg.get("type") == "done":
+                        continue
+                    if _is_answer(msg):
+                        answered.add(agent_id)
+                    tagged = {**msg, "agent_id": agent_id}
+                    if first_wins:
+                        held[agent_id].append(tagged)
+                    else:
+                        yield tagged
+                    continue
+
+                running.discard(agent_id)
+                if agent_id not in errors and agent_id not in answered:
+                    errors[agent_id] = "Agent returned no answer"
+                if agent_id in errors:
+                    yield {"type": "agent_error", "agent_id": agent_id, "error": errors[agent_id]}
+                    continue
+
+                for tagged in held[agent_id]:
+                    yield tagged
+                yield {
+                    "type": "agent_complete",
+                    "agent_id": agent_id,
+                    "latency_ms": (time.time() - start) * 1000,
+                }
+                if first_wins:
+                    if running:
+                        logger.info(f"{agent_id} answered first, cancelling {sorted(running)}")
+                    yield {"type": "done", "payload": None}
+                    return
+
+            for agent_id in agent_ids:
+                if agent_id in running:
+                    yield {"type": "agent_error", "agent_id": agent_id, "error": "Timed out"}
+            yield {"type": "done", "payload": None}
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def _invoke_sequential(
         self,
         query: str,
@@ -245,27 +452,21 @@ class Orchestrator:
         session_id: str,
         token: str,
     ) -> AsyncIterator[dict]:
-        """Call a single agent and stream response."""
-        async with httpx.AsyncClient(timeout=self._settings.agent_timeout) as client:
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{agent.base_url}/api/v1/query",
-                    json={
-                        "query": query,
-                        "session_id": session_id,
-                    },
-                    headers={
-                        "Authorization": f"Bearer {token}" if token else "",
-                    },
-                ) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            try:
-                                data = json.loads(line[6:])
-                                yield data
-                            except json.JSONDecodeError:
-                                pass
-            except httpx.HTTPError as e:
-                yield {"type": "error", "message": f"Agent call failed: {e}"}
+        """Call a single agent and stream response over the pooled transport."""
+        try:
+            async for data in self._pool.stream_events(
+                agent,
+                "/api/v1/query",
+                payload={
+                    "query": query,
+                    "session_id": session_id,
+                },
+                headers={
+                    "Authorization": f"Bearer {token}" if token else "",
+                },
+            ):
+                yield data
+        except AgentUnavailableError as e:
+            yield {"type": "error", "message": str(e)}
+        except httpx.HTTPError as e:
+            yield {"type": "error", "message": f"Agent call failed: {e}"}
@@ -0,0 +1,202 @@
+"""Pooled HTTP transport for orchestrator agent calls."""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from agentcore.registry.models import AgentInfo
+from agentcore.settings.orchestrator import OrchestratorSettings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install agentcore[http2])
+HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Agent calls are non-idempotent POSTs: only retry when the request cannot
+# have reached the agent, or the agent refused it with 503
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUS = frozenset({503})
+
+
+class AgentUnavailableError(Exception):
+    """Raised when an agent's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one agent.
+
+    After failure_threshold failures in a row the breaker opens and calls
+    are refused for reset_timeout seconds. Calls are then let through
+    again: the first success closes the breaker, a failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        return time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        return not self.is_open
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class AgentConnectionPool:
+    """
+    Shared keep-alive HTTP clients for agent calls, one per agent base URL.
+
+    Owned by the Orchestrator and closed with it. Each agent also gets a
+    CircuitBreaker and a moving average of its time to response headers,
+    which decides whether a failed attempt can be retried within the
+    call's timeout.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[OrchestratorSettings] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            settings: Orchestrator settings (limits, timeouts, retries)
+            transport: Optional transport for every client, e.g.
+                httpx.MockTransport in tests
+        """
+        self._settings = settings or OrchestratorSettings()
+        self._transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latency: dict[str, float] = {}
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        """Get (or create) the pooled client for an agent endpoint."""
+        client = self._clients.get(base_url)
+        if client is None:
+            s = self._settings
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                http2=s.http2 and HAS_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=s.max_connections_per_agent,
+                    max_keepalive_connections=s.max_keepalive_connections,
+                    keepalive_expiry=s.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(s.agent_timeout, connect=s.connect_timeout),
+                transport=self._transport,
+            )
+            self._clients[base_url] = client
+        return client
+
+    def breaker(self, agent_id: str) -> CircuitBreaker:
+        """Get (or create) the circuit breaker for an agent."""
+        breaker = self._breakers.get(agent_id)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=self._settings.breaker_failure_threshold,
+                reset_timeout=self._settings.breaker_reset_timeout,
+            )
+            self._breakers[agent_id] = breaker
+        return breaker
+
+    def expected_latency(self, agent_id: str) -> float:
+        """Moving average of seconds to response headers (0 when unknown)."""
+        return self._latency.get(agent_id, 0.0)
+
+    def _observe_latency(self, agent_id: str, seconds: float) -> None:
+        previous = self._latency.get(agent_id)
+        self._latency[agent_id] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+
+    async def stream_events(
+        self,
+        agent: AgentInfo,
+        path: str,
+        payload: dict,
+        headers: Optional[dict[str, str]] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        POST to an agent and yield the JSON events of its SSE response.
+
+        Failures to connect (or to get a pooled connection) and 503
+        responses are retried with exponential backoff, and only while the
+        agent's expected latency still fits in agent_timeout. Read errors,
+        other statuses and anything after the response stream started are
+        not retried, since the agent may already be processing the request.
+
+        Raises:
+            AgentUnavailableError: If the agent's circuit breaker is open
+            httpx.HTTPError: If the call fails and cannot be retried
+        """
+        breaker = self.breaker(agent.agent_id)
+        if not breaker.allow():
+            raise AgentUnavailableError(f"Agent {agent.agent_id} is temporarily unavailable")
+
+        client = self.client(agent.base_url)
+        deadline = time.monotonic() + self._settings.agent_timeout
+        attempt = 0
+
+        while True:
+            started = time.monotonic()
+            responded = False
+            try:
+                async with client.stream("POST", path, json=payload, headers=headers) as response:
+                    responded = True
+                    response.raise_for_status()
+                    self._observe_latency(agent.agent_id, time.monotonic() - started)
+                    async for line in response.aiter_lines():
+                        if line.startswith("data: "):
+                            try:
+                                data = json.loads(line[6:])
+                            except json.JSONDecodeError:
+                                continue
+                            yield data
+                breaker.record_success()
+                return
+            except httpx.HTTPError as e:
+                retryable = self._is_retryable(e, responded)
+                if not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500:
+                    breaker.record_failure()
+                if (
+                    not retryable
+                    or attempt >= self._settings.max_retries
+                    or not breaker.allow()
+                ):
+                    raise
+
+                attempt += 1
+                backoff = self._settings.retry_backoff * 2 ** (attempt - 1)
+                remaining = deadline - time.monotonic() - backoff
+                if remaining <= self.expected_latency(agent.agent_id):
+                    raise
+                logger.info(f"Retrying agent {agent.agent_id} after {e} (attempt {attempt})")
+                await asyncio.sleep(backoff)
+
+    @staticmethod
+    def _is_retryable(error: httpx.HTTPError, responded: bool) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS
+        return not responded and isinstance(error, RETRYABLE_ERRORS)
+
+    async def close(self) -> None:
+        """Close all pooled clients."""
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
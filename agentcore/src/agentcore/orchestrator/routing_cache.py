@@ -0,0 +1,162 @@
+"""Cache of routing decisions for repeated and near-duplicate queries."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from agentcore.orchestrator.models import RoutingDecision
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key, ignoring trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+@dataclass
+class _Entry:
+    decision: RoutingDecision
+    vector: Optional[np.ndarray]
+    expires_at: float
+
+
+class RoutingCache:
+    """
+    LRU cache of routing decisions with a TTL.
+
+    Entries are valid for one registry generation only: the first lookup
+    or store with a different generation (an agent registered or
+    unregistered) empties the cache. Lookups are exact on the normalized
+    query, or by cosine similarity of query embeddings at or above
+    similarity_threshold.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        similarity_threshold: float = 0.95,
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._threshold = similarity_threshold
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._generation: Optional[int] = None
+
+        # Stacked entry vectors, rebuilt lazily after the entries change
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: list[str] = []
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, generation: int) -> Optional[RoutingDecision]:
+        """Decision cached for the same normalized query, if any."""
+        self._check_generation(generation)
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is None or not self._is_fresh(key, entry):
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.decision
+
+    def get_similar(self, embedding: np.ndarray, generation: int) -> Optional[RoutingDecision]:
+        """Decision cached for the most similar query above the threshold, if any."""
+        self._check_generation(generation)
+        vector = _unit(embedding)
+        if vector is None or self._threshold > 1.0:
+            self.misses += 1
+            return None
+
+        matrix = self._vectors()
+        if matrix is not None and matrix.shape[1] == vector.shape[0]:
+            for index in np.argsort(-(matrix @ vector)):
+                if float(matrix[index] @ vector) < self._threshold:
+                    break
+                key = self._matrix_keys[index]
+                entry = self._entries.get(key)
+                if entry is not None and self._is_fresh(key, entry):
+                    self._entries.move_to_end(key)
+                    self.similar_hits += 1
+                    return entry.decision
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        query: str,
+        generation: int,
+        decision: RoutingDecision,
+        embedding: Optional[np.ndarray] = None,
+    ) -> None:
+        """Store a decision, evicting the least recently used entries when full."""
+        self._check_generation(generation)
+        key = normalize_query(query)
+        self._entries[key] = _Entry(
+            decision=decision,
+            vector=_unit(embedding) if embedding is not None else None,
+            expires_at=time.monotonic() + self._ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def invalidate(self) -> None:
+        """Drop all cached decisions."""
+        self._entries.clear()
+        self._matrix = None
+
+    def invalidate_agents(self, agent_ids: Iterable[str]) -> int:
+        """Drop the decisions that route to any of agent_ids; returns how many."""
+        agent_ids = set(agent_ids)
+        stale = [k for k, e in self._entries.items() if agent_ids.intersection(e.decision.agents)]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._matrix = None
+        return len(stale)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "generation": self._generation,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+        }
+
+    def _check_generation(self, generation: int) -> None:
+        if generation != self._generation:
+            self.invalidate()
+            self._generation = generation
+
+    def _is_fresh(self, key: str, entry: _Entry) -> bool:
+        if entry.expires_at > time.monotonic():
+            return True
+        del self._entries[key]
+        self._matrix = None
+        return False
+
+    def _vectors(self) -> Optional[np.ndarray]:
+        if self._matrix is None:
+            keyed = [(k, e.vector) for k, e in self._entries.items() if e.vector is not None]
+            if not keyed or len({v.shape for _, v in keyed}) != 1:
+                return None
+            self._matrix_keys = [k for k, _ in keyed]
+            self._matrix = np.vstack([v for _, v in keyed])
+        return self._matrix
+
+
+def _unit(vector: np.ndarray) -> Optional[np.ndarray]:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else None
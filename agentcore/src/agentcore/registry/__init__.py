@@ -3,5 +3,6 @@
 from agentcore.registry.models import AgentInfo
 from agentcore.registry.client import RegistryClient
 from agentcore.registry.heartbeat import HeartbeatManager
+from agentcore.registry.mirror import RegistryMirror
 
-__all__ = ["AgentInfo", "RegistryClient", "HeartbeatManager"]
+__all__ = ["AgentInfo", "RegistryClient", "HeartbeatManager", "RegistryMirror"]
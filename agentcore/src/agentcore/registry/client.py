@@ -1,6 +1,7 @@
 """Registry client for agent registration and discovery."""
 
 import json
+import logging
 import struct
 from datetime import datetime
 from typing import Optional, Protocol
@@ -12,9 +13,12 @@ from redis.commands.search.index_definition import IndexDefinition, IndexType
 from redis.commands.search.query import Query
 from redis.exceptions import ResponseError
 
+from agentcore.registry.mirror import RegistryMirror
 from agentcore.registry.models import AgentInfo
 from agentcore.settings.registry import RegistrySettings
 
+logger = logging.getLogger(__name__)
+
 
 class EmbeddingClientProtocol(Protocol):
     async def embed(self, text: str) -> np.ndarray: ...
@@ -33,11 +37,63 @@ class RegistryClient:
         self._embedding = embedding
         self._settings = settings or RegistrySettings()
         self._prefix = self._settings.key_prefix
+        self._mirror: Optional[RegistryMirror] = None
 
     @property
     def index_name(self) -> str:
         return f"{self._prefix}:idx"
 
+    @property
+    def redis(self) -> Redis:
+        return self._redis
+
+    @property
+    def redis_db(self) -> int:
+        return self._redis.connection_pool.connection_kwargs.get("db", 0)
+
+    @property
+    def key_prefix(self) -> str:
+        return self._prefix
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self._prefix}:generation"
+
+    @property
+    def mirror(self) -> Optional[RegistryMirror]:
+        return self._mirror
+
+    async def start_mirror(self) -> RegistryMirror:
+        """Load the local registry mirror and keep it refreshed."""
+        if self._mirror is None:
+            self._mirror = RegistryMirror(
+                self,
+                refresh_seconds=self._settings.mirror_refresh_seconds,
+                agent_ttl_seconds=self._settings.agent_ttl_seconds,
+                keyspace_events=self._settings.mirror_keyspace_events,
+            )
+            await self._mirror.start()
+        return self._mirror
+
+    async def stop_mirror(self) -> None:
+        """Stop the local registry mirror; lookups go back to Redis."""
+        if self._mirror is not None:
+            mirror, self._mirror = self._mirror, None
+            await mirror.stop()
+
+    async def _local_mirror(self) -> Optional[RegistryMirror]:
+        """The mirror, if enabled, loaded and small enough to search in-process."""
+        if self._mirror is None and self._settings.mirror_enabled:
+            try:
+                await self.start_mirror()
+            except Exception as e:
+                logger.warning(f"Registry mirror unavailable, using Redis: {e}")
+                await self.stop_mirror()
+        mirror = self._mirror
+        if mirror is not None and mirror.ready and len(mirror) <= self._settings.mirror_max_agents:
+            return mirror
+        return None
+
     async def ensure_index(self) -> None:
         """Create vector index if it doesn't exist."""
         try:
@@ -89,11 +145,17 @@ class RegistryClient:
                 "embedding": embedding_bytes,
             },
         )
+        await self._redis.incr(self.generation_key)
+        if self._mirror is not None:
+            self._mirror.request_refresh()
 
     async def unregister(self, agent_id: str) -> None:
         """Remove agent from registry."""
         await self._redis.delete(f"{self._prefix}:{agent_id}")
         await self._redis.delete(f"{self._prefix}:vec:{agent_id}")
+        await self._redis.incr(self.generation_key)
+        if self._mirror is not None:
+            self._mirror.request_refresh()
 
     async def heartbeat(self, agent_id: str) -> None:
         """Refresh TTL and update last heartbeat."""
@@ -110,20 +172,87 @@ class RegistryClient:
             await self._redis.set(agent_key, agent.model_dump_json())
             await self._redis.expire(agent_key, self._settings.agent_ttl_seconds)
 
+    async def generation(self) -> int:
+        """Counter bumped on every register/unregister, for caches keyed on agent membership."""
+        value = await self._redis.get(self.generation_key)
+        return int(value) if value else 0
+
+    async def embed_query(self, query: str) -> np.ndarray:
+        """Embed a query the way discover() does."""
+        return await self._embedding.embed(query)
+
     async def get(self, agent_id: str) -> Optional[AgentInfo]:
-        """Get agent by ID."""
+        """Get agent by ID, from the mirror when it has it and Redis otherwise."""
+        mirror = await self._local_mirror()
+        if mirror is not None:
+            agent = mirror.get(agent_id)
+            if agent is not None:
+                return agent
+            # Registered or re-heartbeated since the last mirror refresh
+
         data = await self._redis.get(f"{self._prefix}:{agent_id}")
         if data:
             return AgentInfo.model_validate_json(data)
         return None
 
-    async def discover(self, query: str, top_k: Optional[int] = None) -> list[AgentInfo]:
-        """Find relevant agents via vector search."""
+    async def get_many(self, agent_ids: list[str]) -> list[Optional[AgentInfo]]:
+        """Get several agents with one MGET, in the order of agent_ids."""
+        if not agent_ids:
+            return []
+        values = await self._redis.mget([f"{self._prefix}:{agent_id}" for agent_id in agent_ids])
+        return [AgentInfo.model_validate_json(data) if data else None for data in values]
+
+    async def load_all(self) -> list[tuple[AgentInfo, np.ndarray]]:
+        """
+        Load every live agent with its embedding.
+
+        Vector keys are found with SCAN; infos and embeddings are then read
+        in a single pipeline round trip. Agents whose info key has expired
+        are skipped.
+        """
+        vec_prefix = f"{self._prefix}:vec:"
+        agent_ids = []
+        async for key in self._redis.scan_iter(match=f"{vec_prefix}*"):
+            key_str = key.decode() if isinstance(key, bytes) else key
+            agent_ids.append(key_str[len(vec_prefix):])
+        if not agent_ids:
+            return []
+
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.mget([f"{self._prefix}:{agent_id}" for agent_id in agent_ids])
+        for agent_id in agent_ids:
+            pipe.hget(f"{vec_prefix}{agent_id}", "embedding")
+        infos, *embeddings = await pipe.execute()
+
+        entries = []
+        for data, embedding in zip(infos, embeddings):
+            if not data or not embedding:
+                continue
+            try:
+                agent = AgentInfo.model_validate_json(data)
+            except Exception:
+                continue  # Skip invalid entries
+            entries.append((agent, np.frombuffer(embedding, dtype=np.float32)))
+        return entries
+
+    async def discover(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> list[AgentInfo]:
+        """Find relevant agents via vector search (pass query_embedding if already computed)."""
         if top_k is None:
             top_k = self._settings.discovery_top_k
 
         # Embed query
-        query_embedding = await self._embedding.embed(query)
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
+
+        mirror = await self._local_mirror()
+        if mirror is not None:
+            return mirror.search(query_embedding, top_k)
+
         query_bytes = struct.pack(f"{len(query_embedding)}f", *query_embedding.tolist())
 
         # Vector search
@@ -142,14 +271,9 @@ class RegistryClient:
             # Index might not exist or be empty
             return []
 
-        # Fetch agent info for each result
-        agents = []
-        for doc in results.docs:
-            agent = await self.get(doc.agent_id)
-            if agent and agent.is_healthy:
-                agents.append(agent)
-
-        return agents
+        # Fetch agent info for all results in one round trip
+        found = await self.get_many([doc.agent_id for doc in results.docs])
+        return [agent for agent in found if agent and agent.is_healthy]
 
     async def get_routing_context(self, agents: list[AgentInfo]) -> str:
         """Generate LLM-friendly agent descriptions for routing."""
@@ -0,0 +1,154 @@
+"""In-process mirror of the agent registry for local discovery."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from agentcore.registry.models import AgentInfo
+
+if TYPE_CHECKING:
+    from agentcore.registry.client import RegistryClient
+
+logger = logging.getLogger(__name__)
+
+# Keyspace events that change the set of agents (register, unregister, TTL expiry)
+MEMBERSHIP_EVENTS = frozenset({"hset", "del", "expired"})
+
+
+class RegistryMirror:
+    """
+    Local copy of all agent infos and embeddings.
+
+    Reloaded from Redis every refresh_seconds and, with keyspace_events,
+    as soon as an agent registers, unregisters or expires (requires
+    notify-keyspace-events to include "Khgx" on the Redis server). Agents
+    whose last heartbeat is older than the registry TTL are ignored even
+    before the next reload.
+    """
+
+    def __init__(
+        self,
+        registry: "RegistryClient",
+        refresh_seconds: float = 10.0,
+        agent_ttl_seconds: int = 30,
+        keyspace_events: bool = False,
+    ):
+        self._registry = registry
+        self._refresh_seconds = refresh_seconds
+        self._agent_ttl = timedelta(seconds=agent_ttl_seconds)
+        self._keyspace_events = keyspace_events
+
+        self._agents: dict[str, AgentInfo] = {}
+        self._ids: list[str] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._loaded = False
+
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the mirror has been loaded at least once."""
+        return self._loaded
+
+    async def refresh(self) -> int:
+        """Reload every agent from Redis; returns the number of agents."""
+        entries = await self._registry.load_all()
+        ids = [agent.agent_id for agent, _ in entries]
+        if entries:
+            matrix = np.vstack([vector for _, vector in entries]).astype(np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1.0, norms)
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+
+        # Swap in one step so concurrent searches see old or new state
+        self._agents, self._ids, self._matrix = {a.agent_id: a for a, _ in entries}, ids, matrix
+        self._loaded = True
+        return len(ids)
+
+    def request_refresh(self) -> None:
+        """Reload in the background as soon as possible."""
+        self._wakeup.set()
+
+    def get(self, agent_id: str) -> Optional[AgentInfo]:
+        """Get a live agent by ID."""
+        agent = self._agents.get(agent_id)
+        return agent if agent is not None and self._is_live(agent) else None
+
+    def search(self, query_embedding: np.ndarray, top_k: int) -> list[AgentInfo]:
+        """Healthy agents most similar (cosine) to the query embedding."""
+        if not self._ids:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self._matrix @ (query / norm)
+
+        agents = []
+        for index in np.argsort(-scores)[:top_k]:
+            agent = self._agents[self._ids[index]]
+            if agent.is_healthy and self._is_live(agent):
+                agents.append(agent)
+        return agents
+
+    def _is_live(self, agent: AgentInfo) -> bool:
+        if agent.last_heartbeat is None:
+            return True
+        return datetime.utcnow() - agent.last_heartbeat.replace(tzinfo=None) < self._agent_ttl
+
+    async def start(self) -> None:
+        """Load the mirror and keep it refreshed in the background."""
+        await self.refresh()
+        self._tasks.append(asyncio.create_task(self._refresh_loop()))
+        if self._keyspace_events:
+            self._tasks.append(asyncio.create_task(self._watch_keyspace()))
+        logger.info(f"Started registry mirror with {len(self)} agents")
+
+    async def stop(self) -> None:
+        """Stop background refreshes."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._refresh_seconds)
+            self._wakeup.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Registry mirror refresh failed: {e}")
+
+    async def _watch_keyspace(self) -> None:
+        """Trigger a refresh on membership changes reported by keyspace notifications."""
+        pubsub = self._registry.redis.pubsub()
+        pattern = f"__keyspace@{self._registry.redis_db}__:{self._registry.key_prefix}:*"
+        try:
+            await pubsub.psubscribe(pattern)
+            async for message in pubsub.listen():
+                if message.get("type") != "pmessage":
+                    continue
+                event = message.get("data")
+                if isinstance(event, bytes):
+                    event = event.decode()
+                if event in MEMBERSHIP_EVENTS:
+                    self.request_refresh()
+        finally:
+            with suppress(Exception):
+                await pubsub.aclose()
@@ -27,6 +27,7 @@ class MockRegistryClient:
         self._discovery_top_k = discovery_top_k
         self._agents: dict[str, AgentInfo] = {}
         self._vectors: dict[str, np.ndarray] = {}
+        self._generation = 0
 
     async def ensure_index(self) -> None:
         pass
@@ -43,26 +44,40 @@ class MockRegistryClient:
         # Store in memory
         self._agents[agent.agent_id] = agent
         self._vectors[agent.agent_id] = embedding
+        self._generation += 1
 
     async def unregister(self, agent_id: str) -> None:
         self._agents.pop(agent_id, None)
         self._vectors.pop(agent_id, None)
+        self._generation += 1
 
     async def heartbeat(self, agent_id: str) -> None:
         if agent_id in self._agents:
             self._agents[agent_id].last_heartbeat = datetime.now(timezone.utc)
 
+    async def generation(self) -> int:
+        return self._generation
+
+    async def embed_query(self, query: str) -> np.ndarray:
+        return await self._embedding.embed(query)
+
     async def get(self, agent_id: str) -> Optional[AgentInfo]:
         return self._agents.get(agent_id)
 
-    async def discover(self, query: str, top_k: Optional[int] = None) -> list[AgentInfo]:
+    async def discover(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> list[AgentInfo]:
         if top_k is None:
             top_k = self._discovery_top_k
 
         if not self._agents:
             return []
 
-        query_embedding = await self._embedding.embed(query)
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
 
         similarities: list[tuple[str, float]] = []
         for agent_id, vec in self._vectors.items():
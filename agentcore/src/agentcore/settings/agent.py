@@ -17,6 +17,7 @@ class AgentSettings(BaseSettings):
     max_iterations: int = 10
     max_tool_calls_per_iteration: int = 5
     max_context_tokens: int = 8000
+    max_parallel_steps: int = 4  # plan steps run concurrently (1 = one at a time)
 
     # Result handling
     use_compact_results: bool = True
@@ -15,4 +15,23 @@ class OrchestratorSettings(BaseAppSettings):
     routing_model: str = "gpt-4"
     max_parallel_agents: int = 5
     agent_timeout: float = 60.0
+    parallel_mode: str = "stream"  # stream (interleaved chunks) | first (first good answer) | gather
+    parallel_deadline: float = 60.0  # seconds for all PARALLEL agents together
     fallback_agent: str = "default"
+
+    # Routing decision cache (cleared when agents register or unregister)
+    routing_cache_enabled: bool = True
+    routing_cache_size: int = 1024
+    routing_cache_ttl: float = 300.0  # seconds
+    routing_cache_similarity: float = 0.95  # cosine threshold for near-duplicates; > 1 disables
+
+    # Agent HTTP transport (pooled per agent endpoint)
+    http2: bool = True  # used when the h2 package is installed
+    max_connections_per_agent: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    max_retries: int = 2  # connect failures and 503s only
+    retry_backoff: float = 0.1  # seconds, doubled per retry
+    breaker_failure_threshold: int = 5  # consecutive failures before an agent is skipped
+    breaker_reset_timeout: float = 30.0  # seconds before a skipped agent is tried again
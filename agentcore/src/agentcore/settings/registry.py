@@ -18,3 +18,9 @@ class RegistrySettings(BaseAppSettings):
     # Vector search
     embedding_dimension: int = 1536
     discovery_top_k: int = 5
+
+    # Local mirror: search agents in-process instead of a Redis KNN query
+    mirror_enabled: bool = False
+    mirror_refresh_seconds: float = 10.0
+    mirror_max_agents: int = 500
+    mirror_keyspace_events: bool = False
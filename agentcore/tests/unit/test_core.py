@@ -180,6 +180,26 @@ class TestExecutionPlan:
         # s2 depends on s1, so s1 should be current even though s2 is pending
         assert plan.current_step.id == "s1"
 
+    def test_ready_steps(self):
+        plan = ExecutionPlan(
+            query="Test",
+            goal="Test",
+            steps=[
+                PlanStep(id="s1", description="Step 1", sub_agent="researcher", instruction="X"),
+                PlanStep(id="s2", description="Step 2", sub_agent="researcher", instruction="Y"),
+                PlanStep(id="s3", description="Step 3", sub_agent="synthesizer", instruction="Z", depends_on=["s1", "s2"]),
+            ],
+        )
+        
+        # Independent steps are ready together
+        assert [s.id for s in plan.ready_steps] == ["s1", "s2"]
+        
+        plan.steps[0].complete()
+        assert [s.id for s in plan.ready_steps] == ["s2"]
+        
+        plan.steps[1].complete()
+        assert [s.id for s in plan.ready_steps] == ["s3"]
+
     def test_progress_percent(self):
         plan = ExecutionPlan(
             query="Test",
@@ -396,6 +416,36 @@ class TestBlackboard:
         assert history[0].value == "v1"
         assert history[1].value == "v2"
 
+    def test_fork_and_merge(self, request_ctx):
+        bb = Blackboard.create(ctx=request_ctx, query="Test")
+        bb.set("shared", "before", source="test")
+        bb.add_finding(source="test", content="Existing")
+        
+        fork_a = bb.fork()
+        fork_b = bb.fork()
+        fork_a.add_finding(source="researcher", content="From A")
+        fork_a.set("shared", "a", source="researcher")
+        fork_b.add_finding(source="researcher", content="From B")
+        fork_b.set("shared", "b", source="researcher")
+        
+        # Forks see earlier state but not each other
+        assert fork_a.get("shared") == "a"
+        assert [f.content for f in fork_b.findings] == ["Existing", "From B"]
+        assert len(bb.findings) == 1
+        
+        bb.merge(fork_b)
+        bb.merge(fork_a)
+        
+        assert [f.content for f in bb.findings] == ["Existing", "From B", "From A"]
+        assert bb.get("shared") == "a"
+        assert [e.value for e in bb.get_variable_history("shared")] == ["before", "b", "a"]
+
+    def test_merge_requires_fork(self, request_ctx):
+        bb = Blackboard.create(ctx=request_ctx, query="Test")
+        
+        with pytest.raises(ValueError):
+            bb.merge(Blackboard.create(ctx=request_ctx, query="Other"))
+
     def test_add_tool_result(self, request_ctx):
         bb = Blackboard.create(ctx=request_ctx, query="Test")
         
@@ -667,3 +717,121 @@ class TestBaseAgentToolIntegration:
         assert agent.tool_registry is custom_registry
         assert "external_tool" in agent.tool_registry
         assert agent.tool_registry.tool_count == 1
+
+
+class TestReactLoopScheduling:
+    """Tests for concurrent plan step execution in BaseAgent._react_loop."""
+
+    def _agent(self, settings, plans, results=None):
+        import asyncio
+        from agentcore.core.agent import BaseAgent
+        from agentcore.inference import InferenceClient
+        from agentcore.knowledge.client import MockKnowledgeClient
+        from unittest.mock import MagicMock
+
+        class TestAgent(BaseAgent):
+            agent_id = "test"
+            name = "Test Agent"
+            description = "Test agent"
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.events = []
+                self.active = 0
+                self.max_active = 0
+                self.plans = list(plans)
+
+            def get_system_prompt(self, ctx):
+                return "System prompt"
+
+            async def _plan(self, ctx, blackboard):
+                self.events.append("plan")
+                return self.plans.pop(0)
+
+            async def _execute_step(self, ctx, blackboard, step):
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                self.events.append(f"start:{step.id}")
+                await asyncio.sleep(0.02 if step.id.startswith("slow") else 0.01)
+                blackboard.add_finding(source=step.sub_agent, content=step.id)
+                self.active -= 1
+                self.events.append(f"end:{step.id}")
+                return (results or {}).get(step.id) or SubAgentResult.success_result(step.id)
+
+            async def _synthesize(self, ctx, blackboard):
+                yield self._markdown("done")
+
+        return TestAgent(
+            inference=MagicMock(spec=InferenceClient),
+            knowledge=MockKnowledgeClient(),
+            settings=settings,
+        )
+
+    def _plan(self, *steps):
+        return ExecutionPlan(query="Test", goal="Test", steps=list(steps))
+
+    async def _run(self, agent, request_ctx):
+        bb = Blackboard.create(ctx=request_ctx, query="Test")
+        chunks = [chunk async for chunk in agent._react_loop(request_ctx, bb)]
+        return bb, chunks
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self, request_ctx):
+        from agentcore.settings.agent import AgentSettings
+
+        plan = self._plan(
+            PlanStep(id="slow_r1", description="R1", sub_agent="researcher", instruction="X"),
+            PlanStep(id="r2", description="R2", sub_agent="researcher", instruction="Y"),
+            PlanStep(id="s", description="S", sub_agent="synthesizer", instruction="Z", depends_on=["slow_r1", "r2"]),
+        )
+        agent = self._agent(AgentSettings(max_parallel_steps=4), [plan])
+
+        bb, chunks = await self._run(agent, request_ctx)
+
+        assert agent.max_active == 2
+        assert agent.events.index("start:s") > agent.events.index("end:slow_r1")
+        assert all(step.status == StepStatus.COMPLETED for step in plan.steps)
+        # Findings from forks are merged back
+        assert sorted(f.content for f in bb.findings) == ["r2", "s", "slow_r1"]
+        statuses = [c["payload"]["data"]["status"] for c in chunks if c["type"] == "component"]
+        assert "Finished: R2" in statuses
+
+    @pytest.mark.asyncio
+    async def test_single_parallel_step_runs_sequentially(self, request_ctx):
+        from agentcore.settings.agent import AgentSettings
+
+        plan = self._plan(
+            PlanStep(id="r1", description="R1", sub_agent="researcher", instruction="X"),
+            PlanStep(id="r2", description="R2", sub_agent="researcher", instruction="Y"),
+        )
+        agent = self._agent(AgentSettings(max_parallel_steps=1), [plan])
+
+        await self._run(agent, request_ctx)
+
+        assert agent.max_active == 1
+        assert agent.events == ["plan", "start:r1", "end:r1", "start:r2", "end:r2"]
+
+    @pytest.mark.asyncio
+    async def test_replan_waits_for_running_steps(self, request_ctx):
+        from agentcore.settings.agent import AgentSettings
+
+        first = self._plan(
+            PlanStep(id="r1", description="R1", sub_agent="researcher", instruction="X"),
+            PlanStep(id="slow_r2", description="R2", sub_agent="researcher", instruction="Y"),
+            PlanStep(id="a1", description="A1", sub_agent="analyzer", instruction="Z", depends_on=["r1"]),
+        )
+        second = self._plan(
+            PlanStep(id="s", description="S", sub_agent="synthesizer", instruction="Z"),
+        )
+        agent = self._agent(
+            AgentSettings(max_parallel_steps=4),
+            [first, second],
+            results={"r1": SubAgentResult.replan_result("Need more data")},
+        )
+
+        await self._run(agent, request_ctx)
+
+        # a1 never starts; the replan happens once slow_r2 has finished
+        assert "start:a1" not in agent.events
+        assert agent.events.index("plan", 1) > agent.events.index("end:slow_r2")
+        assert agent.events[-2:] == ["start:s", "end:s"]
@@ -0,0 +1,425 @@
+"""Unit tests for the orchestrator."""
+
+import asyncio
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from agentcore.embedding.client import MockEmbeddingClient
+from agentcore.orchestrator import (
+    AgentConnectionPool,
+    CircuitBreaker,
+    Orchestrator,
+    RoutingCache,
+    RoutingDecision,
+    RoutingStrategy,
+)
+from agentcore.registry.mock_client import MockRegistryClient
+from agentcore.registry.models import AgentInfo
+from agentcore.settings.orchestrator import OrchestratorSettings
+
+
+def _agent(agent_id="purchasing", base_url="http://purchasing:8000"):
+    return AgentInfo(
+        agent_id=agent_id,
+        name=f"{agent_id.title()} Agent",
+        description=f"Handles {agent_id}",
+        base_url=base_url,
+    )
+
+
+def _sse(*events):
+    return "".join(f"data: {json.dumps(e)}\n\n" for e in events).encode()
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Answers requests in turn with (status, body) or an exception; the last one repeats."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def handle_async_request(self, request):
+        self.requests.append(request)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        status, body = response
+        return httpx.Response(status, content=body)
+
+
+def _settings(**overrides):
+    return OrchestratorSettings(retry_backoff=0.0, **overrides)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_resets_on_success(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.allow()
+        assert breaker.failures == 0
+
+    def test_lets_calls_through_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+        breaker.record_failure()
+
+        assert breaker.allow()
+
+
+class TestAgentConnectionPool:
+
+    @pytest.mark.asyncio
+    async def test_streams_events_over_one_client_per_endpoint(self):
+        transport = ScriptedTransport((200, _sse({"type": "assistant_message", "content": "hi"})))
+        pool = AgentConnectionPool(_settings(), transport=transport)
+        agent = _agent()
+
+        first = [e async for e in pool.stream_events(agent, "/api/v1/query", {"query": "q"})]
+        second = [e async for e in pool.stream_events(agent, "/api/v1/query", {"query": "q"})]
+
+        assert first == second == [{"type": "assistant_message", "content": "hi"}]
+        assert pool.client(agent.base_url) is pool.client("http://purchasing:8000")
+        assert str(transport.requests[0].url) == "http://purchasing:8000/api/v1/query"
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_retries_unavailable_agent_before_streaming(self):
+        transport = ScriptedTransport(
+            httpx.ConnectError("refused"),
+            (503, b""),
+            (200, _sse({"type": "assistant_message", "content": "ok"})),
+        )
+        pool = AgentConnectionPool(_settings(max_retries=2), transport=transport)
+
+        events = [e async for e in pool.stream_events(_agent(), "/api/v1/query", {})]
+
+        assert events == [{"type": "assistant_message", "content": "ok"}]
+        assert len(transport.requests) == 3
+        assert pool.breaker("purchasing").failures == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure", [
+        httpx.ReadError("reset"),
+        httpx.ReadTimeout("slow"),
+        (502, b""),
+        (504, b""),
+    ])
+    async def test_request_that_may_have_reached_the_agent_is_not_retried(self, failure):
+        transport = ScriptedTransport(failure, (200, _sse({"type": "assistant_message", "content": "ok"})))
+        pool = AgentConnectionPool(_settings(max_retries=2), transport=transport)
+
+        with pytest.raises(httpx.HTTPError):
+            [e async for e in pool.stream_events(_agent(), "/api/v1/query", {})]
+
+        assert len(transport.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_after_response_started_is_not_retried(self):
+        async def body():
+            yield b""
+            raise httpx.ConnectError("dropped")
+
+        transport = ScriptedTransport((200, body()), (200, _sse({"type": "assistant_message"})))
+        pool = AgentConnectionPool(_settings(max_retries=2), transport=transport)
+
+        with pytest.raises(httpx.ConnectError):
+            [e async for e in pool.stream_events(_agent(), "/api/v1/query", {})]
+
+        assert len(transport.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried_or_counted(self):
+        transport = ScriptedTransport((401, b""))
+        pool = AgentConnectionPool(_settings(), transport=transport)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            [e async for e in pool.stream_events(_agent(), "/api/v1/query", {})]
+
+        assert len(transport.requests) == 1
+        assert pool.breaker("purchasing").failures == 0
+
+
+class TestOrchestratorTransport:
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_agent_call(self):
+        transport = ScriptedTransport((502, b""))
+        settings = _settings(max_retries=0, breaker_failure_threshold=2)
+        orchestrator = Orchestrator(
+            MockRegistryClient(MockEmbeddingClient(dimension=8)),
+            settings=settings,
+            pool=AgentConnectionPool(settings, transport=transport),
+        )
+        agent = _agent()
+
+        for _ in range(3):
+            messages = [m async for m in orchestrator._call_agent(agent, "q", "s", "")]
+            assert messages[0]["type"] == "error"
+
+        # The third call is refused without a request
+        assert len(transport.requests) == 2
+        assert "temporarily unavailable" in messages[0]["message"]
+        await orchestrator.close()
+
+
+def _decision(*agents):
+    return RoutingDecision(strategy=RoutingStrategy.SINGLE, agents=list(agents))
+
+
+class CountingInference:
+    """Routes every query to both agents in parallel and counts LLM calls."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def complete(self, messages):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return RoutingDecision(
+            strategy=RoutingStrategy.PARALLEL,
+            agents=["purchasing", "billing"],
+        ).model_dump_json()
+
+
+class TestRoutingCache:
+
+    def test_exact_hit_ignores_case_whitespace_and_punctuation(self):
+        cache = RoutingCache()
+        cache.put("Create a  purchase order", 1, _decision("purchasing"))
+
+        assert cache.get("create a purchase order?", 1).agents == ["purchasing"]
+        assert cache.get("cancel a purchase order", 1) is None
+
+    def test_similarity_tier_uses_threshold(self):
+        cache = RoutingCache(similarity_threshold=0.9)
+        cache.put("create a purchase order", 1, _decision("purchasing"), np.array([1.0, 0.0]))
+
+        assert cache.get_similar(np.array([1.0, 0.1]), 1).agents == ["purchasing"]
+        assert cache.get_similar(np.array([1.0, 1.0]), 1) is None
+        assert (cache.similar_hits, cache.misses) == (1, 1)
+
+    def test_new_generation_invalidates(self):
+        cache = RoutingCache()
+        cache.put("q", 1, _decision("purchasing"), np.array([1.0, 0.0]))
+
+        assert cache.get("q", 2) is None
+        assert cache.get_similar(np.array([1.0, 0.0]), 2) is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used_and_expired(self):
+        cache = RoutingCache(max_entries=2)
+        cache.put("a", 1, _decision("a"))
+        cache.put("b", 1, _decision("b"))
+        cache.get("a", 1)
+        cache.put("c", 1, _decision("c"))
+
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) is not None
+
+        expired = RoutingCache(ttl_seconds=0)
+        expired.put("a", 1, _decision("a"))
+        assert expired.get("a", 1) is None
+
+    def test_invalidate_agents_drops_decisions_routing_to_them(self):
+        cache = RoutingCache()
+        cache.put("a", 1, _decision("purchasing", "billing"))
+        cache.put("b", 1, _decision("purchasing"))
+
+        assert cache.invalidate_agents(["billing"]) == 1
+        assert cache.get("a", 1) is None
+        assert cache.get("b", 1) is not None
+
+
+class TestOrchestratorRoutingCache:
+
+    async def _orchestrator(self, inference, **settings):
+        registry = MockRegistryClient(MockEmbeddingClient(dimension=8))
+        await registry.register(_agent("purchasing"))
+        await registry.register(_agent("billing", "http://billing:8000"))
+        return registry, Orchestrator(registry, inference=inference, settings=_settings(**settings))
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_skips_llm_routing(self):
+        inference = CountingInference()
+        _, orchestrator = await self._orchestrator(inference)
+
+        first = await orchestrator._discover_and_route("Show my purchase orders")
+        second = await orchestrator._discover_and_route("show my purchase orders.")
+
+        assert first == second
+        assert inference.calls == 1
+        assert orchestrator.routing_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_registration_change_invalidates_cached_routes(self):
+        inference = CountingInference()
+        registry, orchestrator = await self._orchestrator(inference)
+
+        await orchestrator._discover_and_route("show my purchase orders")
+        await registry.register(_agent("shipping", "http://shipping:8000"))
+        await orchestrator._discover_and_route("show my purchase orders")
+
+        assert inference.calls == 2
+
+    @pytest.mark.parametrize("lost", ["unhealthy", "expired"])
+    @pytest.mark.asyncio
+    async def test_hit_with_unavailable_agent_is_rerouted(self, lost):
+        inference = CountingInference()
+        registry, orchestrator = await self._orchestrator(inference)
+
+        first = await orchestrator._discover_and_route("show my purchase orders")
+        if lost == "unhealthy":
+            (await registry.get("billing")).is_healthy = False
+        else:
+            # Expiry through the registry TTL does not bump the generation
+            registry._agents.pop("billing")
+        second = await orchestrator._discover_and_route("show my purchase orders")
+
+        assert first.agents == ["purchasing", "billing"]
+        assert second.agents == ["purchasing"]
+        assert orchestrator.routing_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_llm_routing_is_not_cached(self):
+        inference = CountingInference(fail=True)
+        _, orchestrator = await self._orchestrator(inference)
+
+        await orchestrator._discover_and_route("show my purchase orders")
+        await orchestrator._discover_and_route("show my purchase orders")
+
+        assert inference.calls == 2
+        assert len(orchestrator.routing_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self):
+        inference = CountingInference()
+        _, orchestrator = await self._orchestrator(inference, routing_cache_enabled=False)
+
+        await orchestrator._discover_and_route("show my purchase orders")
+        await orchestrator._discover_and_route("show my purchase orders")
+
+        assert orchestrator.routing_cache is None
+        assert inference.calls == 2
+
+
+class TestStreamParallel:
+    """Agents are scripted as lists of (delay, message) steps."""
+
+    async def _orchestrator(self, scripts, **settings):
+        registry = MockRegistryClient(MockEmbeddingClient(dimension=8))
+        for agent_id in scripts:
+            await registry.register(_agent(agent_id, f"http://{agent_id}:8000"))
+        orchestrator = Orchestrator(registry, settings=_settings(**settings))
+        cancelled = []
+
+        async def call_agent(agent, query, session_id, token):
+            try:
+                for delay, msg in scripts[agent.agent_id]:
+                    await asyncio.sleep(delay)
+                    yield msg
+            except asyncio.CancelledError:
+                cancelled.append(agent.agent_id)
+                raise
+
+        orchestrator._call_agent = call_agent
+        routing = RoutingDecision(strategy=RoutingStrategy.PARALLEL, agents=list(scripts))
+        return orchestrator, routing, cancelled
+
+    @staticmethod
+    def _say(content, delay=0.0):
+        return (delay, {"type": "assistant_message", "content": content})
+
+    @pytest.mark.asyncio
+    async def test_interleaves_chunks_tagged_by_agent(self):
+        orchestrator, routing, _ = await self._orchestrator({
+            "slow": [self._say("s1", 0.05), self._say("s2", 0.05)],
+            "fast": [self._say("f1", 0.01), self._say("f2", 0.01)],
+        })
+
+        messages = [m async for m in orchestrator._stream_parallel("q", routing, "", "")]
+
+        chunks = [(m["agent_id"], m["content"]) for m in messages if m["type"] == "assistant_message"]
+        assert chunks == [("fast", "f1"), ("fast", "f2"), ("slow", "s1"), ("slow", "s2")]
+        done = [m["agent_id"] for m in messages if m["type"] == "agent_complete"]
+        assert done == ["fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_first_good_answer_wins_and_cancels_the_rest(self):
+        orchestrator, routing, cancelled = await self._orchestrator({
+            "broken": [(0.0, {"type": "error", "message": "boom"})],
+            "fast": [self._say("f1", 0.01), self._say("f2", 0.0)],
+            "slow": [self._say("s1", 1.0)],
+        })
+
+        messages = [m async for m in orchestrator._stream_parallel("q", routing, "", "", first_wins=True)]
+
+        assert [(m["type"], m["agent_id"]) for m in messages[:-1]] == [
+            ("agent_error", "broken"),
+            ("assistant_message", "fast"),
+            ("assistant_message", "fast"),
+            ("agent_complete", "fast"),
+        ]
+        assert messages[-1] == {"type": "done", "payload": None}
+        assert cancelled == ["slow"]
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_slow_agents(self):
+        orchestrator, routing, cancelled = await self._orchestrator(
+            {"fast": [self._say("f1")], "slow": [self._say("s1", 1.0)]},
+            parallel_deadline=0.05,
+        )
+
+        messages = [m async for m in orchestrator._stream_parallel("q", routing, "", "")]
+
+        assert messages[-2:] == [
+            {"type": "agent_error", "agent_id": "slow", "error": "Timed out"},
+            {"type": "done", "payload": None},
+        ]
+        assert [m["type"] for m in messages if m.get("agent_id") == "fast"] == [
+            "assistant_message",
+            "agent_complete",
+        ]
+        assert cancelled == ["slow"]
+
+    @pytest.mark.asyncio
+    async def test_base_agent_chunks_count_as_answers(self):
+        """Only markdown and assistant chunks answer; components, suggestions and done do not."""
+        progress = {"type": "component", "payload": {"component": "progress", "data": {"status": "..."}}}
+        done = {"type": "done", "payload": None}
+        orchestrator, routing, _ = await self._orchestrator({
+            "markdown": [
+                (0.0, progress), (0.01, {"type": "markdown", "payload": "**3** open POs"}), (0.0, done),
+            ],
+            "form": [
+                (0.02, {"type": "component", "payload": {"component": "form", "data": {}}}), (0.0, done),
+            ],
+            "suggestions": [(0.025, {"type": "suggestions", "payload": ["Show POs"]}), (0.0, done)],
+            "stalled": [(0.03, progress)],
+            "broken": [(0.04, {"type": "error", "payload": {"message": "Vendor lookup failed"}})],
+        })
+
+        messages = [m async for m in orchestrator._stream_parallel("q", routing, "", "")]
+
+        outcomes = [(m["type"], m["agent_id"], m.get("error")) for m in messages
+                    if m["type"] in ("agent_complete", "agent_error")]
+        assert outcomes == [
+            ("agent_complete", "markdown", None),
+            ("agent_error", "form", "Agent returned no answer"),
+            ("agent_error", "suggestions", "Agent returned no answer"),
+            ("agent_error", "stalled", "Agent returned no answer"),
+            ("agent_error", "broken", "Vendor lookup failed"),
+        ]
+        assert [m for m in messages if m["type"] == "done"] == [done]
+        assert messages[-1] == done
@@ -0,0 +1,185 @@
+"""Unit tests for pipelined registry reads and the local registry mirror."""
+
+import fnmatch
+import struct
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from agentcore.registry import RegistryClient, RegistryMirror
+from agentcore.registry.models import AgentInfo
+from agentcore.settings.registry import RegistrySettings
+
+
+def _agent(agent_id, **kwargs):
+    return AgentInfo(
+        agent_id=agent_id,
+        name=f"{agent_id.title()} Agent",
+        description=f"Handles {agent_id}",
+        base_url=f"http://{agent_id}:8000",
+        last_heartbeat=kwargs.pop("last_heartbeat", datetime.utcnow()),
+        **kwargs,
+    )
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def mget(self, keys):
+        self._calls.append(("mget", keys))
+
+    def hget(self, key, field):
+        self._calls.append(("hget", key, field))
+
+    async def execute(self):
+        self._redis.round_trips += 1
+        results = []
+        for name, *args in self._calls:
+            if name == "mget":
+                results.append([self._redis.strings.get(k) for k in args[0]])
+            else:
+                results.append(self._redis.hashes.get(args[0], {}).get(args[1]))
+        return results
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis used by the bulk reads."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.round_trips = 0
+
+    def put(self, prefix, agent, vector):
+        self.strings[f"{prefix}:{agent.agent_id}"] = agent.model_dump_json().encode()
+        self.hashes[f"{prefix}:vec:{agent.agent_id}"] = {
+            "agent_id": agent.agent_id,
+            "embedding": struct.pack(f"{len(vector)}f", *vector),
+        }
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.strings.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.strings.get(k) for k in keys]
+
+    async def scan_iter(self, match):
+        for key in list(self.strings) + list(self.hashes):
+            if fnmatch.fnmatchcase(key, match):
+                yield key.encode()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class StaticRegistry:
+    """Stands in for RegistryClient.load_all."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    async def load_all(self):
+        return self.entries
+
+
+PREFIX = RegistrySettings().key_prefix
+
+
+class TestBulkReads:
+
+    @pytest.mark.asyncio
+    async def test_get_many_is_one_round_trip_in_order(self):
+        redis = FakeRedis()
+        redis.put(PREFIX, _agent("billing"), [1.0, 0.0])
+        redis.put(PREFIX, _agent("purchasing"), [0.0, 1.0])
+        client = RegistryClient(redis, embedding=None)
+
+        agents = await client.get_many(["purchasing", "gone", "billing"])
+
+        assert [a.agent_id if a else None for a in agents] == ["purchasing", None, "billing"]
+        assert redis.round_trips == 1
+
+    @pytest.mark.asyncio
+    async def test_load_all_pairs_infos_with_embeddings(self):
+        redis = FakeRedis()
+        redis.put(PREFIX, _agent("billing"), [1.0, 0.0])
+        redis.put(PREFIX, _agent("expired"), [0.0, 1.0])
+        del redis.strings[f"{PREFIX}:expired"]
+        client = RegistryClient(redis, embedding=None)
+
+        entries = await client.load_all()
+
+        assert [(a.agent_id, v.tolist()) for a, v in entries] == [("billing", [1.0, 0.0])]
+        assert redis.round_trips == 1
+
+    @pytest.mark.asyncio
+    async def test_get_falls_back_to_redis_on_mirror_miss(self):
+        redis = FakeRedis()
+        redis.put(PREFIX, _agent("billing"), [1.0, 0.0])
+        client = RegistryClient(redis, embedding=None)
+        await client.start_mirror()
+        try:
+            redis.put(PREFIX, _agent("purchasing"), [0.0, 1.0])
+            round_trips = redis.round_trips
+
+            assert (await client.get("billing")).agent_id == "billing"
+            assert redis.round_trips == round_trips
+            assert (await client.get("purchasing")).agent_id == "purchasing"
+            assert await client.get("gone") is None
+            assert redis.round_trips == round_trips + 2
+        finally:
+            await client.stop_mirror()
+
+
+class TestRegistryMirror:
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_by_cosine_similarity(self):
+        mirror = RegistryMirror(StaticRegistry([
+            (_agent("billing"), np.array([1.0, 0.0], dtype=np.float32)),
+            (_agent("purchasing"), np.array([0.0, 3.0], dtype=np.float32)),
+            (_agent("mixed"), np.array([1.0, 1.0], dtype=np.float32)),
+        ]))
+        await mirror.refresh()
+
+        found = mirror.search(np.array([0.1, 1.0]), top_k=2)
+
+        assert [a.agent_id for a in found] == ["purchasing", "mixed"]
+
+    @pytest.mark.asyncio
+    async def test_skips_unhealthy_and_stale_agents(self):
+        stale = datetime.utcnow() - timedelta(seconds=60)
+        mirror = RegistryMirror(
+            StaticRegistry([
+                (_agent("billing"), np.array([1.0, 0.0], dtype=np.float32)),
+                (_agent("down", is_healthy=False), np.array([1.0, 0.0], dtype=np.float32)),
+                (_agent("stale", last_heartbeat=stale), np.array([1.0, 0.0], dtype=np.float32)),
+            ]),
+            agent_ttl_seconds=30,
+        )
+        await mirror.refresh()
+
+        assert [a.agent_id for a in mirror.search(np.array([1.0, 0.0]), top_k=3)] == ["billing"]
+        assert mirror.get("stale") is None
+        assert mirror.get("billing").agent_id == "billing"
+
+    @pytest.mark.asyncio
+    async def test_refresh_replaces_contents(self):
+        registry = StaticRegistry([(_agent("billing"), np.array([1.0, 0.0], dtype=np.float32))])
+        mirror = RegistryMirror(registry)
+        assert not mirror.ready
+
+        await mirror.refresh()
+        registry.entries = []
+        await mirror.refresh()
+
+        assert mirror.ready
+        assert len(mirror) == 0
+        assert mirror.get("billing") is None
+        assert mirror.search(np.array([1.0, 0.0]), top_k=5) == []
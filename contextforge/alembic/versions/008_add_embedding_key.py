@@ -0,0 +1,33 @@
+"""Add embedding_key column to knowledge_nodes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-02-03
+
+Stores the embedding cache key (SHA-256 of model, dimension and embed text)
+that produced the current embedding, so re-embed jobs can skip nodes whose
+text and model are unchanged.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+
+SCHEMA = os.environ.get("DB_SCHEMA", "agent")
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(f"""
+        ALTER TABLE {SCHEMA}.knowledge_nodes
+        ADD COLUMN embedding_key VARCHAR(64);
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"ALTER TABLE {SCHEMA}.knowledge_nodes DROP COLUMN IF EXISTS embedding_key;")
@@ -0,0 +1,61 @@
+"""Add knowledge hit rollup tables
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-02-10
+
+Hourly and daily pre-aggregates of knowledge_hits, per node and retrieval
+method (knowledge_hit_rollups) and across all nodes
+(knowledge_hit_rollup_totals). They are filled by the hit rollup job up to
+the watermarks stored in system_settings under 'hit_rollups'; metrics read
+the rollups and only scan raw hits past the hourly watermark.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+
+SCHEMA = os.environ.get("DB_SCHEMA", "agent")
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(f"""
+        CREATE TABLE {SCHEMA}.knowledge_hit_rollups (
+            granularity VARCHAR(4) NOT NULL,
+            bucket_start TIMESTAMPTZ NOT NULL,
+            node_id BIGINT NOT NULL REFERENCES {SCHEMA}.knowledge_nodes(id) ON DELETE CASCADE,
+            retrieval_method VARCHAR(30) NOT NULL DEFAULT '',
+
+            hits BIGINT NOT NULL,
+            sessions BIGINT NOT NULL,
+            similarity_sum FLOAT NOT NULL DEFAULT 0,
+            similarity_count BIGINT NOT NULL DEFAULT 0,
+            last_hit_at TIMESTAMPTZ,
+
+            PRIMARY KEY (granularity, bucket_start, node_id, retrieval_method)
+        );
+
+        CREATE INDEX idx_hit_rollups_node ON {SCHEMA}.knowledge_hit_rollups(node_id);
+
+        CREATE TABLE {SCHEMA}.knowledge_hit_rollup_totals (
+            granularity VARCHAR(4) NOT NULL,
+            bucket_start TIMESTAMPTZ NOT NULL,
+
+            hits BIGINT NOT NULL,
+            sessions BIGINT NOT NULL,
+
+            PRIMARY KEY (granularity, bucket_start)
+        );
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"DROP TABLE IF EXISTS {SCHEMA}.knowledge_hit_rollup_totals;")
+    op.execute(f"DROP TABLE IF EXISTS {SCHEMA}.knowledge_hit_rollups;")
+    op.execute(f"DELETE FROM {SCHEMA}.system_settings WHERE category = 'hit_rollups';")
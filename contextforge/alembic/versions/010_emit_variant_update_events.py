@@ -0,0 +1,61 @@
+"""Emit graph events for variant embedding updates
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-02-17
+
+Variants are inserted without an embedding and get it from a follow-up
+UPDATE, which trg_variant_events (INSERT/DELETE only) did not report, so
+graph_events consumers never saw variant embeddings. The trigger now also
+fires on UPDATE OF embedding and emits 'variant_updated' with the new row.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+
+SCHEMA = os.environ.get("DB_SCHEMA", "agent")
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {SCHEMA}.emit_variant_event()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO {SCHEMA}.graph_events (event_type, entity_type, entity_id, payload)
+                VALUES ('variant_created', 'variant', NEW.id, to_jsonb(NEW));
+                RETURN NEW;
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO {SCHEMA}.graph_events (event_type, entity_type, entity_id, payload)
+                VALUES ('variant_updated', 'variant', NEW.id, to_jsonb(NEW));
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO {SCHEMA}.graph_events (event_type, entity_type, entity_id, payload)
+                VALUES ('variant_deleted', 'variant', OLD.id, to_jsonb(OLD));
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_variant_events ON {SCHEMA}.node_variants;
+        CREATE TRIGGER trg_variant_events
+        AFTER INSERT OR DELETE OR UPDATE OF embedding ON {SCHEMA}.node_variants
+        FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.emit_variant_event();
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"""
+        DROP TRIGGER IF EXISTS trg_variant_events ON {SCHEMA}.node_variants;
+        CREATE TRIGGER trg_variant_events
+        AFTER INSERT OR DELETE ON {SCHEMA}.node_variants
+        FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.emit_variant_event();
+    """)
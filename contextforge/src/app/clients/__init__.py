@@ -1,11 +1,14 @@
 from app.clients.base import BaseClient
 from app.clients.embedding_client import EmbeddingClient
+from app.clients.embedding_cache import EmbeddingCache, CachedEmbeddingClient
 from app.clients.inference_client import InferenceClient
 from app.clients.langfuse_client import LangfuseClient, PromptConfig, get_langfuse_client
 
 __all__ = [
     "BaseClient",
     "EmbeddingClient",
+    "EmbeddingCache",
+    "CachedEmbeddingClient",
     "InferenceClient",
     "LangfuseClient",
     "PromptConfig",
@@ -0,0 +1,190 @@
+"""
+Two-tier embedding cache.
+
+Embeddings are deterministic for a given (model, dimension, text), so they
+are cached under a SHA-256 of exactly that triple:
+
+- L1: in-process LRU, shared by every request in the worker; vectors are
+  kept as array('f') (4 bytes per value instead of a Python float object)
+- L2: Redis (optional), shared by all workers; vectors are stored as packed
+  float32 bytes rather than JSON
+
+CachedEmbeddingClient wraps any EmbeddingClient and only forwards misses to
+the provider, so repeated queries cost no embedding API calls.
+"""
+
+import hashlib
+import logging
+import sys
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Dict, Sequence
+
+from app.clients.embedding_client import EmbeddingClient
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_cache_key(text: str, model: str, dimension: int) -> str:
+    """Hex digest identifying an embedding of text by model and dimension."""
+    digest = hashlib.sha256()
+    digest.update(f"{model}\x00{dimension}\x00".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array("f", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    values = array("f")
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class EmbeddingCache:
+    """In-process LRU backed by an optional Redis tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        redis_client=None,
+        ttl: Optional[int] = None,
+        key_prefix: str = "contextforge:emb",
+        use_shared_redis: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.redis = redis_client
+        self._use_shared_redis = use_shared_redis and redis_client is None
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, array]" = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def _get_redis(self):
+        if self._use_shared_redis:
+            self._use_shared_redis = False
+            from app.core.redis import get_redis_client
+            self.redis = await get_redis_client()
+        if self.redis is not None and self.redis.is_connected:
+            return self.redis
+        return None
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def _remember(self, key: str, embedding: array) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for keys; missing keys are omitted."""
+        found: Dict[str, List[float]] = {}
+        remote: List[str] = []
+
+        for key in dict.fromkeys(keys):
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                found[key] = embedding.tolist()
+                self.hits += 1
+            else:
+                remote.append(key)
+
+        redis = await self._get_redis() if remote else None
+        if redis is not None:
+            values = await redis.mget([self._redis_key(key) for key in remote])
+            for key, data in zip(remote, values):
+                if data:
+                    embedding = _unpack(data)
+                    self._remember(key, embedding)
+                    found[key] = embedding.tolist()
+                    self.redis_hits += 1
+
+        self.misses += len(remote) - sum(1 for key in remote if key in found)
+        return found
+
+    async def set_many(self, items: Dict[str, List[float]]) -> None:
+        packed = {key: array("f", embedding) for key, embedding in items.items()}
+        for key, values in packed.items():
+            self._remember(key, values)
+        redis = await self._get_redis()
+        if redis is not None:
+            await redis.set_many(
+                {self._redis_key(key): _pack(values) for key, values in packed.items()},
+                ttl=self.ttl,
+            )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedEmbeddingClient(EmbeddingClient):
+    """
+    EmbeddingClient decorator that serves repeated texts from EmbeddingCache.
+
+    embed_batch only sends the distinct uncached texts to the wrapped client,
+    in one call, and returns results in input order.
+    """
+
+    def __init__(
+        self,
+        client: EmbeddingClient,
+        cache: EmbeddingCache,
+        model: Optional[str] = None,
+    ):
+        self._client = client
+        self.cache = cache
+        self.model = model or settings.EMBEDDING_MODEL
+
+    @property
+    def wrapped(self) -> EmbeddingClient:
+        return self._client
+
+    def cache_key(self, text: str) -> str:
+        return embedding_cache_key(text, self.model, self.expected_dimension)
+
+    async def embed(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        keys = [self.cache_key(t) for t in texts]
+        found = await self.cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            if len(missing) == 1:
+                embeddings = [await self._client.embed(next(iter(missing.values())))]
+            else:
+                embeddings = await self._client.embed_batch(list(missing.values()))
+            fresh = dict(zip(missing.keys(), embeddings))
+            await self.cache.set_many(fresh)
+            found.update(fresh)
+
+        return [list(found[key]) for key in keys]
+
+    async def health_check(self) -> bool:
+        return await self._client.health_check()
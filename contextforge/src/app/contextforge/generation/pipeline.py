@@ -12,6 +12,7 @@ NOTE: This is a simplified version adapted for ContextForge.
 The full version will be implemented after retrieval and storage layers are complete.
 """
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime
@@ -250,8 +251,10 @@ class QueryGenerationPipeline:
     ) -> RetrievalContext:
         """Retrieve context using configured retriever."""
         try:
-            # The retriever interface will be defined by the retrieval layer
-            context = self.retriever.retrieve(
+            # The retriever interface will be defined by the retrieval layer.
+            # Retrieval is CPU-bound, so keep it off the event loop.
+            context = await asyncio.to_thread(
+                self.retriever.retrieve,
                 question=question,
                 tenant_id=tenant_id,
                 document_name=document_name,
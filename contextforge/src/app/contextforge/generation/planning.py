@@ -10,6 +10,7 @@ NOTE: This is a simplified version adapted for ContextForge.
 The full version with plan storage will be implemented in Phase 8+.
 """
 
+import asyncio
 import json
 import logging
 import re
@@ -132,7 +133,8 @@ class QueryPlanningPipeline:
 
         # Step 1: Retrieve context (if retriever available)
         if self.retriever:
-            retrieval_context = self.retriever.retrieve(
+            retrieval_context = await asyncio.to_thread(
+                self.retriever.retrieve,
                 question=question,
                 tenant_id=tenant_id,
                 document_name=document_name,
@@ -5,14 +5,28 @@ Provides BM25 (Best Matching 25) ranking for searching field metadata.
 Indexes field paths, descriptions, aliases, and concept mappings.
 
 Used by GraphContextRetriever for text-based field discovery.
+
+The index keeps term -> {doc: tf} postings, so a query only touches
+documents containing one of its terms. With NumPy installed, postings are
+compiled to (doc ids, tf) arrays and scored in bulk, and top-k selection
+uses a partial sort. Fields can be added or removed without rebuilding.
 """
 
+import heapq
 import logging
 import math
 import re
+from collections import Counter
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
 from ..schema.yaml_schema import YAMLSchemaV1
 from ..schema.field_schema import FieldSpec
 from ..schema.api_schema import EndpointSpec, ParameterSpec
@@ -48,6 +62,9 @@ class BM25Document:
     # Source metadata for debugging
     source_text: str
 
+    # "METHOD:/path" of the endpoint a parameter document came from
+    endpoint_key: Optional[str] = None
+
 
 @dataclass
 class BM25SearchResult:
@@ -73,20 +90,35 @@ class BM25FieldIndex:
         >>> results = index.search("pending status orders", top_k=5)
         >>> for r in results:
         ...     print(f"{r.field_path}: {r.score:.3f}")
+        >>>
+        >>> # Schema edits
+        >>> index.add_field(new_field_spec)
+        >>> index.remove_field("Legacy.Status")
     """
 
+    # Rebuild slot arrays once this many removed slots have accumulated
+    COMPACT_MIN_REMOVED = 1000
+
     def __init__(self, config: Optional[BM25Config] = None):
         self.config = config or BM25Config()
-        self._documents: List[BM25Document] = []
-        self._field_to_idx: Dict[str, int] = {}
+        # Slot per document; removed documents leave None until compaction.
+        # A path can own several slots (e.g. query.status on many endpoints).
+        self._documents: List[Optional[BM25Document]] = []
+        self._field_to_idx: Dict[str, List[int]] = {}
+        self._endpoint_to_idx: Dict[str, List[int]] = {}
 
         # Corpus statistics
         self._avgdl: float = 0.0
         self._doc_count: int = 0
+        self._total_length: int = 0
         self._doc_freqs: Dict[str, int] = {}  # term -> number of docs containing term
 
-        # Precomputed IDF values
-        self._idf_cache: Dict[str, float] = {}
+        # term -> {doc slot: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = {}
+
+        # Lazily built NumPy views, dropped when the index changes
+        self._compiled: Dict[str, Tuple[Any, Any]] = {}
+        self._len_norms: Optional[Any] = None
 
     def build_from_schema(self, schema: YAMLSchemaV1) -> None:
         """
@@ -95,76 +127,174 @@ class BM25FieldIndex:
         Processes all fields in all indices, creating searchable
         documents from their metadata.
         """
-        self._documents.clear()
-        self._field_to_idx.clear()
-        self._doc_freqs.clear()
-        self._idf_cache.clear()
+        self._reset()
 
         # Collect all documents from indices
         for index in schema.indices:
-            self._index_fields(index.fields, index.name)
+            self._index_fields(index.fields)
 
         # Collect all documents from REST API endpoints
         for endpoint in schema.endpoints:
             self._index_endpoint_params(endpoint)
 
-        # Calculate corpus statistics
-        self._doc_count = len(self._documents)
-        if self._doc_count > 0:
-            total_length = sum(doc.length for doc in self._documents)
-            self._avgdl = total_length / self._doc_count
-        else:
-            self._avgdl = 1.0
-
-        # Precompute IDF for all terms
-        self._precompute_idf()
-
         logger.info(
             f"Built BM25 index: {self._doc_count} documents, "
             f"{len(self._doc_freqs)} unique terms, avgdl={self._avgdl:.1f}"
         )
 
-    def _index_fields(
-        self,
-        fields: List[FieldSpec],
-        index_name: str,
-        parent_path: str = "",
-    ) -> None:
-        """Recursively index fields including nested ones"""
-        for field_spec in fields:
-            # Build document text from field metadata
-            doc_text = self._build_document_text(field_spec)
-            tokens = self._tokenize(doc_text)
+    def _reset(self) -> None:
+        self._documents.clear()
+        self._field_to_idx.clear()
+        self._endpoint_to_idx.clear()
+        self._doc_freqs.clear()
+        self._postings.clear()
+        self._compiled.clear()
+        self._len_norms = None
+        self._doc_count = 0
+        self._total_length = 0
+        self._avgdl = 1.0
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add_field(self, field_spec: FieldSpec, include_nested: bool = True) -> int:
+        """
+        Index a field (and by default its nested fields).
 
-            if not tokens:
-                continue
+        Every document already indexed under one of the added paths is
+        replaced. Returns the number of documents added.
+        """
+        docs: List[BM25Document] = []
+        if include_nested:
+            self._collect_field_documents([field_spec], docs)
+        else:
+            doc = self._make_document(field_spec.path, self._build_document_text(field_spec))
+            if doc is not None:
+                docs.append(doc)
+
+        for path in {doc.field_path for doc in docs}:
+            self.remove_field(path)
+        for doc in docs:
+            self._add_document(doc)
+        return len(docs)
+
+    def add_endpoint(self, endpoint: EndpointSpec) -> int:
+        """Index (or re-index) the parameters of a REST endpoint."""
+        for idx in list(self._endpoint_to_idx.get(self._endpoint_key(endpoint), [])):
+            self._remove_slot(idx)
+        self._maybe_compact()
+        before = self._doc_count
+        self._index_endpoint_params(endpoint)
+        return self._doc_count - before
+
+    def remove_field(self, field_path: str) -> bool:
+        """Remove every field or parameter document with this path. Returns False if absent."""
+        slots = self._field_to_idx.get(field_path)
+        if not slots:
+            return False
+        for idx in list(slots):
+            self._remove_slot(idx)
+        self._maybe_compact()
+        return True
+
+    def _remove_slot(self, idx: int) -> None:
+        doc = self._documents[idx]
+        self._documents[idx] = None
+        self._unlink(self._field_to_idx, doc.field_path, idx)
+        if doc.endpoint_key is not None:
+            self._unlink(self._endpoint_to_idx, doc.endpoint_key, idx)
+        for term in doc.token_freqs:
+            posting = self._postings[term]
+            del posting[idx]
+            self._compiled.pop(term, None)
+            if posting:
+                self._doc_freqs[term] -= 1
+            else:
+                del self._postings[term]
+                del self._doc_freqs[term]
+
+        self._doc_count -= 1
+        self._total_length -= doc.length
+        self._update_stats()
+
+    def _maybe_compact(self) -> None:
+        removed = len(self._documents) - self._doc_count
+        if removed >= self.COMPACT_MIN_REMOVED and removed >= self._doc_count:
+            self._compact()
+
+    @staticmethod
+    def _unlink(slots_by_key: Dict[str, List[int]], key: str, idx: int) -> None:
+        slots = slots_by_key[key]
+        slots.remove(idx)
+        if not slots:
+            del slots_by_key[key]
+
+    def _make_document(self, field_path: str, doc_text: str) -> Optional[BM25Document]:
+        tokens = self._tokenize(doc_text)
+        if not tokens:
+            return None
+        return BM25Document(
+            field_path=field_path,
+            tokens=tokens,
+            token_freqs=dict(Counter(tokens)),
+            length=len(tokens),
+            source_text=doc_text,
+        )
 
-            # Calculate token frequencies
-            token_freqs: Dict[str, int] = {}
-            for token in tokens:
-                token_freqs[token] = token_freqs.get(token, 0) + 1
-
-            # Create document
-            doc = BM25Document(
-                field_path=field_spec.path,
-                tokens=tokens,
-                token_freqs=token_freqs,
-                length=len(tokens),
-                source_text=doc_text,
-            )
+    def _add_document(self, doc: Optional[BM25Document]) -> None:
+        """Append a document in a new slot; documents sharing its path are kept."""
+        if doc is None:
+            return
 
-            # Store document
-            idx = len(self._documents)
-            self._documents.append(doc)
-            self._field_to_idx[field_spec.path] = idx
+        idx = len(self._documents)
+        self._documents.append(doc)
+        self._field_to_idx.setdefault(doc.field_path, []).append(idx)
+        if doc.endpoint_key is not None:
+            self._endpoint_to_idx.setdefault(doc.endpoint_key, []).append(idx)
+
+        for term, tf in doc.token_freqs.items():
+            self._postings.setdefault(term, {})[idx] = tf
+            self._doc_freqs[term] = self._doc_freqs.get(term, 0) + 1
+            self._compiled.pop(term, None)
+
+        self._doc_count += 1
+        self._total_length += doc.length
+        self._update_stats()
+
+    def _update_stats(self) -> None:
+        self._avgdl = self._total_length / self._doc_count if self._doc_count else 1.0
+        self._len_norms = None
+
+    def _compact(self) -> None:
+        """Drop removed slots so arrays stay proportional to live docs."""
+        docs = [doc for doc in self._documents if doc is not None]
+        self._reset()
+        for doc in docs:
+            self._add_document(doc)
+
+    def _index_fields(self, fields: List[FieldSpec]) -> None:
+        """Recursively index fields including nested ones"""
+        docs: List[BM25Document] = []
+        self._collect_field_documents(fields, docs)
+        for doc in docs:
+            self._add_document(doc)
 
-            # Update document frequencies
-            for term in set(tokens):
-                self._doc_freqs[term] = self._doc_freqs.get(term, 0) + 1
+    def _collect_field_documents(self, fields: List[FieldSpec], docs: List[BM25Document]) -> None:
+        for field_spec in fields:
+            # Build document text from field metadata
+            doc = self._make_document(field_spec.path, self._build_document_text(field_spec))
+            if doc is not None:
+                docs.append(doc)
 
             # Recursively index nested fields
             if field_spec.nested_fields:
-                self._index_fields(field_spec.nested_fields, index_name, field_spec.path)
+                self._collect_field_documents(field_spec.nested_fields, docs)
+
+    @staticmethod
+    def _endpoint_key(endpoint: EndpointSpec) -> str:
+        method_str = endpoint.method.value if hasattr(endpoint.method, 'value') else str(endpoint.method)
+        return f"{method_str}:{endpoint.path}"
 
     def _index_endpoint_params(self, endpoint: EndpointSpec) -> None:
         """
@@ -172,42 +302,19 @@ class BM25FieldIndex:
         
         Parameters are treated like fields for BM25 search.
         """
-        method_str = endpoint.method.value if hasattr(endpoint.method, 'value') else str(endpoint.method)
-        endpoint_key = f"{method_str}:{endpoint.path}"
+        endpoint_key = self._endpoint_key(endpoint)
         
         for param in endpoint.parameters:
             # Build document text from parameter metadata
             doc_text = self._build_param_document_text(param, endpoint)
-            tokens = self._tokenize(doc_text)
-            
-            if not tokens:
-                continue
-            
-            # Calculate token frequencies
-            token_freqs: Dict[str, int] = {}
-            for token in tokens:
-                token_freqs[token] = token_freqs.get(token, 0) + 1
             
             # Get qualified name for the param
             qualified_name = param.get_qualified_name() if hasattr(param, 'get_qualified_name') else param.name
             
-            # Create document
-            doc = BM25Document(
-                field_path=qualified_name,
-                tokens=tokens,
-                token_freqs=token_freqs,
-                length=len(tokens),
-                source_text=doc_text,
-            )
-            
-            # Store document
-            idx = len(self._documents)
-            self._documents.append(doc)
-            self._field_to_idx[qualified_name] = idx
-            
-            # Update document frequencies
-            for term in set(tokens):
-                self._doc_freqs[term] = self._doc_freqs.get(term, 0) + 1
+            doc = self._make_document(qualified_name, doc_text)
+            if doc is not None:
+                doc.endpoint_key = endpoint_key
+            self._add_document(doc)
 
     def _build_param_document_text(self, param: ParameterSpec, endpoint: EndpointSpec) -> str:
         """
@@ -309,20 +416,35 @@ class BM25FieldIndex:
         # Filter short tokens
         return [t for t in tokens if len(t) >= 2]
 
-    def _precompute_idf(self) -> None:
-        """Precompute IDF values for all terms"""
-        n = self._doc_count
-        if n == 0:
-            return
-
-        for term, df in self._doc_freqs.items():
-            # BM25 IDF formula
-            idf = math.log((n - df + 0.5) / (df + 0.5) + 1.0)
-            self._idf_cache[term] = idf
-
     def _get_idf(self, term: str) -> float:
         """Get IDF for a term"""
-        return self._idf_cache.get(term, 0.0)
+        df = self._doc_freqs.get(term, 0)
+        if not df:
+            return 0.0
+        # BM25 IDF formula
+        return math.log((self._doc_count - df + 0.5) / (df + 0.5) + 1.0)
+
+    def _compiled_postings(self, term: str) -> Tuple[Any, Any]:
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            posting = self._postings[term]
+            compiled = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float64, count=len(posting)),
+            )
+            self._compiled[term] = compiled
+        return compiled
+
+    def _length_norms(self) -> Any:
+        if self._len_norms is None:
+            b = self.config.b
+            lengths = np.fromiter(
+                (doc.length if doc is not None else 0 for doc in self._documents),
+                dtype=np.float64,
+                count=len(self._documents),
+            )
+            self._len_norms = 1 - b + b * (lengths / self._avgdl) if self._avgdl > 0 else np.ones_like(lengths)
+        return self._len_norms
 
     def _score_document(
         self,
@@ -381,7 +503,7 @@ class BM25FieldIndex:
         Returns:
             List of BM25SearchResult sorted by score descending
         """
-        if not self._documents:
+        if not self._doc_count:
             return []
 
         min_score = min_score if min_score is not None else self.config.min_score
@@ -390,21 +512,81 @@ class BM25FieldIndex:
         if not query_tokens:
             return []
 
-        # Score all documents
+        # Repeated query terms count once per occurrence
+        query_terms = [
+            (term, count) for term, count in Counter(query_tokens).items()
+            if term in self._postings
+        ]
+        if not query_terms:
+            return []
+
+        if HAS_NUMPY:
+            ranked = self._rank_vectorized(query_terms, top_k, min_score)
+        else:
+            ranked = self._rank_postings(query_terms, top_k, min_score)
+
         results: List[BM25SearchResult] = []
-        for doc in self._documents:
-            score, matched = self._score_document(doc, query_tokens)
+        for idx, score in ranked:
+            doc = self._documents[idx]
+            results.append(BM25SearchResult(
+                field_path=doc.field_path,
+                score=score,
+                matched_terms=[t for t in query_tokens if t in doc.token_freqs],
+            ))
+        return results
+
+    def _rank_vectorized(
+        self,
+        query_terms: List[Tuple[str, int]],
+        top_k: int,
+        min_score: float,
+    ) -> List[Tuple[int, float]]:
+        """Score matching docs with NumPy; (slot, score) best first."""
+        k1 = self.config.k1
+        norms = self._length_norms()
+        scores = np.zeros(len(self._documents), dtype=np.float64)
+        matched = np.zeros(len(self._documents), dtype=bool)
+
+        for term, count in query_terms:
+            doc_ids, tfs = self._compiled_postings(term)
+            weight = count * self._get_idf(term)
+            scores[doc_ids] += weight * (tfs * (k1 + 1)) / (tfs + k1 * norms[doc_ids])
+            matched[doc_ids] = True
+
+        candidates = np.flatnonzero(matched & (scores >= min_score))
+        if not len(candidates) or top_k <= 0:
+            return []
+
+        cand_scores = scores[candidates]
+        if len(candidates) > top_k:
+            # Partial sort, keeping ties at the cut so ordering stays stable
+            kth = np.partition(cand_scores, len(cand_scores) - top_k)[len(cand_scores) - top_k]
+            keep = cand_scores >= kth
+            candidates, cand_scores = candidates[keep], cand_scores[keep]
+
+        order = np.lexsort((candidates, -cand_scores))[:top_k]
+        return list(zip(candidates[order].tolist(), cand_scores[order].tolist()))
+
+    def _rank_postings(
+        self,
+        query_terms: List[Tuple[str, int]],
+        top_k: int,
+        min_score: float,
+    ) -> List[Tuple[int, float]]:
+        """Pure-Python postings scorer used when NumPy is unavailable."""
+        k1 = self.config.k1
+        b = self.config.b
+        scores: Dict[int, float] = {}
 
-            if score >= min_score and matched:
-                results.append(BM25SearchResult(
-                    field_path=doc.field_path,
-                    score=score,
-                    matched_terms=matched,
-                ))
+        for term, count in query_terms:
+            weight = count * self._get_idf(term)
+            for idx, tf in self._postings[term].items():
+                length = self._documents[idx].length
+                len_norm = 1 - b + b * (length / self._avgdl) if self._avgdl > 0 else 1.0
+                scores[idx] = scores.get(idx, 0.0) + weight * (tf * (k1 + 1)) / (tf + k1 * len_norm)
 
-        # Sort by score descending and limit
-        results.sort(key=lambda r: -r.score)
-        return results[:top_k]
+        ranked = [(idx, score) for idx, score in scores.items() if score >= min_score]
+        return heapq.nsmallest(top_k, ranked, key=lambda item: (-item[1], item[0]))
 
     def search_fields(
         self,
@@ -420,11 +602,11 @@ class BM25FieldIndex:
         return [(r.field_path, r.score) for r in results]
 
     def get_field_score(self, field_path: str, query: str) -> float:
-        """Get BM25 score for a specific field given a query"""
+        """Get BM25 score for a specific field given a query (its last indexed document)"""
         if field_path not in self._field_to_idx:
             return 0.0
 
-        idx = self._field_to_idx[field_path]
+        idx = self._field_to_idx[field_path][-1]
         doc = self._documents[idx]
         query_tokens = self._tokenize(query)
 
@@ -433,7 +615,7 @@ class BM25FieldIndex:
 
     def has_documents(self) -> bool:
         """Check if index has any documents"""
-        return len(self._documents) > 0
+        return self._doc_count > 0
 
     @property
     def document_count(self) -> int:
@@ -451,7 +633,7 @@ class BM25FieldIndex:
             "document_count": self._doc_count,
             "vocabulary_size": len(self._doc_freqs),
             "avg_doc_length": self._avgdl,
-            "total_tokens": sum(doc.length for doc in self._documents),
+            "total_tokens": self._total_length,
         }
 
     def __repr__(self) -> str:
@@ -99,6 +99,7 @@ class SearchResult:
     hop_count: int
     field_scores: Dict[str, float] = field(default_factory=dict)  # field_path -> score
     matched_endpoint_keys: Set[str] = field(default_factory=set)  # "METHOD:/path" keys
+    dropped_legs: Dict[str, str] = field(default_factory=dict)  # fusion leg -> "timeout" | "error"
 
 
 class SchemaGraph:
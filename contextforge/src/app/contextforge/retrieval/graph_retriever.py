@@ -13,9 +13,11 @@ with the QueryGenerationPipeline.
 
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from ..graph.bm25_index import BM25FieldIndex
 from ..graph.schema_graph import SchemaGraph, SearchResult
@@ -40,6 +42,24 @@ class RetrievalStrategy(str, Enum):
 
 logger = logging.getLogger(__name__)
 
+# Worker threads shared by all retrievers for concurrent fusion legs
+FUSION_MAX_WORKERS = 8
+
+_fusion_executor: Optional[ThreadPoolExecutor] = None
+_fusion_executor_lock = threading.Lock()
+
+
+def _get_fusion_executor() -> ThreadPoolExecutor:
+    global _fusion_executor
+    if _fusion_executor is None:
+        with _fusion_executor_lock:
+            if _fusion_executor is None:
+                _fusion_executor = ThreadPoolExecutor(
+                    max_workers=FUSION_MAX_WORKERS,
+                    thread_name_prefix="fusion-leg",
+                )
+    return _fusion_executor
+
 
 # Query-related keywords that indicate operations
 OPERATION_KEYWORDS = {
@@ -98,6 +118,7 @@ class ScoringConfig:
     value_weight: float = 0.35            # Value synonym matching
     pronoun_weight: float = 0.15          # Pronoun reference matching
     bm25_weight: float = 0.20             # BM25 text search
+    vector_weight: float = 0.0            # Vector similarity (opt-in, needs vector_store)
 
     # === Thresholds ===
     min_fusion_score: float = 0.1         # Minimum score to include in results
@@ -106,7 +127,10 @@ class ScoringConfig:
 
     def validate(self) -> None:
         """Validate that weights are sensible"""
-        total = self.concept_weight + self.value_weight + self.pronoun_weight + self.bm25_weight
+        total = (
+            self.concept_weight + self.value_weight + self.pronoun_weight
+            + self.bm25_weight + self.vector_weight
+        )
         if abs(total - 1.0) > 0.01:
             raise ValueError(f"Fusion weights should sum to 1.0, got {total}")
 
@@ -193,6 +217,12 @@ class GraphRetrievalConfig:
     enable_pronoun_search: bool = True
     enable_bm25_search: bool = True
 
+    # Run fusion legs concurrently on the shared fusion pool. With a
+    # timeout (seconds), legs still running are dropped and the remaining
+    # results are fused without them; see SearchResult.dropped_legs
+    parallel_fusion: bool = False
+    fusion_leg_timeout: Optional[float] = None
+
     # Scoring configuration
     scoring: ScoringConfig = field(default_factory=ScoringConfig)
     
@@ -657,14 +687,17 @@ class GraphContextRetriever:
         """
         Parallel fusion search with weighted scoring.
 
-        Runs multiple search strategies in parallel and fuses results
-        using configurable weights from ScoringConfig.
+        Runs multiple search strategies concurrently and fuses results
+        using configurable weights from ScoringConfig. A strategy that fails
+        or misses config.fusion_leg_timeout is left out of the fusion and
+        reported in the result's dropped_legs.
 
         Strategies:
         1. Concept search (graph traversal)
         2. Value search (value synonym matching)
         3. Pronoun search (pronoun -> concept mapping)
         4. BM25 search (optional text search)
+        5. Vector search (when vector_weight > 0 and a vector store is set)
 
         Args:
             question: Original question text (for pronoun detection)
@@ -676,37 +709,123 @@ class GraphContextRetriever:
         Returns:
             Fused SearchResult with weighted scoring
         """
+        legs = self._fusion_legs(question, keywords, index_pattern, expansion_hops)
+        results_with_weights, dropped = self._run_fusion_legs(legs)
+
+        # Fuse results with weighted scoring
+        result = self._fuse_results(results_with_weights, max_fields)
+        result.dropped_legs = dropped
+        return result
+
+    def _fusion_legs(
+        self,
+        question: str,
+        keywords: List[str],
+        index_pattern: Optional[str],
+        expansion_hops: int,
+    ) -> List[Tuple[str, Callable[[], SearchResult], float]]:
+        """Enabled fusion strategies as (name, search, weight) tuples"""
         scoring = self.config.scoring
-        results_with_weights: List[Tuple[SearchResult, float]] = []
 
-        # 1. Concept search (always enabled)
-        concept_result = self._concept_search(keywords, expansion_hops)
-        results_with_weights.append((concept_result, scoring.concept_weight))
+        # Concept search is always enabled
+        legs: List[Tuple[str, Callable[[], SearchResult], float]] = [
+            ("concept", lambda: self._concept_search(keywords, expansion_hops), scoring.concept_weight),
+        ]
 
-        # 2. Value synonym search
         if self.config.enable_value_search and self.value_index.has_values():
-            value_result = self._value_search(keywords, expansion_hops)
-            results_with_weights.append((value_result, scoring.value_weight))
+            legs.append(
+                ("value", lambda: self._value_search(keywords, expansion_hops), scoring.value_weight)
+            )
         else:
-            # Redistribute weight if disabled
             logger.debug("Value search disabled or no values indexed")
 
-        # 3. Pronoun search
         if self.config.enable_pronoun_search and self.value_index.has_pronouns():
-            pronoun_result = self._pronoun_search(question, expansion_hops)
-            results_with_weights.append((pronoun_result, scoring.pronoun_weight))
+            legs.append(
+                ("pronoun", lambda: self._pronoun_search(question, expansion_hops), scoring.pronoun_weight)
+            )
         else:
             logger.debug("Pronoun search disabled or no pronouns indexed")
 
-        # 4. BM25 text search
         if self.config.enable_bm25_search and self.bm25_index.has_documents():
-            bm25_result = self._bm25_search(question, expansion_hops)
-            results_with_weights.append((bm25_result, scoring.bm25_weight))
+            legs.append(
+                ("bm25", lambda: self._bm25_search(question, expansion_hops), scoring.bm25_weight)
+            )
         else:
             logger.debug("BM25 search disabled or no documents indexed")
 
-        # Fuse results with weighted scoring
-        return self._fuse_results(results_with_weights, max_fields)
+        if scoring.vector_weight > 0 and self.vector_store:
+            legs.append((
+                "vector",
+                lambda: self._vector_leg(keywords, index_pattern, expansion_hops),
+                scoring.vector_weight,
+            ))
+
+        return legs
+
+    def _run_fusion_legs(
+        self,
+        legs: List[Tuple[str, Callable[[], SearchResult], float]],
+    ) -> Tuple[List[Tuple[SearchResult, float]], Dict[str, str]]:
+        """
+        Execute fusion legs, concurrently when config.parallel_fusion is set.
+
+        Failed legs are logged and skipped. In concurrent mode, legs still
+        running after config.fusion_leg_timeout are abandoned so the
+        slowest strategy cannot hold up the fused result. An abandoned leg
+        that has already started keeps its pool thread until it returns.
+
+        Returns:
+            (result, weight) tuples in the order of legs, and the skipped
+            legs mapped to "timeout" or "error"
+        """
+        results_with_weights: List[Tuple[SearchResult, float]] = []
+        dropped: Dict[str, str] = {}
+
+        if not self.config.parallel_fusion or len(legs) < 2:
+            for name, search, weight in legs:
+                try:
+                    results_with_weights.append((search(), weight))
+                except Exception as e:
+                    logger.warning(f"Fusion leg '{name}' failed: {e}")
+                    dropped[name] = "error"
+            return results_with_weights, dropped
+
+        timeout = self.config.fusion_leg_timeout
+        executor = _get_fusion_executor()
+        futures = [(name, executor.submit(search), weight) for name, search, weight in legs]
+        done, _pending = wait([f for _, f, _ in futures], timeout=timeout)
+
+        for name, future, weight in futures:
+            if future not in done:
+                # Only stops legs still queued behind other searches
+                future.cancel()
+                logger.warning(f"Fusion leg '{name}' exceeded {timeout}s, fusing without it")
+                dropped[name] = "timeout"
+                continue
+            try:
+                results_with_weights.append((future.result(), weight))
+            except Exception as e:
+                logger.warning(f"Fusion leg '{name}' failed: {e}")
+                dropped[name] = "error"
+
+        return results_with_weights, dropped
+
+    def _vector_leg(
+        self,
+        keywords: List[str],
+        index_pattern: Optional[str],
+        expansion_hops: int,
+    ) -> SearchResult:
+        """Vector search wrapped as a fusion leg"""
+        vector_fields = self._vector_search(keywords, index_pattern)
+        return SearchResult(
+            matched_concepts=[],
+            matched_fields=list(vector_fields),
+            expanded_fields=set(vector_fields),
+            adjacency={},
+            traversal_path=["vector_search"] if vector_fields else [],
+            hop_count=expansion_hops,
+        )
 
     def _value_search(
         self,
@@ -1007,6 +1126,7 @@ class GraphContextRetriever:
             adjacency=result.adjacency,
             traversal_path=result.traversal_path,
             hop_count=result.hop_count,
+            dropped_legs=result.dropped_legs,
         )
 
     def _get_field_metadata(
@@ -1119,6 +1239,7 @@ class GraphContextRetriever:
                 **config,
                 "question": question,
                 "operations": operations,
+                "dropped_legs": dict(search_result.dropped_legs),
             },
             endpoints=matched_endpoints,
         )
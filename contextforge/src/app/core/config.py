@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 10
     DB_MAX_OVERFLOW: int = 20
     DB_SCHEMA: str = "agent"
+    DB_READ_URL: Optional[str] = None  # read replica for search legs; defaults to the primary
     
     # Embedding Configuration
     # Common dimensions by model:
@@ -38,6 +39,18 @@ class Settings(BaseSettings):
     EMBEDDING_DIMENSION: int = 1536
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     
+    # Embedding cache (in-process LRU + Redis when configured)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_SIZE: int = 10000  # in-process entries
+    EMBEDDING_CACHE_TTL: int = 604800  # seconds in Redis (7 days)
+    EMBEDDING_CACHE_KEY_PREFIX: str = "contextforge:emb"
+    
+    # Re-embed job
+    REEMBED_CONCURRENCY: int = 4  # embed_batch requests in flight
+    
+    # Dataset onboarding
+    ONBOARD_BATCH_SIZE: int = 200  # fields per embed_batch call and INSERT
+    
     # LLM Configuration  
     LLM_MODEL: str = "gpt-4o-mini"
     OPENAI_API_KEY: Optional[str] = None
@@ -47,6 +60,11 @@ class Settings(BaseSettings):
     SEARCH_BM25_WEIGHT: float = 0.4
     SEARCH_VECTOR_WEIGHT: float = 0.6
     SEARCH_DEFAULT_LIMIT: int = 10
+    LLM_CONTEXT_TIMEOUT_MS: int = 3000  # /llm-context budget before returning partial context
+    HYBRID_SEARCH_MODE: str = "sql"  # "sql" (hybrid_search_nodes) or "client" (concurrent legs, RRF in Python)
+    HYBRID_RRF_K: int = 60  # RRF constant, in both modes
+    HYBRID_CANDIDATE_FACTOR: int = 2  # rows per leg = limit * factor
+    HYBRID_LEG_TIMEOUT_MS: int = 0  # client mode: drop a slower leg (0 = wait); needs a session factory
     
     # QueryForge Execution
     QUERYFORGE_EXECUTION_TIMEOUT: int = 30  # seconds
@@ -78,6 +96,52 @@ class Settings(BaseSettings):
     # Graph Cache
     GRAPH_CACHE_TTL: int = 300  # seconds (5 minutes)
     GRAPH_CACHE_KEY_PREFIX: str = "contextforge:graph"
+    GRAPH_CACHE_COMPRESS: bool = True  # zlib-compress binary graph snapshots
+    
+    # Live Graph (in-process graph kept current from graph_events)
+    GRAPH_LIVE_ENABLED: bool = True
+    GRAPH_LIVE_MAX_AGE: int = 3600  # seconds before a full rebuild
+    GRAPH_DELTA_MAX_EVENTS: int = 5000  # larger backlogs trigger a rebuild
+    GRAPH_EVENT_REREAD_WINDOW: int = 1000  # trailing event ids re-read to catch late commits
+    GRAPH_REGISTRY_MAX_GRAPHS: int = 32  # live graphs kept per process (LRU)
+    GRAPH_REGISTRY_MAX_ELEMENTS: int = 2_000_000  # nodes + edges across live graphs
+    GRAPH_REFRESH_INTERVAL: int = 30  # seconds between background syncs (0 = off)
+    
+    # Hybrid search result cache (per process, invalidated from graph_events)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_SIZE: int = 5000  # cached searches
+    SEARCH_CACHE_TTL: int = 300  # seconds
+    SEARCH_CACHE_SEMANTIC_THRESHOLD: float = 0.0  # cosine to reuse a similar query (0 = exact only)
+    SEARCH_CACHE_SYNC_INTERVAL: float = 2.0  # min seconds between graph_events checks
+    
+    # Knowledge hit recording (write-behind, flushed off the request path)
+    HIT_RECORDER_ENABLED: bool = True
+    HIT_RECORDER_BATCH_SIZE: int = 1000  # hits per INSERT batch; a full batch flushes early
+    HIT_RECORDER_FLUSH_INTERVAL: float = 2.0  # max seconds a hit waits in memory
+    HIT_RECORDER_MAX_QUEUE: int = 100_000  # hits beyond this are dropped
+    HIT_RECORDER_SAMPLE_RATE: float = 1.0  # fraction kept once the queue is half full
+
+    # Knowledge hit rollups (hourly/daily pre-aggregates read by the metrics dashboards)
+    HIT_ROLLUP_INTERVAL: int = 300  # seconds between background rollups (0 = off)
+    HIT_ROLLUP_LAG: int = 120  # seconds after an hour ends before it is rolled up
+    HIT_ROLLUP_MAX_HOURS: int = 168  # hours rolled up per run while catching up
+
+    # In-process vector index (vector leg of hybrid search; requires numpy)
+    VECTOR_INDEX_ENABLED: bool = False
+    VECTOR_INDEX_DIR: Optional[str] = None  # per-tenant snapshots, memory-mapped on load
+    VECTOR_INDEX_EXACT_MAX: int = 50000  # larger tenants use the IVF index
+    VECTOR_INDEX_NPROBE: int = 16  # IVF buckets scanned per query
+    VECTOR_INDEX_SYNC_INTERVAL: float = 1.0  # min seconds between graph_events checks
+    VECTOR_INDEX_MAX_EVENTS: int = 5000  # larger backlogs trigger a rebuild
+    
+    # CSR traversal backend (requires numpy; falls back to networkx)
+    GRAPH_CSR_ENABLED: bool = True
+    GRAPH_CSR_REBUILD_INTERVAL: int = 30  # min seconds between CSR rebuilds
+    
+    # SIMILAR edge generation (in-process kNN, requires numpy)
+    SIMILAR_EDGES_TOP_K: int = 10  # neighbours per node
+    SIMILAR_INDEX_EXACT_MAX: int = 50000  # larger tenants use the IVF index
+    SIMILAR_INDEX_NPROBE: int = 8  # IVF buckets scanned per query
     
     # Langfuse
     LANGFUSE_PUBLIC_KEY: Optional[str] = None
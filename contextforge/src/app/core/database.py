@@ -34,6 +34,25 @@ async_session_maker = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only work that tolerates replica lag (search legs) can use a replica
+if settings.DB_READ_URL:
+    read_engine = create_async_engine(
+        settings.DB_READ_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        echo=settings.DEBUG,
+    )
+    read_session_maker = async_sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+else:
+    read_engine = engine
+    read_session_maker = async_session_maker
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -61,6 +80,8 @@ async def init_db() -> None:
 async def close_db() -> None:
     """Close database connections (call on shutdown)."""
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 from contextlib import asynccontextmanager
@@ -40,7 +40,7 @@ def _initialize_clients() -> None:
         return
     
     # Initialize embedding client
-    _embedding_client = _create_embedding_client()
+    _embedding_client = _with_embedding_cache(_create_embedding_client())
     
     # Initialize inference client
     _inference_client = _create_inference_client()
@@ -85,6 +85,21 @@ def _create_embedding_client() -> EmbeddingClient:
     )
 
 
+def _with_embedding_cache(client: EmbeddingClient) -> EmbeddingClient:
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return client
+    
+    from app.clients.embedding_cache import EmbeddingCache, CachedEmbeddingClient
+    
+    cache = EmbeddingCache(
+        max_entries=settings.EMBEDDING_CACHE_SIZE,
+        ttl=settings.EMBEDDING_CACHE_TTL,
+        key_prefix=settings.EMBEDDING_CACHE_KEY_PREFIX,
+        use_shared_redis=True,
+    )
+    return CachedEmbeddingClient(client, cache, model=settings.EMBEDDING_MODEL)
+
+
 def _create_inference_client() -> InferenceClient:
     openai_key = settings.OPENAI_API_KEY
     if openai_key:
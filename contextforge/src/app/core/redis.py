@@ -1,4 +1,4 @@
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import logging
 import json
 import asyncio
@@ -87,6 +87,15 @@ class RedisClient:
             logger.warning(f"Redis GET failed for {key}: {e}")
             return None
     
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not self._client or not keys:
+            return [None] * len(keys)
+        try:
+            return await self._client.mget(keys)
+        except Exception as e:
+            logger.warning(f"Redis MGET failed for {len(keys)} keys: {e}")
+            return [None] * len(keys)
+
     async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
         if not self._client:
             return False
@@ -99,6 +108,20 @@ class RedisClient:
         except Exception as e:
             logger.warning(f"Redis SET failed for {key}: {e}")
             return False
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[int] = None) -> bool:
+        """SET several keys in one pipelined round trip."""
+        if not self._client or not items:
+            return False
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, value, ex=ttl or None)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Redis SET failed for {len(items)} keys: {e}")
+            return False
     
     async def delete(self, key: str) -> bool:
         if not self._client:
@@ -4,6 +4,8 @@ FAQ/Knowledge Base System - FastAPI Application
 Main application entry point.
 """
 
+import asyncio
+import contextlib
 import logging
 from contextlib import asynccontextmanager
 
@@ -12,11 +14,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.redis import get_redis_client
 from app.core.dependencies import (
     EmbeddingClientNotConfiguredError,
     InferenceClientNotConfiguredError,
 )
 from app.services.node_service import EmbeddingClientRequiredError
+from app.services.graph_sync_service import run_graph_refresher
+from app.services.hit_recorder import start_hit_recorder, stop_hit_recorder
+from app.services.hit_rollup_service import run_hit_rollup
 from app.core.logging import setup_logging
 from app.routes import (
     nodes_router,
@@ -43,8 +50,25 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.APP_NAME}...")
+    start_hit_recorder(async_session_maker)
+    refresher = None
+    if settings.GRAPH_LIVE_ENABLED and settings.GRAPH_REFRESH_INTERVAL > 0:
+        refresher = asyncio.create_task(run_graph_refresher(
+            async_session_maker,
+            settings.GRAPH_REFRESH_INTERVAL,
+            redis_client=await get_redis_client(),
+        ))
+    rollup = None
+    if settings.HIT_ROLLUP_INTERVAL > 0:
+        rollup = asyncio.create_task(run_hit_rollup(async_session_maker, settings.HIT_ROLLUP_INTERVAL))
     yield
     logger.info(f"Shutting down {settings.APP_NAME}...")
+    for task in (refresher, rollup):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    await stop_hit_recorder()
 
 
 app = FastAPI(
@@ -9,11 +9,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
-from app.core.dependencies import get_embedding_client, get_current_user
+from app.core.dependencies import get_embedding_client, get_current_user, get_redis_client
 from app.clients.embedding_client import EmbeddingClient
 from app.services.context_service import ContextService
 from app.services.tenant_service import TenantService
 from app.services.metrics_service import MetricsService, HitRecord
+from app.services.search_cache import get_search_cache
 from app.schemas.context import ContextRequest, ContextResponse
 
 
@@ -42,6 +43,7 @@ async def get_context(
     session: AsyncSession = Depends(get_session),
     embedding_client: EmbeddingClient = Depends(get_embedding_client),
     current_user: dict = Depends(get_current_user),
+    redis_client=Depends(get_redis_client),
 ):
     """
     Get structured context for AI agent.
@@ -68,7 +70,12 @@ async def get_context(
             )
         request.tenant_ids = allowed_tenants
     
-    service = ContextService(session, embedding_client)
+    service = ContextService(
+        session,
+        embedding_client,
+        redis_client=redis_client,
+        search_cache=get_search_cache(),
+    )
     response = await service.get_context(request)
     
     # Record hits for entry points and context nodes
@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.core.dependencies import get_current_user, get_graph_service
-from app.services.graph_service import GraphService
+from app.services.graph_service import GraphService, graph_registry_stats
 from app.services.tenant_service import TenantService
 
 
@@ -41,6 +41,21 @@ class GraphStatsResponse(BaseModel):
     node_types: Dict[str, int]
     edge_types: Dict[str, int]
     last_sync: Optional[str] = None
+    graph_version: Optional[int] = None
+
+
+class GraphRegistryResponse(BaseModel):
+    graphs: int
+    elements: int
+    in_use: int
+    hits: int
+    misses: int
+    coalesced: int
+    hit_rate: float
+    builds: int
+    avg_build_seconds: float
+    last_build_seconds: float
+    evictions: int
 
 
 class SuggestionResponse(BaseModel):
@@ -76,6 +91,14 @@ async def get_graph_stats(
     return GraphStatsResponse(**stats)
 
 
+@router.get("/registry", response_model=GraphRegistryResponse)
+async def get_graph_registry_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """Live graph registry metrics for this process."""
+    return GraphRegistryResponse(**graph_registry_stats())
+
+
 @router.get("/neighbors/{node_id}", response_model=List[NeighborResponse])
 async def get_neighbors(
     node_id: int,
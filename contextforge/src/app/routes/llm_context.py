@@ -2,11 +2,12 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.core.dependencies import get_embedding_client, get_current_user
+from app.core.database import get_session, async_session_maker
+from app.core.dependencies import get_embedding_client, get_current_user, get_redis_client
 from app.clients.embedding_client import EmbeddingClient
 from app.services.llm_context_service import LLMContextService
 from app.services.metrics_service import MetricsService, HitRecord
+from app.services.search_cache import get_search_cache
 from app.schemas.llm_context import LLMContextRequest, LLMContextResponse
 
 
@@ -26,6 +27,7 @@ async def get_llm_context(
     session: AsyncSession = Depends(get_session),
     embedding_client: EmbeddingClient = Depends(get_embedding_client),
     current_user: dict = Depends(get_current_user),
+    redis_client=Depends(get_redis_client),
 ):
     """
     Get LLM-optimized hierarchical context for AI agents.
@@ -58,7 +60,13 @@ async def get_llm_context(
             )
         request.tenant_ids = allowed_tenants
 
-    service = LLMContextService(session, embedding_client)
+    service = LLMContextService(
+        session,
+        embedding_client,
+        session_factory=async_session_maker,
+        redis_client=redis_client,
+        search_cache=get_search_cache(),
+    )
     response = await service.get_llm_context(request)
 
     all_hits: List[HitRecord] = []
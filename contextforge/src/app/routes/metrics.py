@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
 from app.core.dependencies import get_current_user
 from app.services.metrics_service import MetricsService
+from app.services.hit_recorder import get_hit_recorder
 from app.services.tenant_service import TenantService
 from app.schemas.metrics import (
     MetricsSummaryResponse,
@@ -16,6 +17,7 @@ from app.schemas.metrics import (
     HeatmapResponse,
     HeatmapTagsResponse,
     HeatmapTypesResponse,
+    HitRecorderStatsResponse,
 )
 
 
@@ -158,3 +160,14 @@ async def get_heatmap_by_types(
     user_tenant_ids = await get_user_tenant_ids(session, email)
     service = MetricsService(session, user_tenant_ids)
     return await service.get_heatmap_by_types(period)
+
+
+@router.get("/recorder", response_model=HitRecorderStatsResponse)
+async def get_hit_recorder_stats(
+    current_user: dict = Depends(get_current_user),
+):
+    """Hit recording queue and drop counters for this process."""
+    recorder = get_hit_recorder()
+    if recorder is None:
+        return HitRecorderStatsResponse(enabled=False)
+    return HitRecorderStatsResponse(enabled=True, **recorder.stats())
@@ -10,6 +10,7 @@ from app.core.database import get_session
 from app.core.dependencies import get_embedding_client, get_optional_embedding_client, get_current_user
 from app.clients.embedding_client import EmbeddingClient
 from app.services.node_service import NodeService
+from app.services.search_cache import get_search_cache
 from app.services.edge_service import EdgeService
 from app.services.tenant_service import TenantService
 from app.services.metrics_service import MetricsService, HitRecord
@@ -88,7 +89,7 @@ async def search_nodes(
     email = current_user["email"]
     user_tenant_ids = await get_user_tenant_ids(session, email)
     
-    service = NodeService(session, embedding_client)
+    service = NodeService(session, embedding_client, search_cache=get_search_cache())
     results = await service.hybrid_search(
         query_text=q,
         user_tenant_ids=user_tenant_ids,
@@ -163,7 +164,7 @@ async def create_node(
     email = current_user["email"]
     user_tenant_ids = await get_user_tenant_ids(session, email)
     
-    service = NodeService(session, embedding_client)
+    service = NodeService(session, embedding_client, search_cache=get_search_cache())
     node = await service.create_node(data, user_tenant_ids, created_by=email)
     
     if not node:
@@ -186,7 +187,7 @@ async def update_node(
     email = current_user["email"]
     user_tenant_ids = await get_user_tenant_ids(session, email)
     
-    service = NodeService(session, embedding_client)
+    service = NodeService(session, embedding_client, search_cache=get_search_cache())
     node = await service.update_node(node_id, data, user_tenant_ids, updated_by=email)
     
     if not node:
@@ -208,7 +209,7 @@ async def delete_node(
     email = current_user["email"]
     user_tenant_ids = await get_user_tenant_ids(session, email)
     
-    service = NodeService(session, embedding_client)
+    service = NodeService(session, embedding_client, search_cache=get_search_cache())
     success = await service.delete_node(node_id, user_tenant_ids, deleted_by=email)
     
     if not success:
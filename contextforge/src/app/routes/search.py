@@ -6,10 +6,11 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import get_session, read_session_maker
 from app.core.dependencies import get_embedding_client, get_user_tenant_ids
 from app.clients.embedding_client import EmbeddingClient
 from app.services.node_service import NodeService
+from app.services.search_cache import get_search_cache
 from app.schemas.search import SearchRequest, SearchResponse, SearchResult
 
 
@@ -32,7 +33,12 @@ async def search_knowledge(
     
     Results are ranked using Reciprocal Rank Fusion (RRF).
     """
-    service = NodeService(session, embedding_client)
+    service = NodeService(
+        session,
+        embedding_client,
+        search_cache=get_search_cache(),
+        session_factory=read_session_maker,
+    )
     
     results = await service.hybrid_search(
         query_text=request.query,
@@ -60,4 +66,5 @@ async def search_knowledge(
             for r in results
         ],
         total=len(results),
+        timings=service.last_search_stats,
     )
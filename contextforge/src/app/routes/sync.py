@@ -13,6 +13,7 @@ from app.core.database import get_session
 from app.core.dependencies import get_embedding_client, get_current_user
 from app.clients.embedding_client import EmbeddingClient
 from app.services.graph_sync_service import GraphSyncService
+from app.services.hit_rollup_service import HitRollupService
 from app.services.node_service import NodeService
 from app.services.tenant_service import TenantService
 from app.models.enums import NodeType
@@ -35,6 +36,7 @@ class ProcessEventsResponse(BaseModel):
     edge_created: int
     edge_deleted: int
     errors: int
+    graphs_synced: int = 0
 
 
 class GenerateEdgesResponse(BaseModel):
@@ -77,6 +79,7 @@ async def process_events(
 async def generate_shared_tag_edges(
     min_shared_tags: int = Query(2, ge=1, le=10),
     batch_size: int = Query(1000, ge=1, le=10000),
+    full: bool = Query(False, description="Recount every node instead of changed ones"),
     session: AsyncSession = Depends(get_session),
     current_user: dict = Depends(get_current_user),
 ):
@@ -89,6 +92,7 @@ async def generate_shared_tag_edges(
         tenant_ids=user_tenant_ids,
         min_shared_tags=min_shared_tags,
         batch_size=batch_size,
+        full=full,
     )
     
     return GenerateEdgesResponse(edges_created=created, edge_type="shared_tag")
@@ -98,6 +102,8 @@ async def generate_shared_tag_edges(
 async def generate_similar_edges(
     similarity_threshold: float = Query(0.85, ge=0.5, le=0.99),
     batch_size: int = Query(100, ge=1, le=1000),
+    top_k: int = Query(10, ge=1, le=100, description="Neighbours per node"),
+    full: bool = Query(False, description="Re-query every node instead of changed ones"),
     session: AsyncSession = Depends(get_session),
     embedding_client: EmbeddingClient = Depends(get_embedding_client),
     current_user: dict = Depends(get_current_user),
@@ -111,6 +117,8 @@ async def generate_similar_edges(
         tenant_ids=user_tenant_ids,
         similarity_threshold=similarity_threshold,
         batch_size=batch_size,
+        top_k=top_k,
+        full=full,
     )
     
     return GenerateEdgesResponse(edges_created=created, edge_type="similar")
@@ -164,12 +172,26 @@ async def cleanup_old_events(
     }
 
 
+@router.post("/hits/rollup")
+async def rollup_knowledge_hits(
+    max_hours: int = Query(168, ge=1, le=24 * 90),
+    session: AsyncSession = Depends(get_session),
+    current_user: dict = Depends(get_current_user),
+):
+    """Roll up knowledge hits past the rollup watermarks (normally run in the background)."""
+    email = current_user["email"]  # noqa: F841 - reserved for future permission checks
+    return await HitRollupService(session).roll_up(max_hours)
+
+
 class ReembedResponse(BaseModel):
     processed: int
     updated: int
     skipped: int
+    unchanged: int = 0
     errors: int
     batches: int
+    resumed_from: int = 0
+    last_id: int = 0
 
 
 @router.post("/reembed", response_model=ReembedResponse)
@@ -177,6 +199,10 @@ async def reembed_nodes(
     node_types: Optional[List[NodeType]] = Query(None, description="Filter by node types"),
     batch_size: int = Query(50, ge=1, le=200, description="Nodes per batch"),
     only_missing: bool = Query(False, description="Only embed nodes without embeddings"),
+    concurrency: Optional[int] = Query(
+        None, ge=1, le=16, description="Embedding requests in flight (default REEMBED_CONCURRENCY)"
+    ),
+    resume: bool = Query(True, description="Continue from the last checkpoint"),
     session: AsyncSession = Depends(get_session),
     embedding_client: EmbeddingClient = Depends(get_embedding_client),
     current_user: dict = Depends(get_current_user),
@@ -193,8 +219,10 @@ async def reembed_nodes(
     - node_types: Optional filter to only reembed specific node types
     - batch_size: Number of nodes to process per batch (affects memory)
     - only_missing: If true, only embed nodes that have NULL embeddings
+    - concurrency: Number of embed_batch requests in flight (defaults to REEMBED_CONCURRENCY)
+    - resume: Continue an interrupted job from its last checkpoint
     
-    Note: This can be slow for large datasets. Consider running during off-hours.
+    Nodes whose embed text and model are unchanged are skipped.
     """
     email = current_user["email"]
     user_tenant_ids = await get_user_tenant_ids(session, email)
@@ -205,6 +233,8 @@ async def reembed_nodes(
         node_types=node_types,
         batch_size=batch_size,
         only_missing=only_missing,
+        concurrency=concurrency,
+        resume=resume,
     )
     
     return ReembedResponse(**stats)
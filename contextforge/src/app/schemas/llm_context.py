@@ -90,6 +90,13 @@ class LLMContextRequest(BaseModel):
         le=20,
         description="Maximum Q&A examples to return",
     )
+    
+    timeout_ms: Optional[int] = Field(
+        default=None,
+        ge=100,
+        le=60000,
+        description="Time budget in ms; parts not ready in time are omitted (None = server default)",
+    )
 
 
 class FAQItem(BaseModel):
@@ -285,6 +292,10 @@ class LLMContextResponse(BaseModel):
         description="Hierarchical schema context (if include_schema=true)",
     )
     stats: LLMContextStats = Field(default_factory=LLMContextStats)
+    partial: bool = Field(
+        default=False,
+        description="True when knowledge or schema context missed the time budget and was omitted",
+    )
     debug: Optional[Dict[str, Any]] = Field(
         default=None,
         description="Debug information (entry point IDs, search scores, etc.)",
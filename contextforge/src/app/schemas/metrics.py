@@ -167,3 +167,17 @@ class HeatmapTypesResponse(BaseModel):
     
     period: str
     types: List[HeatmapTypeData]
+
+
+class HitRecorderStatsResponse(BaseModel):
+    """Write-behind hit recorder counters for this process."""
+    
+    enabled: bool
+    queued: int = 0
+    recorded: int = 0
+    written: int = 0
+    sampled_out: int = 0
+    dropped: int = 0
+    failed: int = 0
+    flushes: int = 0
+    last_flush_seconds: float = 0.0
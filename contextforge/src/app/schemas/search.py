@@ -34,6 +34,8 @@ class SearchResponse(BaseModel):
     query: str
     results: List[SearchResult]
     total: int
+    # Search mode and per-leg latency in ms; None when served from cache
+    timings: Optional[Dict[str, Any]] = None
 
 
 class ContextSearchRequest(BaseModel):
@@ -19,7 +19,9 @@ from app.schemas.context import (
     ContextStats,
 )
 from app.services.node_service import NodeService
+from app.services.search_cache import SearchResultCache
 from app.services.graph_service import GraphService
+from app.services.node_detail_cache import NodeDetailCache
 from app.clients.embedding_client import EmbeddingClient
 from app.utils.schema import sql as schema_sql
 
@@ -29,11 +31,15 @@ class ContextService:
         self,
         session: AsyncSession,
         embedding_client: EmbeddingClient,
+        detail_cache: Optional[NodeDetailCache] = None,
+        redis_client=None,
+        search_cache: Optional[SearchResultCache] = None,
     ):
         self.session = session
         self.embedding_client = embedding_client
-        self.node_service = NodeService(session, embedding_client)
-        self.graph_service = GraphService(session)
+        self.node_service = NodeService(session, embedding_client, search_cache=search_cache)
+        self.graph_service = GraphService(session, redis_client=redis_client)
+        self.detail_cache = detail_cache or NodeDetailCache(session)
     
     async def get_context(
         self,
@@ -161,70 +167,63 @@ class ContextService:
         expansion_type_values = [t.value for t in expansion_types]
         
         current_level = set(entry_ids)
+        graph = self.graph_service.graph
         
         for depth in range(1, request.max_depth + 1):
             if len(context_nodes) >= request.context_limit:
                 break
             
+            nodes_expanded += sum(1 for node_id in current_level if node_id in graph)
+            candidates = self.graph_service.neighbor_candidates(
+                current_level, visited, node_types=set(expansion_type_values)
+            )
+            
             next_level: Set[int] = set()
             
-            for node_id in current_level:
-                if node_id not in self.graph_service.graph:
-                    continue
-                
-                nodes_expanded += 1
-                
-                successors = set(self.graph_service.graph.successors(node_id))
-                predecessors = set(self.graph_service.graph.predecessors(node_id))
-                neighbors = (successors | predecessors) - visited
+            # Hydrate the frontier in bulk; only fetch as many candidates as
+            # can still fit, and fetch more only if some were not visible.
+            position = 0
+            while position < len(candidates) and len(context_nodes) < request.context_limit:
+                chunk = candidates[position:position + request.context_limit - len(context_nodes)]
+                position += len(chunk)
+                details = await self.detail_cache.get_many(
+                    [c[0] for c in chunk], request.tenant_ids
+                )
                 
-                for neighbor_id in neighbors:
-                    if len(context_nodes) >= request.context_limit:
-                        break
-                    
-                    node_data = self.graph_service.graph.nodes.get(neighbor_id, {})
-                    neighbor_type = node_data.get("node_type")
-                    
-                    if neighbor_type not in expansion_type_values:
+                for neighbor_id, parent_id, edge_type_value, edge_weight in chunk:
+                    node_detail = details.get(neighbor_id)
+                    if not node_detail:
                         continue
                     
-                    edge_data = self.graph_service.graph.get_edge_data(node_id, neighbor_id)
-                    if not edge_data:
-                        edge_data = self.graph_service.graph.get_edge_data(neighbor_id, node_id)
-                    
                     edge_type = None
-                    if edge_data:
+                    if edge_type_value:
                         try:
-                            edge_type = EdgeType(edge_data.get("edge_type"))
+                            edge_type = EdgeType(edge_type_value)
                         except ValueError:
                             pass
                     
-                    path = paths[node_id] + [neighbor_id]
+                    path = paths[parent_id] + [neighbor_id]
+                    base_score = 1.0 / (depth + 1)
+                    score = base_score * edge_weight
                     
-                    node_detail = await self._get_node_detail(neighbor_id, request.tenant_ids)
-                    if node_detail:
-                        base_score = 1.0 / (depth + 1)
-                        edge_weight = edge_data.get("weight", 1.0) if edge_data else 1.0
-                        score = base_score * edge_weight
-                        
-                        context_nodes.append(ContextNodeResult(
-                            id=neighbor_id,
-                            node_type=NodeType(node_detail["node_type"]),
-                            title=node_detail["title"],
-                            summary=node_detail.get("summary"),
-                            content=node_detail["content"],
-                            tags=node_detail.get("tags", []),
-                            score=score,
-                            distance=depth,
-                            path=path,
-                            edge_type=edge_type,
-                        ))
-                        
-                        paths[neighbor_id] = path
-                        edge_types_used[neighbor_id] = edge_type
-                        visited.add(neighbor_id)
-                        next_level.add(neighbor_id)
-                        max_depth_reached = max(max_depth_reached, depth)
+                    context_nodes.append(ContextNodeResult(
+                        id=neighbor_id,
+                        node_type=NodeType(node_detail["node_type"]),
+                        title=node_detail["title"],
+                        summary=node_detail.get("summary"),
+                        content=node_detail["content"],
+                        tags=node_detail.get("tags", []),
+                        score=score,
+                        distance=depth,
+                        path=path,
+                        edge_type=edge_type,
+                    ))
+                    
+                    paths[neighbor_id] = path
+                    edge_types_used[neighbor_id] = edge_type
+                    visited.add(neighbor_id)
+                    next_level.add(neighbor_id)
+                    max_depth_reached = max(max_depth_reached, depth)
             
             current_level = next_level
             if not current_level:
@@ -239,30 +238,7 @@ class ContextService:
         node_id: int,
         tenant_ids: List[str],
     ) -> Optional[Dict[str, Any]]:
-        result = await self.session.execute(
-            text(schema_sql("""
-                SELECT id, tenant_id, node_type, title, summary, content, tags
-                FROM {schema}.knowledge_nodes
-                WHERE id = :node_id 
-                  AND tenant_id = ANY(:tenant_ids)
-                  AND is_deleted = FALSE
-                  AND status = 'published'
-            """)),
-            {"node_id": node_id, "tenant_ids": tenant_ids}
-        )
-        row = result.fetchone()
-        if not row:
-            return None
-        
-        return {
-            "id": row.id,
-            "tenant_id": row.tenant_id,
-            "node_type": row.node_type,
-            "title": row.title,
-            "summary": row.summary,
-            "content": row.content,
-            "tags": row.tags or [],
-        }
+        return await self.detail_cache.get(node_id, tenant_ids)
     
     async def _collect_entities(
         self,
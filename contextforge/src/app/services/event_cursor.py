@@ -0,0 +1,67 @@
+"""
+graph_events watermark that tolerates out-of-order commits.
+
+graph_events ids come from a BIGSERIAL, which is assigned when a row is
+inserted, not when its transaction commits. A transaction that commits
+after a later one can therefore make an event with a lower id visible
+after readers have moved past it. An EventCursor re-reads the last
+GRAPH_EVENT_REREAD_WINDOW ids on every poll and skips the ones it has
+already seen, so such late events are still picked up.
+
+Residual lag: an event whose transaction commits after more than
+GRAPH_EVENT_REREAD_WINDOW newer events were read is still missed, until
+the consumer's next full rebuild (GRAPH_LIVE_MAX_AGE for live graphs,
+SEARCH_CACHE_TTL for cached searches, a restart for vector indexes, a
+full run for SHARED_TAG/SIMILAR edge jobs).
+"""
+
+from typing import Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+
+class EventCursor:
+    """
+    Watermark plus the ids already seen in the re-read window.
+
+    Right after construction or reset() nothing is marked as seen, unless
+    seen is restored from seen_ids of an earlier cursor, so events in the
+    window are applied once more; consumers apply events idempotently.
+    """
+
+    def __init__(
+        self,
+        last_event_id: int = 0,
+        window: Optional[int] = None,
+        seen: Iterable[int] = (),
+    ):
+        self.last_event_id = last_event_id
+        self.window = settings.GRAPH_EVENT_REREAD_WINDOW if window is None else window
+        floor = self.floor
+        self._seen: Set[int] = {event_id for event_id in seen if event_id > floor}
+
+    @property
+    def floor(self) -> int:
+        """Read events with id > floor; the ones in (floor, last_event_id] may be seen already."""
+        return max(0, self.last_event_id - self.window)
+
+    @property
+    def seen_ids(self) -> List[int]:
+        """Seen ids in the window, for persisting the cursor."""
+        return sorted(self._seen)
+
+    def is_new(self, event_id: int) -> bool:
+        return event_id > self.floor and event_id not in self._seen
+
+    def advance(self, event_ids: Iterable[int]) -> None:
+        """Mark events as applied and move the watermark past them."""
+        for event_id in event_ids:
+            self._seen.add(event_id)
+            if event_id > self.last_event_id:
+                self.last_event_id = event_id
+        floor = self.floor
+        self._seen = {event_id for event_id in self._seen if event_id > floor}
+
+    def reset(self, last_event_id: int) -> None:
+        self.last_event_id = last_event_id
+        self._seen.clear()
@@ -0,0 +1,217 @@
+"""
+Compact CSR adjacency for knowledge graph traversal.
+
+Stores the graph as NumPy arrays instead of networkx dict-of-dicts:
+node IDs are remapped to dense indices (sorted ID array + searchsorted),
+and each node's incident edges live in one contiguous slice of the
+neighbor / edge-type / weight arrays. Traversal ignores direction, matching
+how context expansion walks successors and predecessors.
+"""
+
+from typing import List, Optional, Dict, Any, Set, Tuple, Iterable
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+
+# (neighbor_id, parent_id, edge_type, weight)
+Candidate = Tuple[int, int, Optional[str], float]
+
+
+def _encode(values: List[Optional[str]]) -> Tuple["np.ndarray", List[Optional[str]]]:
+    """Dictionary-encode values as int16 codes into a first-seen vocabulary."""
+    index: Dict[Optional[str], int] = {}
+    for value in values:
+        index.setdefault(value, len(index))
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int16, count=len(values))
+    return codes, list(index)
+
+
+class CSRGraph:
+    """
+    Immutable array-backed adjacency built from a graph snapshot.
+
+    Each row holds outgoing edges first, then incoming edges, so the first
+    entry for a neighbor is the node -> neighbor edge when one exists.
+    """
+
+    def __init__(
+        self,
+        node_ids: "np.ndarray",
+        node_type_codes: "np.ndarray",
+        node_types: List[Optional[str]],
+        offsets: "np.ndarray",
+        neighbors: "np.ndarray",
+        edge_type_codes: "np.ndarray",
+        edge_types: List[Optional[str]],
+        weights: "np.ndarray",
+        version: int = 0,
+    ):
+        self.node_ids = node_ids
+        self.node_type_codes = node_type_codes
+        self.node_types = node_types
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.edge_type_codes = edge_type_codes
+        self.edge_types = edge_types
+        self.weights = weights
+        self.version = version
+
+    @classmethod
+    def from_networkx(cls, graph: Any, version: int = 0) -> "CSRGraph":
+        """
+        Build from a networkx graph without per-element array writes.
+
+        Node and edge attributes are collected with one pass each and
+        converted in bulk; the graph must not change while this runs.
+        """
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for the CSR graph backend")
+
+        node_count = graph.number_of_nodes()
+        node_ids = np.fromiter(graph.nodes(), dtype=np.int64, count=node_count)
+        order = np.argsort(node_ids, kind="stable")
+        node_ids = node_ids[order]
+        node_attrs = graph.nodes
+        node_type_codes, node_types = _encode(
+            [node_attrs[n].get("node_type") for n in node_ids.tolist()]
+        )
+
+        edge_count = graph.number_of_edges()
+        if edge_count:
+            sources, targets, data = zip(*graph.edges(data=True))
+        else:
+            sources, targets, data = (), (), ()
+        sources = np.fromiter(sources, dtype=np.int64, count=edge_count)
+        targets = np.fromiter(targets, dtype=np.int64, count=edge_count)
+        edge_type_codes, edge_types = _encode([d.get("edge_type") for d in data])
+        weights = np.fromiter(
+            (1.0 if d.get("weight") is None else d["weight"] for d in data),
+            dtype=np.float32,
+            count=edge_count,
+        )
+
+        src_idx = np.searchsorted(node_ids, sources).astype(np.int32)
+        dst_idx = np.searchsorted(node_ids, targets).astype(np.int32)
+
+        # Undirected rows: out-edges (is_in=0) sort before in-edges (is_in=1)
+        rows = np.concatenate([src_idx, dst_idx])
+        cols = np.concatenate([dst_idx, src_idx])
+        is_in = np.concatenate([
+            np.zeros(edge_count, dtype=np.int8),
+            np.ones(edge_count, dtype=np.int8),
+        ])
+        order = np.lexsort((is_in, rows))
+
+        offsets = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=node_count), out=offsets[1:])
+
+        return cls(
+            node_ids=node_ids,
+            node_type_codes=node_type_codes,
+            node_types=node_types,
+            offsets=offsets,
+            neighbors=cols[order],
+            edge_type_codes=np.concatenate([edge_type_codes, edge_type_codes])[order],
+            edge_types=edge_types,
+            weights=np.concatenate([weights, weights])[order],
+            version=version,
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (
+            self.node_ids, self.node_type_codes, self.offsets,
+            self.neighbors, self.edge_type_codes, self.weights,
+        ))
+
+    def _indices(self, ids: Iterable[int]) -> "np.ndarray":
+        """Map node IDs to dense indices, dropping IDs not in the graph."""
+        arr = np.fromiter(ids, dtype=np.int64)
+        if not len(arr) or not self.node_count:
+            return np.empty(0, dtype=np.int64)
+        idx = np.searchsorted(self.node_ids, arr)
+        idx[idx >= self.node_count] = 0
+        return idx[self.node_ids[idx] == arr]
+
+    def _code_mask(self, vocab: List[Optional[str]], allowed: Optional[Set[str]]) -> Optional["np.ndarray"]:
+        if allowed is None:
+            return None
+        return np.array([v in allowed for v in vocab], dtype=bool)
+
+    def contains(self, node_id: int) -> bool:
+        return len(self._indices([node_id])) == 1
+
+    def node_type(self, node_id: int) -> Optional[str]:
+        idx = self._indices([node_id])
+        if not len(idx):
+            return None
+        return self.node_types[self.node_type_codes[idx[0]]]
+
+    def neighbor_candidates(
+        self,
+        frontier: Iterable[int],
+        visited: Set[int],
+        node_types: Optional[Set[str]] = None,
+        edge_types: Optional[Set[str]] = None,
+    ) -> List[Candidate]:
+        """
+        Expand one BFS hop from frontier.
+
+        Returns unvisited neighbors (first parent wins, in frontier order)
+        whose node type is in node_types, reached via an edge whose type is
+        in edge_types. None means no filter.
+        """
+        rows = self._indices(frontier)
+        if not len(rows):
+            return []
+
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return []
+
+        # Flattened positions of every incident edge of the frontier
+        row_first = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.arange(total) - row_first + np.repeat(starts, counts)
+        parents = np.repeat(rows, counts)
+        cols = self.neighbors[positions]
+
+        keep = np.ones(total, dtype=bool)
+        node_mask = self._code_mask(self.node_types, node_types)
+        if node_mask is not None:
+            keep &= node_mask[self.node_type_codes[cols]]
+        edge_mask = self._code_mask(self.edge_types, edge_types)
+        if edge_mask is not None:
+            keep &= edge_mask[self.edge_type_codes[positions]]
+        if visited:
+            visited_idx = self._indices(visited)
+            keep &= ~np.isin(cols, visited_idx)
+
+        positions = positions[keep]
+        parents = parents[keep]
+        cols = cols[keep]
+        if not len(cols):
+            return []
+
+        _, first = np.unique(cols, return_index=True)
+        first.sort()
+
+        neighbor_ids = self.node_ids[cols[first]].tolist()
+        parent_ids = self.node_ids[parents[first]].tolist()
+        type_codes = self.edge_type_codes[positions[first]].tolist()
+        weights = self.weights[positions[first]].tolist()
+
+        return [
+            (neighbor_ids[i], parent_ids[i], self.edge_types[type_codes[i]], weights[i])
+            for i in range(len(neighbor_ids))
+        ]
@@ -1,23 +1,153 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Set, FrozenSet
+import asyncio
 import json
 import logging
+import time
+import weakref
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.utils.schema import sql as schema_sql
 from app.core.config import settings
+from app.services.graph_csr import CSRGraph, Candidate, HAS_NUMPY
+from app.services.graph_snapshot import SNAPSHOT_FORMAT_VERSION, encode_graph, decode_graph
+from app.services.event_cursor import EventCursor
 
 logger = logging.getLogger(__name__)
 
 try:
     import networkx as nx
-    from networkx.readwrite import json_graph
     HAS_NETWORKX = True
 except ImportError:
     HAS_NETWORKX = False
-    json_graph = None
+
+
+@dataclass
+class LiveGraph:
+    """
+    Long-lived graph for one tenant set, kept current from graph_events.
+    
+    last_event_id is the graph_events watermark: every event with a
+    smaller or equal id that had committed when it was read is reflected
+    in the graph; cursor re-reads a trailing window to catch events that
+    commit late (see app.services.event_cursor). revision
+    increments whenever an event actually changes this graph. users
+    holds the GraphService instances currently reading the graph; a graph
+    with users is never evicted.
+    """
+    graph: "nx.DiGraph"
+    tenant_ids: FrozenSet[str]
+    last_event_id: int = 0
+    revision: int = 0
+    built_at: datetime = field(default_factory=datetime.utcnow)
+    last_sync: datetime = field(default_factory=datetime.utcnow)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    csr: Optional[CSRGraph] = None
+    csr_built_at: Optional[datetime] = None
+    csr_task: Optional["asyncio.Task"] = None
+    users: "weakref.WeakSet[GraphService]" = field(default_factory=weakref.WeakSet)
+    cursor: EventCursor = field(init=False)
+    
+    def __post_init__(self) -> None:
+        self.cursor = EventCursor(self.last_event_id)
+    
+    @property
+    def size(self) -> int:
+        """Nodes plus edges, the unit of GRAPH_REGISTRY_MAX_ELEMENTS."""
+        return self.graph.number_of_nodes() + self.graph.number_of_edges()
+
+
+# Process-wide live graphs keyed by tenant set (see GraphService._cache_key),
+# least recently used first
+_live_graphs: "OrderedDict[str, LiveGraph]" = OrderedDict()
+
+# One build lock per key so concurrent cold loads share a single build
+_build_locks: Dict[str, asyncio.Lock] = {}
+
+_registry_stats: Dict[str, float] = {
+    "hits": 0,
+    "misses": 0,
+    "coalesced": 0,
+    "builds": 0,
+    "build_seconds": 0.0,
+    "last_build_seconds": 0.0,
+    "evictions": 0,
+}
+
+
+def get_live_graphs() -> List[LiveGraph]:
+    """Return all live graphs held by this process."""
+    return list(_live_graphs.values())
+
+
+def clear_live_graphs() -> None:
+    """Drop all live graphs (next load_graph rebuilds from Postgres)."""
+    _live_graphs.clear()
+    _build_locks.clear()
+
+
+def graph_registry_stats() -> Dict[str, Any]:
+    """Hit rate, build time and memory use of the live graph registry."""
+    stats = dict(_registry_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    stats["avg_build_seconds"] = stats["build_seconds"] / stats["builds"] if stats["builds"] else 0.0
+    stats["graphs"] = len(_live_graphs)
+    stats["elements"] = sum(live.size for live in _live_graphs.values())
+    stats["in_use"] = sum(1 for live in _live_graphs.values() if live.users)
+    return stats
+
+
+def reset_graph_registry_stats() -> None:
+    """Zero the registry counters (graphs are kept)."""
+    for name in _registry_stats:
+        _registry_stats[name] = 0
+
+
+def _register_live_graph(key: str, live: LiveGraph) -> None:
+    """Store live under key and evict idle graphs over the registry limits."""
+    _live_graphs[key] = live
+    _live_graphs.move_to_end(key)
+    
+    total = sum(g.size for g in _live_graphs.values())
+    for candidate_key in list(_live_graphs):
+        if (
+            len(_live_graphs) <= settings.GRAPH_REGISTRY_MAX_GRAPHS
+            and total <= settings.GRAPH_REGISTRY_MAX_ELEMENTS
+        ):
+            break
+        candidate = _live_graphs[candidate_key]
+        if candidate_key == key or candidate.users:
+            continue
+        del _live_graphs[candidate_key]
+        _build_locks.pop(candidate_key, None)
+        total -= candidate.size
+        _registry_stats["evictions"] += 1
+        logger.info(
+            f"Evicted live graph for tenants {sorted(candidate.tenant_ids)} "
+            f"({candidate.size} elements)"
+        )
+
+
+def _event_payload(payload: Any) -> Dict[str, Any]:
+    if payload is None:
+        return {}
+    if isinstance(payload, (str, bytes)):
+        return json.loads(payload)
+    return dict(payload)
+
+
+def _spawn(coro) -> Optional[asyncio.Task]:
+    """Run coro as a background task, or drop it outside an event loop."""
+    try:
+        return asyncio.get_running_loop().create_task(coro)
+    except RuntimeError:
+        coro.close()
+        return None
 
 
 class GraphService:
@@ -27,6 +157,9 @@ class GraphService:
         self._graph: Optional["nx.DiGraph"] = None
         self._last_sync: Optional[datetime] = None
         self._graph_version: int = 0
+        self._live: Optional[LiveGraph] = None
+        self._csr: Optional[CSRGraph] = None
+        self._csr_task: Optional[asyncio.Task] = None
     
     @property
     def graph(self) -> "nx.DiGraph":
@@ -40,21 +173,33 @@ class GraphService:
         sorted_ids = sorted(tenant_ids)
         return f"{settings.GRAPH_CACHE_KEY_PREFIX}:{':'.join(sorted_ids)}"
     
+    def _snapshot_key(self, tenant_ids: List[str]) -> str:
+        # Format version in the key so old entries are never misread
+        sorted_ids = sorted(tenant_ids)
+        return (
+            f"{settings.GRAPH_CACHE_KEY_PREFIX}:v{SNAPSHOT_FORMAT_VERSION}:"
+            f"{':'.join(sorted_ids)}"
+        )
+    
     async def _get_cached_graph(self, tenant_ids: List[str]) -> Optional["nx.DiGraph"]:
         if not self.redis_client or not self.redis_client.is_connected:
             return None
         
-        if not HAS_NETWORKX or json_graph is None:
+        if not HAS_NETWORKX:
             return None
         
         try:
-            key = self._cache_key(tenant_ids)
+            key = self._snapshot_key(tenant_ids)
             data = await self.redis_client.get(key)
             if data:
-                # Use JSON serialization instead of pickle for security
-                graph_data = json.loads(data.decode("utf-8"))
-                graph = json_graph.node_link_graph(graph_data, directed=True)
-                logger.debug(f"Graph cache hit for tenants {tenant_ids}")
+                # Binary columnar snapshot (see graph_snapshot); never pickle
+                started = time.perf_counter()
+                graph = decode_graph(data)
+                logger.debug(
+                    f"Graph cache hit for tenants {tenant_ids} "
+                    f"(version {graph.graph.get('last_event_id', 0)}, {len(data)} bytes, "
+                    f"{(time.perf_counter() - started) * 1000:.1f}ms)"
+                )
                 return graph
         except Exception as e:
             logger.warning(f"Failed to load graph from cache: {e}")
@@ -64,26 +209,29 @@ class GraphService:
         if not self.redis_client or not self.redis_client.is_connected:
             return
         
-        if not HAS_NETWORKX or json_graph is None:
+        if not HAS_NETWORKX:
             return
         
         try:
-            key = self._cache_key(tenant_ids)
-            # Use JSON serialization instead of pickle for security
-            graph_data = json_graph.node_link_data(graph)
-            data = json.dumps(graph_data).encode("utf-8")
+            key = self._snapshot_key(tenant_ids)
+            data = encode_graph(graph, compress=settings.GRAPH_CACHE_COMPRESS)
             await self.redis_client.set(key, data, ttl=settings.GRAPH_CACHE_TTL)
-            logger.debug(f"Graph cached for tenants {tenant_ids}")
+            logger.debug(f"Graph cached for tenants {tenant_ids} ({len(data)} bytes)")
         except Exception as e:
             logger.warning(f"Failed to cache graph: {e}")
     
     async def invalidate_cache(self, tenant_ids: Optional[List[str]] = None):
+        if tenant_ids:
+            _live_graphs.pop(self._cache_key(tenant_ids), None)
+        else:
+            clear_live_graphs()
+        
         if not self.redis_client or not self.redis_client.is_connected:
             return
         
         try:
             if tenant_ids:
-                key = self._cache_key(tenant_ids)
+                key = self._snapshot_key(tenant_ids)
                 await self.redis_client.delete(key)
                 logger.info(f"Invalidated graph cache for tenants {tenant_ids}")
             else:
@@ -104,14 +252,99 @@ class GraphService:
         if self._graph is not None and not force_reload:
             return self._graph
         
+        self.release()
+        self._live = None
+        self._csr = None
+        self._csr_task = None
+        
+        if not settings.GRAPH_LIVE_ENABLED:
+            return await self._build_graph(tenant_ids, force_reload=force_reload)
+        
+        key = self._cache_key(tenant_ids)
+        live = _live_graphs.get(key)
+        
+        if live is not None and not force_reload:
+            age = (datetime.utcnow() - live.built_at).total_seconds()
+            if age < settings.GRAPH_LIVE_MAX_AGE:
+                async with live.lock:
+                    applied = await self.apply_pending_events(live)
+                if applied is not None:
+                    _registry_stats["hits"] += 1
+                    if key in _live_graphs:
+                        _live_graphs.move_to_end(key)
+                    self._use_live_graph(live)
+                    return self._graph
+            # Stale or too far behind: the Redis snapshot is at least as old,
+            # so rebuild straight from Postgres.
+            force_reload = True
+        
+        _registry_stats["misses"] += 1
+        lock = _build_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            current = _live_graphs.get(key)
+            if current is not None and current is not live:
+                # Built by a concurrent request while we waited
+                _registry_stats["coalesced"] += 1
+                self._use_live_graph(current)
+                return self._graph
+            
+            started = time.perf_counter()
+            graph = await self._build_graph(tenant_ids, force_reload=force_reload)
+            elapsed = time.perf_counter() - started
+            _registry_stats["builds"] += 1
+            _registry_stats["build_seconds"] += elapsed
+            _registry_stats["last_build_seconds"] = elapsed
+            
+            live = LiveGraph(
+                graph=graph,
+                tenant_ids=frozenset(tenant_ids),
+                last_event_id=graph.graph.get("last_event_id", 0),
+            )
+            self._use_live_graph(live)
+            _register_live_graph(key, live)
+        return self._graph
+    
+    def release(self) -> None:
+        """Stop using the current live graph so it may be evicted."""
+        if self._live is not None:
+            self._live.users.discard(self)
+    
+    def _use_live_graph(self, live: LiveGraph) -> None:
+        self.release()
+        live.users.add(self)
+        self._live = live
+        self._graph = live.graph
+        self._last_sync = live.last_sync
+        self._graph_version = live.last_event_id
+    
+    async def _current_event_id(self) -> int:
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT COALESCE(MAX(id), 0) FROM {schema}.graph_events
+            """))
+        )
+        return result.scalar() or 0
+    
+    async def _build_graph(
+        self,
+        tenant_ids: List[str],
+        force_reload: bool = False,
+    ) -> "nx.DiGraph":
+        """Build the full graph from the Redis cache or Postgres."""
         if not force_reload:
             cached = await self._get_cached_graph(tenant_ids)
             if cached:
                 self._graph = cached
+                self._graph_version = cached.graph.get("last_event_id", 0)
                 self._last_sync = datetime.utcnow()
                 return self._graph
         
-        self._graph = nx.DiGraph()
+        # Read the watermark before the snapshot so events committed while
+        # loading are replayed (applying an event twice is harmless).
+        last_event_id = await self._current_event_id()
+        
+        self._graph = nx.DiGraph(last_event_id=last_event_id)
+        self._graph_version = last_event_id
         
         nodes_result = await self.session.execute(
             text(schema_sql("""
@@ -126,15 +359,7 @@ class GraphService:
         )
         
         for row in nodes_result.fetchall():
-            self._graph.add_node(
-                row.id,
-                tenant_id=row.tenant_id,
-                node_type=row.node_type,
-                title=row.title,
-                tags=row.tags or [],
-                dataset_name=row.dataset_name,
-                field_path=row.field_path,
-            )
+            self._add_node(self._graph, row._mapping)
         
         node_ids = list(self._graph.nodes())
         if not node_ids:
@@ -150,14 +375,7 @@ class GraphService:
         )
         
         for row in edges_result.fetchall():
-            self._graph.add_edge(
-                row.source_id,
-                row.target_id,
-                edge_id=row.id,
-                edge_type=row.edge_type,
-                weight=row.weight,
-                is_auto_generated=row.is_auto_generated,
-            )
+            self._add_edge(self._graph, row._mapping)
         
         self._last_sync = datetime.utcnow()
         
@@ -165,6 +383,275 @@ class GraphService:
         
         return self._graph
     
+    @staticmethod
+    def _add_node(graph: "nx.DiGraph", data: Dict[str, Any]) -> None:
+        graph.add_node(
+            data["id"],
+            tenant_id=data.get("tenant_id"),
+            node_type=data.get("node_type"),
+            title=data.get("title"),
+            tags=data.get("tags") or [],
+            dataset_name=data.get("dataset_name"),
+            field_path=data.get("field_path"),
+            graph_version=data.get("graph_version") or 0,
+        )
+    
+    @staticmethod
+    def _add_edge(graph: "nx.DiGraph", data: Dict[str, Any]) -> None:
+        graph.add_edge(
+            data["source_id"],
+            data["target_id"],
+            edge_id=data["id"],
+            edge_type=data.get("edge_type"),
+            weight=data.get("weight"),
+            is_auto_generated=data.get("is_auto_generated"),
+        )
+    
+    # =========================================================================
+    # Incremental Sync (graph_events deltas)
+    # =========================================================================
+    
+    async def apply_pending_events(self, live: LiveGraph) -> Optional[int]:
+        """
+        Apply graph_events newer than the live graph's watermark.
+        
+        Cost is proportional to the number of new events, not graph size.
+        Caller must hold live.lock.
+        
+        Returns:
+            Number of events applied, or None if the backlog exceeds
+            GRAPH_DELTA_MAX_EVENTS and the graph should be rebuilt instead.
+        """
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT id, event_type, entity_type, entity_id, payload
+                FROM {schema}.graph_events
+                WHERE id > :floor
+                ORDER BY id ASC
+                LIMIT :limit
+            """)),
+            {
+                "floor": live.cursor.floor,
+                "limit": settings.GRAPH_DELTA_MAX_EVENTS + live.cursor.window + 1,
+            }
+        )
+        events = [event for event in result.fetchall() if live.cursor.is_new(event.id)]
+        
+        if len(events) > settings.GRAPH_DELTA_MAX_EVENTS:
+            logger.info(
+                f"Graph event backlog exceeds {settings.GRAPH_DELTA_MAX_EVENTS} "
+                f"for tenants {sorted(live.tenant_ids)}, rebuilding"
+            )
+            return None
+        
+        added_nodes: Set[int] = set()
+        changed = False
+        for event in events:
+            try:
+                payload = _event_payload(event.payload)
+                if event.entity_type == "node":
+                    was_present = event.entity_id in live.graph
+                    changed |= self._apply_node_event(live, event.event_type, payload)
+                    if not was_present and event.entity_id in live.graph:
+                        added_nodes.add(event.entity_id)
+                elif event.entity_type == "edge":
+                    changed |= self._apply_edge_event(live, event.event_type, payload)
+            except Exception as e:
+                logger.warning(f"Failed to apply graph event {event.id}: {e}")
+        
+        if added_nodes:
+            await self._attach_edges(live.graph, list(added_nodes))
+        
+        if changed:
+            live.revision += 1
+        
+        if events:
+            live.cursor.advance(event.id for event in events)
+            live.last_event_id = live.cursor.last_event_id
+            live.graph.graph["last_event_id"] = live.last_event_id
+            logger.debug(
+                f"Applied {len(events)} graph events for tenants "
+                f"{sorted(live.tenant_ids)} (version {live.last_event_id})"
+            )
+        live.last_sync = datetime.utcnow()
+        
+        return len(events)
+    
+    def _apply_node_event(
+        self,
+        live: LiveGraph,
+        event_type: str,
+        payload: Dict[str, Any],
+    ) -> bool:
+        """Apply a node event. Returns True if the graph changed."""
+        graph = live.graph
+        node_id = payload.get("id")
+        if node_id is None:
+            return False
+        
+        visible = (
+            event_type != "node_deleted"
+            and not payload.get("is_deleted", False)
+            and payload.get("status") == "published"
+            and payload.get("tenant_id") in live.tenant_ids
+        )
+        
+        if not visible:
+            if node_id in graph:
+                graph.remove_node(node_id)
+                return True
+            return False
+        
+        if node_id in graph:
+            current_version = graph.nodes[node_id].get("graph_version", 0)
+            if (payload.get("graph_version") or 0) < current_version:
+                return False
+        
+        self._add_node(graph, payload)
+        return True
+    
+    def _apply_edge_event(
+        self,
+        live: LiveGraph,
+        event_type: str,
+        payload: Dict[str, Any],
+    ) -> bool:
+        """Apply an edge event. Returns True if the graph changed."""
+        graph = live.graph
+        source_id = payload.get("source_id")
+        target_id = payload.get("target_id")
+        
+        if event_type == "edge_created":
+            if source_id in graph and target_id in graph:
+                self._add_edge(graph, payload)
+                return True
+        elif event_type == "edge_deleted":
+            edge_data = graph.get_edge_data(source_id, target_id)
+            if edge_data and edge_data.get("edge_id") == payload.get("id"):
+                graph.remove_edge(source_id, target_id)
+                return True
+        return False
+    
+    async def _attach_edges(self, graph: "nx.DiGraph", node_ids: List[int]) -> None:
+        """Load existing edges for nodes that (re)appeared in the graph."""
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT id, source_id, target_id, edge_type, weight, is_auto_generated
+                FROM {schema}.knowledge_edges
+                WHERE source_id = ANY(:node_ids) OR target_id = ANY(:node_ids)
+            """)),
+            {"node_ids": node_ids}
+        )
+        for row in result.fetchall():
+            if row.source_id in graph and row.target_id in graph:
+                self._add_edge(graph, row._mapping)
+    
+    # =========================================================================
+    # Traversal
+    # =========================================================================
+    
+    def _get_csr(self) -> Optional[CSRGraph]:
+        """
+        Return the CSR index for the loaded graph if it is current.
+        
+        A missing or outdated CSR is built in a worker thread and swapped in
+        when done; until then traversal falls back to networkx so requests
+        never wait for a build and results are never stale. Live graphs
+        rebuild their CSR at most every GRAPH_CSR_REBUILD_INTERVAL seconds.
+        """
+        if not settings.GRAPH_CSR_ENABLED or not HAS_NUMPY or self._graph is None:
+            return None
+        
+        live = self._live
+        if live is None:
+            if self._csr is None and self._csr_task is None:
+                self._csr_task = _spawn(self._build_csr(self._graph))
+            return self._csr
+        
+        if live.csr is not None and live.csr.version == live.revision:
+            return live.csr
+        
+        now = datetime.utcnow()
+        if (live.csr_task is None or live.csr_task.done()) and (
+            live.csr_built_at is None
+            or (now - live.csr_built_at).total_seconds() >= settings.GRAPH_CSR_REBUILD_INTERVAL
+        ):
+            live.csr_task = _spawn(self._build_live_csr(live))
+            live.csr_built_at = now
+        
+        return None
+    
+    async def _build_csr(self, graph: "nx.DiGraph") -> None:
+        try:
+            csr = await asyncio.to_thread(CSRGraph.from_networkx, graph)
+        except Exception as e:
+            logger.warning(f"Failed to build CSR graph: {e}")
+            return
+        if self._graph is graph:
+            self._csr = csr
+    
+    @staticmethod
+    async def _build_live_csr(live: LiveGraph) -> None:
+        # Holding live.lock keeps graph_events from mutating the graph while
+        # the worker thread reads it; readers keep using networkx meanwhile.
+        try:
+            async with live.lock:
+                csr = await asyncio.to_thread(CSRGraph.from_networkx, live.graph, live.revision)
+        except Exception as e:
+            logger.warning(f"Failed to build CSR for tenants {sorted(live.tenant_ids)}: {e}")
+            return
+        live.csr = csr
+    
+    def neighbor_candidates(
+        self,
+        frontier: Set[int],
+        visited: Set[int],
+        node_types: Optional[Set[str]] = None,
+        edge_types: Optional[Set[str]] = None,
+    ) -> List[Candidate]:
+        """
+        Expand one BFS hop over the loaded graph, ignoring edge direction.
+        
+        Returns (neighbor_id, parent_id, edge_type, weight) for each unvisited
+        neighbor whose node type is in node_types and that is reached via an
+        edge type in edge_types (None means no filter). The parent -> neighbor
+        edge is preferred over neighbor -> parent when both exist.
+        """
+        csr = self._get_csr()
+        if csr is not None:
+            return csr.neighbor_candidates(frontier, visited, node_types, edge_types)
+        
+        graph = self.graph
+        candidates: List[Candidate] = []
+        seen: Set[int] = set()
+        for node_id in frontier:
+            if node_id not in graph:
+                continue
+            incident = [
+                (neighbor, graph.edges[node_id, neighbor])
+                for neighbor in graph.successors(node_id)
+            ] + [
+                (neighbor, graph.edges[neighbor, node_id])
+                for neighbor in graph.predecessors(node_id)
+            ]
+            for neighbor, edge_data in incident:
+                if neighbor in visited or neighbor in seen:
+                    continue
+                if node_types is not None and graph.nodes[neighbor].get("node_type") not in node_types:
+                    continue
+                edge_type = edge_data.get("edge_type")
+                if edge_types is not None and edge_type not in edge_types:
+                    continue
+                weight = edge_data.get("weight")
+                seen.add(neighbor)
+                candidates.append((
+                    neighbor,
+                    node_id,
+                    edge_type,
+                    1.0 if weight is None else weight,
+                ))
+        return candidates
+    
     async def get_neighbors(
         self,
         node_id: int,
@@ -180,37 +667,24 @@ class GraphService:
         visited: Set[int] = {node_id}
         current_level = {node_id}
         all_neighbors = []
+        edge_type_filter = set(edge_types) if edge_types else None
         
         for d in range(depth):
-            next_level: Set[int] = set()
+            candidates = self.neighbor_candidates(
+                current_level, visited, edge_types=edge_type_filter
+            )
             
-            for nid in current_level:
-                successors = set(self.graph.successors(nid))
-                predecessors = set(self.graph.predecessors(nid))
-                neighbors = (successors | predecessors) - visited
-                
-                if edge_types:
-                    filtered = set()
-                    for neighbor in neighbors:
-                        edge_data = self.graph.get_edge_data(nid, neighbor)
-                        if edge_data and edge_data.get("edge_type") in edge_types:
-                            filtered.add(neighbor)
-                        edge_data = self.graph.get_edge_data(neighbor, nid)
-                        if edge_data and edge_data.get("edge_type") in edge_types:
-                            filtered.add(neighbor)
-                    neighbors = filtered
-                
-                for neighbor in neighbors:
-                    node_data = self.graph.nodes[neighbor]
-                    all_neighbors.append({
-                        "id": neighbor,
-                        "depth": d + 1,
-                        **node_data,
-                    })
-                
-                next_level |= neighbors
-                visited |= neighbors
+            next_level: Set[int] = set()
+            for neighbor, _, _, _ in candidates:
+                node_data = self.graph.nodes[neighbor]
+                all_neighbors.append({
+                    "id": neighbor,
+                    "depth": d + 1,
+                    **node_data,
+                })
+                next_level.add(neighbor)
             
+            visited |= next_level
             current_level = next_level
             if not current_level:
                 break
@@ -229,7 +703,7 @@ class GraphService:
         if source_id not in self.graph or target_id not in self.graph:
             return []
         
-        undirected = self.graph.to_undirected()
+        undirected = self.graph.to_undirected(as_view=True)
         
         try:
             paths = list(nx.all_simple_paths(
@@ -249,7 +723,7 @@ class GraphService:
         if node_id not in self.graph:
             return []
         
-        undirected = self.graph.to_undirected()
+        undirected = self.graph.to_undirected(as_view=True)
         
         for component in nx.connected_components(undirected):
             if node_id in component:
@@ -279,7 +753,7 @@ class GraphService:
                 "cache_enabled": self.redis_client is not None and self.redis_client.is_connected,
             }
         
-        undirected = self.graph.to_undirected()
+        undirected = self.graph.to_undirected(as_view=True)
         connected_components = nx.number_connected_components(undirected)
         
         degrees = [d for _, d in self.graph.degree()]
@@ -308,6 +782,7 @@ class GraphService:
             "node_types": node_types,
             "edge_types": edge_types,
             "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "graph_version": self._graph_version,
             "cache_enabled": self.redis_client is not None and self.redis_client.is_connected,
         }
     
@@ -375,5 +850,9 @@ class GraphService:
     
     def clear_cache(self):
         self._graph = None
+        self.release()
+        self._live = None
+        self._csr = None
+        self._csr_task = None
         self._last_sync = None
         self._graph_version = 0
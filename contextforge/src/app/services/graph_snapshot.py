@@ -0,0 +1,305 @@
+"""
+Binary graph snapshot format for the Redis graph cache.
+
+A snapshot stores the graph column-wise instead of as node-link JSON:
+numeric node and edge attributes are packed arrays, repeated strings
+(tenant, node type, edge type, dataset, tags) are dictionary-encoded and
+free-text strings are one UTF-8 blob plus offsets. Loading is a handful of
+array.frombytes calls followed by bulk networkx inserts; nothing is
+executed on load, so (unlike pickle) it is safe to read from a shared cache.
+
+Layout (little-endian header):
+
+    magic  b"CFGS"
+    u16    format version
+    u16    flags (bit 0: payload is zlib-compressed)
+    payload:
+        u32   meta length
+        meta  JSON: graph attrs, counts, vocabularies, column table
+        column bytes, concatenated in column-table order
+"""
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import List, Optional, Dict, Any, Tuple
+
+try:
+    import networkx as nx
+    HAS_NETWORKX = True
+except ImportError:
+    HAS_NETWORKX = False
+
+
+SNAPSHOT_MAGIC = b"CFGS"
+SNAPSHOT_FORMAT_VERSION = 1
+FLAG_COMPRESSED = 1
+
+_HEADER = struct.Struct("<4sHH")
+_META_LEN = struct.Struct("<I")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is malformed or has an unsupported version."""
+
+
+class _Vocab:
+    def __init__(self):
+        self.values: List[Any] = []
+        self._index: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        if value is None:
+            return -1
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _encode_strings(values: List[Optional[str]]) -> Tuple[array, bytes, array]:
+    offsets = array("q", [0])
+    nulls = array("b")
+    chunks = []
+    position = 0
+    for value in values:
+        nulls.append(1 if value is None else 0)
+        data = (value or "").encode("utf-8")
+        chunks.append(data)
+        position += len(data)
+        offsets.append(position)
+    return offsets, b"".join(chunks), nulls
+
+
+def _decode_strings(offsets: array, data: bytes, nulls: array) -> List[Optional[str]]:
+    text = data.decode("utf-8") if data.isascii() else None
+    result: List[Optional[str]] = []
+    for i in range(len(nulls)):
+        if nulls[i]:
+            result.append(None)
+        elif text is not None:
+            result.append(text[offsets[i]:offsets[i + 1]])
+        else:
+            result.append(data[offsets[i]:offsets[i + 1]].decode("utf-8"))
+    return result
+
+
+def encode_graph(graph: "nx.DiGraph", compress: bool = True) -> bytes:
+    """Serialize a knowledge graph into a binary snapshot."""
+    tenants, node_types, datasets, tags_vocab, edge_types = (
+        _Vocab(), _Vocab(), _Vocab(), _Vocab(), _Vocab()
+    )
+
+    node_ids = array("q")
+    node_versions = array("q")
+    node_tenants = array("i")
+    node_type_codes = array("i")
+    node_datasets = array("i")
+    tag_offsets = array("q", [0])
+    tag_codes = array("i")
+    titles: List[Optional[str]] = []
+    field_paths: List[Optional[str]] = []
+
+    for node_id, data in graph.nodes(data=True):
+        node_ids.append(node_id)
+        node_versions.append(data.get("graph_version") or 0)
+        node_tenants.append(tenants.code(data.get("tenant_id")))
+        node_type_codes.append(node_types.code(data.get("node_type")))
+        node_datasets.append(datasets.code(data.get("dataset_name")))
+        for tag in data.get("tags") or []:
+            tag_codes.append(tags_vocab.code(tag))
+        tag_offsets.append(len(tag_codes))
+        titles.append(data.get("title"))
+        field_paths.append(data.get("field_path"))
+
+    edge_sources = array("q")
+    edge_targets = array("q")
+    edge_ids = array("q")
+    edge_type_codes = array("i")
+    edge_weights = array("d")
+    edge_auto = array("b")
+
+    for source, target, data in graph.edges(data=True):
+        edge_sources.append(source)
+        edge_targets.append(target)
+        edge_ids.append(data.get("edge_id") or 0)
+        edge_type_codes.append(edge_types.code(data.get("edge_type")))
+        weight = data.get("weight")
+        edge_weights.append(float("nan") if weight is None else weight)
+        auto = data.get("is_auto_generated")
+        edge_auto.append(-1 if auto is None else int(bool(auto)))
+
+    title_offsets, title_data, title_nulls = _encode_strings(titles)
+    path_offsets, path_data, path_nulls = _encode_strings(field_paths)
+
+    columns: List[Tuple[str, str, bytes]] = []
+    for name, column in [
+        ("node_id", node_ids),
+        ("node_graph_version", node_versions),
+        ("node_tenant", node_tenants),
+        ("node_type", node_type_codes),
+        ("node_dataset", node_datasets),
+        ("node_tags.offsets", tag_offsets),
+        ("node_tags.codes", tag_codes),
+        ("node_title.offsets", title_offsets),
+        ("node_title.nulls", title_nulls),
+        ("node_field_path.offsets", path_offsets),
+        ("node_field_path.nulls", path_nulls),
+        ("edge_source", edge_sources),
+        ("edge_target", edge_targets),
+        ("edge_id", edge_ids),
+        ("edge_type", edge_type_codes),
+        ("edge_weight", edge_weights),
+        ("edge_auto", edge_auto),
+    ]:
+        columns.append((name, column.typecode, column.tobytes()))
+    columns.append(("node_title.data", "B", title_data))
+    columns.append(("node_field_path.data", "B", path_data))
+
+    meta = {
+        "byteorder": sys.byteorder,
+        "graph": {k: v for k, v in graph.graph.items() if isinstance(v, (int, float, str))},
+        "node_count": len(node_ids),
+        "edge_count": len(edge_ids),
+        "vocab": {
+            "tenant": tenants.values,
+            "node_type": node_types.values,
+            "dataset": datasets.values,
+            "tag": tags_vocab.values,
+            "edge_type": edge_types.values,
+        },
+        "columns": [[name, typecode, len(data)] for name, typecode, data in columns],
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+
+    payload = b"".join(
+        [_META_LEN.pack(len(meta_bytes)), meta_bytes] + [data for _, _, data in columns]
+    )
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 1)
+        flags |= FLAG_COMPRESSED
+
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, flags) + payload
+
+
+def read_snapshot_meta(data: bytes) -> Tuple[Dict[str, Any], memoryview]:
+    """Validate the header and return (meta, column bytes)."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Snapshot too short")
+
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a graph snapshot")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+
+    payload = memoryview(data)[_HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        payload = memoryview(zlib.decompress(payload))
+
+    (meta_len,) = _META_LEN.unpack_from(payload)
+    start = _META_LEN.size
+    meta = json.loads(bytes(payload[start:start + meta_len]))
+    return meta, payload[start + meta_len:]
+
+
+def decode_graph(data: bytes) -> "nx.DiGraph":
+    """Rebuild a knowledge graph from a binary snapshot."""
+    if not HAS_NETWORKX:
+        raise ImportError("networkx is required for graph operations")
+
+    meta, body = read_snapshot_meta(data)
+    swap = meta.get("byteorder") != sys.byteorder
+
+    columns: Dict[str, Any] = {}
+    position = 0
+    for name, typecode, length in meta["columns"]:
+        chunk = body[position:position + length]
+        position += length
+        if typecode == "B":
+            columns[name] = bytes(chunk)
+            continue
+        column = array(typecode)
+        column.frombytes(chunk)
+        if swap:
+            column.byteswap()
+        columns[name] = column
+    if position != len(body):
+        raise SnapshotError("Snapshot column table does not match payload size")
+
+    vocab = meta["vocab"]
+    tenant_vocab = vocab["tenant"]
+    node_type_vocab = vocab["node_type"]
+    dataset_vocab = vocab["dataset"]
+    tag_vocab = vocab["tag"]
+    edge_type_vocab = vocab["edge_type"]
+
+    titles = _decode_strings(
+        columns["node_title.offsets"], columns["node_title.data"], columns["node_title.nulls"]
+    )
+    field_paths = _decode_strings(
+        columns["node_field_path.offsets"],
+        columns["node_field_path.data"],
+        columns["node_field_path.nulls"],
+    )
+
+    def lookup(values: List[Any], codes: array) -> List[Any]:
+        table = values + [None]  # code -1 maps to None
+        return [table[c] for c in codes]
+
+    tag_offsets = columns["node_tags.offsets"].tolist()
+    tag_names = lookup(tag_vocab, columns["node_tags.codes"])
+    node_tags = [tag_names[tag_offsets[i]:tag_offsets[i + 1]] for i in range(len(tag_offsets) - 1)]
+
+    graph = nx.DiGraph(**meta.get("graph", {}))
+    graph.add_nodes_from(
+        (
+            node_id,
+            {
+                "tenant_id": tenant_id,
+                "node_type": node_type,
+                "title": title,
+                "tags": tags,
+                "dataset_name": dataset_name,
+                "field_path": field_path,
+                "graph_version": graph_version,
+            },
+        )
+        for node_id, tenant_id, node_type, title, tags, dataset_name, field_path, graph_version in zip(
+            columns["node_id"].tolist(),
+            lookup(tenant_vocab, columns["node_tenant"]),
+            lookup(node_type_vocab, columns["node_type"]),
+            titles,
+            node_tags,
+            lookup(dataset_vocab, columns["node_dataset"]),
+            field_paths,
+            columns["node_graph_version"].tolist(),
+        )
+    )
+
+    graph.add_edges_from(
+        (
+            source,
+            target,
+            {
+                "edge_id": edge_id,
+                "edge_type": edge_type,
+                "weight": None if weight != weight else weight,
+                "is_auto_generated": None if auto < 0 else bool(auto),
+            },
+        )
+        for source, target, edge_id, edge_type, weight, auto in zip(
+            columns["edge_source"].tolist(),
+            columns["edge_target"].tolist(),
+            columns["edge_id"].tolist(),
+            lookup(edge_type_vocab, columns["edge_type"]),
+            columns["edge_weight"].tolist(),
+            columns["edge_auto"].tolist(),
+        )
+    )
+
+    return graph
@@ -5,30 +5,51 @@ Processes graph_events table to keep NetworkX graph in sync
 and generates implicit edges (SHARED_TAG, SIMILAR).
 """
 
+import asyncio
+import hashlib
+import json
+import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Set, Tuple
+from typing import List, Optional, Dict, Any, Set, Tuple, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.core.config import settings
 from app.models.enums import EdgeType
 from app.clients.embedding_client import EmbeddingClient
+from app.services.event_cursor import EventCursor
+from app.services.graph_service import GraphService, get_live_graphs
+from app.services.similarity_index import SimilarityIndex, parse_vector, HAS_NUMPY, np
+from app.services.tag_index import TagIndex, shared_tag_weight
 from app.utils.schema import sql as schema_sql
 
+logger = logging.getLogger(__name__)
+
+# Weight changes below this are not written back
+WEIGHT_EPSILON = 1e-4
+
 
 class GraphSyncService:
     def __init__(
         self,
         session: AsyncSession,
         embedding_client: Optional[EmbeddingClient] = None,
+        redis_client=None,
     ):
         self.session = session
         self.embedding_client = embedding_client
+        self.redis_client = redis_client
     
     async def process_pending_events(
         self,
         batch_size: int = 100,
     ) -> Dict[str, int]:
-        """Process unprocessed events from graph_events table."""
+        """
+        Process unprocessed events from graph_events table.
+        
+        Also applies new events as deltas to this process's live graphs
+        so they stay current without a full reload.
+        """
         result = await self.session.execute(
             text(schema_sql("""
                 SELECT id, event_type, entity_type, entity_id, payload, created_at
@@ -50,6 +71,7 @@ class GraphSyncService:
             "edge_created": 0,
             "edge_deleted": 0,
             "errors": 0,
+            "graphs_synced": 0,
         }
         
         processed_ids = []
@@ -86,6 +108,56 @@ class GraphSyncService:
             )
             await self.session.commit()
         
+        stats["graphs_synced"] = await self.sync_live_graphs()
+        
+        return stats
+    
+    async def sync_live_graphs(self) -> int:
+        """Apply pending graph_events to every live graph in this process."""
+        graph_service = GraphService(self.session)
+        synced = 0
+        
+        for live in get_live_graphs():
+            async with live.lock:
+                applied = await graph_service.apply_pending_events(live)
+            if applied is None:
+                # Backlog too large for deltas; next load_graph rebuilds it
+                await graph_service.invalidate_cache(sorted(live.tenant_ids))
+            else:
+                synced += 1
+        
+        return synced
+    
+    async def refresh_live_graphs(self) -> Dict[str, int]:
+        """
+        Keep every live graph current ahead of requests.
+        
+        Graphs that would expire before the next refresh (or whose event
+        backlog is too large for deltas) are rebuilt here, so requests keep
+        using the old graph instead of paying for the rebuild. The rest get
+        pending graph_events applied.
+        """
+        stats = {"synced": 0, "rebuilt": 0}
+        rebuild_age = settings.GRAPH_LIVE_MAX_AGE - settings.GRAPH_REFRESH_INTERVAL
+        
+        for live in get_live_graphs():
+            if not any(current is live for current in get_live_graphs()):
+                continue  # evicted or invalidated meanwhile
+            
+            age = (datetime.utcnow() - live.built_at).total_seconds()
+            if age < rebuild_age:
+                graph_service = GraphService(self.session)
+                async with live.lock:
+                    applied = await graph_service.apply_pending_events(live)
+                if applied is not None:
+                    stats["synced"] += 1
+                    continue
+            
+            graph_service = GraphService(self.session, redis_client=self.redis_client)
+            await graph_service.load_graph(sorted(live.tenant_ids), force_reload=True)
+            graph_service.release()
+            stats["rebuilt"] += 1
+        
         return stats
     
     async def generate_shared_tag_edges(
@@ -93,72 +165,184 @@ class GraphSyncService:
         tenant_ids: List[str],
         min_shared_tags: int = 2,
         batch_size: int = 1000,
+        full: bool = False,
     ) -> int:
-        """Generate SHARED_TAG edges between nodes with common tags."""
-        await self.session.execute(
-            text(schema_sql("""
-                DELETE FROM {schema}.knowledge_edges
-                WHERE edge_type = 'shared_tag' AND is_auto_generated = TRUE
-            """))
-        )
+        """
+        Generate SHARED_TAG edges between nodes with common tags.
+        
+        Builds one in-memory tag -> node posting-list index over all
+        tenant_ids, so nodes pair across the requested tenants, and counts
+        shared tags by merging postings. Only auto edges with both
+        endpoints in tenant_ids are diffed; edges to other tenants are
+        left alone. After the first run only
+        nodes changed since the last run (per graph_events) are recounted.
+        Existing auto edges are diffed against the result and written in
+        batch_size chunks, each committed on its own, so the edges table is
+        never locked for the whole rebuild.
         
-        result = await self.session.execute(
-            text(schema_sql("""
-                WITH node_pairs AS (
-                    SELECT 
-                        n1.id as source_id,
-                        n2.id as target_id,
-                        array_length(
-                            ARRAY(SELECT unnest(n1.tags) INTERSECT SELECT unnest(n2.tags)),
-                            1
-                        ) as shared_count
-                    FROM {schema}.knowledge_nodes n1
-                    JOIN {schema}.knowledge_nodes n2 ON n1.id < n2.id
-                    WHERE n1.tenant_id = ANY(:tenant_ids)
-                      AND n2.tenant_id = ANY(:tenant_ids)
-                      AND n1.is_deleted = FALSE
-                      AND n2.is_deleted = FALSE
-                      AND n1.status = 'published'
-                      AND n2.status = 'published'
-                      AND n1.tags && n2.tags
-                )
-                INSERT INTO {schema}.knowledge_edges (source_id, target_id, edge_type, weight, is_auto_generated, created_by)
-                SELECT 
-                    source_id, 
-                    target_id, 
-                    'shared_tag',
-                    LEAST(shared_count::float / 5.0, 1.0),
-                    TRUE,
-                    'system'
-                FROM node_pairs
-                WHERE shared_count >= :min_shared_tags
-                LIMIT :batch_size
-                ON CONFLICT (source_id, target_id, edge_type) DO UPDATE
-                SET weight = EXCLUDED.weight
-                RETURNING id
-            """)),
-            {
-                "tenant_ids": tenant_ids,
-                "min_shared_tags": min_shared_tags,
-                "batch_size": batch_size,
-            }
+        Args:
+            tenant_ids: Tenants whose nodes are paired with each other
+            min_shared_tags: Minimum shared tags required for an edge
+            batch_size: Rows per INSERT / UPDATE / DELETE statement
+            full: Ignore the stored watermark and recount every node
+        
+        Returns:
+            Number of edges created
+        """
+        params = {"min_shared_tags": min_shared_tags}
+        tenant_ids = sorted(set(tenant_ids))
+        
+        state_key = self._job_state_key("shared_tag_edges", tenant_ids)
+        cursor, scope = await self._resolve_incremental_scope(state_key, tenant_ids, params, full)
+        if scope is not None and not scope:
+            await self._save_job_state(state_key, self._job_state(cursor, params))
+            await self.session.commit()
+            return 0
+        
+        index = await self._load_tag_index(tenant_ids, min_shared_tags)
+        desired = {
+            pair: shared_tag_weight(count)
+            for pair, count in index.pairs(min_shared_tags, scope).items()
+        }
+        existing = await self._load_auto_edges("shared_tag", tenant_ids, scope)
+        
+        stats = await self._apply_edge_diff(
+            "shared_tag", existing, desired, batch_size, commit_batches=True
         )
         
-        created = len(result.fetchall())
+        await self._save_job_state(state_key, self._job_state(cursor, params))
         await self.session.commit()
         
-        return created
+        logger.info(
+            f"SHARED_TAG edges for {tenant_ids}: "
+            f"{len(scope) if scope is not None else len(index)} nodes counted "
+            f"({'incremental' if scope is not None else 'full'}), "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['deleted']} deleted"
+        )
+        
+        return stats["created"]
     
     async def generate_similar_edges(
         self,
         tenant_ids: List[str],
         similarity_threshold: float = 0.85,
         batch_size: int = 100,
+        top_k: Optional[int] = None,
+        full: bool = False,
     ) -> int:
-        """Generate SIMILAR edges between nodes with high embedding similarity."""
+        """
+        Generate SIMILAR edges between nodes with high embedding similarity.
+        
+        Embeddings of all tenant_ids are loaded into one in-process
+        SimilarityIndex, so nodes pair across the requested tenants (e.g. a
+        shared KB and a tenant KB), and each node is linked to its top_k
+        neighbours at or above similarity_threshold. Only auto edges with
+        both endpoints in tenant_ids are diffed; edges to other tenants are
+        left alone. After the first run only nodes changed since
+        the last run (per graph_events) are re-queried. Existing auto edges
+        are diffed against the result: new pairs are inserted, vanished
+        pairs deleted and changed weights updated in place.
+        
+        Incremental runs re-query the changed nodes plus every node whose
+        top_k could have changed with them (old neighbours, and nodes within
+        similarity_threshold of a changed node), and the other endpoints of
+        those nodes' edges, so the result matches a full run.
+        
+        Args:
+            tenant_ids: Tenants whose nodes are paired with each other
+            similarity_threshold: Minimum cosine similarity
+            batch_size: Rows per INSERT / UPDATE / DELETE statement
+            top_k: Neighbours per node (default: SIMILAR_EDGES_TOP_K)
+            full: Ignore the stored watermark and re-query every node
+        
+        Returns:
+            Number of edges created
+        """
         if not self.embedding_client:
             return 0
         
+        if not HAS_NUMPY:
+            return await self._generate_similar_edges_sql(tenant_ids, similarity_threshold, batch_size)
+        
+        top_k = top_k or settings.SIMILAR_EDGES_TOP_K
+        params = {"threshold": similarity_threshold, "top_k": top_k}
+        tenant_ids = sorted(set(tenant_ids))
+        
+        state_key = self._job_state_key("similar_edges", tenant_ids)
+        cursor, scope = await self._resolve_incremental_scope(state_key, tenant_ids, params, full)
+        if scope is not None and not scope:
+            await self._save_job_state(state_key, self._job_state(cursor, params))
+            await self.session.commit()
+            return 0
+        
+        index = await self._load_similarity_index(tenant_ids)
+        if scope is None:
+            rows = np.arange(len(index))
+            pairs = index.similar_pairs(rows, top_k, similarity_threshold) if len(index) else {}
+            existing = await self._load_auto_edges("similar", tenant_ids)
+        else:
+            rows, pairs, existing = await self._similar_pairs_around(
+                index, tenant_ids, scope, top_k, similarity_threshold
+            )
+        
+        stats = await self._apply_edge_diff("similar", existing, pairs, batch_size)
+        
+        await self._save_job_state(state_key, self._job_state(cursor, params))
+        await self.session.commit()
+        
+        logger.info(
+            f"SIMILAR edges for {tenant_ids}: {len(rows)} nodes queried "
+            f"({'incremental' if scope is not None else 'full'}), "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['deleted']} deleted"
+        )
+        
+        return stats["created"]
+    
+    async def _similar_pairs_around(
+        self,
+        index: SimilarityIndex,
+        tenant_ids: List[str],
+        changed: Set[int],
+        top_k: int,
+        threshold: float,
+    ) -> Tuple["np.ndarray", Dict[Tuple[int, int], float], Dict[Tuple[int, int], Tuple[int, float]]]:
+        """
+        Desired and existing SIMILAR edges touching the nodes affected by changed.
+        
+        A node's top_k can only change if a changed node left it (they
+        share an existing edge) or entered it (they are within threshold).
+        Whether an edge of an affected node survives also depends on its
+        other endpoint's top_k, so those endpoints are re-queried too.
+        
+        Returns (rows queried, desired pairs, existing edges).
+        """
+        old = await self._load_auto_edges("similar", tenant_ids, changed)
+        affected = set(changed)
+        affected.update(node_id for pair in old for node_id in pair)
+        if len(index):
+            affected.update(index.ids[index.rows_within(index.rows_for(changed), threshold)].tolist())
+        
+        existing = await self._load_auto_edges("similar", tenant_ids, affected)
+        if not len(index):
+            return np.arange(0), {}, existing
+        
+        pairs = index.similar_pairs(index.rows_for(affected), top_k, threshold)
+        partners = {node_id for pair in list(existing) + list(pairs) for node_id in pair} - affected
+        rows = index.rows_for(affected | partners)
+        pairs = {
+            pair: sim
+            for pair, sim in index.similar_pairs(rows, top_k, threshold).items()
+            if pair[0] in affected or pair[1] in affected
+        }
+        return rows, pairs, existing
+    
+    async def _generate_similar_edges_sql(
+        self,
+        tenant_ids: List[str],
+        similarity_threshold: float,
+        batch_size: int,
+    ) -> int:
+        """pgvector self-join fallback used when numpy is not installed."""
         await self.session.execute(
             text(schema_sql("""
                 DELETE FROM {schema}.knowledge_edges
@@ -268,6 +452,291 @@ class GraphSyncService:
         
         return deleted
     
+    # =========================================================================
+    # Incremental edge generation helpers
+    # =========================================================================
+    
+    @staticmethod
+    def _job_state_key(job: str, tenant_ids: List[str]) -> str:
+        tenants = ",".join(sorted(set(tenant_ids)))
+        key = f"{job}:{tenants}"
+        if len(key) > 50:  # system_settings.category is VARCHAR(50)
+            key = f"{job}:" + hashlib.sha256(tenants.encode("utf-8")).hexdigest()[:16]
+        return key
+    
+    @staticmethod
+    def _job_state(cursor: EventCursor, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"last_event_id": cursor.last_event_id, "seen": cursor.seen_ids, "params": params}
+    
+    async def _load_job_state(self, key: str) -> Optional[Dict[str, Any]]:
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT settings FROM {schema}.system_settings WHERE category = :category
+            """)),
+            {"category": key}
+        )
+        row = result.fetchone()
+        return row.settings if row and isinstance(row.settings, dict) else None
+    
+    async def _save_job_state(self, key: str, state: Dict[str, Any]) -> None:
+        await self.session.execute(
+            text(schema_sql("""
+                INSERT INTO {schema}.system_settings (category, settings, updated_at)
+                VALUES (:category, :settings, NOW())
+                ON CONFLICT (category) DO UPDATE SET
+                    settings = EXCLUDED.settings,
+                    updated_at = EXCLUDED.updated_at
+            """)),
+            {"category": key, "settings": json.dumps(state)}
+        )
+    
+    async def _resolve_incremental_scope(
+        self,
+        state_key: str,
+        tenant_ids: List[str],
+        params: Dict[str, Any],
+        full: bool,
+    ) -> Tuple[EventCursor, Optional[Set[int]]]:
+        """
+        Return (event cursor to save, changed node IDs) for an edge job.
+        
+        Changed node IDs is None when the job must process every node: on
+        the first run, when full is set, when params differ from the last
+        run or when graph_events since the last run were cleaned up.
+        
+        Node events are read through an EventCursor restored from the job
+        state, so events committed after the last run with a lower id than
+        its watermark are still picked up.
+        """
+        current = await self._current_event_id()
+        state = await self._load_job_state(state_key)
+        since = None
+        if not full and state and state.get("params") == params:
+            since = state.get("last_event_id")
+            if since is not None and since < await self._min_event_id() - 1:
+                since = None
+        
+        cursor = EventCursor(current) if since is None else EventCursor(since, seen=state.get("seen") or ())
+        events = [
+            event for event in await self._changed_node_events(tenant_ids, cursor.floor)
+            if cursor.is_new(event.id)
+        ]
+        # Nodes are loaded after this read, so every event read is reflected
+        cursor.advance([event.id for event in events] + [current])
+        if since is None:
+            return cursor, None
+        return cursor, {event.entity_id for event in events}
+    
+    async def _current_event_id(self) -> int:
+        result = await self.session.execute(
+            text(schema_sql("SELECT COALESCE(MAX(id), 0) FROM {schema}.graph_events"))
+        )
+        return result.scalar() or 0
+    
+    async def _min_event_id(self) -> int:
+        result = await self.session.execute(
+            text(schema_sql("SELECT COALESCE(MIN(id), 0) FROM {schema}.graph_events"))
+        )
+        return result.scalar() or 0
+    
+    async def _changed_node_events(self, tenant_ids: List[str], floor: int) -> List[Any]:
+        """(id, entity_id) of node events in tenant_ids after floor."""
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT id, entity_id
+                FROM {schema}.graph_events
+                WHERE id > :floor
+                  AND entity_type = 'node'
+                  AND payload->>'tenant_id' = ANY(:tenant_ids)
+                ORDER BY id
+            """)),
+            {"floor": floor, "tenant_ids": tenant_ids}
+        )
+        return result.fetchall()
+    
+    async def _load_similarity_index(
+        self,
+        tenant_ids: List[str],
+        page_size: int = 5000,
+    ) -> SimilarityIndex:
+        """Bulk-load the tenants' published embeddings into a SimilarityIndex."""
+        ids: List[int] = []
+        vectors: List[Any] = []
+        last_id = 0
+        
+        while True:
+            result = await self.session.execute(
+                text(schema_sql("""
+                    SELECT id, embedding::text AS embedding
+                    FROM {schema}.knowledge_nodes
+                    WHERE tenant_id = ANY(:tenant_ids)
+                      AND is_deleted = FALSE
+                      AND status = 'published'
+                      AND embedding IS NOT NULL
+                      AND id > :after_id
+                    ORDER BY id
+                    LIMIT :limit
+                """)),
+                {"tenant_ids": tenant_ids, "after_id": last_id, "limit": page_size}
+            )
+            rows = result.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                ids.append(row.id)
+                vectors.append(parse_vector(row.embedding))
+            last_id = rows[-1].id
+        
+        return SimilarityIndex(
+            ids,
+            np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32),
+            exact_max=settings.SIMILAR_INDEX_EXACT_MAX,
+            nprobe=settings.SIMILAR_INDEX_NPROBE,
+        )
+    
+    async def _load_tag_index(
+        self,
+        tenant_ids: List[str],
+        min_shared_tags: int,
+        page_size: int = 10000,
+    ) -> TagIndex:
+        """Bulk-load tags of the tenants' published nodes into a TagIndex."""
+        index = TagIndex()
+        last_id = 0
+        
+        while True:
+            result = await self.session.execute(
+                text(schema_sql("""
+                    SELECT id, tags
+                    FROM {schema}.knowledge_nodes
+                    WHERE tenant_id = ANY(:tenant_ids)
+                      AND is_deleted = FALSE
+                      AND status = 'published'
+                      AND cardinality(tags) >= :min_tags
+                      AND id > :after_id
+                    ORDER BY id
+                    LIMIT :limit
+                """)),
+                {"tenant_ids": tenant_ids, "min_tags": min_shared_tags, "after_id": last_id, "limit": page_size}
+            )
+            rows = result.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                index.add(row.id, row.tags or [])
+            last_id = rows[-1].id
+        
+        return index
+    
+    async def _load_auto_edges(
+        self,
+        edge_type: str,
+        tenant_ids: List[str],
+        node_ids: Optional[Set[int]] = None,
+    ) -> Dict[Tuple[int, int], Tuple[int, float]]:
+        """
+        Existing auto-generated edges with both endpoints in tenant_ids as
+        (source_id, target_id) -> (edge_id, weight), optionally limited to
+        edges touching node_ids.
+        """
+        scope = ""
+        params: Dict[str, Any] = {"edge_type": edge_type, "tenant_ids": list(tenant_ids)}
+        if node_ids is not None:
+            scope = "AND (e.source_id = ANY(:node_ids) OR e.target_id = ANY(:node_ids))"
+            params["node_ids"] = list(node_ids)
+        
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT e.id, e.source_id, e.target_id, e.weight
+                FROM {schema}.knowledge_edges e
+                JOIN {schema}.knowledge_nodes s ON s.id = e.source_id
+                JOIN {schema}.knowledge_nodes t ON t.id = e.target_id
+                WHERE e.edge_type = :edge_type
+                  AND e.is_auto_generated = TRUE
+                  AND s.tenant_id = ANY(:tenant_ids)
+                  AND t.tenant_id = ANY(:tenant_ids)
+            """) + scope),
+            params
+        )
+        return {
+            (row.source_id, row.target_id): (row.id, row.weight)
+            for row in result.fetchall()
+        }
+    
+    async def _apply_edge_diff(
+        self,
+        edge_type: str,
+        existing: Dict[Tuple[int, int], Tuple[int, float]],
+        desired: Dict[Tuple[int, int], float],
+        batch_size: int,
+        commit_batches: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Insert, update and delete auto edges so existing matches desired.
+        
+        With commit_batches each statement is committed separately to keep
+        row locks short; callers must be able to re-run an interrupted diff.
+        """
+        to_delete = [edge_id for pair, (edge_id, _) in existing.items() if pair not in desired]
+        to_insert = [(pair, weight) for pair, weight in desired.items() if pair not in existing]
+        to_update = [
+            (existing[pair][0], weight)
+            for pair, weight in desired.items()
+            if pair in existing and abs((existing[pair][1] or 0.0) - weight) > WEIGHT_EPSILON
+        ]
+        batch_size = max(1, batch_size)
+        
+        for i in range(0, len(to_delete), batch_size):
+            await self.session.execute(
+                text(schema_sql("""
+                    DELETE FROM {schema}.knowledge_edges WHERE id = ANY(:ids)
+                """)),
+                {"ids": to_delete[i:i + batch_size]}
+            )
+            if commit_batches:
+                await self.session.commit()
+        
+        for i in range(0, len(to_update), batch_size):
+            chunk = to_update[i:i + batch_size]
+            await self.session.execute(
+                text(schema_sql("""
+                    UPDATE {schema}.knowledge_edges AS e
+                    SET weight = v.weight
+                    FROM unnest(CAST(:ids AS BIGINT[]), CAST(:weights AS FLOAT8[])) AS v(id, weight)
+                    WHERE e.id = v.id
+                """)),
+                {"ids": [edge_id for edge_id, _ in chunk], "weights": [w for _, w in chunk]}
+            )
+            if commit_batches:
+                await self.session.commit()
+        
+        for i in range(0, len(to_insert), batch_size):
+            chunk = to_insert[i:i + batch_size]
+            await self.session.execute(
+                text(schema_sql("""
+                    INSERT INTO {schema}.knowledge_edges
+                        (source_id, target_id, edge_type, weight, is_auto_generated, created_by)
+                    SELECT v.source_id, v.target_id, :edge_type, v.weight, TRUE, 'system'
+                    FROM unnest(
+                        CAST(:sources AS BIGINT[]),
+                        CAST(:targets AS BIGINT[]),
+                        CAST(:weights AS FLOAT8[])
+                    ) AS v(source_id, target_id, weight)
+                    ON CONFLICT (source_id, target_id, edge_type) DO UPDATE
+                    SET weight = EXCLUDED.weight
+                """)),
+                {
+                    "edge_type": edge_type,
+                    "sources": [pair[0] for pair, _ in chunk],
+                    "targets": [pair[1] for pair, _ in chunk],
+                    "weights": [w for _, w in chunk],
+                }
+            )
+            if commit_batches:
+                await self.session.commit()
+        
+        return {"created": len(to_insert), "updated": len(to_update), "deleted": len(to_delete)}
+    
     # =========================================================================
     # Incremental Shared Tag Edge Sync (for use on node create/update)
     # =========================================================================
@@ -284,7 +753,8 @@ class GraphSyncService:
         Incrementally sync SHARED_TAG edges for a single node.
         
         Called after node create/update to maintain tag-based edges.
-        Only creates edges with nodes that share >= min_shared_tags.
+        Only keeps edges with nodes that share >= min_shared_tags; edges
+        that still qualify are left in place rather than recreated.
         
         Performance: O(n) where n = nodes with overlapping tags in same tenant.
         Typically completes in 10-50ms.
@@ -299,68 +769,36 @@ class GraphSyncService:
         Returns:
             Number of edges created/updated
         """
-        if not node_tags or len(node_tags) < min_shared_tags:
-            # Node doesn't have enough tags to form edges
-            return 0
-        
-        # First, delete existing SHARED_TAG edges for this node
-        # (they'll be recreated if still valid)
-        await self.session.execute(
-            text(schema_sql("""
-                DELETE FROM {schema}.knowledge_edges
-                WHERE edge_type = 'shared_tag'
-                  AND is_auto_generated = TRUE
-                  AND (source_id = :node_id OR target_id = :node_id)
-            """)),
-            {"node_id": node_id}
-        )
-        
-        # Find all nodes with overlapping tags and create edges
-        result = await self.session.execute(
-            text(schema_sql("""
-                WITH overlapping_nodes AS (
-                    SELECT 
-                        n.id as other_id,
-                        array_length(
-                            ARRAY(SELECT unnest(:node_tags::text[]) INTERSECT SELECT unnest(n.tags)),
-                            1
-                        ) as shared_count
-                    FROM {schema}.knowledge_nodes n
-                    WHERE n.id != :node_id
-                      AND n.tenant_id = :tenant_id
-                      AND n.is_deleted = FALSE
-                      AND n.status = 'published'
-                      AND n.tags && :node_tags::text[]
-                )
-                INSERT INTO {schema}.knowledge_edges (source_id, target_id, edge_type, weight, is_auto_generated, created_by)
-                SELECT 
-                    LEAST(:node_id, other_id),
-                    GREATEST(:node_id, other_id),
-                    'shared_tag',
-                    LEAST(shared_count::float / 5.0, 1.0),
-                    TRUE,
-                    'system'
-                FROM overlapping_nodes
-                WHERE shared_count >= :min_shared_tags
-                ON CONFLICT (source_id, target_id, edge_type) DO UPDATE
-                SET weight = EXCLUDED.weight,
-                    updated_at = NOW()
-                RETURNING id
-            """)),
-            {
-                "node_id": node_id,
-                "node_tags": node_tags,
-                "tenant_id": tenant_id,
-                "min_shared_tags": min_shared_tags,
-            }
-        )
+        # Posting lists of the node's tags, restricted to the tenant
+        index = TagIndex()
+        if node_tags and len(set(node_tags)) >= min_shared_tags:
+            result = await self.session.execute(
+                text(schema_sql("""
+                    SELECT id, tags
+                    FROM {schema}.knowledge_nodes
+                    WHERE id != :node_id
+                      AND tenant_id = :tenant_id
+                      AND is_deleted = FALSE
+                      AND status = 'published'
+                      AND tags && CAST(:node_tags AS TEXT[])
+                """)),
+                {"node_id": node_id, "tenant_id": tenant_id, "node_tags": list(node_tags)}
+            )
+            for row in result.fetchall():
+                index.add(row.id, row.tags or [])
+            index.add(node_id, node_tags)
         
-        created = len(result.fetchall())
+        desired = {
+            pair: shared_tag_weight(count)
+            for pair, count in index.pairs(min_shared_tags, {node_id}).items()
+        }
+        existing = await self._load_auto_edges("shared_tag", [tenant_id], {node_id})
+        stats = await self._apply_edge_diff("shared_tag", existing, desired, batch_size=1000)
         
         if commit:
             await self.session.commit()
         
-        return created
+        return stats["created"] + stats["updated"]
     
     async def delete_shared_tag_edges_for_node(
         self,
@@ -396,3 +834,22 @@ class GraphSyncService:
             await self.session.commit()
         
         return deleted
+
+
+async def run_graph_refresher(
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+    redis_client=None,
+) -> None:
+    """Call refresh_live_graphs every interval seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        if not get_live_graphs():
+            continue
+        try:
+            async with session_factory() as session:
+                service = GraphSyncService(session, redis_client=redis_client)
+                stats = await service.refresh_live_graphs()
+            logger.debug(f"Refreshed live graphs: {stats}")
+        except Exception as e:
+            logger.warning(f"Live graph refresh failed: {e}")
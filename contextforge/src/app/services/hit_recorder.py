@@ -0,0 +1,218 @@
+"""
+Write-behind recording of knowledge hits.
+
+Search routes hand their hits to the process-wide HitRecorder, which only
+appends them to an in-memory queue; a background task writes the queue to
+knowledge_hits in batches of HIT_RECORDER_BATCH_SIZE rows, at least every
+HIT_RECORDER_FLUSH_INTERVAL seconds. Once the queue is half full only
+HIT_RECORDER_SAMPLE_RATE of new hits are kept, and beyond
+HIT_RECORDER_MAX_QUEUE they are dropped, so a slow database never pushes
+back on searches. Both are counted in stats(). The queue is drained when
+the application shuts down.
+
+Without a started recorder (scripts, tests) hits are inserted directly on
+the caller's session.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Callable, Deque, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.utils.schema import sql as schema_sql
+
+logger = logging.getLogger(__name__)
+
+
+def hit_row(
+    node_id: int,
+    query_text: Optional[str],
+    similarity_score: Optional[float] = None,
+    retrieval_method: Optional[str] = None,
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """One knowledge_hits row, stamped with the time of the hit rather than of the flush."""
+    return {
+        "node_id": node_id,
+        "query_text": query_text,
+        "similarity_score": similarity_score,
+        "retrieval_method": retrieval_method,
+        "session_id": session_id,
+        "user_id": user_id,
+        "hit_at": datetime.now(timezone.utc),
+    }
+
+
+async def insert_hits(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert hit rows with a single executemany and commit.
+
+    Rows for nodes deleted since the hit are skipped rather than failing
+    the whole batch on the foreign key.
+    """
+    if not rows:
+        return
+    await session.execute(
+        text(schema_sql("""
+            INSERT INTO {schema}.knowledge_hits (
+                node_id, query_text, similarity_score,
+                retrieval_method, session_id, user_id, hit_at
+            )
+            SELECT :node_id, :query_text, :similarity_score,
+                   :retrieval_method, :session_id, :user_id, :hit_at
+            WHERE EXISTS (
+                SELECT 1 FROM {schema}.knowledge_nodes WHERE id = :node_id
+            )
+        """)),
+        rows,
+    )
+    await session.commit()
+
+
+class HitRecorder:
+    """In-memory hit queue flushed to knowledge_hits by a background task."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = 1000,
+        flush_interval: float = 2.0,
+        max_queue: int = 100_000,
+        sample_rate: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.sample_rate = sample_rate
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.recorded = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_seconds = 0.0
+
+    def record(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Queue hit rows without waiting; returns how many were accepted."""
+        accepted = 0
+        for row in rows:
+            queued = len(self._queue)
+            if queued >= self.max_queue:
+                self.dropped += 1
+                continue
+            if queued * 2 >= self.max_queue and random.random() >= self.sample_rate:
+                self.sampled_out += 1
+                continue
+            self._queue.append(row)
+            accepted += 1
+        self.recorded += accepted
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return accepted
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still queued."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        logger.info(f"Hit recorder stopped: {self.stats()}")
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write queued hits in batches; returns how many rows were written."""
+        written = 0
+        async with self._flush_lock:
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                started = time.perf_counter()
+                try:
+                    async with self.session_factory() as session:
+                        await insert_hits(session, batch)
+                except Exception as e:
+                    # Hits are analytics; a failed batch is counted, not retried
+                    self.failed += len(batch)
+                    logger.warning(f"Failed to write {len(batch)} knowledge hits: {e}")
+                    break
+                self.flushes += 1
+                self.last_flush_seconds = time.perf_counter() - started
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "recorded": self.recorded,
+            "written": self.written,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_seconds": round(self.last_flush_seconds, 4),
+        }
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+_hit_recorder: Optional[HitRecorder] = None
+
+
+def get_hit_recorder() -> Optional[HitRecorder]:
+    """The running recorder, or None when hits should be written inline."""
+    return _hit_recorder
+
+
+def start_hit_recorder(session_factory: Callable[[], AsyncSession]) -> Optional[HitRecorder]:
+    """Start the process-wide recorder (on startup) unless HIT_RECORDER_ENABLED is off."""
+    global _hit_recorder
+    if not settings.HIT_RECORDER_ENABLED:
+        return None
+    if _hit_recorder is None:
+        _hit_recorder = HitRecorder(
+            session_factory,
+            batch_size=settings.HIT_RECORDER_BATCH_SIZE,
+            flush_interval=settings.HIT_RECORDER_FLUSH_INTERVAL,
+            max_queue=settings.HIT_RECORDER_MAX_QUEUE,
+            sample_rate=settings.HIT_RECORDER_SAMPLE_RATE,
+        )
+        _hit_recorder.start()
+    return _hit_recorder
+
+
+async def stop_hit_recorder() -> None:
+    """Drain and stop the process-wide recorder (on shutdown)."""
+    global _hit_recorder
+    recorder, _hit_recorder = _hit_recorder, None
+    if recorder is not None:
+        await recorder.stop()
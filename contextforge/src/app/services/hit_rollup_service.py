@@ -0,0 +1,257 @@
+"""
+Hourly and daily rollups of knowledge hits for the metrics dashboards.
+
+The rollup job aggregates knowledge_hits into knowledge_hit_rollups (per
+node and retrieval method) and knowledge_hit_rollup_totals (all nodes),
+one row per UTC hour or day bucket, and advances two watermarks kept in
+system_settings: every hour before the hourly watermark and every day
+before the daily watermark is rolled up. Hours are only rolled up
+HIT_ROLLUP_LAG seconds after they end, so hits still waiting in the
+write-behind HitRecorder land in raw rows the queries still scan.
+
+NODE_HITS_SQL and TOTAL_HITS_SQL stitch a time window together from daily
+rollups, hourly rollups for the hours around them and raw hits past the
+hourly watermark; with no rollups yet they fall back to raw hits entirely.
+Session counts from rollups add up per-bucket distinct counts, so a
+session spanning several buckets is counted once per bucket.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.utils.schema import sql as schema_sql
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_CATEGORY = "hit_rollups"
+ROLLUP_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_BUCKET_SQL = "date_trunc('{unit}', hit_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+HOUR_BUCKET_SQL = _BUCKET_SQL.format(unit="hour")
+DAY_BUCKET_SQL = _BUCKET_SQL.format(unit="day")
+
+# Per node and retrieval method hits in [:window_start, now). Columns:
+# bucket_start, node_id, retrieval_method, hits, sessions, similarity_sum,
+# similarity_count, last_hit_at. Parameters come from window_params().
+NODE_HITS_SQL = f"""
+    SELECT bucket_start, node_id, NULLIF(retrieval_method, '') AS retrieval_method,
+           hits, sessions, similarity_sum, similarity_count, last_hit_at
+    FROM {{schema}}.knowledge_hit_rollups
+    WHERE granularity = 'day'
+      AND bucket_start >= :window_day AND bucket_start < :day_mark
+    UNION ALL
+    SELECT bucket_start, node_id, NULLIF(retrieval_method, '') AS retrieval_method,
+           hits, sessions, similarity_sum, similarity_count, last_hit_at
+    FROM {{schema}}.knowledge_hit_rollups
+    WHERE granularity = 'hour'
+      AND bucket_start >= :window_start AND bucket_start < :hour_mark
+      AND NOT (bucket_start >= :window_day AND bucket_start < :day_mark)
+    UNION ALL
+    SELECT {HOUR_BUCKET_SQL} AS bucket_start, node_id, retrieval_method,
+           COUNT(*) AS hits, COUNT(DISTINCT session_id) AS sessions,
+           COALESCE(SUM(similarity_score), 0) AS similarity_sum,
+           COUNT(similarity_score) AS similarity_count, MAX(hit_at) AS last_hit_at
+    FROM {{schema}}.knowledge_hits
+    WHERE hit_at >= :hour_mark AND hit_at >= :window_start
+      AND node_id IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+# Hits across all nodes in [:window_start, now). Columns: bucket_start,
+# hits, sessions.
+TOTAL_HITS_SQL = f"""
+    SELECT bucket_start, hits, sessions
+    FROM {{schema}}.knowledge_hit_rollup_totals
+    WHERE granularity = 'day'
+      AND bucket_start >= :window_day AND bucket_start < :day_mark
+    UNION ALL
+    SELECT bucket_start, hits, sessions
+    FROM {{schema}}.knowledge_hit_rollup_totals
+    WHERE granularity = 'hour'
+      AND bucket_start >= :window_start AND bucket_start < :hour_mark
+      AND NOT (bucket_start >= :window_day AND bucket_start < :day_mark)
+    UNION ALL
+    SELECT {HOUR_BUCKET_SQL} AS bucket_start,
+           COUNT(*) AS hits, COUNT(DISTINCT session_id) AS sessions
+    FROM {{schema}}.knowledge_hits
+    WHERE hit_at >= :hour_mark AND hit_at >= :window_start
+    GROUP BY 1
+"""
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment: datetime) -> datetime:
+    return floor_hour(moment).replace(hour=0)
+
+
+def window_params(
+    start: Optional[datetime],
+    hour_mark: Optional[datetime],
+    day_mark: Optional[datetime],
+) -> Dict[str, datetime]:
+    """
+    Query parameters for NODE_HITS_SQL / TOTAL_HITS_SQL.
+
+    The window starts at start rounded down to the hour (all time when
+    None); missing watermarks mean nothing is rolled up yet.
+    """
+    window_start = floor_hour(start) if start else ROLLUP_EPOCH
+    window_day = floor_day(window_start)
+    if window_day < window_start:
+        window_day += timedelta(days=1)
+    return {
+        "window_start": window_start,
+        "window_day": window_day,
+        "hour_mark": hour_mark or ROLLUP_EPOCH,
+        "day_mark": day_mark or ROLLUP_EPOCH,
+    }
+
+
+class HitRollupService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_watermarks(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """(hourly, daily) watermarks, or (None, None) before the first rollup."""
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT settings FROM {schema}.system_settings WHERE category = :category
+            """)),
+            {"category": WATERMARK_CATEGORY}
+        )
+        row = result.fetchone()
+        state = row.settings if row and isinstance(row.settings, dict) else None
+        if not state:
+            return None, None
+        return datetime.fromisoformat(state["hour"]), datetime.fromisoformat(state["day"])
+
+    async def roll_up(self, max_hours: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Roll up settled hours and complete days past the watermarks.
+
+        At most max_hours hours (HIT_ROLLUP_MAX_HOURS) are rolled up per
+        call so catching up on a large backlog is spread over several runs.
+        Concurrent calls from other workers return without doing anything.
+        """
+        max_hours = max_hours or settings.HIT_ROLLUP_MAX_HOURS
+        stats: Dict[str, Any] = {"hours_rolled": 0, "days_rolled": 0}
+
+        locked = await self.session.execute(
+            text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+            {"key": WATERMARK_CATEGORY}
+        )
+        if not locked.scalar():
+            stats["skipped"] = True
+            return stats
+
+        hour_mark, day_mark = await self.get_watermarks()
+        if hour_mark is None:
+            first_hit = (await self.session.execute(
+                text(schema_sql("SELECT MIN(hit_at) FROM {schema}.knowledge_hits"))
+            )).scalar()
+            if first_hit is None:
+                await self.session.commit()
+                return stats
+            hour_mark, day_mark = floor_hour(first_hit), floor_day(first_hit)
+
+        settled = floor_hour(datetime.now(timezone.utc) - timedelta(seconds=settings.HIT_ROLLUP_LAG))
+        hour_to = min(settled, hour_mark + timedelta(hours=max_hours))
+        if hour_to > hour_mark:
+            await self._roll("hour", hour_mark, hour_to)
+            stats["hours_rolled"] = int((hour_to - hour_mark) / timedelta(hours=1))
+            hour_mark = hour_to
+
+        # Days are rolled up from raw hits (distinct sessions do not add up
+        # across hours), and only once all their hours are rolled up
+        day_to = floor_day(hour_mark)
+        if day_to > day_mark:
+            await self._roll("day", day_mark, day_to)
+            stats["days_rolled"] = (day_to - day_mark).days
+            day_mark = day_to
+
+        await self.session.execute(
+            text(schema_sql("""
+                INSERT INTO {schema}.system_settings (category, settings, updated_at)
+                VALUES (:category, :settings, NOW())
+                ON CONFLICT (category) DO UPDATE SET
+                    settings = EXCLUDED.settings,
+                    updated_at = EXCLUDED.updated_at
+            """)),
+            {
+                "category": WATERMARK_CATEGORY,
+                "settings": json.dumps({"hour": hour_mark.isoformat(), "day": day_mark.isoformat()}),
+            }
+        )
+        await self.session.commit()
+
+        stats["hour_watermark"] = hour_mark.isoformat()
+        stats["day_watermark"] = day_mark.isoformat()
+        return stats
+
+    async def _roll(self, granularity: str, start: datetime, end: datetime) -> None:
+        """Aggregate raw hits in [start, end) into granularity buckets (idempotent)."""
+        bucket = HOUR_BUCKET_SQL if granularity == "hour" else DAY_BUCKET_SQL
+        params = {"granularity": granularity, "start": start, "end": end}
+
+        await self.session.execute(
+            text(schema_sql(f"""
+                INSERT INTO {{schema}}.knowledge_hit_rollups (
+                    granularity, bucket_start, node_id, retrieval_method,
+                    hits, sessions, similarity_sum, similarity_count, last_hit_at
+                )
+                SELECT :granularity, {bucket}, node_id, COALESCE(retrieval_method, ''),
+                       COUNT(*), COUNT(DISTINCT session_id),
+                       COALESCE(SUM(similarity_score), 0), COUNT(similarity_score), MAX(hit_at)
+                FROM {{schema}}.knowledge_hits
+                WHERE hit_at >= :start AND hit_at < :end
+                  AND node_id IS NOT NULL
+                GROUP BY 2, 3, 4
+                ON CONFLICT (granularity, bucket_start, node_id, retrieval_method) DO UPDATE SET
+                    hits = EXCLUDED.hits,
+                    sessions = EXCLUDED.sessions,
+                    similarity_sum = EXCLUDED.similarity_sum,
+                    similarity_count = EXCLUDED.similarity_count,
+                    last_hit_at = EXCLUDED.last_hit_at
+            """)),
+            params
+        )
+        await self.session.execute(
+            text(schema_sql(f"""
+                INSERT INTO {{schema}}.knowledge_hit_rollup_totals (
+                    granularity, bucket_start, hits, sessions
+                )
+                SELECT :granularity, {bucket}, COUNT(*), COUNT(DISTINCT session_id)
+                FROM {{schema}}.knowledge_hits
+                WHERE hit_at >= :start AND hit_at < :end
+                GROUP BY 2
+                ON CONFLICT (granularity, bucket_start) DO UPDATE SET
+                    hits = EXCLUDED.hits,
+                    sessions = EXCLUDED.sessions
+            """)),
+            params
+        )
+
+
+async def run_hit_rollup(
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+) -> None:
+    """Call roll_up every interval seconds until cancelled."""
+    while True:
+        try:
+            async with session_factory() as session:
+                stats = await HitRollupService(session).roll_up()
+            logger.debug(f"Rolled up knowledge hits: {stats}")
+        except Exception as e:
+            logger.warning(f"Knowledge hit rollup failed: {e}")
+        await asyncio.sleep(interval)
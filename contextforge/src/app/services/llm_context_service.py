@@ -1,4 +1,6 @@
-from typing import List, Optional, Dict, Any, Set, Tuple
+import asyncio
+import logging
+from typing import List, Optional, Dict, Any, Set, Tuple, Callable, Awaitable
 from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -20,21 +22,58 @@ from app.schemas.llm_context import (
     ExampleItem,
 )
 from app.services.node_service import NodeService
+from app.services.search_cache import SearchResultCache
 from app.services.graph_service import GraphService
+from app.services.node_detail_cache import NodeDetailCache
 from app.clients.embedding_client import EmbeddingClient
+from app.core.config import settings
 from app.utils.schema import sql as schema_sql
 
+logger = logging.getLogger(__name__)
+
+# Graph loads left running after a request timed out (kept so they finish)
+_background_loads: Set[asyncio.Task] = set()
+
+
+def _finish_background_load(task: asyncio.Task) -> None:
+    _background_loads.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background graph load failed: {task.exception()}")
+
 
 class LLMContextService:
+    """
+    Builds /llm-context responses.
+
+    The knowledge and schema halves of a request run concurrently, each on
+    its own session from session_factory, and share one query embedding and
+    one loaded graph. Halves that miss the request's time budget are left
+    out and the response is marked partial. Without a session_factory the
+    halves take turns on the request session.
+    """
+
     def __init__(
         self,
         session: AsyncSession,
         embedding_client: EmbeddingClient,
+        detail_cache: Optional[NodeDetailCache] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        redis_client=None,
+        search_cache: Optional[SearchResultCache] = None,
     ):
         self.session = session
         self.embedding_client = embedding_client
-        self.node_service = NodeService(session, embedding_client)
-        self.graph_service = GraphService(session)
+        self.node_service = NodeService(session, embedding_client, search_cache=search_cache)
+        self.graph_service = GraphService(session, redis_client=redis_client)
+        self.detail_cache = detail_cache or NodeDetailCache(session)
+        self.session_factory = session_factory
+        self.redis_client = redis_client
+        self.search_cache = search_cache
+
+        # Request-scoped state shared by both halves
+        self._query_embedding: Optional[asyncio.Task] = None
+        self._graph: Optional[asyncio.Task] = None
+        self._session_lock: Optional[asyncio.Lock] = None
 
     async def get_llm_context(
         self,
@@ -45,8 +84,16 @@ class LLMContextService:
         stats = LLMContextStats()
         debug_info: Dict[str, Any] = {"entry_point_ids": [], "expanded_ids": []}
 
+        halves: Dict[str, Callable[["LLMContextService", LLMContextRequest], Awaitable[Any]]] = {}
         if request.include_knowledge:
-            knowledge_context, k_stats, k_debug = await self._get_knowledge_context(request)
+            halves["knowledge"] = LLMContextService._get_knowledge_context
+        if request.include_schema:
+            halves["schema"] = LLMContextService._get_schema_context
+
+        results, timed_out = await self._run_halves(request, halves)
+
+        if "knowledge" in results:
+            knowledge_context, k_stats, k_debug = results["knowledge"]
             stats.faqs = k_stats.get("faqs", 0)
             stats.playbooks = k_stats.get("playbooks", 0)
             stats.permissions = k_stats.get("permissions", 0)
@@ -56,8 +103,8 @@ class LLMContextService:
             stats.max_depth_reached = max(stats.max_depth_reached, k_stats.get("max_depth", 0))
             debug_info["knowledge"] = k_debug
 
-        if request.include_schema:
-            schema_context, s_stats, s_debug = await self._get_schema_context(request)
+        if "schema" in results:
+            schema_context, s_stats, s_debug = results["schema"]
             stats.schema_fields = s_stats.get("fields", 0)
             stats.schema_concepts = s_stats.get("concepts", 0)
             stats.examples = s_stats.get("examples", 0)
@@ -66,6 +113,9 @@ class LLMContextService:
             stats.max_depth_reached = max(stats.max_depth_reached, s_stats.get("max_depth", 0))
             debug_info["schema"] = s_debug
 
+        if timed_out:
+            debug_info["timed_out"] = timed_out
+
         formatted_context = self._format_combined_context(knowledge_context, schema_context)
 
         return LLMContextResponse(
@@ -73,9 +123,98 @@ class LLMContextService:
             knowledge=knowledge_context,
             schema_context=schema_context,
             stats=stats,
-            debug=debug_info if debug_info.get("knowledge") or debug_info.get("schema") else None,
+            partial=bool(timed_out),
+            debug=debug_info if debug_info.get("knowledge") or debug_info.get("schema") or timed_out else None,
         )
 
+    async def _run_halves(
+        self,
+        request: LLMContextRequest,
+        halves: Dict[str, Callable[["LLMContextService", LLMContextRequest], Awaitable[Any]]],
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run the requested halves within the time budget.
+
+        Returns results by half name and the names of halves that were
+        cancelled for missing the budget. Errors in a half propagate.
+        """
+        if not halves:
+            return {}, []
+
+        budget = (request.timeout_ms or settings.LLM_CONTEXT_TIMEOUT_MS) / 1000
+        self._session_lock = None if self.session_factory else asyncio.Lock()
+        self._query_embedding = asyncio.ensure_future(self.embedding_client.embed(request.query))
+        self._graph = None
+        if request.expand_graph and self.session_factory:
+            self._graph = asyncio.ensure_future(self._load_graph(request.tenant_ids))
+
+        async def run(half):
+            if self.session_factory is None:
+                async with self._session_lock:
+                    return await half(self, request)
+            async with self.session_factory() as session:
+                return await half(self._scoped(session), request)
+
+        tasks = {name: asyncio.ensure_future(run(half)) for name, half in halves.items()}
+        try:
+            await asyncio.wait(tasks.values(), timeout=budget)
+        finally:
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if not self._query_embedding.done():
+                self._query_embedding.cancel()
+            await asyncio.gather(*pending, self._query_embedding, return_exceptions=True)
+
+            # A graph load on its own session keeps running so the next
+            # request finds the graph warm
+            if self._graph is not None:
+                _background_loads.add(self._graph)
+                self._graph.add_done_callback(_finish_background_load)
+
+        timed_out = [name for name, task in tasks.items() if task.cancelled()]
+        if timed_out:
+            logger.warning(f"LLM context for {request.tenant_ids} missed {budget}s budget: {timed_out}")
+            if self.session_factory is None:
+                # A cancelled half may have been mid-query on the shared session
+                await self.session.rollback()
+
+        finished = {name: task for name, task in tasks.items() if not task.cancelled()}
+        for task in finished.values():
+            if task.exception() is not None:
+                raise task.exception()
+        return {name: task.result() for name, task in finished.items()}, timed_out
+
+    def _scoped(self, session: AsyncSession) -> "LLMContextService":
+        """Service for one half of a request, sharing its embedding and graph."""
+        scoped = LLMContextService(
+            session,
+            self.embedding_client,
+            redis_client=self.redis_client,
+            search_cache=self.search_cache,
+        )
+        scoped._query_embedding = self._query_embedding
+        scoped._graph = self._graph
+        return scoped
+
+    async def _load_graph(self, tenant_ids: List[str]) -> GraphService:
+        async with self.session_factory() as session:
+            graph_service = GraphService(session, redis_client=self.redis_client)
+            await graph_service.load_graph(tenant_ids)
+            return graph_service
+
+    async def _get_query_embedding(self, query: str) -> List[float]:
+        if self._query_embedding is not None:
+            return await asyncio.shield(self._query_embedding)
+        return await self.embedding_client.embed(query)
+
+    async def _get_graph(self, tenant_ids: List[str]) -> GraphService:
+        """Loaded GraphService; traversal after loading is in-memory."""
+        if self._graph is not None:
+            return await asyncio.shield(self._graph)
+        await self.graph_service.load_graph(tenant_ids)
+        return self.graph_service
+
     async def _get_knowledge_context(
         self,
         request: LLMContextRequest,
@@ -99,6 +238,7 @@ class LLMContextService:
             bm25_weight=bm25_weight,
             vector_weight=vector_weight,
             limit=request.max_knowledge_items,
+            query_embedding=await self._get_query_embedding(request.query),
         )
 
         entry_ids = [r.node.id for r in search_results]
@@ -168,7 +308,7 @@ class LLMContextService:
         node_types: List[NodeType],
         limit: int,
     ) -> Tuple[List[Dict[str, Any]], int]:
-        await self.graph_service.load_graph(tenant_ids)
+        graph = await self._get_graph(tenant_ids)
 
         visited: Set[int] = set(entry_ids)
         expanded_nodes: List[Dict[str, Any]] = []
@@ -180,27 +320,19 @@ class LLMContextService:
             if len(expanded_nodes) >= limit:
                 break
 
+            candidates = graph.neighbor_candidates(
+                current_level, visited, node_types=set(type_values)
+            )
             next_level: Set[int] = set()
 
-            for node_id in current_level:
-                if node_id not in self.graph_service.graph:
-                    continue
+            position = 0
+            while position < len(candidates) and len(expanded_nodes) < limit:
+                chunk = candidates[position:position + limit - len(expanded_nodes)]
+                position += len(chunk)
+                details = await self.detail_cache.get_many([c[0] for c in chunk], tenant_ids)
 
-                successors = set(self.graph_service.graph.successors(node_id))
-                predecessors = set(self.graph_service.graph.predecessors(node_id))
-                neighbors = (successors | predecessors) - visited
-
-                for neighbor_id in neighbors:
-                    if len(expanded_nodes) >= limit:
-                        break
-
-                    node_data = self.graph_service.graph.nodes.get(neighbor_id, {})
-                    neighbor_type = node_data.get("node_type")
-
-                    if neighbor_type not in type_values:
-                        continue
-
-                    node_detail = await self._get_node_detail(neighbor_id, tenant_ids)
+                for neighbor_id, _, _, _ in chunk:
+                    node_detail = details.get(neighbor_id)
                     if node_detail:
                         node_detail["score"] = 1.0 / (depth + 1)
                         node_detail["is_entry_point"] = False
@@ -312,6 +444,7 @@ class LLMContextService:
             bm25_weight=bm25_weight,
             vector_weight=vector_weight,
             limit=request.max_schema_fields * 2,
+            query_embedding=await self._get_query_embedding(request.query),
         )
 
         if request.dataset_names:
@@ -405,7 +538,7 @@ class LLMContextService:
         max_depth: int,
         limit: int,
     ) -> Tuple[List[Dict[str, Any]], int]:
-        await self.graph_service.load_graph(tenant_ids)
+        graph = await self._get_graph(tenant_ids)
 
         visited: Set[int] = set(entry_ids)
         expanded_fields: List[Dict[str, Any]] = []
@@ -416,49 +549,43 @@ class LLMContextService:
             if len(expanded_fields) >= limit:
                 break
 
+            candidates = graph.neighbor_candidates(
+                current_level, visited, node_types={NodeType.SCHEMA_FIELD.value}
+            )
             next_level: Set[int] = set()
 
-            for node_id in current_level:
-                if node_id not in self.graph_service.graph:
-                    continue
-
-                successors = set(self.graph_service.graph.successors(node_id))
-                predecessors = set(self.graph_service.graph.predecessors(node_id))
-                neighbors = (successors | predecessors) - visited
-
-                for neighbor_id in neighbors:
-                    if len(expanded_fields) >= limit:
-                        break
+            position = 0
+            while position < len(candidates) and len(expanded_fields) < limit:
+                chunk = candidates[position:position + limit - len(expanded_fields)]
+                position += len(chunk)
+                details = await self.detail_cache.get_many([c[0] for c in chunk], tenant_ids)
 
-                    node_data = self.graph_service.graph.nodes.get(neighbor_id, {})
-                    neighbor_type = node_data.get("node_type")
-
-                    if neighbor_type != NodeType.SCHEMA_FIELD.value:
+                for neighbor_id, _, _, _ in chunk:
+                    node_detail = details.get(neighbor_id)
+                    if not node_detail:
                         continue
 
-                    node_detail = await self._get_node_detail(neighbor_id, tenant_ids)
-                    if node_detail:
-                        content = node_detail.get("content", {})
-                        expanded_fields.append({
-                            "id": node_detail["id"],
-                            "path": node_detail["title"],
-                            "data_type": content.get("data_type", content.get("es_type", "unknown")),
-                            "description": content.get("description", ""),
-                            "business_meaning": content.get("business_meaning") or content.get("maps_to"),
-                            "allowed_values": content.get("allowed_values"),
-                            "value_meanings": content.get("value_synonyms"),
-                            "is_nullable": content.get("nullable", True),
-                            "is_primary_key": content.get("is_primary_key", False),
-                            "is_foreign_key": content.get("is_foreign_key", False),
-                            "references": content.get("references"),
-                            "score": 1.0 / (depth + 1),
-                            "is_direct_match": False,
-                            "concept": content.get("maps_to") or content.get("concept"),
-                            "dataset_name": node_detail.get("dataset_name"),
-                        })
-                        visited.add(neighbor_id)
-                        next_level.add(neighbor_id)
-                        max_depth_reached = max(max_depth_reached, depth)
+                    content = node_detail.get("content", {})
+                    expanded_fields.append({
+                        "id": node_detail["id"],
+                        "path": node_detail["title"],
+                        "data_type": content.get("data_type", content.get("es_type", "unknown")),
+                        "description": content.get("description", ""),
+                        "business_meaning": content.get("business_meaning") or content.get("maps_to"),
+                        "allowed_values": content.get("allowed_values"),
+                        "value_meanings": content.get("value_synonyms"),
+                        "is_nullable": content.get("nullable", True),
+                        "is_primary_key": content.get("is_primary_key", False),
+                        "is_foreign_key": content.get("is_foreign_key", False),
+                        "references": content.get("references"),
+                        "score": 1.0 / (depth + 1),
+                        "is_direct_match": False,
+                        "concept": content.get("maps_to") or content.get("concept"),
+                        "dataset_name": node_detail.get("dataset_name"),
+                    })
+                    visited.add(neighbor_id)
+                    next_level.add(neighbor_id)
+                    max_depth_reached = max(max_depth_reached, depth)
 
             current_level = next_level
             if not current_level:
@@ -559,31 +686,7 @@ class LLMContextService:
         node_id: int,
         tenant_ids: List[str],
     ) -> Optional[Dict[str, Any]]:
-        result = await self.session.execute(
-            text(schema_sql("""
-                SELECT id, tenant_id, node_type, title, summary, content, tags, dataset_name
-                FROM {schema}.knowledge_nodes
-                WHERE id = :node_id 
-                  AND tenant_id = ANY(:tenant_ids)
-                  AND is_deleted = FALSE
-                  AND status = 'published'
-            """)),
-            {"node_id": node_id, "tenant_ids": tenant_ids}
-        )
-        row = result.fetchone()
-        if not row:
-            return None
-
-        return {
-            "id": row.id,
-            "tenant_id": row.tenant_id,
-            "node_type": row.node_type,
-            "title": row.title,
-            "summary": row.summary,
-            "content": row.content,
-            "tags": row.tags or [],
-            "dataset_name": row.dataset_name,
-        }
+        return await self.detail_cache.get(node_id, tenant_ids)
 
     def _resolve_search_weights(self, search_method: str) -> Tuple[float, float]:
         if search_method == "bm25":
@@ -3,8 +3,8 @@ Metrics and analytics service.
 """
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict
 from sqlmodel import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -12,6 +12,13 @@ from sqlalchemy import text
 from app.models.nodes import KnowledgeNode
 from app.models.enums import KnowledgeStatus, NodeType
 from app.utils.schema import sql as schema_sql
+from app.services.hit_recorder import get_hit_recorder, hit_row, insert_hits
+from app.services.hit_rollup_service import (
+    HitRollupService,
+    NODE_HITS_SQL,
+    TOTAL_HITS_SQL,
+    window_params,
+)
 from app.schemas.metrics import (
     MetricsSummaryResponse,
     KnowledgeHitStats,
@@ -39,11 +46,28 @@ class HitRecord:
     retrieval_method: Optional[str] = None  # 'bm25', 'vector', 'hybrid'
 
 
+PERIOD_DAYS = {"7d": 7, "30d": 30, "90d": 90, "all": None}
+
+
 class MetricsService:
+    """
+    Dashboard metrics.
+    
+    Hit aggregates read the hourly/daily rollups maintained by
+    HitRollupService and scan raw knowledge_hits only past the rollup
+    watermark (see hit_rollup_service for the window semantics).
+    """
+    
     def __init__(self, session: AsyncSession, user_tenant_ids: List[str]):
         self.session = session
         self.user_tenant_ids = user_tenant_ids
 
+    async def _hit_window(self, days: Optional[int]) -> Dict[str, datetime]:
+        """Rollup query parameters for the last days days (all time when None)."""
+        start = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+        hour_mark, day_mark = await HitRollupService(self.session).get_watermarks()
+        return window_params(start, hour_mark, day_mark)
+
     async def get_summary(
         self, days: int = 7, node_types: list[str] | None = None
     ) -> MetricsSummaryResponse:
@@ -74,19 +98,15 @@ class MetricsService:
         draft = (await self.session.execute(draft_query)).scalar() or 0
         archived = (await self.session.execute(archived_query)).scalar() or 0
 
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        hits_stmt = text(schema_sql("""
-            SELECT COUNT(*) FROM {schema}.knowledge_hits
-            WHERE hit_at >= :start_date
-        """))
-        sessions_stmt = text(schema_sql("""
-            SELECT COUNT(DISTINCT session_id) FROM {schema}.knowledge_hits
-            WHERE hit_at >= :start_date
+        totals_stmt = text(schema_sql(f"""
+            SELECT
+                COALESCE(SUM(hits), 0)::bigint AS total_hits,
+                COALESCE(SUM(sessions), 0)::bigint AS total_sessions
+            FROM ({TOTAL_HITS_SQL}) totals
         """))
-
-        total_hits = (await self.session.execute(hits_stmt, {"start_date": start_date})).scalar() or 0
-        total_sessions = (await self.session.execute(sessions_stmt, {"start_date": start_date})).scalar() or 0
+        totals = (await self.session.execute(totals_stmt, await self._hit_window(days))).fetchone()
+        total_hits = totals.total_hits or 0
+        total_sessions = totals.total_sessions or 0
 
         node_type_filter = ""
         if node_types:
@@ -124,32 +144,46 @@ class MetricsService:
         limit: int = 10,
         days: int = 7,
     ) -> TopItemsResponse:
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        stmt = text(schema_sql("""
-            SELECT 
-                k.id,
-                k.node_type,
-                k.title,
-                k.tags,
-                COUNT(h.id) AS total_hits,
-                COUNT(DISTINCT h.session_id) AS unique_sessions,
-                COUNT(DISTINCT DATE(h.hit_at)) AS days_with_hits,
-                MAX(h.hit_at) AS last_hit_at,
-                ROUND(AVG(h.similarity_score)::numeric, 3) AS avg_similarity,
-                MODE() WITHIN GROUP (ORDER BY h.retrieval_method) AS primary_retrieval_method
-            FROM {schema}.knowledge_nodes k
-            JOIN {schema}.knowledge_hits h ON k.id = h.node_id
-            WHERE k.is_deleted = FALSE
-              AND k.tenant_id = ANY(:tenant_ids)
-              AND h.hit_at >= :start_date
-            GROUP BY k.id, k.node_type, k.title, k.tags
-            ORDER BY total_hits DESC
-            LIMIT :limit
+        stmt = text(schema_sql(f"""
+            WITH period_hits AS ({NODE_HITS_SQL}),
+            top AS (
+                SELECT 
+                    k.id,
+                    k.node_type,
+                    k.title,
+                    k.tags,
+                    SUM(h.hits)::bigint AS total_hits,
+                    SUM(h.sessions)::bigint AS unique_sessions,
+                    COUNT(DISTINCT DATE(h.bucket_start AT TIME ZONE 'UTC')) AS days_with_hits,
+                    MAX(h.last_hit_at) AS last_hit_at,
+                    ROUND((SUM(h.similarity_sum) / NULLIF(SUM(h.similarity_count), 0))::numeric, 3) AS avg_similarity
+                FROM {{schema}}.knowledge_nodes k
+                JOIN period_hits h ON k.id = h.node_id
+                WHERE k.is_deleted = FALSE
+                  AND k.tenant_id = ANY(:tenant_ids)
+                GROUP BY k.id, k.node_type, k.title, k.tags
+                ORDER BY total_hits DESC
+                LIMIT :limit
+            ),
+            methods AS (
+                SELECT DISTINCT ON (node_id) node_id, retrieval_method
+                FROM (
+                    SELECT node_id, retrieval_method, SUM(hits) AS hits
+                    FROM period_hits
+                    WHERE retrieval_method IS NOT NULL
+                      AND node_id IN (SELECT id FROM top)
+                    GROUP BY node_id, retrieval_method
+                ) m
+                ORDER BY node_id, hits DESC, retrieval_method
+            )
+            SELECT top.*, methods.retrieval_method AS primary_retrieval_method
+            FROM top
+            LEFT JOIN methods ON methods.node_id = top.id
+            ORDER BY top.total_hits DESC
         """))
 
         result = await self.session.execute(stmt, {
-            "start_date": start_date,
+            **await self._hit_window(days),
             "limit": limit,
             "tenant_ids": self.user_tenant_ids,
         })
@@ -174,20 +208,17 @@ class MetricsService:
     async def get_daily_trend(self, days: int = 7) -> DailyTrendResponse:
         """Get daily hit trend."""
         
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        stmt = text(schema_sql("""
+        stmt = text(schema_sql(f"""
             SELECT 
-                DATE(hit_at) AS date,
-                COUNT(*) AS total_hits,
-                COUNT(DISTINCT session_id) AS unique_sessions
-            FROM {schema}.knowledge_hits
-            WHERE hit_at >= :start_date
-            GROUP BY DATE(hit_at)
+                DATE(bucket_start AT TIME ZONE 'UTC') AS date,
+                SUM(hits)::bigint AS total_hits,
+                SUM(sessions)::bigint AS unique_sessions
+            FROM ({TOTAL_HITS_SQL}) totals
+            GROUP BY 1
             ORDER BY date
         """))
         
-        result = await self.session.execute(stmt, {"start_date": start_date})
+        result = await self.session.execute(stmt, await self._hit_window(days))
         
         data = []
         for row in result.fetchall():
@@ -200,15 +231,15 @@ class MetricsService:
         return DailyTrendResponse(data=data, period_days=days)
     
     async def get_tag_stats(self, limit: int = 20) -> TagStatsResponse:
-        stmt = text(schema_sql("""
+        stmt = text(schema_sql(f"""
             SELECT 
                 unnest(k.tags) AS tag,
                 COUNT(*) AS count,
-                COALESCE(SUM(stats.total_hits), 0) AS total_hits
-            FROM {schema}.knowledge_nodes k
+                COALESCE(SUM(stats.total_hits), 0)::bigint AS total_hits
+            FROM {{schema}}.knowledge_nodes k
             LEFT JOIN (
-                SELECT node_id, COUNT(*) AS total_hits
-                FROM {schema}.knowledge_hits
+                SELECT node_id, SUM(hits) AS total_hits
+                FROM ({NODE_HITS_SQL}) h
                 GROUP BY node_id
             ) stats ON k.id = stats.node_id
             WHERE k.is_deleted = FALSE
@@ -219,6 +250,7 @@ class MetricsService:
         """))
 
         result = await self.session.execute(stmt, {
+            **await self._hit_window(None),
             "limit": limit,
             "tenant_ids": self.user_tenant_ids,
         })
@@ -329,7 +361,10 @@ class MetricsService:
         username: Optional[str] = None,
     ) -> int:
         """
-        Record hits for all top-K search results (batch insert).
+        Record hits for all top-K search results.
+        
+        Hits are queued on the write-behind HitRecorder when it is running
+        and inserted in one batch on this session otherwise.
         
         Args:
             hits: List of HitRecord with node_id, similarity_score, retrieval_method
@@ -337,7 +372,7 @@ class MetricsService:
             username: User who performed the search (from auth token)
             
         Returns:
-            Number of hits recorded
+            Number of hits recorded (or queued)
         """
         if not hits:
             return 0
@@ -345,32 +380,15 @@ class MetricsService:
         # TODO: get username from auth token
         username = username or "default"
         
-        # Build batch insert values
-        values = []
-        params = {"query_text": query_text, "username": username}
-        
-        for i, hit in enumerate(hits):
-            values.append(f"""(
-                :node_id_{i}, 
-                :query_text, 
-                :score_{i}, 
-                :method_{i}, 
-                :username
-            )""")
-            params[f"node_id_{i}"] = hit.node_id
-            params[f"score_{i}"] = hit.similarity_score
-            params[f"method_{i}"] = hit.retrieval_method
-        
-        values_str = ", ".join(values)
-        
-        stmt = text(schema_sql(f"""
-            INSERT INTO {{schema}}.knowledge_hits 
-            (node_id, query_text, similarity_score, retrieval_method, user_id)
-            VALUES {values_str}
-        """))
+        rows = [
+            hit_row(hit.node_id, query_text, hit.similarity_score, hit.retrieval_method, user_id=username)
+            for hit in hits
+        ]
+        recorder = get_hit_recorder()
+        if recorder is not None:
+            return recorder.record(rows)
         
-        await self.session.execute(stmt, params)
-        await self.session.commit()
+        await insert_hits(self.session, rows)
         
         return len(hits)
 
@@ -393,14 +411,6 @@ class MetricsService:
         Returns:
             HeatmapResponse with per-node heat scores
         """
-        # Calculate start date based on period
-        days_map = {"7d": 7, "30d": 30, "90d": 90, "all": None}
-        days = days_map.get(period)
-        
-        date_filter = ""
-        if days:
-            date_filter = "AND h.hit_at >= NOW() - INTERVAL ':days days'"
-        
         node_type_filter = ""
         if node_types:
             node_type_list = ", ".join(f"'{nt}'" for nt in node_types)
@@ -411,19 +421,18 @@ class MetricsService:
             WITH period_hits AS (
                 SELECT 
                     node_id,
-                    COUNT(*) as total_hits,
-                    COUNT(DISTINCT session_id) as unique_sessions,
-                    AVG(similarity_score) as avg_similarity,
-                    MAX(hit_at) as last_hit_at
-                FROM {{schema}}.knowledge_hits h
-                WHERE 1=1 {date_filter.replace(':days', str(days) if days else '0')}
+                    SUM(hits) as total_hits,
+                    SUM(sessions) as unique_sessions,
+                    SUM(similarity_sum) / NULLIF(SUM(similarity_count), 0) as avg_similarity,
+                    MAX(last_hit_at) as last_hit_at
+                FROM ({NODE_HITS_SQL}) h
                 GROUP BY node_id
             ),
             all_nodes AS (
                 SELECT 
                     n.id as node_id,
-                    COALESCE(h.total_hits, 0) as total_hits,
-                    COALESCE(h.unique_sessions, 0) as unique_sessions,
+                    COALESCE(h.total_hits, 0)::bigint as total_hits,
+                    COALESCE(h.unique_sessions, 0)::bigint as unique_sessions,
                     h.avg_similarity,
                     h.last_hit_at
                 FROM {{schema}}.knowledge_nodes n
@@ -445,7 +454,10 @@ class MetricsService:
             ORDER BY total_hits DESC
         """))
         
-        result = await self.session.execute(stmt, {"tenant_ids": self.user_tenant_ids})
+        result = await self.session.execute(stmt, {
+            **await self._hit_window(PERIOD_DAYS.get(period)),
+            "tenant_ids": self.user_tenant_ids,
+        })
         rows = result.fetchall()
         
         nodes = []
@@ -496,24 +508,16 @@ class MetricsService:
         limit: int = 20,
     ) -> HeatmapTagsResponse:
         """Get heatmap data aggregated by tags."""
-        days_map = {"7d": 7, "30d": 30, "90d": 90, "all": None}
-        days = days_map.get(period)
-        
-        date_filter = ""
-        if days:
-            date_filter = f"AND h.hit_at >= NOW() - INTERVAL '{days} days'"
-        
         stmt = text(schema_sql(f"""
             WITH tag_hits AS (
                 SELECT 
                     unnest(n.tags) as tag,
                     COUNT(DISTINCT n.id) as node_count,
-                    COALESCE(SUM(stats.total_hits), 0) as total_hits
+                    COALESCE(SUM(stats.total_hits), 0)::bigint as total_hits
                 FROM {{schema}}.knowledge_nodes n
                 LEFT JOIN (
-                    SELECT node_id, COUNT(*) as total_hits
-                    FROM {{schema}}.knowledge_hits h
-                    WHERE 1=1 {date_filter}
+                    SELECT node_id, SUM(hits) as total_hits
+                    FROM ({NODE_HITS_SQL}) h
                     GROUP BY node_id
                 ) stats ON n.id = stats.node_id
                 WHERE n.is_deleted = FALSE
@@ -532,6 +536,7 @@ class MetricsService:
         """))
         
         result = await self.session.execute(stmt, {
+            **await self._hit_window(PERIOD_DAYS.get(period)),
             "tenant_ids": self.user_tenant_ids,
             "limit": limit,
         })
@@ -552,24 +557,16 @@ class MetricsService:
         period: str = "7d",
     ) -> HeatmapTypesResponse:
         """Get heatmap data aggregated by node type."""
-        days_map = {"7d": 7, "30d": 30, "90d": 90, "all": None}
-        days = days_map.get(period)
-        
-        date_filter = ""
-        if days:
-            date_filter = f"AND h.hit_at >= NOW() - INTERVAL '{days} days'"
-        
         stmt = text(schema_sql(f"""
             WITH type_hits AS (
                 SELECT 
                     n.node_type,
                     COUNT(DISTINCT n.id) as node_count,
-                    COALESCE(SUM(stats.total_hits), 0) as total_hits
+                    COALESCE(SUM(stats.total_hits), 0)::bigint as total_hits
                 FROM {{schema}}.knowledge_nodes n
                 LEFT JOIN (
-                    SELECT node_id, COUNT(*) as total_hits
-                    FROM {{schema}}.knowledge_hits h
-                    WHERE 1=1 {date_filter}
+                    SELECT node_id, SUM(hits) as total_hits
+                    FROM ({NODE_HITS_SQL}) h
                     GROUP BY node_id
                 ) stats ON n.id = stats.node_id
                 WHERE n.is_deleted = FALSE
@@ -586,7 +583,10 @@ class MetricsService:
             ORDER BY total_hits DESC
         """))
         
-        result = await self.session.execute(stmt, {"tenant_ids": self.user_tenant_ids})
+        result = await self.session.execute(stmt, {
+            **await self._hit_window(PERIOD_DAYS.get(period)),
+            "tenant_ids": self.user_tenant_ids,
+        })
         
         types = []
         for row in result.fetchall():
@@ -0,0 +1,78 @@
+"""
+Per-request node detail cache.
+
+Graph expansion needs the full row (content, summary, ...) for every node it
+returns. NodeDetailCache hydrates a whole BFS frontier with one
+`id = ANY(:ids)` query and remembers the rows for the rest of the request,
+so repeated lookups never go back to Postgres. Rows are cached whatever
+their tenant and filtered by the caller's tenant_ids on every lookup.
+"""
+
+from typing import List, Optional, Dict, Any, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.utils.schema import sql as schema_sql
+
+
+class NodeDetailCache:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._details: Dict[int, Optional[Dict[str, Any]]] = {}
+        self.queries = 0
+
+    async def get_many(
+        self,
+        node_ids: Iterable[int],
+        tenant_ids: List[str],
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Return details for the published, visible nodes among node_ids.
+
+        Nodes that are missing, deleted, unpublished or outside tenant_ids
+        are omitted from the result. Returned dicts are copies and may be
+        modified by the caller.
+        """
+        node_ids = list(dict.fromkeys(node_ids))
+        missing = [nid for nid in node_ids if nid not in self._details]
+
+        if missing:
+            self.queries += 1
+            result = await self.session.execute(
+                text(schema_sql("""
+                    SELECT id, tenant_id, node_type, title, summary, content, tags, dataset_name
+                    FROM {schema}.knowledge_nodes
+                    WHERE id = ANY(:node_ids)
+                      AND is_deleted = FALSE
+                      AND status = 'published'
+                """)),
+                {"node_ids": missing}
+            )
+            for row in result.fetchall():
+                self._details[row.id] = {
+                    "id": row.id,
+                    "tenant_id": row.tenant_id,
+                    "node_type": row.node_type,
+                    "title": row.title,
+                    "summary": row.summary,
+                    "content": row.content,
+                    "tags": row.tags or [],
+                    "dataset_name": row.dataset_name,
+                }
+            for nid in missing:
+                self._details.setdefault(nid, None)
+
+        allowed = set(tenant_ids)
+        return {
+            nid: dict(self._details[nid])
+            for nid in node_ids
+            if self._details[nid] is not None and self._details[nid]["tenant_id"] in allowed
+        }
+
+    async def get(
+        self,
+        node_id: int,
+        tenant_ids: List[str],
+    ) -> Optional[Dict[str, Any]]:
+        details = await self.get_many([node_id], tenant_ids)
+        return details.get(node_id)
@@ -2,8 +2,14 @@
 Knowledge Verse node CRUD service.
 """
 
+import asyncio
+import hashlib
+import json
+import time
+from collections import deque
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from types import SimpleNamespace
+from typing import List, Optional, Dict, Any, Tuple, Deque, Callable, Awaitable
 from sqlmodel import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import or_, text
@@ -19,6 +25,12 @@ from app.schemas.nodes import (
 )
 from app.schemas.common import PaginatedResponse
 from app.clients.embedding_client import EmbeddingClient
+from app.clients.embedding_cache import embedding_cache_key
+from app.services.graph_sync_service import GraphSyncService
+from app.services.search_cache import SearchResultCache, search_cache_key
+from app.services.similarity_index import HAS_NUMPY
+from app.services.vector_index import VectorHit, rank_vector_rows, vector_search
+from app.core.config import settings
 from app.utils.schema import sql
 
 import logging
@@ -30,10 +42,57 @@ class EmbeddingClientRequiredError(RuntimeError):
     pass
 
 
+def fuse_rrf(
+    bm25_hits: List[Tuple[int, float]],
+    vector_hits: List[VectorHit],
+    bm25_weight: float,
+    vector_weight: float,
+    limit: int,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Weighted RRF of a ranked BM25 list and vector hits, as in
+    hybrid_search_nodes with rrf_k = HYBRID_RRF_K.
+    
+    Returns (node_id, ranking) for the top `limit` nodes, where ranking
+    holds the bm25/vector ranks and scores, rrf_score and match_source.
+    """
+    fused: Dict[int, Dict[str, Any]] = {}
+    for rank, (node_id, score) in enumerate(bm25_hits, start=1):
+        fused[node_id] = {
+            "bm25_rank": rank, "bm25_score": score,
+            "vector_rank": None, "vector_score": 0.0,
+            "match_source": "node",
+        }
+    for hit in vector_hits:
+        entry = fused.setdefault(hit.node_id, {"bm25_rank": None, "bm25_score": 0.0})
+        entry.update(vector_rank=hit.rank, vector_score=hit.score, match_source=hit.source)
+    
+    rrf_k = settings.HYBRID_RRF_K
+    for entry in fused.values():
+        entry["rrf_score"] = (
+            (bm25_weight / (rrf_k + entry["bm25_rank"]) if entry["bm25_rank"] else 0.0)
+            + (vector_weight / (rrf_k + entry["vector_rank"]) if entry["vector_rank"] else 0.0)
+        )
+    
+    ranked = sorted(fused.items(), key=lambda item: -item[1]["rrf_score"])
+    return ranked[:limit]
+
+
 class NodeService:
-    def __init__(self, session: AsyncSession, embedding_client: Optional[EmbeddingClient] = None):
+    def __init__(
+        self,
+        session: AsyncSession,
+        embedding_client: Optional[EmbeddingClient] = None,
+        search_cache: Optional[SearchResultCache] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
         self.session = session
         self.embedding_client = embedding_client
+        self.search_cache = search_cache
+        # Client-mode search legs each get their own session from here
+        self.session_factory = session_factory
+        # Mode and per-leg timings of the last uncached hybrid_search
+        self.last_search_stats: Optional[Dict[str, Any]] = None
     
     def _require_embedding_client(self) -> EmbeddingClient:
         if self.embedding_client is None:
@@ -43,6 +102,15 @@ class NodeService:
             )
         return self.embedding_client
     
+    def _embedding_key(self, embed_text: str) -> str:
+        client = self._require_embedding_client()
+        return embedding_cache_key(embed_text, settings.EMBEDDING_MODEL, client.expected_dimension)
+    
+    def _invalidate_search_cache(self, tenant_id: str) -> None:
+        # Other workers pick the change up from graph_events
+        if self.search_cache is not None:
+            self.search_cache.invalidate_tenants([tenant_id])
+    
     async def list_nodes(
         self,
         params: NodeListParams,
@@ -165,10 +233,11 @@ class NodeService:
         await self.session.execute(
             text(sql("""
                 UPDATE {schema}.knowledge_nodes 
-                SET embedding = :embedding::vector 
+                SET embedding = :embedding::vector,
+                    embedding_key = :embedding_key
                 WHERE id = :id
             """)),
-            {"id": node.id, "embedding": embedding_str}
+            {"id": node.id, "embedding": embedding_str, "embedding_key": self._embedding_key(embed_text)}
         )
         
         # Sync SHARED_TAG edges if node has tags and is published
@@ -181,6 +250,7 @@ class NodeService:
         
         await self.session.commit()
         await self.session.refresh(node)
+        self._invalidate_search_cache(node.tenant_id)
         
         return node
     
@@ -230,10 +300,11 @@ class NodeService:
             await self.session.execute(
                 text(sql("""
                     UPDATE {schema}.knowledge_nodes 
-                    SET embedding = :embedding::vector 
+                    SET embedding = :embedding::vector,
+                        embedding_key = :embedding_key
                     WHERE id = :id
                 """)),
-                {"id": node.id, "embedding": embedding_str}
+                {"id": node.id, "embedding": embedding_str, "embedding_key": self._embedding_key(embed_text)}
             )
         
         # Sync SHARED_TAG edges if tags or status changed
@@ -251,6 +322,7 @@ class NodeService:
         
         await self.session.commit()
         await self.session.refresh(node)
+        self._invalidate_search_cache(node.tenant_id)
         
         return node
     
@@ -269,6 +341,7 @@ class NodeService:
         node.updated_at = datetime.utcnow()
         
         await self.session.commit()
+        self._invalidate_search_cache(node.tenant_id)
         return True
     
     async def hybrid_search(
@@ -280,42 +353,50 @@ class NodeService:
         bm25_weight: float = 0.4,
         vector_weight: float = 0.6,
         limit: int = 20,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[NodeSearchResult]:
+        self.last_search_stats = None
         if not query_text or not query_text.strip():
             return []
         
-        client = self._require_embedding_client()
-        query_embedding = await client.embed(query_text)
-        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
+        cache = self.search_cache
+        if cache is not None:
+            await cache.sync(self.session)
+            cache_key, cache_scope = search_cache_key(
+                query_text, user_tenant_ids, node_types, tags, bm25_weight, vector_weight, limit
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation(user_tenant_ids)
         
-        result = await self.session.execute(
-            text(sql("""
-                SELECT * FROM {schema}.hybrid_search_nodes(
-                    :query_text,
-                    :query_embedding,
-                    :tenant_ids,
-                    :node_types,
-                    :tag_filter,
-                    :bm25_weight,
-                    :vector_weight,
-                    :result_limit
-                )
-            """)),
-            {
-                "query_text": query_text,
-                "query_embedding": embedding_str,
-                "tenant_ids": user_tenant_ids,
-                "node_types": [nt.value for nt in node_types] if node_types else None,
-                "tag_filter": tags,
-                "bm25_weight": bm25_weight,
-                "vector_weight": vector_weight,
-                "result_limit": limit,
-            }
-        )
+        if query_embedding is None:
+            client = self._require_embedding_client()
+            query_embedding = await client.embed(query_text)
         
-        rows = result.fetchall()
-        results = []
+        if cache is not None:
+            cached = cache.get_similar(cache_scope, query_embedding)
+            if cached is not None:
+                return cached
         
+        started = time.perf_counter()
+        if settings.HYBRID_SEARCH_MODE == "client" or (
+            settings.VECTOR_INDEX_ENABLED and HAS_NUMPY and vector_weight > 0
+        ):
+            rows = await self._hybrid_search_client(
+                query_text, query_embedding, user_tenant_ids, node_types, tags,
+                bm25_weight, vector_weight, limit,
+            )
+        else:
+            rows = await self._hybrid_search_sql(
+                query_text, query_embedding, user_tenant_ids, node_types, tags,
+                bm25_weight, vector_weight, limit,
+            )
+            self.last_search_stats = {"mode": "sql"}
+        self.last_search_stats["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.debug(f"Hybrid search for {user_tenant_ids}: {self.last_search_stats}")
+        
+        results = []
         for row in rows:
             node_response = NodeResponse(
                 id=row.id,
@@ -345,8 +426,249 @@ class NodeService:
                 match_source=match_source,
             ))
         
+        legs = self.last_search_stats.get("legs", {})
+        if cache is not None and not any(leg.get("timed_out") for leg in legs.values()):
+            # Partial results from a timed-out leg are served but not cached
+            cache.put(cache_key, cache_scope, user_tenant_ids, results, query_embedding, generation)
+        
         return results
     
+    async def _hybrid_search_sql(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        user_tenant_ids: List[str],
+        node_types: Optional[List[NodeType]],
+        tags: Optional[List[str]],
+        bm25_weight: float,
+        vector_weight: float,
+        limit: int,
+    ) -> List[Any]:
+        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
+        
+        result = await self.session.execute(
+            text(sql("""
+                SELECT * FROM {schema}.hybrid_search_nodes(
+                    :query_text,
+                    :query_embedding,
+                    :tenant_ids,
+                    :node_types,
+                    :tag_filter,
+                    :bm25_weight,
+                    :vector_weight,
+                    :result_limit,
+                    :rrf_k
+                )
+            """)),
+            {
+                "query_text": query_text,
+                "query_embedding": embedding_str,
+                "tenant_ids": user_tenant_ids,
+                "node_types": [nt.value for nt in node_types] if node_types else None,
+                "tag_filter": tags,
+                "bm25_weight": bm25_weight,
+                "vector_weight": vector_weight,
+                "result_limit": limit,
+                "rrf_k": settings.HYBRID_RRF_K,
+            }
+        )
+        return result.fetchall()
+    
+    async def _hybrid_search_client(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        user_tenant_ids: List[str],
+        node_types: Optional[List[NodeType]],
+        tags: Optional[List[str]],
+        bm25_weight: float,
+        vector_weight: float,
+        limit: int,
+    ) -> List[Any]:
+        """
+        hybrid_search_nodes with the legs run as separate queries and fused here.
+        
+        The BM25 and vector legs run concurrently, each on its own session
+        (and so optionally a read replica) when session_factory is set; the
+        vector leg is served by the in-process index when it is enabled.
+        Ranks, scores and RRF match the SQL function. A zero-weight leg is
+        skipped, and with HYBRID_LEG_TIMEOUT_MS a leg that misses the
+        budget is dropped so the other leg's ranking is returned alone.
+        """
+        type_values = [nt.value for nt in node_types] if node_types else None
+        candidates = limit * settings.HYBRID_CANDIDATE_FACTOR
+        
+        legs: Dict[str, Callable[[AsyncSession], Awaitable[List[Any]]]] = {}
+        if bm25_weight > 0:
+            legs["bm25"] = lambda session: self._bm25_leg(
+                session, query_text, user_tenant_ids, type_values, tags, candidates
+            )
+        if vector_weight > 0:
+            legs["vector"] = lambda session: self._vector_leg(
+                session, query_embedding, user_tenant_ids, type_values, tags, candidates
+            )
+        hits = await self._run_search_legs(legs)
+        
+        fused = fuse_rrf(
+            hits.get("bm25", []), hits.get("vector", []), bm25_weight, vector_weight, limit
+        )
+        if not fused:
+            return []
+        
+        # Re-checks visibility: the index or a replica may trail the primary slightly
+        rows_result = await self.session.execute(
+            text(sql("""
+                SELECT id, tenant_id, node_type, title, summary, content, tags,
+                       dataset_name, field_path
+                FROM {schema}.knowledge_nodes
+                WHERE id = ANY(:ids)
+                  AND tenant_id = ANY(:tenant_ids)
+                  AND is_deleted = FALSE
+                  AND status = 'published'
+            """)),
+            {"ids": [node_id for node_id, _ in fused], "tenant_ids": user_tenant_ids}
+        )
+        rows = {row.id: row._mapping for row in rows_result.fetchall()}
+        
+        return [
+            SimpleNamespace(**rows[node_id], **ranking)
+            for node_id, ranking in fused
+            if node_id in rows
+        ]
+    
+    async def _run_search_legs(
+        self,
+        legs: Dict[str, Callable[[AsyncSession], Awaitable[List[Any]]]],
+    ) -> Dict[str, List[Any]]:
+        """
+        Run the search legs and record their timings in last_search_stats.
+        
+        Returns hits by leg name, leaving out legs that timed out. Errors in
+        a leg propagate. Without a session_factory the legs take turns on
+        the request session.
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        self.last_search_stats = {"mode": "client", "legs": stats}
+        
+        async def timed(name: str, leg, session: AsyncSession) -> List[Any]:
+            started = time.perf_counter()
+            hits = await leg(session)
+            stats[name] = {"ms": round((time.perf_counter() - started) * 1000, 2), "hits": len(hits)}
+            return hits
+        
+        if self.session_factory is None:
+            return {name: await timed(name, leg, self.session) for name, leg in legs.items()}
+        
+        async def run(name, leg):
+            async with self.session_factory() as session:
+                return await timed(name, leg, session)
+        
+        budget = settings.HYBRID_LEG_TIMEOUT_MS / 1000 if settings.HYBRID_LEG_TIMEOUT_MS > 0 else None
+        tasks = {name: asyncio.ensure_future(run(name, leg)) for name, leg in legs.items()}
+        try:
+            await asyncio.wait(tasks.values(), timeout=budget)
+        finally:
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        timed_out = [name for name, task in tasks.items() if task.cancelled()]
+        if timed_out:
+            logger.warning(f"Hybrid search legs missed {budget}s budget: {timed_out}")
+            for name in timed_out:
+                stats[name] = {"ms": settings.HYBRID_LEG_TIMEOUT_MS, "timed_out": True}
+        
+        finished = {name: task for name, task in tasks.items() if not task.cancelled()}
+        for task in finished.values():
+            if task.exception() is not None:
+                raise task.exception()
+        return {name: task.result() for name, task in finished.items()}
+    
+    async def _bm25_leg(
+        self,
+        session: AsyncSession,
+        query_text: str,
+        tenant_ids: List[str],
+        node_types: Optional[List[str]],
+        tags: Optional[List[str]],
+        limit: int,
+    ) -> List[Tuple[int, float]]:
+        """(node_id, ts_rank_cd score) in BM25 rank order."""
+        result = await session.execute(
+            text(sql("""
+                SELECT n.id,
+                       ts_rank_cd(n.search_vector, plainto_tsquery('english', :query_text)) AS score
+                FROM {schema}.knowledge_nodes n
+                WHERE n.search_vector @@ plainto_tsquery('english', :query_text)
+                  AND n.is_deleted = FALSE
+                  AND n.status = 'published'
+                  AND n.tenant_id = ANY(:tenant_ids)
+                  AND (CAST(:node_types AS TEXT[]) IS NULL OR n.node_type = ANY(:node_types))
+                  AND (CAST(:tag_filter AS TEXT[]) IS NULL OR n.tags && :tag_filter)
+                ORDER BY score DESC
+                LIMIT :limit
+            """)),
+            {
+                "query_text": query_text,
+                "tenant_ids": tenant_ids,
+                "node_types": node_types,
+                "tag_filter": tags,
+                "limit": limit,
+            }
+        )
+        return [(row.id, float(row.score)) for row in result.fetchall()]
+    
+    async def _vector_leg(
+        self,
+        session: AsyncSession,
+        query_embedding: List[float],
+        tenant_ids: List[str],
+        node_types: Optional[List[str]],
+        tags: Optional[List[str]],
+        limit: int,
+    ) -> List[VectorHit]:
+        """Vector hits from the in-process index when enabled, else pgvector."""
+        if settings.VECTOR_INDEX_ENABLED and HAS_NUMPY:
+            return await vector_search(session, tenant_ids, query_embedding, limit, node_types, tags)
+        
+        result = await session.execute(
+            text(sql("""
+                (SELECT n.id, 'node' AS source,
+                        1 - (n.embedding <=> CAST(:embedding AS vector)) AS score
+                 FROM {schema}.knowledge_nodes n
+                 WHERE n.embedding IS NOT NULL
+                   AND n.is_deleted = FALSE
+                   AND n.status = 'published'
+                   AND n.tenant_id = ANY(:tenant_ids)
+                   AND (CAST(:node_types AS TEXT[]) IS NULL OR n.node_type = ANY(:node_types))
+                   AND (CAST(:tag_filter AS TEXT[]) IS NULL OR n.tags && :tag_filter)
+                 ORDER BY n.embedding <=> CAST(:embedding AS vector)
+                 LIMIT :limit)
+                UNION ALL
+                (SELECT n.id, 'variant' AS source,
+                        1 - (v.embedding <=> CAST(:embedding AS vector)) AS score
+                 FROM {schema}.node_variants v
+                 JOIN {schema}.knowledge_nodes n ON v.node_id = n.id
+                 WHERE v.embedding IS NOT NULL
+                   AND n.is_deleted = FALSE
+                   AND n.status = 'published'
+                   AND n.tenant_id = ANY(:tenant_ids)
+                   AND (CAST(:node_types AS TEXT[]) IS NULL OR n.node_type = ANY(:node_types))
+                   AND (CAST(:tag_filter AS TEXT[]) IS NULL OR n.tags && :tag_filter)
+                 ORDER BY v.embedding <=> CAST(:embedding AS vector)
+                 LIMIT :limit)
+            """)),
+            {
+                "embedding": "[" + ",".join(str(x) for x in query_embedding) + "]",
+                "tenant_ids": tenant_ids,
+                "node_types": node_types,
+                "tag_filter": tags,
+                "limit": limit,
+            }
+        )
+        return rank_vector_rows((float(row.score), row.id, row.source) for row in result.fetchall())
+    
     async def get_nodes_by_ids(
         self,
         node_ids: List[int],
@@ -369,6 +691,8 @@ class NodeService:
         node_types: Optional[List[NodeType]] = None,
         batch_size: int = 50,
         only_missing: bool = False,
+        concurrency: Optional[int] = None,
+        resume: bool = True,
     ) -> Dict[str, Any]:
         """
         Regenerate embeddings for nodes.
@@ -378,102 +702,235 @@ class NodeService:
         - Updating embeddings after model change
         - Fixing nodes with missing embeddings
         
+        Nodes are streamed in id order (keyset pagination). Each page is sent
+        to embed_batch, up to `concurrency` pages are in flight at once, and
+        results are written back in page order with one bulk UPDATE per page.
+        After every page the last written id is checkpointed, so an
+        interrupted job resumes where it stopped. Nodes whose text and model
+        are unchanged are not sent to the embedding provider.
+        
         Args:
             user_tenant_ids: Tenant IDs to process
             node_types: Optional filter for specific node types
-            batch_size: Number of nodes to process per batch
+            batch_size: Number of nodes per embed_batch call
             only_missing: If True, only embed nodes without embeddings
+            concurrency: Max embedding requests in flight
+                (default: REEMBED_CONCURRENCY)
+            resume: Continue from the last checkpoint of an identical job
         
         Returns:
-            Stats dict with processed, updated, errors counts
+            Stats dict with processed, updated, unchanged, errors counts
         """
         client = self._require_embedding_client()
+        concurrency = max(1, concurrency or settings.REEMBED_CONCURRENCY)
+        checkpoint_key = self._reembed_checkpoint_key(user_tenant_ids, node_types, only_missing)
+        
+        last_id = 0
+        if resume:
+            last_id = await self._load_reembed_checkpoint(checkpoint_key)
         
         stats = {
             "processed": 0,
             "updated": 0,
             "skipped": 0,
+            "unchanged": 0,
             "errors": 0,
             "batches": 0,
+            "resumed_from": last_id,
+            "last_id": last_id,
         }
         
-        # Build query for nodes to process
-        query = select(KnowledgeNode).where(
-            KnowledgeNode.is_deleted == False,
-            KnowledgeNode.tenant_id.in_(user_tenant_ids),
-        )
-        
-        if node_types:
-            query = query.where(KnowledgeNode.node_type.in_(node_types))
+        pending: Deque[Tuple[int, List[Tuple[int, str]], "asyncio.Task"]] = deque()
+        exhausted = False
         
-        if only_missing:
-            # Only nodes without embeddings
-            query = query.where(
-                text("embedding IS NULL")
-            )
-        
-        query = query.order_by(KnowledgeNode.id)
-        
-        # Process in batches
-        offset = 0
-        while True:
-            batch_query = query.offset(offset).limit(batch_size)
-            result = await self.session.execute(batch_query)
-            nodes = result.scalars().all()
-            
-            if not nodes:
-                break
-            
-            stats["batches"] += 1
-            
-            for node in nodes:
-                stats["processed"] += 1
-                
-                try:
-                    # Build embedding text
-                    embed_text = self._build_embed_text(
-                        node.title,
-                        node.content or {},
-                        node.node_type,
+        try:
+            while not exhausted or pending:
+                if not exhausted:
+                    rows = await self._fetch_reembed_page(
+                        user_tenant_ids, node_types, only_missing, last_id, batch_size
                     )
+                    if rows:
+                        last_id = rows[-1].id
+                        items = self._prepare_reembed_page(rows, stats)
+                        task = asyncio.create_task(
+                            client.embed_batch([embed_text for _, embed_text in items])
+                        ) if items else None
+                        pending.append((last_id, items, task))
+                    else:
+                        exhausted = True
+                
+                if pending and (exhausted or len(pending) >= concurrency):
+                    page_last_id, items, task = pending.popleft()
+                    await self._write_reembed_page(items, task, stats)
+                    stats["batches"] += 1
+                    stats["last_id"] = page_last_id
+                    await self._save_reembed_checkpoint(checkpoint_key, page_last_id)
+                    await self.session.commit()
                     
-                    if not embed_text.strip():
-                        stats["skipped"] += 1
-                        continue
-                    
-                    # Generate embedding
-                    embedding = await client.embed(embed_text)
-                    # Convert to PostgreSQL vector format
-                    embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-                    
-                    # Update node
-                    await self.session.execute(
-                        text(sql("""
-                            UPDATE {schema}.knowledge_nodes 
-                            SET embedding = :embedding::vector,
-                                updated_at = NOW()
-                            WHERE id = :id
-                        """)),
-                        {"id": node.id, "embedding": embedding_str}
+                    logger.info(
+                        f"Reembed progress: {stats['processed']} processed, "
+                        f"{stats['updated']} updated, {stats['unchanged']} unchanged, "
+                        f"{stats['errors']} errors (last id {page_last_id})"
                     )
-                    
-                    stats["updated"] += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to embed node {node.id}: {e}")
-                    stats["errors"] += 1
-            
-            # Commit each batch
-            await self.session.commit()
-            
-            offset += batch_size
-            logger.info(
-                f"Reembed progress: {stats['processed']} processed, "
-                f"{stats['updated']} updated, {stats['errors']} errors"
-            )
+        finally:
+            # A failed write or commit leaves later pages' requests in flight
+            outstanding = [task for _, _, task in pending if task is not None]
+            for task in outstanding:
+                task.cancel()
+            await asyncio.gather(*outstanding, return_exceptions=True)
+        
+        await self._clear_reembed_checkpoint(checkpoint_key)
+        await self.session.commit()
         
         return stats
     
+    async def _fetch_reembed_page(
+        self,
+        tenant_ids: List[str],
+        node_types: Optional[List[NodeType]],
+        only_missing: bool,
+        after_id: int,
+        limit: int,
+    ) -> List[Any]:
+        filters = ""
+        params: Dict[str, Any] = {
+            "tenant_ids": tenant_ids,
+            "after_id": after_id,
+            "limit": limit,
+        }
+        if node_types:
+            filters += " AND node_type = ANY(:node_types)"
+            params["node_types"] = [nt.value if isinstance(nt, NodeType) else nt for nt in node_types]
+        if only_missing:
+            filters += " AND embedding IS NULL"
+        
+        result = await self.session.execute(
+            text(sql("""
+                SELECT id, title, content, node_type,
+                       CASE WHEN embedding IS NULL THEN NULL ELSE embedding_key END AS embedding_key
+                FROM {schema}.knowledge_nodes
+                WHERE is_deleted = FALSE
+                  AND tenant_id = ANY(:tenant_ids)
+                  AND id > :after_id
+            """) + filters + """
+                ORDER BY id
+                LIMIT :limit
+            """),
+            params
+        )
+        return result.fetchall()
+    
+    def _prepare_reembed_page(
+        self,
+        rows: List[Any],
+        stats: Dict[str, Any],
+    ) -> List[Tuple[int, str]]:
+        """Build embed texts for a page, dropping empty and unchanged nodes."""
+        items = []
+        for row in rows:
+            stats["processed"] += 1
+            try:
+                embed_text = self._build_embed_text(row.title, row.content or {}, row.node_type)
+            except Exception as e:
+                logger.warning(f"Failed to build embed text for node {row.id}: {e}")
+                stats["errors"] += 1
+                continue
+            
+            if not embed_text.strip():
+                stats["skipped"] += 1
+            elif row.embedding_key == self._embedding_key(embed_text):
+                stats["unchanged"] += 1
+            else:
+                items.append((row.id, embed_text))
+        return items
+    
+    async def _write_reembed_page(
+        self,
+        items: List[Tuple[int, str]],
+        task: Optional["asyncio.Task"],
+        stats: Dict[str, Any],
+    ) -> None:
+        if task is None:
+            return
+        
+        try:
+            embeddings = await task
+        except Exception as e:
+            logger.warning(f"Failed to embed nodes {items[0][0]}..{items[-1][0]}: {e}")
+            stats["errors"] += len(items)
+            return
+        
+        await self.session.execute(
+            text(sql("""
+                UPDATE {schema}.knowledge_nodes AS n
+                SET embedding = v.embedding::vector,
+                    embedding_key = v.embedding_key,
+                    updated_at = NOW()
+                FROM unnest(
+                    CAST(:ids AS BIGINT[]),
+                    CAST(:embeddings AS TEXT[]),
+                    CAST(:keys AS TEXT[])
+                ) AS v(id, embedding, embedding_key)
+                WHERE n.id = v.id
+            """)),
+            {
+                "ids": [node_id for node_id, _ in items],
+                "embeddings": [
+                    "[" + ",".join(str(x) for x in embedding) + "]"
+                    for embedding in embeddings
+                ],
+                "keys": [self._embedding_key(embed_text) for _, embed_text in items],
+            }
+        )
+        stats["updated"] += len(items)
+    
+    def _reembed_checkpoint_key(
+        self,
+        tenant_ids: List[str],
+        node_types: Optional[List[NodeType]],
+        only_missing: bool,
+    ) -> str:
+        job = json.dumps({
+            "tenants": sorted(tenant_ids),
+            "node_types": sorted(str(getattr(nt, "value", nt)) for nt in node_types or []),
+            "only_missing": only_missing,
+            "model": settings.EMBEDDING_MODEL,
+        }, sort_keys=True)
+        return "reembed:" + hashlib.sha256(job.encode("utf-8")).hexdigest()[:16]
+    
+    async def _load_reembed_checkpoint(self, checkpoint_key: str) -> int:
+        result = await self.session.execute(
+            text(sql("""
+                SELECT settings FROM {schema}.system_settings WHERE category = :category
+            """)),
+            {"category": checkpoint_key}
+        )
+        row = result.fetchone()
+        if not row or not isinstance(row.settings, dict):
+            return 0
+        last_id = int(row.settings.get("last_id") or 0)
+        if last_id:
+            logger.info(f"Resuming re-embed job {checkpoint_key} after node {last_id}")
+        return last_id
+    
+    async def _save_reembed_checkpoint(self, checkpoint_key: str, last_id: int) -> None:
+        await self.session.execute(
+            text(sql("""
+                INSERT INTO {schema}.system_settings (category, settings, updated_at)
+                VALUES (:category, :settings, NOW())
+                ON CONFLICT (category) DO UPDATE SET
+                    settings = EXCLUDED.settings,
+                    updated_at = EXCLUDED.updated_at
+            """)),
+            {"category": checkpoint_key, "settings": json.dumps({"last_id": last_id})}
+        )
+    
+    async def _clear_reembed_checkpoint(self, checkpoint_key: str) -> None:
+        await self.session.execute(
+            text(sql("DELETE FROM {schema}.system_settings WHERE category = :category")),
+            {"category": checkpoint_key}
+        )
+    
     async def get_node_versions(
         self,
         node_id: int,
@@ -575,67 +1032,18 @@ class NodeService:
         min_shared_tags: int = 2,
     ) -> int:
         """
-        Sync SHARED_TAG edges for a node using inline SQL.
+        Sync SHARED_TAG edges for a node within this session's transaction.
         
-        This is a lightweight version that doesn't require GraphSyncService,
-        suitable for use within NodeService transactions.
+        Delegates to GraphSyncService so the single-node path and the bulk
+        generator share the same posting-list counting and edge diffing.
         """
-        if not node_tags or len(node_tags) < min_shared_tags:
-            return 0
-        
         try:
-            # Delete existing SHARED_TAG edges for this node
-            await self.session.execute(
-                text(sql("""
-                    DELETE FROM {schema}.knowledge_edges
-                    WHERE edge_type = 'shared_tag'
-                      AND is_auto_generated = TRUE
-                      AND (source_id = :node_id OR target_id = :node_id)
-                """)),
-                {"node_id": node_id}
+            created = await GraphSyncService(self.session).sync_shared_tag_edges_for_node(
+                node_id=node_id,
+                node_tags=node_tags,
+                tenant_id=tenant_id,
+                min_shared_tags=min_shared_tags,
             )
-            
-            # Create edges with nodes that have overlapping tags
-            result = await self.session.execute(
-                text(sql("""
-                    WITH overlapping_nodes AS (
-                        SELECT 
-                            n.id as other_id,
-                            array_length(
-                                ARRAY(SELECT unnest(:node_tags::text[]) INTERSECT SELECT unnest(n.tags)),
-                                1
-                            ) as shared_count
-                        FROM {schema}.knowledge_nodes n
-                        WHERE n.id != :node_id
-                          AND n.tenant_id = :tenant_id
-                          AND n.is_deleted = FALSE
-                          AND n.status = 'published'
-                          AND n.tags && :node_tags::text[]
-                    )
-                    INSERT INTO {schema}.knowledge_edges (source_id, target_id, edge_type, weight, is_auto_generated, created_by)
-                    SELECT 
-                        LEAST(:node_id, other_id),
-                        GREATEST(:node_id, other_id),
-                        'shared_tag',
-                        LEAST(shared_count::float / 5.0, 1.0),
-                        TRUE,
-                        'system'
-                    FROM overlapping_nodes
-                    WHERE shared_count >= :min_shared_tags
-                    ON CONFLICT (source_id, target_id, edge_type) DO UPDATE
-                    SET weight = EXCLUDED.weight,
-                        updated_at = NOW()
-                    RETURNING id
-                """)),
-                {
-                    "node_id": node_id,
-                    "node_tags": node_tags,
-                    "tenant_id": tenant_id,
-                    "min_shared_tags": min_shared_tags,
-                }
-            )
-            
-            created = len(result.fetchall())
             logger.debug(f"Synced {created} SHARED_TAG edges for node {node_id}")
             return created
             
@@ -17,6 +17,7 @@ Usage:
 
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
+import json
 import logging
 
 from pydantic import BaseModel, Field
@@ -28,6 +29,8 @@ from app.models.enums import NodeType, EdgeType, KnowledgeStatus, Visibility
 from app.models.nodes import KnowledgeNode
 from app.models.edges import KnowledgeEdge
 from app.clients.embedding_client import EmbeddingClient
+from app.clients.embedding_cache import embedding_cache_key
+from app.core.config import settings
 from app.utils.schema import sql as schema_sql
 
 from app.utils.query_validator import QueryValidator, QueryValidationResult
@@ -220,7 +223,7 @@ class QueryForgeService:
                     "dataset_name": dataset_name,
                 }
             
-            field_nodes = await self._create_schema_field_nodes(
+            field_node_ids = await self._create_schema_field_nodes(
                 tenant_id=tenant_id,
                 dataset_name=dataset_name,
                 schema_index_id=schema_index_node.id,
@@ -234,8 +237,8 @@ class QueryForgeService:
                 "dataset_name": dataset_name,
                 "source_type": source_type,
                 "schema_index_id": schema_index_node.id,
-                "field_count": len(field_nodes),
-                "fields": [f.id for f in field_nodes],
+                "field_count": len(field_node_ids),
+                "fields": field_node_ids,
                 "errors": errors if errors else None,
             }
             
@@ -319,9 +322,15 @@ class QueryForgeService:
         unified_fields: List[Any],  # List[UnifiedField] when available
         tags: List[str],
         created_by: Optional[str],
-    ) -> List[KnowledgeNode]:
-        """Create schema_field nodes and link to schema_index."""
-        nodes: List[KnowledgeNode] = []
+    ) -> List[int]:
+        """
+        Create schema_field nodes and link them to schema_index.
+        
+        Fields are embedded with embed_batch and written in multi-row
+        INSERTs of ONBOARD_BATCH_SIZE rows, nodes and PARENT edges in a
+        single transaction. Returns the new node IDs in field order.
+        """
+        rows: List[Dict[str, Any]] = []
         
         for field in unified_fields:
             # Build content from UnifiedField
@@ -346,58 +355,96 @@ class QueryForgeService:
             business_meaning = getattr(field, 'business_meaning', None)
             if business_meaning:
                 embed_text += f"\n{business_meaning}"
-            embedding = await self.embedding_client.embed(embed_text)
             
-            # Create node
-            node = KnowledgeNode(
-                tenant_id=tenant_id,
-                node_type=NodeType.SCHEMA_FIELD,
-                title=field.path,
-                summary=field_desc,
-                content=content,
-                tags=tags,
-                dataset_name=dataset_name,
-                field_path=field.path,
-                data_type=field.field_type,
-                status=KnowledgeStatus.PUBLISHED,
-                visibility=Visibility.INTERNAL,
-                source="queryforge",
-                created_by=created_by,
+            rows.append({
+                "path": field.path,
+                "summary": field_desc,
+                "content": json.dumps(content),
+                "data_type": field.field_type,
+                "embed_text": embed_text,
+            })
+        
+        node_ids: List[int] = []
+        batch_size = max(1, settings.ONBOARD_BATCH_SIZE)
+        dimension = self.embedding_client.expected_dimension
+        
+        for i in range(0, len(rows), batch_size):
+            chunk = rows[i:i + batch_size]
+            embeddings = await self.embedding_client.embed_batch(
+                [row["embed_text"] for row in chunk]
             )
             
-            self.session.add(node)
-            await self.session.flush()
-            
-            # Update embedding
-            await self.session.execute(
+            result = await self.session.execute(
                 text(schema_sql("""
-                    UPDATE {schema}.knowledge_nodes 
-                    SET embedding = :embedding::vector 
-                    WHERE id = :id
+                    INSERT INTO {schema}.knowledge_nodes (
+                        tenant_id, node_type, title, summary, content, tags,
+                        dataset_name, field_path, data_type, embedding, embedding_key,
+                        status, visibility, source, created_by
+                    )
+                    SELECT :tenant_id, :node_type, v.path, v.summary, v.content::jsonb,
+                           CAST(:tags AS TEXT[]), :dataset_name, v.path, v.data_type,
+                           v.embedding::vector, v.embedding_key,
+                           :status, :visibility, 'queryforge', :created_by
+                    FROM unnest(
+                        CAST(:paths AS TEXT[]),
+                        CAST(:summaries AS TEXT[]),
+                        CAST(:contents AS TEXT[]),
+                        CAST(:data_types AS TEXT[]),
+                        CAST(:embeddings AS TEXT[]),
+                        CAST(:keys AS TEXT[])
+                    ) WITH ORDINALITY AS v(path, summary, content, data_type, embedding, embedding_key, ord)
+                    ORDER BY v.ord
+                    RETURNING id, field_path
                 """)),
-                {"id": node.id, "embedding": embedding}
+                {
+                    "tenant_id": tenant_id,
+                    "node_type": NodeType.SCHEMA_FIELD.value,
+                    "tags": tags,
+                    "dataset_name": dataset_name,
+                    "status": KnowledgeStatus.PUBLISHED.value,
+                    "visibility": Visibility.INTERNAL.value,
+                    "created_by": created_by,
+                    "paths": [row["path"] for row in chunk],
+                    "summaries": [row["summary"] for row in chunk],
+                    "contents": [row["content"] for row in chunk],
+                    "data_types": [row["data_type"] for row in chunk],
+                    "embeddings": [
+                        "[" + ",".join(str(x) for x in embedding) + "]"
+                        for embedding in embeddings
+                    ],
+                    "keys": [
+                        embedding_cache_key(row["embed_text"], settings.EMBEDDING_MODEL, dimension)
+                        for row in chunk
+                    ],
+                }
             )
+            # RETURNING order is not guaranteed to follow ORDER BY; field paths
+            # are unique within a dataset, so map the ids back by path
+            ids_by_path = {row.field_path: row.id for row in result.fetchall()}
+            chunk_ids = [ids_by_path[row["path"]] for row in chunk]
             
-            nodes.append(node)
-            
-            # Create PARENT edge: schema_index → field
-            edge = KnowledgeEdge(
-                source_id=schema_index_id,
-                target_id=node.id,
-                edge_type=EdgeType.PARENT,
-                is_auto_generated=True,
-                metadata_={"auto_generated": True},
-                created_by=created_by,
+            # PARENT edges: schema_index → field
+            await self.session.execute(
+                text(schema_sql("""
+                    INSERT INTO {schema}.knowledge_edges
+                        (source_id, target_id, edge_type, is_auto_generated, metadata_, created_by)
+                    SELECT :source_id, v.target_id, :edge_type, TRUE, CAST(:metadata AS JSONB), :created_by
+                    FROM unnest(CAST(:targets AS BIGINT[])) AS v(target_id)
+                """)),
+                {
+                    "source_id": schema_index_id,
+                    "edge_type": EdgeType.PARENT.value,
+                    "metadata": json.dumps({"auto_generated": True}),
+                    "created_by": created_by,
+                    "targets": chunk_ids,
+                }
             )
-            self.session.add(edge)
+            node_ids.extend(chunk_ids)
         
         await self.session.commit()
         
-        # Refresh all nodes
-        for node in nodes:
-            await self.session.refresh(node)
-        
-        return nodes
+        logger.info(f"Created {len(node_ids)} schema_field nodes for {dataset_name}")
+        return node_ids
     
     # -------------------------------------------------------------------------
     # Query Generation
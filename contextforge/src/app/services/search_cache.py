@@ -0,0 +1,304 @@
+"""
+Process-wide hybrid search result cache.
+
+Results of NodeService.hybrid_search are cached under the normalised query
+text plus everything else that shapes the result (tenant set, node types,
+tags, weights, limit). An optional semantic tier also reuses results for a
+different query whose embedding is within SEARCH_CACHE_SEMANTIC_THRESHOLD
+cosine similarity of a cached one with the same filters.
+
+Entries are dropped when graph_events shows a node or variant change in one
+of their tenants; variant events carry no tenant, so it is read from the
+variant's node. The cache polls graph_events at most every SEARCH_CACHE_SYNC_INTERVAL
+seconds on the caller's session, so every worker converges on its own
+without any cross-process messaging; SEARCH_CACHE_TTL bounds staleness for
+changes graph_events does not capture.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Tuple, FrozenSet
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.schemas.nodes import NodeSearchResult
+from app.services.event_cursor import EventCursor
+from app.services.similarity_index import HAS_NUMPY, np
+from app.utils.schema import sql as schema_sql
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query_text: str) -> str:
+    return " ".join(query_text.lower().split())
+
+
+def search_cache_key(
+    query_text: str,
+    tenant_ids: Iterable[str],
+    node_types: Optional[Iterable[Any]] = None,
+    tags: Optional[Iterable[str]] = None,
+    bm25_weight: float = 0.4,
+    vector_weight: float = 0.6,
+    limit: int = 20,
+) -> Tuple[str, str]:
+    """
+    Return (key, scope) for a search.
+
+    scope identifies the filters alone; semantic lookups only consider
+    entries with the same scope.
+    """
+    scope = json.dumps([
+        sorted(set(tenant_ids)),
+        sorted(getattr(nt, "value", nt) for nt in node_types) if node_types else None,
+        sorted(set(tags)) if tags else None,
+        bm25_weight,
+        vector_weight,
+        limit,
+    ])
+    digest = hashlib.sha256()
+    digest.update(scope.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_query(query_text).encode("utf-8"))
+    return digest.hexdigest(), scope
+
+
+def _unit(embedding: Sequence[float]):
+    if HAS_NUMPY:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+    norm = math.sqrt(sum(x * x for x in embedding))
+    return [x / norm for x in embedding] if norm else list(embedding)
+
+
+@dataclass
+class _Entry:
+    scope: str
+    tenant_ids: FrozenSet[str]
+    results: List[NodeSearchResult]
+    expires_at: float
+    unit_embedding: Any = None
+
+
+class SearchResultCache:
+    """In-process LRU of hybrid search results, invalidated per tenant."""
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl: float = 300,
+        semantic_threshold: float = 0.0,
+        sync_interval: float = 2.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self.sync_interval = sync_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Bumped on every invalidation so fills that raced with it are dropped
+        self._generations: Dict[str, int] = {}
+        self._cursor: Optional[EventCursor] = None
+        self._last_sync = 0.0
+        self._sync_lock = asyncio.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # =========================================================================
+    # Lookup / fill
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[List[NodeSearchResult]]:
+        """Exact-match lookup. Misses are counted here unless the semantic tier follows."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            if self.semantic_threshold <= 0:
+                self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._copy(entry.results)
+
+    def get_similar(
+        self,
+        scope: str,
+        embedding: Sequence[float],
+    ) -> Optional[List[NodeSearchResult]]:
+        """Results of the most similar cached query with the same scope, if close enough."""
+        if self.semantic_threshold <= 0:
+            return None
+        now = time.monotonic()
+        candidates = [
+            (key, entry) for key, entry in self._entries.items()
+            if entry.scope == scope and entry.unit_embedding is not None and entry.expires_at > now
+        ]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        query = _unit(embedding)
+        if HAS_NUMPY:
+            sims = np.stack([entry.unit_embedding for _, entry in candidates]) @ query
+            best = int(np.argmax(sims))
+            best_sim = float(sims[best])
+        else:
+            sims = [sum(a * b for a, b in zip(entry.unit_embedding, query)) for _, entry in candidates]
+            best = max(range(len(sims)), key=sims.__getitem__)
+            best_sim = sims[best]
+
+        if best_sim < self.semantic_threshold:
+            self.misses += 1
+            return None
+        key, entry = candidates[best]
+        self._entries.move_to_end(key)
+        self.semantic_hits += 1
+        return self._copy(entry.results)
+
+    def generation(self, tenant_ids: Iterable[str]) -> Tuple[int, ...]:
+        """Snapshot to pass to put() so results read before an invalidation are not stored."""
+        return tuple(self._generations.get(t, 0) for t in sorted(set(tenant_ids)))
+
+    def put(
+        self,
+        key: str,
+        scope: str,
+        tenant_ids: Iterable[str],
+        results: List[NodeSearchResult],
+        embedding: Optional[Sequence[float]] = None,
+        generation: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        tenant_ids = frozenset(tenant_ids)
+        if generation is not None and generation != self.generation(tenant_ids):
+            return
+        self._entries[key] = _Entry(
+            scope=scope,
+            tenant_ids=tenant_ids,
+            results=self._copy(results),
+            expires_at=time.monotonic() + self.ttl,
+            unit_embedding=_unit(embedding) if embedding is not None and self.semantic_threshold > 0 else None,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _copy(results: List[NodeSearchResult]) -> List[NodeSearchResult]:
+        return [r.model_copy(deep=True) for r in results]
+
+    # =========================================================================
+    # Invalidation
+    # =========================================================================
+
+    def invalidate_tenants(self, tenant_ids: Iterable[str]) -> int:
+        """Drop every entry whose tenant set includes one of tenant_ids."""
+        tenant_ids = set(tenant_ids)
+        for tenant_id in tenant_ids:
+            self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+        stale = [key for key, entry in self._entries.items() if entry.tenant_ids & tenant_ids]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    async def sync(self, session: AsyncSession, force: bool = False) -> None:
+        """Invalidate tenants with node or variant changes in graph_events since the last sync."""
+        if not force and time.monotonic() - self._last_sync < self.sync_interval:
+            return
+
+        async with self._sync_lock:
+            if not force and time.monotonic() - self._last_sync < self.sync_interval:
+                return
+
+            if self._cursor is None:
+                self._cursor = EventCursor(await self._max_event_id(session))
+                self.clear()
+            else:
+                limit = settings.GRAPH_DELTA_MAX_EVENTS + self._cursor.window
+                result = await session.execute(
+                    text(schema_sql("""
+                        SELECT e.id, COALESCE(e.payload->>'tenant_id', n.tenant_id) AS tenant_id
+                        FROM {schema}.graph_events e
+                        LEFT JOIN {schema}.knowledge_nodes n
+                          ON e.entity_type = 'variant'
+                         AND n.id = (e.payload->>'node_id')::bigint
+                        WHERE e.id > :floor
+                          AND e.entity_type IN ('node', 'variant')
+                        ORDER BY e.id ASC
+                        LIMIT :limit
+                    """)),
+                    {"floor": self._cursor.floor, "limit": limit + 1}
+                )
+                rows = result.fetchall()
+                if len(rows) > limit:
+                    # Too far behind to tell which tenants changed
+                    self._cursor.reset(await self._max_event_id(session))
+                    self.invalidate_tenants({t for entry in self._entries.values() for t in entry.tenant_ids})
+                else:
+                    rows = [row for row in rows if self._cursor.is_new(row.id)]
+                    tenants = {row.tenant_id for row in rows if row.tenant_id is not None}
+                    if tenants:
+                        dropped = self.invalidate_tenants(tenants)
+                        logger.debug(f"Search cache invalidated {dropped} entries for tenants {sorted(tenants)}")
+                    self._cursor.advance(row.id for row in rows)
+
+            self._last_sync = time.monotonic()
+
+    @staticmethod
+    async def _max_event_id(session: AsyncSession) -> int:
+        result = await session.execute(
+            text(schema_sql("""
+                SELECT COALESCE(MAX(id), 0) FROM {schema}.graph_events
+            """))
+        )
+        return result.scalar() or 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "last_event_id": self._cursor.last_event_id if self._cursor else None,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_search_cache: Optional[SearchResultCache] = None
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """Process-wide cache, or None when SEARCH_CACHE_ENABLED is off."""
+    global _search_cache
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        _search_cache = SearchResultCache(
+            max_entries=settings.SEARCH_CACHE_SIZE,
+            ttl=settings.SEARCH_CACHE_TTL,
+            semantic_threshold=settings.SEARCH_CACHE_SEMANTIC_THRESHOLD,
+            sync_interval=settings.SEARCH_CACHE_SYNC_INTERVAL,
+        )
+    return _search_cache
@@ -10,6 +10,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.clients.embedding_client import EmbeddingClient
+from app.core.config import settings
+from app.services.hit_recorder import get_hit_recorder, hit_row, insert_hits
+from app.services.similarity_index import HAS_NUMPY
+from app.services.vector_index import NODE, vector_search
 from app.utils.schema import sql as schema_sql
 
 
@@ -31,6 +35,8 @@ class SearchService:
         node_types: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         embedding = await self.embedding_client.embed(query_text)
+        if settings.VECTOR_INDEX_ENABLED and HAS_NUMPY:
+            return await self._local_vector_search(embedding, limit, node_types)
         embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
 
         stmt = text(schema_sql("""
@@ -69,6 +75,43 @@ class SearchService:
             for row in rows
         ]
 
+    async def _local_vector_search(
+        self,
+        embedding: List[float],
+        limit: int,
+        node_types: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        """simple_vector_search over the in-process vector index."""
+        index_hits = await vector_search(
+            self.session, self.user_tenant_ids, embedding, limit, node_types, sources=(NODE,)
+        )
+        similarity = {hit.node_id: hit.score for hit in index_hits}
+        if not similarity:
+            return []
+
+        result = await self.session.execute(
+            text(schema_sql("""
+                SELECT id, node_type, title, content
+                FROM {schema}.knowledge_nodes
+                WHERE id = ANY(:ids)
+                  AND is_deleted = FALSE
+                  AND status = 'published'
+                  AND tenant_id = ANY(:tenant_ids)
+            """)),
+            {"ids": list(similarity), "tenant_ids": self.user_tenant_ids}
+        )
+        rows = sorted(result.fetchall(), key=lambda row: -similarity[row.id])
+        return [
+            {
+                "id": row.id,
+                "node_type": row.node_type,
+                "title": row.title,
+                "content": row.content,
+                "similarity": float(similarity[row.id]),
+            }
+            for row in rows
+        ]
+
     async def record_hit(
         self,
         node_id: int,
@@ -78,21 +121,9 @@ class SearchService:
         session_id: Optional[str] = None,
         user_id: Optional[str] = None,
     ) -> None:
-        stmt = text(schema_sql("""
-            INSERT INTO {schema}.knowledge_hits (
-                node_id, query_text, similarity_score, 
-                retrieval_method, session_id, user_id
-            ) VALUES (
-                :node_id, :query_text, :similarity_score,
-                :retrieval_method, :session_id, :user_id
-            )
-        """))
-        await self.session.execute(stmt, {
-            "node_id": node_id,
-            "query_text": query_text,
-            "similarity_score": similarity_score,
-            "retrieval_method": retrieval_method,
-            "session_id": session_id,
-            "user_id": user_id,
-        })
-        await self.session.commit()
+        row = hit_row(node_id, query_text, similarity_score, retrieval_method, session_id, user_id)
+        recorder = get_hit_recorder()
+        if recorder is not None:
+            recorder.record([row])
+        else:
+            await insert_hits(self.session, [row])
@@ -0,0 +1,310 @@
+"""
+In-process k-nearest-neighbour search over node embeddings.
+
+Vectors are L2-normalised float32 rows, so cosine similarity is a dot
+product. Small indexes are searched exactly with blocked matrix products
+(bounded memory per block); larger ones use an IVF layout: vectors are
+bucketed by a k-means coarse quantizer and each query only scans the
+`nprobe` closest buckets.
+"""
+
+import math
+from typing import Optional, Dict, Tuple, Iterable
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+
+# Max similarity-matrix cells computed per block (~32 MB of float32)
+BLOCK_CELLS = 8_000_000
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _merge_top_k(
+    best_sims: "np.ndarray",
+    best_idx: "np.ndarray",
+    sims: "np.ndarray",
+    idx: "np.ndarray",
+    k: int,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Keep the k largest of the current best and a new candidate block."""
+    all_sims = np.concatenate([best_sims, sims], axis=1)
+    all_idx = np.concatenate([best_idx, idx], axis=1)
+    if all_sims.shape[1] > k:
+        keep = np.argpartition(-all_sims, k - 1, axis=1)[:, :k]
+        all_sims = np.take_along_axis(all_sims, keep, axis=1)
+        all_idx = np.take_along_axis(all_idx, keep, axis=1)
+    return all_sims, all_idx
+
+
+class SimilarityIndex:
+    """
+    Cosine kNN over a fixed set of (id, embedding) rows.
+
+    Indexes with at most `exact_max` rows are searched exactly; larger ones
+    build an IVF quantizer with `nlist` buckets (default 4 * sqrt(n)).
+    """
+
+    def __init__(
+        self,
+        ids: Iterable[int],
+        vectors: "np.ndarray",
+        exact_max: int = 50000,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        seed: int = 0,
+        normalized: bool = False,
+    ):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for similarity search")
+
+        self.ids = np.fromiter(ids, dtype=np.int64)
+        if not len(self.ids):
+            self.vectors = np.empty((0, 0), dtype=np.float32)
+        elif normalized:
+            # Already unit rows (possibly memory-mapped); used as-is, never copied
+            self.vectors = vectors
+        else:
+            self.vectors = _normalize(vectors)
+        self.nprobe = nprobe
+        self._row_of: Dict[int, int] = {node_id: i for i, node_id in enumerate(self.ids.tolist())}
+
+        self.centroids: Optional["np.ndarray"] = None
+        self._list_order: Optional["np.ndarray"] = None
+        self._list_offsets: Optional["np.ndarray"] = None
+        if len(self.ids) > exact_max:
+            self._build_ivf(nlist or int(4 * math.sqrt(len(self.ids))), seed)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def is_exact(self) -> bool:
+        return self.centroids is None
+
+    def rows_for(self, node_ids: Iterable[int]) -> "np.ndarray":
+        """Row positions of the given node IDs; unknown IDs are dropped."""
+        rows = [self._row_of[n] for n in node_ids if n in self._row_of]
+        return np.array(sorted(rows), dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # IVF construction
+    # ------------------------------------------------------------------
+
+    def _assign(self, vectors: "np.ndarray", centroids: "np.ndarray", probes: int = 1) -> "np.ndarray":
+        """Indices of the `probes` most similar centroids for each vector."""
+        block = max(1, BLOCK_CELLS // max(1, len(centroids)))
+        out = np.empty((len(vectors), probes), dtype=np.int64)
+        for start in range(0, len(vectors), block):
+            sims = vectors[start:start + block] @ centroids.T
+            if probes == 1:
+                out[start:start + block, 0] = sims.argmax(axis=1)
+            else:
+                out[start:start + block] = np.argpartition(-sims, probes - 1, axis=1)[:, :probes]
+        return out
+
+    def _build_ivf(self, nlist: int, seed: int, iterations: int = 8) -> None:
+        n = len(self.ids)
+        nlist = max(1, min(nlist, n))
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(n, max(nlist * 40, 10000))
+        sample = self.vectors[rng.choice(n, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = self._assign(sample, centroids)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            filled = counts > 0
+            centroids[filled] = _normalize(sums[filled])
+
+        assign = self._assign(self.vectors, centroids)[:, 0]
+        self.centroids = centroids
+        self._list_order = np.argsort(assign, kind="stable")
+        self._list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=self._list_offsets[1:])
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search_rows(
+        self,
+        rows: "np.ndarray",
+        k: int,
+        threshold: float = -1.0,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        k nearest neighbours of indexed rows, excluding each row itself.
+
+        Returns (neighbor_rows, similarities), both shaped (len(rows), k),
+        sorted by descending similarity. Slots below threshold or without a
+        neighbour hold row -1.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        k = max(1, min(k, len(self.ids) - 1)) if len(self.ids) > 1 else 1
+        best_sims = np.full((len(rows), 0), -np.inf, dtype=np.float32)
+        best_idx = np.full((len(rows), 0), -1, dtype=np.int64)
+
+        if len(rows) and len(self.ids) > 1:
+            if self.is_exact:
+                best_sims, best_idx = self._search_exact(rows, k)
+            else:
+                best_sims, best_idx = self._search_ivf(rows, k)
+
+        if best_sims.shape[1] < k:
+            pad = k - best_sims.shape[1]
+            best_sims = np.pad(best_sims, ((0, 0), (0, pad)), constant_values=-np.inf)
+            best_idx = np.pad(best_idx, ((0, 0), (0, pad)), constant_values=-1)
+
+        order = np.argsort(-best_sims, axis=1, kind="stable")
+        best_sims = np.take_along_axis(best_sims, order, axis=1)
+        best_idx = np.take_along_axis(best_idx, order, axis=1)
+        best_idx[best_sims < threshold] = -1
+        return best_idx, best_sims
+
+    def _search_exact(self, rows: "np.ndarray", k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        n = len(self.ids)
+        block = max(1, BLOCK_CELLS // n)
+        sims_out = np.empty((len(rows), k), dtype=np.float32)
+        idx_out = np.empty((len(rows), k), dtype=np.int64)
+
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            sims = self.vectors[chunk] @ self.vectors.T
+            sims[np.arange(len(chunk)), chunk] = -np.inf
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            sims_out[start:start + len(chunk)] = np.take_along_axis(sims, top, axis=1)
+            idx_out[start:start + len(chunk)] = top
+
+        return sims_out, idx_out
+
+    def _search_ivf(self, rows: "np.ndarray", k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        queries = self.vectors[rows]
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = self._assign(queries, self.centroids, probes=nprobe)
+
+        best_sims = np.full((len(rows), 0), -np.inf, dtype=np.float32)
+        best_idx = np.full((len(rows), 0), -1, dtype=np.int64)
+
+        # Group (query, bucket) probes by bucket so each bucket is scanned once
+        flat_queries = np.repeat(np.arange(len(rows)), nprobe)
+        flat_lists = probes.ravel()
+        order = np.argsort(flat_lists, kind="stable")
+        flat_queries, flat_lists = flat_queries[order], flat_lists[order]
+        bounds = np.flatnonzero(np.diff(flat_lists)) + 1
+
+        for group in np.split(np.arange(len(flat_lists)), bounds):
+            if not len(group):
+                continue
+            bucket = flat_lists[group[0]]
+            members = self._list_order[self._list_offsets[bucket]:self._list_offsets[bucket + 1]]
+            if not len(members):
+                continue
+            q = flat_queries[group]
+            sims = queries[q] @ self.vectors[members].T
+            sims[rows[q][:, None] == members[None, :]] = -np.inf
+
+            if best_sims.shape[1] == 0:
+                best_sims = np.full((len(rows), k), -np.inf, dtype=np.float32)
+                best_idx = np.full((len(rows), k), -1, dtype=np.int64)
+            merged_sims, merged_idx = _merge_top_k(
+                best_sims[q], best_idx[q], sims, np.broadcast_to(members, sims.shape), k
+            )
+            best_sims[q] = merged_sims
+            best_idx[q] = merged_idx
+
+        return best_sims, best_idx
+
+    def search_vector(
+        self,
+        query: "np.ndarray",
+        k: int,
+        allowed: Optional["np.ndarray"] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        k indexed rows most similar to an arbitrary query vector.
+
+        allowed is an optional boolean row mask. When it leaves few rows
+        (or the index is exact) only those rows are scanned; otherwise the
+        IVF buckets closest to the query are. Returns (rows, similarities)
+        sorted by descending similarity, possibly fewer than k.
+        """
+        query = _normalize(np.atleast_2d(query))[0]
+        if not len(self.ids) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if self.is_exact or (allowed is not None and int(allowed.sum()) <= k * 50):
+            candidates = np.flatnonzero(allowed) if allowed is not None else None
+        else:
+            probes = self._assign(query[None, :], self.centroids, probes=min(self.nprobe, len(self.centroids)))[0]
+            candidates = np.concatenate([
+                self._list_order[self._list_offsets[b]:self._list_offsets[b + 1]] for b in probes
+            ])
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+
+        if candidates is None:
+            sims = self.vectors @ query
+            candidates = np.arange(len(self.ids))
+        else:
+            sims = self.vectors[candidates] @ query
+
+        if len(candidates) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            candidates, sims = candidates[top], sims[top]
+        order = np.argsort(-sims, kind="stable")
+        return candidates[order], sims[order]
+
+    def rows_within(self, rows: "np.ndarray", threshold: float) -> "np.ndarray":
+        """
+        Every row with similarity >= threshold to at least one of rows
+        (exact, blocked like _search_exact).
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        found = np.zeros(len(self.ids), dtype=bool)
+        if len(rows) and len(self.ids):
+            block = max(1, BLOCK_CELLS // len(self.ids))
+            for start in range(0, len(rows), block):
+                sims = self.vectors[rows[start:start + block]] @ self.vectors.T
+                found |= (sims >= threshold).any(axis=0)
+        return np.flatnonzero(found)
+
+    def similar_pairs(
+        self,
+        rows: "np.ndarray",
+        k: int,
+        threshold: float,
+    ) -> Dict[Tuple[int, int], float]:
+        """
+        Undirected (min_id, max_id) -> similarity for the top-k neighbours
+        of rows that reach threshold.
+        """
+        neighbor_rows, sims = self.search_rows(rows, k, threshold)
+        pairs: Dict[Tuple[int, int], float] = {}
+        sources = np.repeat(self.ids[rows], neighbor_rows.shape[1])
+        flat_rows = neighbor_rows.ravel()
+        valid = flat_rows >= 0
+        targets = self.ids[flat_rows[valid]]
+        for source, target, sim in zip(sources[valid].tolist(), targets.tolist(), sims.ravel()[valid].tolist()):
+            key = (source, target) if source < target else (target, source)
+            if sim > pairs.get(key, -1.0):
+                pairs[key] = sim
+        return pairs
+
+
+def parse_vector(value: str) -> "np.ndarray":
+    """Parse a pgvector text literal such as '[0.1,0.2]'."""
+    return np.array(value.strip("[]").split(","), dtype=np.float32)
@@ -0,0 +1,74 @@
+"""
+Inverted tag index for SHARED_TAG edge generation.
+
+Maps each tag to the IDs of nodes carrying it. The number of tags two nodes
+share is found by merging the posting lists of one node's tags, so only
+nodes that actually co-occur under some tag are ever compared.
+"""
+
+from collections import Counter
+from typing import List, Optional, Dict, Set, Tuple, Iterable
+
+# Shared-tag count at which an edge reaches full weight
+SHARED_TAG_FULL_WEIGHT = 5
+
+
+def shared_tag_weight(shared_count: int) -> float:
+    return min(shared_count / SHARED_TAG_FULL_WEIGHT, 1.0)
+
+
+class TagIndex:
+    def __init__(self):
+        self.postings: Dict[str, List[int]] = {}
+        self.node_tags: Dict[int, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.node_tags)
+
+    def add(self, node_id: int, tags: Iterable[str]) -> None:
+        tags = tuple(dict.fromkeys(t for t in tags or [] if t))
+        if node_id in self.node_tags:
+            self.remove(node_id)
+        self.node_tags[node_id] = tags
+        for tag in tags:
+            self.postings.setdefault(tag, []).append(node_id)
+
+    def remove(self, node_id: int) -> None:
+        for tag in self.node_tags.pop(node_id, ()):
+            posting = self.postings.get(tag)
+            if posting is not None:
+                posting.remove(node_id)
+                if not posting:
+                    del self.postings[tag]
+
+    def shared_counts(self, node_id: int) -> Counter:
+        """Other node ID -> number of tags shared with node_id."""
+        counts: Counter = Counter()
+        for tag in self.node_tags.get(node_id, ()):
+            counts.update(self.postings[tag])
+        counts.pop(node_id, None)
+        return counts
+
+    def pairs(
+        self,
+        min_shared: int,
+        node_ids: Optional[Set[int]] = None,
+    ) -> Dict[Tuple[int, int], int]:
+        """
+        (min_id, max_id) -> shared tag count for pairs sharing at least
+        min_shared tags. With node_ids, only pairs touching those nodes.
+        """
+        result: Dict[Tuple[int, int], int] = {}
+        sources = self.node_tags.keys() if node_ids is None else [n for n in node_ids if n in self.node_tags]
+
+        for node_id in sources:
+            if len(self.node_tags[node_id]) < min_shared:
+                continue
+            for other, count in self.shared_counts(node_id).items():
+                if count < min_shared:
+                    continue
+                if node_ids is None and other < node_id:
+                    continue  # full scans reach each pair from both ends
+                key = (node_id, other) if node_id < other else (other, node_id)
+                result[key] = count
+        return result
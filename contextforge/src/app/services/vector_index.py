@@ -0,0 +1,632 @@
+"""
+In-process vector index mirroring knowledge_nodes.embedding and
+node_variants.embedding, one per tenant.
+
+With VECTOR_INDEX_ENABLED the vector leg of hybrid search runs here instead
+of through pgvector, so Postgres only serves BM25, filters and row data and
+API replicas scale without adding database load.
+
+Each TenantVectorIndex is a SimilarityIndex (exact, or IVF above
+VECTOR_INDEX_EXACT_MAX rows) over unit float32 rows plus a small overlay of
+rows changed since it was built; the overlay is folded into a new base once
+it grows past a fraction of the base. Indexes are kept current from
+graph_events, whose node and variant payloads carry the embedding. With
+VECTOR_INDEX_DIR set, each base is also written to disk and memory-mapped
+when a worker starts, so only the events since the snapshot are replayed.
+
+Building a base (including IVF k-means), loading and saving snapshots run
+in worker threads. While an index compacts and saves in the background it
+keeps serving its current base and its graph_events wait for the next sync.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Optional, Dict, Any, Iterable, NamedTuple, Set, Tuple, FrozenSet
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.event_cursor import EventCursor
+from app.services.similarity_index import SimilarityIndex, parse_vector, HAS_NUMPY, np
+from app.utils.schema import sql as schema_sql
+
+logger = logging.getLogger(__name__)
+
+# Rows per keyset page when building from Postgres
+LOAD_BATCH_SIZE = 5000
+
+# Overlay rows tolerated before the base is rebuilt (fraction of base size)
+COMPACT_RATIO = 0.1
+COMPACT_MIN_ROWS = 1000
+
+NODE = "node"
+VARIANT = "variant"
+
+
+class VectorHit(NamedTuple):
+    node_id: int
+    rank: int
+    score: float
+    source: str
+
+
+def _unit(vector: "np.ndarray") -> "np.ndarray":
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _payload(payload: Any) -> Dict[str, Any]:
+    if payload is None:
+        return {}
+    if isinstance(payload, (str, bytes)):
+        return json.loads(payload)
+    return dict(payload)
+
+
+class TenantVectorIndex:
+    """Node and variant embeddings of one tenant, filtered by node metadata at search time."""
+
+    def __init__(self, tenant_id: str):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for the vector index")
+        self.tenant_id = tenant_id
+        self.cursor = EventCursor()
+        # Published nodes: node_id -> (node_type, tags). Variants of other
+        # nodes stay indexed but are filtered out.
+        self.nodes: Dict[int, Tuple[str, FrozenSet[str]]] = {}
+        # Every non-deleted node of the tenant, to route variant events
+        self.known_nodes: Set[int] = set()
+        self._version = 0
+        self._masks: Dict[Any, "np.ndarray"] = {}
+
+        self._base: Optional[SimilarityIndex] = None
+        self._base_entities = np.empty(0, dtype=np.int64)
+        self._base_variant = np.empty(0, dtype=bool)
+        self._base_nodes = np.empty(0, dtype=np.int64)
+        self._base_alive = np.empty(0, dtype=bool)
+        self._base_row: Dict[Tuple[str, int], int] = {}
+        self._delta: Dict[Tuple[str, int], Tuple[int, "np.ndarray"]] = {}
+        self._maintenance: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return int(self._base_alive.sum()) + len(self._delta)
+
+    # =========================================================================
+    # Mutation
+    # =========================================================================
+
+    def set_node(self, node_id: int, node_type: str, tags: Iterable[str], published: bool) -> None:
+        self.known_nodes.add(node_id)
+        if published:
+            self.nodes[node_id] = (node_type, frozenset(tags or []))
+        else:
+            self.nodes.pop(node_id, None)
+        self._version += 1
+
+    def forget_node(self, node_id: int) -> None:
+        self.known_nodes.discard(node_id)
+        self.nodes.pop(node_id, None)
+        self.remove(NODE, node_id)
+        self._version += 1
+
+    def upsert(self, kind: str, entity_id: int, node_id: int, vector: "np.ndarray") -> None:
+        self._kill_base_row((kind, entity_id))
+        self._delta[(kind, entity_id)] = (node_id, _unit(vector))
+
+    def remove(self, kind: str, entity_id: int) -> None:
+        self._kill_base_row((kind, entity_id))
+        self._delta.pop((kind, entity_id), None)
+
+    def _kill_base_row(self, key: Tuple[str, int]) -> None:
+        row = self._base_row.pop(key, None)
+        if row is not None:
+            self._base_alive[row] = False
+
+    def apply_event(self, event) -> None:
+        """Apply one graph_events row (edge events are ignored)."""
+        payload = _payload(event.payload)
+        if event.entity_type == "node":
+            node_id = payload.get("id", event.entity_id)
+            if payload.get("tenant_id") != self.tenant_id:
+                if node_id in self.known_nodes:
+                    self.forget_node(node_id)
+                return
+            if event.event_type == "node_deleted" or payload.get("is_deleted", False):
+                self.forget_node(node_id)
+                return
+            self.set_node(
+                node_id,
+                payload.get("node_type"),
+                payload.get("tags") or [],
+                payload.get("status") == "published",
+            )
+            if payload.get("embedding"):
+                self.upsert(NODE, node_id, node_id, parse_vector(payload["embedding"]))
+            else:
+                self.remove(NODE, node_id)
+        elif event.entity_type == "variant":
+            node_id = payload.get("node_id")
+            if node_id not in self.known_nodes:
+                return
+            if event.event_type == "variant_deleted" or not payload.get("embedding"):
+                self.remove(VARIANT, event.entity_id)
+            else:
+                self.upsert(VARIANT, event.entity_id, node_id, parse_vector(payload["embedding"]))
+
+    @property
+    def last_event_id(self) -> int:
+        return self.cursor.last_event_id
+
+    @last_event_id.setter
+    def last_event_id(self, value: int) -> None:
+        self.cursor.reset(value)
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self._delta) > max(COMPACT_MIN_ROWS, COMPACT_RATIO * len(self._base_entities))
+
+    @property
+    def is_compact(self) -> bool:
+        return not self._delta and bool(self._base_alive.all())
+
+    @property
+    def busy(self) -> bool:
+        """Whether a background compaction or save is running (events must wait)."""
+        return self._maintenance is not None and not self._maintenance.done()
+
+    def compact(self) -> None:
+        """Fold the overlay and dropped rows into a new base index."""
+        self._install(*self._compacted(self._base_alive.copy(), dict(self._delta)))
+
+    async def compact_async(self) -> None:
+        """
+        compact() with the new base built in a worker thread.
+
+        Searches keep using the current base until the new one is installed;
+        the caller must not apply events meanwhile.
+        """
+        parts = await asyncio.to_thread(self._compacted, self._base_alive.copy(), dict(self._delta))
+        self._install(*parts)
+
+    def _compacted(
+        self,
+        base_alive: "np.ndarray",
+        delta: Dict[Tuple[str, int], Tuple[int, "np.ndarray"]],
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", SimilarityIndex]:
+        alive = np.flatnonzero(base_alive)
+        delta_keys = list(delta)
+        entities = np.concatenate([
+            self._base_entities[alive],
+            np.array([entity_id for _, entity_id in delta_keys], dtype=np.int64),
+        ])
+        variant = np.concatenate([
+            self._base_variant[alive],
+            np.array([kind == VARIANT for kind, _ in delta_keys], dtype=bool),
+        ])
+        nodes = np.concatenate([
+            self._base_nodes[alive],
+            np.array([delta[key][0] for key in delta_keys], dtype=np.int64),
+        ])
+        parts = []
+        if len(alive):
+            parts.append(np.asarray(self._base.vectors[alive]))
+        if delta_keys:
+            parts.append(np.stack([delta[key][1] for key in delta_keys]))
+        vectors = np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+        return entities, variant, nodes, _new_base(vectors)
+
+    def _set_base(
+        self,
+        entities: "np.ndarray",
+        variant: "np.ndarray",
+        nodes: "np.ndarray",
+        vectors: "np.ndarray",
+    ) -> None:
+        self._install(entities, variant, nodes, _new_base(vectors))
+
+    def _install(
+        self,
+        entities: "np.ndarray",
+        variant: "np.ndarray",
+        nodes: "np.ndarray",
+        base: SimilarityIndex,
+    ) -> None:
+        self._base = base
+        self._base_entities = entities
+        self._base_variant = variant
+        self._base_nodes = nodes
+        self._base_alive = np.ones(len(entities), dtype=bool)
+        self._base_row = {
+            (VARIANT if v else NODE, e): row
+            for row, (e, v) in enumerate(zip(entities.tolist(), variant.tolist()))
+        }
+        self._delta = {}
+        self._masks = {}
+
+    # =========================================================================
+    # Search
+    # =========================================================================
+
+    def _allowed_nodes(
+        self,
+        node_types: Optional[FrozenSet[str]],
+        tags: Optional[FrozenSet[str]],
+    ) -> Set[int]:
+        return {
+            node_id for node_id, (node_type, node_tags) in self.nodes.items()
+            if (node_types is None or node_type in node_types)
+            and (tags is None or node_tags & tags)
+        }
+
+    def _base_mask(self, kind: str, node_types, tags) -> "np.ndarray":
+        key = (self._version, kind, node_types, tags)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) > 64 or any(k[0] != self._version for k in self._masks):
+                self._masks = {}
+            allowed = np.fromiter(self._allowed_nodes(node_types, tags), dtype=np.int64)
+            mask = np.isin(self._base_nodes, allowed) & (self._base_variant == (kind == VARIANT))
+            self._masks[key] = mask
+        return mask & self._base_alive
+
+    def search(
+        self,
+        query: "np.ndarray",
+        k: int,
+        kind: str,
+        node_types: Optional[FrozenSet[str]] = None,
+        tags: Optional[FrozenSet[str]] = None,
+    ) -> List[Tuple[float, int]]:
+        """Top-k (score, node_id) rows of one kind whose node passes the filters."""
+        hits: List[Tuple[float, int]] = []
+        if self._base is not None and len(self._base_entities):
+            rows, sims = self._base.search_vector(query, k, self._base_mask(kind, node_types, tags))
+            hits.extend(zip(sims.tolist(), self._base_nodes[rows].tolist()))
+
+        if self._delta:
+            query = _unit(query)
+            allowed = self._allowed_nodes(node_types, tags)
+            for (row_kind, _), (node_id, vector) in self._delta.items():
+                if row_kind == kind and node_id in allowed:
+                    hits.append((float(vector @ query), node_id))
+
+        hits.sort(key=lambda hit: -hit[0])
+        return hits[:k]
+
+    # =========================================================================
+    # Persistence
+    # =========================================================================
+
+    def save(self, directory: str) -> None:
+        """Write the index as a memory-mappable snapshot (replaces any previous one)."""
+        if not self.is_compact:
+            self.compact()
+        os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(directory) or ".")
+        try:
+            vectors = self._base.vectors if len(self._base_entities) else np.empty((0, 0), dtype=np.float32)
+            np.save(os.path.join(staging, "vectors.npy"), np.ascontiguousarray(vectors, dtype=np.float32))
+            np.savez(
+                os.path.join(staging, "rows.npz"),
+                entities=self._base_entities,
+                variant=self._base_variant,
+                nodes=self._base_nodes,
+            )
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump({
+                    "tenant_id": self.tenant_id,
+                    "last_event_id": self.last_event_id,
+                    "nodes": [[n, t, sorted(tags)] for n, (t, tags) in self.nodes.items()],
+                    "known_nodes": sorted(self.known_nodes),
+                }, f)
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+            os.replace(staging, directory)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(cls, directory: str) -> "TenantVectorIndex":
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        rows = np.load(os.path.join(directory, "rows.npz"))
+        index = cls(meta["tenant_id"])
+        index.last_event_id = meta["last_event_id"]
+        index.nodes = {n: (t, frozenset(tags)) for n, t, tags in meta["nodes"]}
+        index.known_nodes = set(meta["known_nodes"])
+        if len(rows["entities"]):
+            vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        else:
+            vectors = np.empty((0, 0), dtype=np.float32)
+        index._set_base(rows["entities"], rows["variant"], rows["nodes"], vectors)
+        return index
+
+    @classmethod
+    async def build(cls, session: AsyncSession, tenant_id: str) -> "TenantVectorIndex":
+        """Read every embedding of the tenant from Postgres."""
+        index = cls(tenant_id)
+        result = await session.execute(
+            text(schema_sql("""
+                SELECT COALESCE(MAX(id), 0) FROM {schema}.graph_events
+            """))
+        )
+        # Watermark first: events committed while loading are replayed
+        index.last_event_id = result.scalar() or 0
+
+        entities: List[int] = []
+        variant: List[bool] = []
+        nodes: List[int] = []
+        vectors: List["np.ndarray"] = []
+
+        after_id = 0
+        while True:
+            result = await session.execute(
+                text(schema_sql("""
+                    SELECT id, node_type, tags, status, embedding::text AS embedding
+                    FROM {schema}.knowledge_nodes
+                    WHERE tenant_id = :tenant_id
+                      AND is_deleted = FALSE
+                      AND id > :after_id
+                    ORDER BY id
+                    LIMIT :limit
+                """)),
+                {"tenant_id": tenant_id, "after_id": after_id, "limit": LOAD_BATCH_SIZE}
+            )
+            rows = result.fetchall()
+            for row in rows:
+                index.set_node(row.id, row.node_type, row.tags or [], row.status == "published")
+                if row.embedding:
+                    entities.append(row.id)
+                    variant.append(False)
+                    nodes.append(row.id)
+                    vectors.append(parse_vector(row.embedding))
+            if len(rows) < LOAD_BATCH_SIZE:
+                break
+            after_id = rows[-1].id
+
+        after_id = 0
+        while True:
+            result = await session.execute(
+                text(schema_sql("""
+                    SELECT v.id, v.node_id, v.embedding::text AS embedding
+                    FROM {schema}.node_variants v
+                    JOIN {schema}.knowledge_nodes n ON n.id = v.node_id
+                    WHERE n.tenant_id = :tenant_id
+                      AND n.is_deleted = FALSE
+                      AND v.embedding IS NOT NULL
+                      AND v.id > :after_id
+                    ORDER BY v.id
+                    LIMIT :limit
+                """)),
+                {"tenant_id": tenant_id, "after_id": after_id, "limit": LOAD_BATCH_SIZE}
+            )
+            rows = result.fetchall()
+            for row in rows:
+                entities.append(row.id)
+                variant.append(True)
+                nodes.append(row.node_id)
+                vectors.append(parse_vector(row.embedding))
+            if len(rows) < LOAD_BATCH_SIZE:
+                break
+            after_id = rows[-1].id
+
+        # Not shared yet, so the base can be built off the event loop
+        await asyncio.to_thread(
+            index._set_base,
+            np.array(entities, dtype=np.int64),
+            np.array(variant, dtype=bool),
+            np.array(nodes, dtype=np.int64),
+            np.stack([_unit(v) for v in vectors]) if vectors else np.empty((0, 0), dtype=np.float32),
+        )
+        return index
+
+
+def _new_base(vectors: "np.ndarray") -> SimilarityIndex:
+    return SimilarityIndex(
+        range(len(vectors)),
+        vectors,
+        exact_max=settings.VECTOR_INDEX_EXACT_MAX,
+        nprobe=settings.VECTOR_INDEX_NPROBE,
+        normalized=True,
+    )
+
+
+# =============================================================================
+# Process-wide registry
+# =============================================================================
+
+_indexes: Dict[str, TenantVectorIndex] = {}
+_load_locks: Dict[str, asyncio.Lock] = {}
+_sync_lock: Optional[asyncio.Lock] = None
+_last_sync = 0.0
+
+
+def clear_vector_indexes() -> None:
+    global _sync_lock, _last_sync
+    _indexes.clear()
+    _load_locks.clear()
+    _sync_lock = None
+    _last_sync = 0.0
+
+
+def _snapshot_dir(tenant_id: str) -> Optional[str]:
+    if not settings.VECTOR_INDEX_DIR:
+        return None
+    return os.path.join(settings.VECTOR_INDEX_DIR, tenant_id)
+
+
+async def _save(index: TenantVectorIndex) -> None:
+    """Snapshot index to VECTOR_INDEX_DIR; no events may be applied meanwhile."""
+    directory = _snapshot_dir(index.tenant_id)
+    if directory is None:
+        return
+    try:
+        if not index.is_compact:
+            await index.compact_async()
+        await asyncio.to_thread(index.save, directory)
+    except Exception as e:
+        logger.warning(f"Failed to save vector index for {index.tenant_id}: {e}")
+
+
+async def _compact_and_save(index: TenantVectorIndex) -> None:
+    try:
+        await index.compact_async()
+    except Exception as e:
+        logger.warning(f"Failed to compact vector index for {index.tenant_id}: {e}")
+        return
+    await _save(index)
+
+
+async def _get_index(session: AsyncSession, tenant_id: str) -> TenantVectorIndex:
+    index = _indexes.get(tenant_id)
+    if index is not None:
+        return index
+
+    lock = _load_locks.setdefault(tenant_id, asyncio.Lock())
+    async with lock:
+        index = _indexes.get(tenant_id)
+        if index is not None:
+            return index
+
+        started = time.perf_counter()
+        directory = _snapshot_dir(tenant_id)
+        if directory and os.path.isdir(directory):
+            try:
+                index = await asyncio.to_thread(TenantVectorIndex.load, directory)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable vector index snapshot for {tenant_id}: {e}")
+        if index is not None and not await _apply_pending_events(session, [index]):
+            index = None
+        if index is None:
+            index = await TenantVectorIndex.build(session, tenant_id)
+            await _save(index)
+
+        logger.info(
+            f"Vector index for {tenant_id} ready: {len(index)} rows in "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        _indexes[tenant_id] = index
+        return index
+
+
+async def _apply_pending_events(session: AsyncSession, indexes: List[TenantVectorIndex]) -> bool:
+    """
+    Replay graph_events past each index's watermark.
+
+    Returns False, without applying anything, if the backlog exceeds
+    VECTOR_INDEX_MAX_EVENTS and the indexes should be rebuilt instead.
+    Indexes busy compacting are skipped until the next call. An index
+    whose overlay outgrows its base is compacted and saved in the
+    background.
+    """
+    indexes = [index for index in indexes if not index.busy]
+    if not indexes:
+        return True
+    since = min(index.cursor.floor for index in indexes)
+    window = max(index.cursor.window for index in indexes)
+    result = await session.execute(
+        text(schema_sql("""
+            SELECT id, event_type, entity_type, entity_id, payload
+            FROM {schema}.graph_events
+            WHERE id > :since
+              AND entity_type IN ('node', 'variant')
+            ORDER BY id ASC
+            LIMIT :limit
+        """)),
+        {"since": since, "limit": settings.VECTOR_INDEX_MAX_EVENTS + window + 1}
+    )
+    events = result.fetchall()
+
+    backlog = max(sum(1 for event in events if index.cursor.is_new(event.id)) for index in indexes)
+    if backlog > settings.VECTOR_INDEX_MAX_EVENTS:
+        return False
+
+    for index in indexes:
+        applied = []
+        for event in events:
+            if not index.cursor.is_new(event.id):
+                continue
+            try:
+                index.apply_event(event)
+            except Exception as e:
+                logger.warning(f"Failed to apply graph event {event.id} to vector index: {e}")
+            applied.append(event.id)
+        index.cursor.advance(applied)
+        if index.needs_compaction:
+            index._maintenance = asyncio.get_running_loop().create_task(_compact_and_save(index))
+    return True
+
+
+async def sync_vector_indexes(session: AsyncSession, force: bool = False) -> None:
+    """Apply new graph_events to the loaded indexes, at most every VECTOR_INDEX_SYNC_INTERVAL seconds."""
+    global _sync_lock, _last_sync
+    if not force and time.monotonic() - _last_sync < settings.VECTOR_INDEX_SYNC_INTERVAL:
+        return
+    if _sync_lock is None:
+        _sync_lock = asyncio.Lock()
+    async with _sync_lock:
+        if not force and time.monotonic() - _last_sync < settings.VECTOR_INDEX_SYNC_INTERVAL:
+            return
+        indexes = list(_indexes.values())
+        if not await _apply_pending_events(session, indexes):
+            for index in indexes:
+                logger.info(f"Vector index for {index.tenant_id} is too far behind, rebuilding")
+                _indexes.pop(index.tenant_id, None)
+        _last_sync = time.monotonic()
+
+
+async def vector_search(
+    session: AsyncSession,
+    tenant_ids: List[str],
+    query_embedding: List[float],
+    limit: int,
+    node_types: Optional[Iterable[str]] = None,
+    tags: Optional[Iterable[str]] = None,
+    sources: Tuple[str, ...] = (NODE, VARIANT),
+) -> List[VectorHit]:
+    """
+    Vector leg of hybrid search, matching hybrid_search_nodes.
+
+    The top `limit` node rows and top `limit` variant rows across the
+    tenants are ranked together by similarity; each node keeps its best
+    row, so rank may have gaps where a node's weaker row was dropped.
+    """
+    await sync_vector_indexes(session)
+    indexes = [await _get_index(session, tenant_id) for tenant_id in dict.fromkeys(tenant_ids)]
+    query = np.asarray(query_embedding, dtype=np.float32)
+    node_types = frozenset(node_types) if node_types else None
+    tags = frozenset(tags) if tags else None
+
+    combined: List[Tuple[float, int, str]] = []
+    for kind in sources:
+        hits = [
+            (score, node_id, kind)
+            for index in indexes
+            for score, node_id in index.search(query, limit, kind, node_types, tags)
+        ]
+        hits.sort(key=lambda hit: -hit[0])
+        combined.extend(hits[:limit])
+    return rank_vector_rows(combined)
+
+
+def rank_vector_rows(rows: Iterable[Tuple[float, int, str]]) -> List[VectorHit]:
+    """
+    Rank (score, node_id, source) rows by similarity and keep each node's
+    best row, as the dedupe_vector CTE of hybrid_search_nodes does.
+    """
+    results: List[VectorHit] = []
+    seen: Set[int] = set()
+    ranked = sorted(rows, key=lambda row: -row[0])
+    for rank, (score, node_id, source) in enumerate(ranked, start=1):
+        if node_id not in seen:
+            seen.add(node_id)
+            results.append(VectorHit(node_id, rank, score, source))
+    return results
@@ -100,6 +100,7 @@ class PipelineResult(BaseModel):
     staging_id: Optional[int] = None  # If NEW or MERGE
     variant_id: Optional[int] = None  # If ADD_VARIANT
     skipped_reason: Optional[str] = None  # If SKIP
+    duplicate_of: Optional[str] = None  # Ticket ID this one duplicates within the batch
     
     # Metadata
     processed_at: datetime = Field(default_factory=datetime.utcnow)
@@ -121,6 +122,7 @@ class PipelineStats(BaseModel):
     new_items: int = 0
     merged_items: int = 0
     variants_added: int = 0
+    batch_duplicates: int = 0  # Skipped as near-duplicates of another ticket in the batch
     errors: int = 0
     
     # Quality metrics
@@ -148,6 +150,16 @@ class PipelineConfig(BaseModel):
     batch_size: int = 50
     max_similar_items: int = 5
     
+    # Batch concurrency
+    max_workers: int = 8  # Tickets processed concurrently by process_batch
+    llm_concurrency: int = 8  # Inference calls in flight
+    db_concurrency: int = 4  # DB stages in flight (always 1 without a session_factory)
+    stats_interval: int = 100  # Tickets between on_progress snapshots
+    
+    # Intra-batch deduplication (tickets are clustered in windows of batch_size)
+    batch_dedup: bool = True
+    batch_dedup_threshold: float = 0.95  # Cosine similarity to join a cluster
+    
     # Feature flags
     auto_add_variants: bool = True
     require_review_for_merge: bool = True
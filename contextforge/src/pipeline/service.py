@@ -5,11 +5,17 @@ This service orchestrates the process of converting support tickets
 into knowledge base entries.
 """
 
+import asyncio
+import copy
+import inspect
 import json
+import logging
+import math
 import time
 import uuid
+from collections.abc import AsyncIterable, Sized
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Iterable, Tuple, Union
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -35,6 +41,114 @@ from pipeline.prompts import (
     build_merge_decision_prompt,
 )
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _cluster_leaders(
+    vectors: List[List[float]],
+    threshold: float,
+) -> List[Tuple[int, float]]:
+    """
+    Greedy leader clustering by cosine similarity.
+    
+    Rows are visited in order; a row not yet claimed becomes a leader and
+    claims every later unclaimed row at or above threshold. Returns
+    (leader_row, similarity) per row; leaders map to themselves with 1.0.
+    """
+    n = len(vectors)
+    leaders: List[Tuple[int, float]] = [(i, 1.0) for i in range(n)]
+    claimed = [False] * n
+    
+    if HAS_NUMPY:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+        sims = matrix @ matrix.T
+        for i in range(n):
+            if claimed[i]:
+                continue
+            for j in np.flatnonzero(sims[i, i + 1:] >= threshold) + i + 1:
+                if not claimed[j]:
+                    claimed[j] = True
+                    leaders[j] = (i, float(sims[i, j]))
+        return leaders
+    
+    unit = []
+    for vector in vectors:
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        unit.append([x / norm for x in vector])
+    for i in range(n):
+        if claimed[i]:
+            continue
+        for j in range(i + 1, n):
+            if claimed[j]:
+                continue
+            sim = sum(a * b for a, b in zip(unit[i], unit[j]))
+            if sim >= threshold:
+                claimed[j] = True
+                leaders[j] = (i, sim)
+    return leaders
+
+
+class _BatchStats:
+    """Running counters and averages for a process_batch run."""
+    
+    def __init__(self, stats: PipelineStats):
+        self.stats = stats
+        self._sums = {"confidence": 0.0, "similarity": 0.0, "time": 0.0}
+        self._counts = {"confidence": 0, "similarity": 0, "time": 0}
+    
+    def _observe(self, name: str, value: float) -> None:
+        self._sums[name] += value
+        self._counts[name] += 1
+    
+    def add(self, result: PipelineResult) -> None:
+        stats = self.stats
+        stats.processed += 1
+        
+        if result.decision == PipelineDecision.SKIP:
+            stats.skipped += 1
+        elif result.decision == PipelineDecision.NEW:
+            stats.new_items += 1
+        elif result.decision == PipelineDecision.MERGE:
+            stats.merged_items += 1
+        elif result.decision == PipelineDecision.ADD_VARIANT:
+            stats.variants_added += 1
+        
+        if result.duplicate_of:
+            stats.batch_duplicates += 1
+        
+        if result.error:
+            stats.errors += 1
+        
+        if result.analysis and result.analysis.confidence:
+            self._observe("confidence", result.analysis.confidence)
+        
+        if result.top_similarity:
+            self._observe("similarity", result.top_similarity)
+        
+        if result.processing_time_ms:
+            self._observe("time", result.processing_time_ms)
+    
+    def _average(self, name: str) -> float:
+        count = self._counts[name]
+        return self._sums[name] / count if count else 0.0
+    
+    def snapshot(self) -> PipelineStats:
+        self.stats.avg_confidence = self._average("confidence")
+        self.stats.avg_similarity = self._average("similarity")
+        self.stats.avg_processing_time_ms = self._average("time")
+        return self.stats.model_copy()
+
 
 class TicketPipeline:
     """
@@ -50,6 +164,11 @@ class TicketPipeline:
        - >= 0.70: LLM decides MERGE vs NEW
        - < 0.70: NEW
     5. Execute: Create staging item or add variant
+    
+    process_batch runs several tickets at once. LLM calls and DB stages
+    are capped separately by config.llm_concurrency and
+    config.db_concurrency. Without a session_factory all workers share
+    one session, so DB stages run one at a time.
     """
     
     def __init__(
@@ -57,13 +176,26 @@ class TicketPipeline:
         session: AsyncSession,
         embedding_client: EmbeddingClient,
         inference_client: InferenceClient,
-        config: Optional[PipelineConfig] = None
+        config: Optional[PipelineConfig] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
     ):
         self.session = session
         self.embedding_client = embedding_client
         self.inference_client = inference_client
         self.config = config or PipelineConfig()
+        self.session_factory = session_factory
         self.search_service = SearchService(session, embedding_client)
+        
+        db_limit = self.config.db_concurrency if session_factory else 1
+        self._llm_slots = asyncio.Semaphore(max(1, self.config.llm_concurrency))
+        self._db_slots = asyncio.Semaphore(max(1, db_limit))
+    
+    def _with_session(self, session: AsyncSession) -> "TicketPipeline":
+        """Copy of this pipeline bound to another session, sharing its limits."""
+        pipeline = copy.copy(self)
+        pipeline.session = session
+        pipeline.search_service = SearchService(session, self.embedding_client)
+        return pipeline
     
     async def process_ticket(self, ticket: TicketData) -> PipelineResult:
         """Process a single ticket through the pipeline."""
@@ -95,7 +227,8 @@ class TicketPipeline:
                 return result
             
             # Step 3: Find similar items
-            similar_items = await self._find_similar_items(analysis)
+            async with self._db_slots:
+                similar_items = await self._find_similar_items(analysis)
             result.similar_items = similar_items
             
             if similar_items:
@@ -112,17 +245,23 @@ class TicketPipeline:
                 return result
             
             # Step 5: Execute action
-            if decision == PipelineDecision.ADD_VARIANT:
-                result.variant_id = await self._add_variant(
-                    target_id, analysis, ticket
-                )
-            else:
-                # NEW or MERGE - create staging item
-                result.staging_id = await self._create_staging_item(
-                    analysis, ticket, decision, target_id, reasoning
-                )
-            
-            await self.session.commit()
+            async with self._db_slots:
+                try:
+                    if decision == PipelineDecision.ADD_VARIANT:
+                        result.variant_id = await self._add_variant(
+                            target_id, analysis, ticket
+                        )
+                    else:
+                        # NEW or MERGE - create staging item
+                        result.staging_id = await self._create_staging_item(
+                            analysis, ticket, decision, target_id, reasoning
+                        )
+                    
+                    await self.session.commit()
+                except Exception:
+                    # Leave the session usable for the next ticket
+                    await self.session.rollback()
+                    raise
             
         except Exception as e:
             result.error = str(e)
@@ -136,57 +275,149 @@ class TicketPipeline:
     
     async def process_batch(
         self,
-        tickets: List[TicketData],
-        run_id: Optional[str] = None
+        tickets: Union[Iterable[TicketData], AsyncIterable],
+        run_id: Optional[str] = None,
+        on_progress: Optional[Callable[[PipelineStats], Any]] = None,
     ) -> PipelineStats:
-        """Process a batch of tickets."""
+        """
+        Process a batch of tickets with config.max_workers concurrent workers.
+        
+        tickets may be a list or an async iterator. Tickets are pulled
+        through a bounded queue, so a streamed export is never loaded in
+        full. If given, on_progress receives a stats snapshot every
+        config.stats_interval tickets and once more on completion; it is
+        awaited if it returns a coroutine.
+        
+        With config.batch_dedup, tickets are read in windows of
+        config.batch_size and near-duplicates within a window are skipped,
+        so only one ticket per cluster pays for analysis and search.
+        """
         
         stats = PipelineStats(
             run_id=run_id or str(uuid.uuid4()),
             started_at=datetime.utcnow(),
-            total_tickets=len(tickets)
+            total_tickets=len(tickets) if isinstance(tickets, Sized) else 0
         )
+        tracker = _BatchStats(stats)
+        counted = isinstance(tickets, Sized)
+        workers = max(1, self.config.max_workers)
+        interval = max(1, self.config.stats_interval)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
         
-        confidences = []
-        similarities = []
-        processing_times = []
+        window = max(1, self.config.batch_size) if self.config.batch_dedup else 1
         
-        for ticket in tickets:
-            result = await self.process_ticket(ticket)
-            stats.processed += 1
-            
-            if result.decision == PipelineDecision.SKIP:
-                stats.skipped += 1
-            elif result.decision == PipelineDecision.NEW:
-                stats.new_items += 1
-            elif result.decision == PipelineDecision.MERGE:
-                stats.merged_items += 1
-            elif result.decision == PipelineDecision.ADD_VARIANT:
-                stats.variants_added += 1
-            
-            if result.error:
-                stats.errors += 1
+        async def record(result: PipelineResult) -> None:
+            tracker.add(result)
+            if on_progress and stats.processed % interval == 0:
+                await self._emit_progress(on_progress, tracker.snapshot())
+        
+        async def produce() -> None:
+            pending: List[TicketData] = []
             
-            if result.analysis and result.analysis.confidence:
-                confidences.append(result.analysis.confidence)
+            async def flush() -> None:
+                representatives, duplicates = await self._dedupe_window(pending)
+                pending.clear()
+                for result in duplicates:
+                    await record(result)
+                for ticket in representatives:
+                    await queue.put(ticket)
             
-            if result.top_similarity:
-                similarities.append(result.top_similarity)
+            async def put(ticket: TicketData) -> None:
+                if not counted:
+                    stats.total_tickets += 1
+                pending.append(ticket)
+                if len(pending) >= window:
+                    await flush()
             
-            if result.processing_time_ms:
-                processing_times.append(result.processing_time_ms)
+            if isinstance(tickets, AsyncIterable):
+                async for ticket in tickets:
+                    await put(ticket)
+            else:
+                for ticket in tickets:
+                    await put(ticket)
+            await flush()
+            for _ in range(workers):
+                await queue.put(None)
+        
+        async def drain(pipeline: "TicketPipeline") -> None:
+            while (ticket := await queue.get()) is not None:
+                await record(await pipeline.process_ticket(ticket))
+        
+        async def work() -> None:
+            if self.session_factory is None:
+                await drain(self)
+                return
+            async with self.session_factory() as session:
+                await drain(self._with_session(session))
+        
+        async with asyncio.TaskGroup() as group:
+            group.create_task(produce())
+            for _ in range(workers):
+                group.create_task(work())
         
         stats.completed_at = datetime.utcnow()
+        tracker.snapshot()
         
-        if confidences:
-            stats.avg_confidence = sum(confidences) / len(confidences)
-        if similarities:
-            stats.avg_similarity = sum(similarities) / len(similarities)
-        if processing_times:
-            stats.avg_processing_time_ms = sum(processing_times) / len(processing_times)
+        if on_progress:
+            await self._emit_progress(on_progress, stats.model_copy())
         
         return stats
     
+    async def _dedupe_window(
+        self,
+        tickets: List[TicketData],
+    ) -> Tuple[List[TicketData], List[PipelineResult]]:
+        """
+        Cluster near-duplicate tickets in one window.
+        
+        Eligible tickets are embedded with a single embed_batch call and
+        grouped with _cluster_leaders. Returns the tickets still to process
+        (cluster leaders and tickets the filter will reject anyway) and
+        SKIP results for the remaining cluster members. If embedding fails
+        the whole window is processed normally.
+        """
+        eligible = [t for t in tickets if self._passes_filter(t)]
+        if len(eligible) < 2:
+            return list(tickets), []
+        
+        try:
+            vectors = await self.embedding_client.embed_batch(
+                [f"{t.subject}\n{t.body}" for t in eligible]
+            )
+        except Exception as e:
+            logger.warning(f"Batch dedup skipped, failed to embed {len(eligible)} tickets: {e}")
+            return list(tickets), []
+        
+        duplicates: List[PipelineResult] = []
+        duplicate_rows = set()
+        leaders = _cluster_leaders(vectors, self.config.batch_dedup_threshold)
+        for row, (leader, similarity) in enumerate(leaders):
+            if leader == row:
+                continue
+            ticket, original = eligible[row], eligible[leader]
+            duplicate_rows.add(id(ticket))
+            duplicates.append(PipelineResult(
+                ticket_id=ticket.ticket_id,
+                decision=PipelineDecision.SKIP,
+                duplicate_of=original.ticket_id,
+                skipped_reason=(
+                    f"Near duplicate of ticket {original.ticket_id} in batch "
+                    f"(similarity: {similarity:.2%})"
+                ),
+            ))
+        
+        representatives = [t for t in tickets if id(t) not in duplicate_rows]
+        return representatives, duplicates
+    
+    async def _emit_progress(
+        self,
+        on_progress: Callable[[PipelineStats], Any],
+        snapshot: PipelineStats,
+    ) -> None:
+        outcome = on_progress(snapshot)
+        if inspect.isawaitable(outcome):
+            await outcome
+    
     def _passes_filter(self, ticket: TicketData) -> bool:
         """Check if ticket meets minimum criteria for processing."""
         
@@ -221,11 +452,12 @@ class TicketPipeline:
             tags=ticket.tags
         )
         
-        response = await self.inference_client.generate(
-            prompt,
-            system_prompt="You are a knowledge base curator. Output valid JSON only.",
-            temperature=0.3
-        )
+        async with self._llm_slots:
+            response = await self.inference_client.generate(
+                prompt,
+                system_prompt="You are a knowledge base curator. Output valid JSON only.",
+                temperature=0.3
+            )
         
         # Parse LLM response
         try:
@@ -356,11 +588,12 @@ class TicketPipeline:
             similarity=existing.similarity
         )
         
-        response = await self.inference_client.generate(
-            prompt,
-            system_prompt="You are a knowledge base curator. Output valid JSON only.",
-            temperature=0.2
-        )
+        async with self._llm_slots:
+            response = await self.inference_client.generate(
+                prompt,
+                system_prompt="You are a knowledge base curator. Output valid JSON only.",
+                temperature=0.2
+            )
         
         try:
             data = json.loads(response)
@@ -232,3 +232,79 @@ class TestContextServiceSearchWeights:
         
         assert bm25 == 0.0
         assert vector == 1.0
+
+
+class TestContextServiceExpansion:
+
+    @staticmethod
+    def _row(node_id, node_type="faq"):
+        row = MagicMock()
+        row.id = node_id
+        row.tenant_id = "acme"
+        row.node_type = node_type
+        row.title = f"Node {node_id}"
+        row.summary = None
+        row.content = {}
+        row.tags = []
+        row.dataset_name = None
+        return row
+
+    @pytest.mark.asyncio
+    async def test_expansion_fetches_each_frontier_in_one_query(self):
+        """Node details are hydrated with one query per BFS depth."""
+        import networkx as nx
+        from app.services.context_service import ContextService
+        from app.schemas.context import EntryPointResult
+
+        graph = nx.DiGraph()
+        for node_id in range(1, 8):
+            graph.add_node(node_id, node_type="faq")
+        for child in (2, 3, 4):
+            graph.add_edge(1, child, edge_type="related", weight=1.0)
+        graph.add_edge(2, 5, edge_type="related", weight=1.0)
+        graph.add_edge(6, 3, edge_type="related", weight=0.5)
+
+        rows_by_call = [
+            [self._row(2), self._row(3), self._row(4)],
+            [self._row(5), self._row(6)],
+        ]
+        session = AsyncMock()
+        session.execute.side_effect = [
+            MagicMock(fetchall=MagicMock(return_value=rows)) for rows in rows_by_call
+        ]
+
+        service = ContextService(session, MagicMock())
+        service.graph_service._graph = graph
+        service.graph_service.load_graph = AsyncMock(return_value=graph)
+
+        entry = EntryPointResult(
+            id=1, node_type=NodeType.FAQ, title="Entry", content={}, tags=[], score=1.0,
+            match_source="hybrid",
+        )
+        request = ContextRequest(query="test", tenant_ids=["acme"], max_depth=3)
+
+        nodes, max_depth, _ = await service._expand_context([entry], request)
+
+        assert sorted(n.id for n in nodes) == [2, 3, 4, 5, 6]
+        assert max_depth == 2
+        assert session.execute.await_count == 2
+        assert next(n for n in nodes if n.id == 6).path == [1, 3, 6]
+
+        # Cached details are reused without another round-trip
+        assert (await service._get_node_detail(5, ["acme"]))["id"] == 5
+        assert session.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_detail_cache_filters_cached_rows_by_tenant(self):
+        """A node cached for one tenant set is not returned to another."""
+        from app.services.node_detail_cache import NodeDetailCache
+
+        row = self._row(1)
+        session = AsyncMock()
+        session.execute.return_value = MagicMock(fetchall=MagicMock(return_value=[row]))
+        cache = NodeDetailCache(session)
+
+        assert set(await cache.get_many([1], ["acme"])) == {1}
+        assert await cache.get_many([1], ["globex"]) == {}
+        assert await cache.get(1, ["globex", "acme"]) is not None
+        assert session.execute.await_count == 1
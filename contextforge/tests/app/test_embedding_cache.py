@@ -0,0 +1,116 @@
+"""Tests for the two-tier embedding cache."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.clients.embedding_client import EmbeddingClient
+from app.clients.embedding_cache import (
+    CachedEmbeddingClient,
+    EmbeddingCache,
+    embedding_cache_key,
+)
+
+
+class CountingEmbeddingClient(EmbeddingClient):
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def expected_dimension(self) -> int:
+        return 3
+
+    async def embed(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 0.5, 1.0]
+
+    async def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.5, 1.0] for t in texts]
+
+
+def _fake_redis():
+    store = {}
+    redis = MagicMock(is_connected=True)
+    redis.set_many = AsyncMock(side_effect=lambda items, ttl=None: store.update(items))
+    redis.mget = AsyncMock(side_effect=lambda keys: [store.get(k) for k in keys])
+    return redis, store
+
+
+class TestEmbeddingCacheKey:
+
+    def test_key_depends_on_model_dimension_and_text(self):
+        """Changing any part of the key produces a different digest."""
+        base = embedding_cache_key("reset password", "m1", 3)
+
+        assert base == embedding_cache_key("reset password", "m1", 3)
+        assert base != embedding_cache_key("reset password ", "m1", 3)
+        assert base != embedding_cache_key("reset password", "m2", 3)
+        assert base != embedding_cache_key("reset password", "m1", 4)
+
+
+class TestCachedEmbeddingClient:
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_hits_memory(self):
+        """The second embed of the same text makes no provider call."""
+        inner = CountingEmbeddingClient()
+        client = CachedEmbeddingClient(inner, EmbeddingCache(max_entries=10), model="m1")
+
+        first = await client.embed("how do I approve a PO?")
+        second = await client.embed("how do I approve a PO?")
+
+        assert first == second
+        assert len(inner.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_only_sends_distinct_misses(self):
+        """embed_batch forwards each uncached text once and keeps input order."""
+        inner = CountingEmbeddingClient()
+        client = CachedEmbeddingClient(inner, EmbeddingCache(max_entries=10), model="m1")
+        await client.embed("a")
+
+        result = await client.embed_batch(["bb", "a", "ccc", "bb"])
+
+        assert inner.calls == [["a"], ["bb", "ccc"]]
+        assert [v[0] for v in result] == [2.0, 1.0, 3.0, 2.0]
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_workers(self):
+        """A second process-local cache is filled from Redis."""
+        redis, store = _fake_redis()
+        inner = CountingEmbeddingClient()
+        worker_a = CachedEmbeddingClient(inner, EmbeddingCache(redis_client=redis), model="m1")
+        worker_b = CachedEmbeddingClient(inner, EmbeddingCache(redis_client=redis), model="m1")
+
+        await worker_a.embed("invoice status")
+        result = await worker_b.embed("invoice status")
+
+        assert len(inner.calls) == 1
+        assert isinstance(next(iter(store.values())), bytes)
+        assert result == [14.0, 0.5, 1.0]
+        assert worker_b.cache.redis_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_misses_written_to_redis_in_one_call(self):
+        """Fresh embeddings are stored in memory as float32 and sent to Redis together."""
+        redis, store = _fake_redis()
+        cache = EmbeddingCache(redis_client=redis)
+        client = CachedEmbeddingClient(CountingEmbeddingClient(), cache, model="m1")
+
+        await client.embed_batch(["a", "bb", "ccc"])
+
+        redis.set_many.assert_awaited_once()
+        assert len(store) == 3
+        assert all(v.typecode == "f" for v in cache._entries.values())
+        assert await client.embed("bb") == [2.0, 0.5, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_oldest(self):
+        """The in-process tier keeps at most max_entries vectors."""
+        cache = EmbeddingCache(max_entries=2)
+        await cache.set_many({"a": [1.0], "b": [2.0]})
+        await cache.get_many(["a"])
+        await cache.set_many({"c": [3.0]})
+
+        assert set(await cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
@@ -0,0 +1,440 @@
+"""Tests for GraphService live graph, graph_events delta sync and traversal."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import networkx as nx
+
+from app.services import graph_service as graph_module
+from app.services.graph_csr import CSRGraph
+from app.services.graph_service import (
+    GraphService,
+    LiveGraph,
+    clear_live_graphs,
+    get_live_graphs,
+    graph_registry_stats,
+    reset_graph_registry_stats,
+)
+from app.services.graph_sync_service import GraphSyncService
+
+
+def _node(node_id, tenant_id="acme", status="published", is_deleted=False, graph_version=0):
+    return {
+        "id": node_id,
+        "tenant_id": tenant_id,
+        "node_type": "faq",
+        "title": f"Node {node_id}",
+        "tags": [],
+        "status": status,
+        "is_deleted": is_deleted,
+        "graph_version": graph_version,
+    }
+
+
+def _edge(edge_id, source_id, target_id, edge_type="related"):
+    return {
+        "id": edge_id,
+        "source_id": source_id,
+        "target_id": target_id,
+        "edge_type": edge_type,
+        "weight": 1.0,
+        "is_auto_generated": False,
+    }
+
+
+def _event(event_id, event_type, payload):
+    entity_type = event_type.split("_")[0]
+    return SimpleNamespace(
+        id=event_id,
+        event_type=event_type,
+        entity_type=entity_type,
+        entity_id=payload["id"],
+        payload=payload,
+    )
+
+
+def _result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    return result
+
+
+@pytest.fixture(autouse=True)
+def reset_live_graphs():
+    clear_live_graphs()
+    reset_graph_registry_stats()
+    yield
+    clear_live_graphs()
+
+
+@pytest.fixture
+def live():
+    graph = nx.DiGraph()
+    GraphService._add_node(graph, _node(1))
+    GraphService._add_node(graph, _node(2))
+    GraphService._add_edge(graph, _edge(10, 1, 2))
+    return LiveGraph(graph=graph, tenant_ids=frozenset(["acme"]), last_event_id=100)
+
+
+class TestApplyPendingEvents:
+
+    @pytest.mark.asyncio
+    async def test_node_created_is_added_with_existing_edges(self, live):
+        """New nodes are added and their edges attached from Postgres."""
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _result([_event(101, "node_created", _node(3))]),
+            _result([SimpleNamespace(_mapping=_edge(11, 3, 1), source_id=3, target_id=1)]),
+        ]
+        service = GraphService(session)
+
+        applied = await service.apply_pending_events(live)
+
+        assert applied == 1
+        assert 3 in live.graph
+        assert live.graph.has_edge(3, 1)
+        assert live.last_event_id == 101
+
+    @pytest.mark.asyncio
+    async def test_node_deleted_removes_node_and_edges(self, live):
+        """Deleted nodes disappear together with their edges."""
+        session = AsyncMock()
+        session.execute.return_value = _result([
+            _event(101, "node_deleted", _node(2, is_deleted=True)),
+        ])
+        service = GraphService(session)
+
+        await service.apply_pending_events(live)
+
+        assert 2 not in live.graph
+        assert live.graph.number_of_edges() == 0
+
+    @pytest.mark.asyncio
+    async def test_unpublished_or_foreign_tenant_nodes_are_removed(self, live):
+        """Nodes leaving the published state or tenant set are dropped."""
+        session = AsyncMock()
+        session.execute.return_value = _result([
+            _event(101, "node_updated", _node(1, status="draft")),
+            _event(102, "node_updated", _node(2, tenant_id="other")),
+        ])
+        service = GraphService(session)
+
+        await service.apply_pending_events(live)
+
+        assert live.graph.number_of_nodes() == 0
+
+    @pytest.mark.asyncio
+    async def test_stale_node_update_is_ignored(self, live):
+        """Updates older than the stored graph_version are skipped."""
+        live.graph.nodes[1]["graph_version"] = 5
+        stale = _node(1, graph_version=4)
+        stale["title"] = "Stale"
+        session = AsyncMock()
+        session.execute.return_value = _result([_event(101, "node_updated", stale)])
+        service = GraphService(session)
+
+        await service.apply_pending_events(live)
+
+        assert live.graph.nodes[1]["title"] == "Node 1"
+
+    @pytest.mark.asyncio
+    async def test_edge_events(self, live):
+        """Edge events add and remove edges between known nodes."""
+        session = AsyncMock()
+        session.execute.return_value = _result([
+            _event(101, "edge_deleted", _edge(10, 1, 2)),
+            _event(102, "edge_created", _edge(12, 2, 1)),
+            _event(103, "edge_created", _edge(13, 1, 99)),
+        ])
+        service = GraphService(session)
+
+        await service.apply_pending_events(live)
+
+        assert not live.graph.has_edge(1, 2)
+        assert live.graph.has_edge(2, 1)
+        assert 99 not in live.graph
+
+    @pytest.mark.asyncio
+    async def test_late_committed_event_below_watermark_is_applied(self, live):
+        """Events re-read from the trailing window are applied once, even below the watermark."""
+        session = AsyncMock()
+        session.execute.side_effect = [
+            _result([_event(102, "edge_created", _edge(12, 2, 1))]),
+            _result([
+                _event(101, "edge_deleted", _edge(10, 1, 2)),
+                _event(102, "edge_created", _edge(12, 2, 1)),
+            ]),
+        ]
+        service = GraphService(session)
+
+        await service.apply_pending_events(live)
+        applied = await service.apply_pending_events(live)
+
+        assert applied == 1
+        assert not live.graph.has_edge(1, 2)
+        assert live.graph.has_edge(2, 1)
+        assert live.last_event_id == 102
+        assert session.execute.await_args.args[1]["floor"] < 101
+
+    @pytest.mark.asyncio
+    async def test_large_backlog_requests_rebuild(self, live, monkeypatch):
+        """Backlogs beyond GRAPH_DELTA_MAX_EVENTS return None."""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "GRAPH_DELTA_MAX_EVENTS", 1)
+        session = AsyncMock()
+        session.execute.return_value = _result([
+            _event(101, "node_created", _node(3)),
+            _event(102, "node_created", _node(4)),
+        ])
+        service = GraphService(session)
+
+        assert await service.apply_pending_events(live) is None
+        assert live.last_event_id == 100
+
+
+class TestLoadGraph:
+
+    @pytest.mark.asyncio
+    async def test_live_graph_shared_across_services(self, live):
+        """A second request reuses the live graph and only reads deltas."""
+        from app.services import graph_service as module
+        module._live_graphs[GraphService(None)._cache_key(["acme"])] = live
+
+        session = AsyncMock()
+        session.execute.return_value = _result([])
+        service = GraphService(session)
+
+        graph = await service.load_graph(["acme"])
+
+        assert graph is live.graph
+        assert session.execute.await_count == 1
+
+
+def _fake_build(builds, delay=0.0, nodes=1):
+    async def build(self, tenant_ids, force_reload=False):
+        builds.append(sorted(tenant_ids))
+        await asyncio.sleep(delay)
+        graph = nx.DiGraph(last_event_id=7)
+        graph.add_nodes_from(range(nodes))
+        self._graph = graph
+        return graph
+    return build
+
+
+class TestGraphRegistry:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_loads_build_once(self, monkeypatch):
+        """Requests racing on a cold tenant set share one build."""
+        builds = []
+        monkeypatch.setattr(GraphService, "_build_graph", _fake_build(builds, delay=0.05))
+        services = [GraphService(AsyncMock()) for _ in range(5)]
+
+        graphs = await asyncio.gather(*(s.load_graph(["acme"]) for s in services))
+
+        assert builds == [["acme"]]
+        assert all(g is graphs[0] for g in graphs)
+        stats = graph_registry_stats()
+        assert stats["builds"] == 1
+        assert stats["coalesced"] == 4
+        assert len(get_live_graphs()[0].users) == 5
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_skips_graphs_in_use(self, monkeypatch):
+        """Idle graphs are evicted least recently used first."""
+        monkeypatch.setattr(GraphService, "_build_graph", _fake_build([], nodes=10))
+        monkeypatch.setattr(graph_module.settings, "GRAPH_REGISTRY_MAX_ELEMENTS", 25)
+        in_use = GraphService(AsyncMock())
+        await in_use.load_graph(["a"])
+        idle = GraphService(AsyncMock())
+        await idle.load_graph(["b"])
+        idle.release()
+
+        await GraphService(AsyncMock()).load_graph(["c"])
+
+        assert sorted(sorted(g.tenant_ids)[0] for g in get_live_graphs()) == ["a", "c"]
+        assert graph_registry_stats()["evictions"] == 1
+
+        in_use.release()
+        await GraphService(AsyncMock()).load_graph(["d"])
+
+        assert [sorted(g.tenant_ids)[0] for g in get_live_graphs()] == ["c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_hit_rate_and_build_time(self, monkeypatch):
+        """Warm loads count as hits; cold loads record build time."""
+        monkeypatch.setattr(GraphService, "_build_graph", _fake_build([]))
+        session = AsyncMock()
+        session.execute.return_value = _result([])
+
+        for _ in range(4):
+            await GraphService(session).load_graph(["acme"])
+
+        stats = graph_registry_stats()
+        assert (stats["hits"], stats["misses"]) == (3, 1)
+        assert stats["hit_rate"] == pytest.approx(0.75)
+        assert stats["avg_build_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_refresh_rebuilds_graphs_before_they_expire(self, monkeypatch, live):
+        """Background refresh replaces nearly expired graphs and syncs the rest."""
+        builds = []
+        monkeypatch.setattr(GraphService, "_build_graph", _fake_build(builds))
+        old = LiveGraph(
+            graph=nx.DiGraph(),
+            tenant_ids=frozenset(["old"]),
+            built_at=datetime.utcnow() - timedelta(seconds=graph_module.settings.GRAPH_LIVE_MAX_AGE - 1),
+        )
+        graph_module._live_graphs[GraphService(None)._cache_key(["acme"])] = live
+        graph_module._live_graphs[GraphService(None)._cache_key(["old"])] = old
+        session = AsyncMock()
+        session.execute.return_value = _result([])
+
+        stats = await GraphSyncService(session).refresh_live_graphs()
+
+        assert stats == {"synced": 1, "rebuilt": 1}
+        assert builds == [["old"]]
+        rebuilt = graph_module._live_graphs[GraphService(None)._cache_key(["old"])]
+        assert rebuilt is not old and not rebuilt.users
+
+
+class TestNeighborCandidates:
+
+    @pytest.fixture
+    def graph(self):
+        graph = nx.DiGraph()
+        for node_id, node_type in [(1, "faq"), (2, "concept"), (3, "faq"), (4, "entity"), (5, "faq")]:
+            graph.add_node(node_id, node_type=node_type)
+        graph.add_edge(1, 2, edge_id=10, edge_type="related", weight=0.5)
+        graph.add_edge(3, 1, edge_id=11, edge_type="parent", weight=None)
+        graph.add_edge(2, 1, edge_id=12, edge_type="parent", weight=0.9)
+        graph.add_edge(2, 4, edge_id=13, edge_type="related", weight=1.0)
+        graph.add_edge(4, 5, edge_id=14, edge_type="shared_tag", weight=0.4)
+        return graph
+
+    def _service(self, graph, monkeypatch, csr_enabled):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "GRAPH_CSR_ENABLED", csr_enabled)
+        service = GraphService(None)
+        service._graph = graph
+        if csr_enabled:
+            service._csr = CSRGraph.from_networkx(graph)
+        return service
+
+    @pytest.mark.parametrize("csr_enabled", [True, False])
+    def test_prefers_outgoing_edge(self, graph, monkeypatch, csr_enabled):
+        """Neighbors reached both ways report the parent -> neighbor edge."""
+        service = self._service(graph, monkeypatch, csr_enabled)
+
+        candidates = service.neighbor_candidates({1}, {1})
+
+        assert sorted(candidates) == [(2, 1, "related", 0.5), (3, 1, "parent", 1.0)]
+
+    @pytest.mark.parametrize("csr_enabled", [True, False])
+    def test_filters(self, graph, monkeypatch, csr_enabled):
+        """Visited, node type and edge type filters are applied."""
+        service = self._service(graph, monkeypatch, csr_enabled)
+
+        assert service.neighbor_candidates({2}, {1, 2}) == [(4, 2, "related", 1.0)]
+        assert service.neighbor_candidates({1}, {1}, node_types={"faq"}) == [(3, 1, "parent", 1.0)]
+        assert service.neighbor_candidates({4}, {4}, edge_types={"shared_tag"}) == [
+            (5, 4, "shared_tag", pytest.approx(0.4)),
+        ]
+        assert service.neighbor_candidates({99}, set()) == []
+
+    def test_csr_matches_networkx_bfs(self, graph, monkeypatch):
+        """Multi-hop expansion gives the same nodes on both backends."""
+        results = []
+        for csr_enabled in (True, False):
+            service = self._service(graph, monkeypatch, csr_enabled)
+            visited, frontier, reached = {3}, {3}, []
+            while frontier:
+                frontier = {c[0] for c in service.neighbor_candidates(frontier, visited)}
+                visited |= frontier
+                reached.append(sorted(frontier))
+            results.append(reached)
+
+        assert results[0] == results[1] == [[1], [2], [4], [5], []]
+
+    def test_csr_of_empty_graph(self):
+        csr = CSRGraph.from_networkx(nx.DiGraph())
+
+        assert csr.node_count == 0
+        assert csr.neighbor_candidates({1}, set()) == []
+
+    @pytest.mark.asyncio
+    async def test_live_csr_built_off_request_path(self, graph, monkeypatch):
+        """Traversal uses networkx until the background CSR build is swapped in."""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "GRAPH_CSR_ENABLED", True)
+        monkeypatch.setattr(settings, "GRAPH_CSR_REBUILD_INTERVAL", 0)
+        live = LiveGraph(graph=graph, tenant_ids=frozenset(["acme"]))
+        service = GraphService(None)
+        service._use_live_graph(live)
+
+        assert service._get_csr() is None
+        await live.csr_task
+        assert service._get_csr() is live.csr
+        assert service.neighbor_candidates({2}, {1, 2}) == [(4, 2, "related", 1.0)]
+
+        live.revision += 1
+        assert service._get_csr() is None
+        await live.csr_task
+        assert service._get_csr().version == live.revision
+
+
+class TestGraphSnapshot:
+
+    @pytest.fixture
+    def graph(self):
+        graph = nx.DiGraph(last_event_id=42)
+        GraphService._add_node(graph, {**_node(1), "tags": ["po", "approval"], "dataset_name": "orders"})
+        GraphService._add_node(graph, {**_node(2, tenant_id="shared"), "title": "Bestellung – Größe"})
+        GraphService._add_node(graph, {**_node(3), "field_path": "orders.status", "graph_version": 7})
+        GraphService._add_edge(graph, _edge(10, 1, 2))
+        GraphService._add_edge(graph, {**_edge(11, 3, 1, "parent"), "weight": None, "is_auto_generated": True})
+        return graph
+
+    @pytest.mark.parametrize("compress", [True, False])
+    def test_round_trip(self, graph, compress):
+        """Snapshots restore nodes, edges, attributes and graph version."""
+        from app.services.graph_snapshot import encode_graph, decode_graph
+
+        restored = decode_graph(encode_graph(graph, compress=compress))
+
+        assert restored.graph["last_event_id"] == 42
+        assert dict(restored.nodes(data=True)) == dict(graph.nodes(data=True))
+        assert list(restored.edges(data=True)) == list(graph.edges(data=True))
+
+    def test_rejects_foreign_data(self, graph):
+        """Unknown magic or format versions are rejected, never executed."""
+        import struct
+        from app.services.graph_snapshot import SnapshotError, encode_graph, decode_graph
+
+        with pytest.raises(SnapshotError):
+            decode_graph(b'{"nodes": []}')
+
+        data = bytearray(encode_graph(graph))
+        struct.pack_into("<H", data, 4, 99)
+        with pytest.raises(SnapshotError):
+            decode_graph(bytes(data))
+
+    @pytest.mark.asyncio
+    async def test_cache_round_trip_through_redis(self, graph):
+        """GraphService writes and reads the binary snapshot via Redis."""
+        store = {}
+        redis = MagicMock(is_connected=True)
+        redis.set = AsyncMock(side_effect=lambda key, value, ttl=None: store.__setitem__(key, value))
+        redis.get = AsyncMock(side_effect=lambda key: store.get(key))
+        service = GraphService(None, redis_client=redis)
+
+        await service._set_cached_graph(["acme", "shared"], graph)
+        cached = await service._get_cached_graph(["shared", "acme"])
+
+        assert isinstance(next(iter(store.values())), bytes)
+        assert cached.graph["last_event_id"] == 42
+        assert cached.has_edge(3, 1)
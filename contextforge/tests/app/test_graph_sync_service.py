@@ -0,0 +1,358 @@
+"""Tests for implicit edge generation in GraphSyncService."""
+
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.services.graph_sync_service import GraphSyncService
+from app.services.similarity_index import SimilarityIndex
+from app.services.tag_index import TagIndex
+
+
+def _vec(*values):
+    return "[" + ",".join(str(v) for v in values) + "]"
+
+
+class FakeSession:
+    """
+    Answers the queries issued by edge generation from in-memory tables.
+
+    Nodes and events belong to tenant "acme" unless they set tenant_id.
+    """
+
+    def __init__(self, nodes, edges=None, events=None, state=None):
+        self.nodes = nodes
+        self.edges = dict(edges or {})
+        self.events = events or []
+        self.state = dict(state or {})
+        self.next_edge_id = 1000
+        self.statements = []
+
+    def _result(self, rows=None, scalar=None, one=None):
+        result = MagicMock()
+        result.fetchall.return_value = rows or []
+        result.scalar.return_value = scalar
+        result.fetchone.return_value = one
+        return result
+
+    async def execute(self, statement, params=None):
+        query = " ".join(str(statement).split())
+        params = params or {}
+        self.statements.append(query)
+
+        if "FROM" in query and "system_settings" in query and query.startswith("SELECT"):
+            state = self.state.get(params["category"])
+            return self._result(one=SimpleNamespace(settings=state) if state else None)
+        if query.startswith("INSERT INTO") and "system_settings" in query:
+            self.state[params["category"]] = json.loads(params["settings"])
+            return self._result()
+        if "MAX(id)" in query:
+            return self._result(scalar=max([e.id for e in self.events], default=0))
+        if "MIN(id)" in query:
+            return self._result(scalar=min([e.id for e in self.events], default=0))
+        if "FROM" in query and "graph_events" in query:
+            return self._result([
+                SimpleNamespace(id=e.id, entity_id=e.entity_id)
+                for e in sorted(self.events, key=lambda e: e.id)
+                if e.id > params["floor"] and getattr(e, "tenant_id", "acme") in params["tenant_ids"]
+            ])
+        if query.startswith("SELECT id, tags"):
+            if "node_tags" in params:
+                wanted = set(params["node_tags"])
+                rows = [n for n in self.nodes if n["id"] != params["node_id"] and wanted & set(n["tags"])]
+            else:
+                rows = [
+                    n for n in self.nodes
+                    if n["id"] > params["after_id"] and len(n["tags"]) >= params["min_tags"]
+                    and n.get("tenant_id", "acme") in params["tenant_ids"]
+                ][:params["limit"]]
+            return self._result([SimpleNamespace(id=n["id"], tags=n["tags"]) for n in rows])
+        if "embedding::text" in query:
+            rows = [
+                SimpleNamespace(id=n["id"], embedding=n["embedding"])
+                for n in self.nodes
+                if n["id"] > params["after_id"] and n.get("published", True)
+                and n.get("tenant_id", "acme") in params["tenant_ids"]
+            ]
+            return self._result(rows[:params["limit"]])
+        if query.startswith("SELECT e.id"):
+            scope = set(params.get("node_ids") or [])
+            tenants = {n["id"]: n.get("tenant_id", "acme") for n in self.nodes}
+            return self._result([
+                SimpleNamespace(id=edge_id, source_id=s, target_id=t, weight=w)
+                for (s, t), (edge_id, w) in self.edges.items()
+                if (not scope or s in scope or t in scope)
+                and tenants.get(s) in params["tenant_ids"] and tenants.get(t) in params["tenant_ids"]
+            ])
+        if query.startswith("DELETE FROM"):
+            ids = set(params["ids"])
+            self.edges = {k: v for k, v in self.edges.items() if v[0] not in ids}
+            return self._result()
+        if query.startswith("UPDATE"):
+            weights = dict(zip(params["ids"], params["weights"]))
+            self.edges = {k: (i, weights.get(i, w)) for k, (i, w) in self.edges.items()}
+            return self._result()
+        if query.startswith("INSERT INTO") and "knowledge_edges" in query:
+            for s, t, w in zip(params["sources"], params["targets"], params["weights"]):
+                self.next_edge_id += 1
+                self.edges[(s, t)] = (self.next_edge_id, w)
+            return self._result()
+        raise AssertionError(f"unexpected query: {query}")
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def nodes():
+    return [
+        {"id": 1, "embedding": _vec(1, 0, 0)},
+        {"id": 2, "embedding": _vec(0.99, 0.1, 0)},
+        {"id": 3, "embedding": _vec(0, 1, 0)},
+        {"id": 4, "embedding": _vec(0, 0.98, 0.1)},
+        {"id": 5, "embedding": _vec(0, 0, 1)},
+    ]
+
+
+class TestSimilarityIndex:
+
+    def test_exact_top_k_excludes_self(self):
+        """Each row's nearest neighbour is found and never itself."""
+        vectors = np.array([[1, 0], [0.9, 0.1], [0, 1], [0.1, 0.9]], dtype=np.float32)
+        index = SimilarityIndex([10, 20, 30, 40], vectors)
+
+        neighbors, sims = index.search_rows(np.arange(4), k=1)
+
+        assert index.ids[neighbors[:, 0]].tolist() == [20, 10, 40, 30]
+        assert (sims[:, 0] < 1.0001).all()
+
+    def test_ivf_matches_exact_on_clustered_data(self):
+        """The IVF index finds the same neighbours as exact search."""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(20, 16))
+        vectors = centers[rng.integers(0, 20, 2000)] + 0.05 * rng.normal(size=(2000, 16))
+        ids = list(range(2000))
+        exact = SimilarityIndex(ids, vectors)
+        ivf = SimilarityIndex(ids, vectors, exact_max=100, nprobe=16)
+        rows = np.arange(0, 2000, 50)
+
+        expected, _ = exact.search_rows(rows, k=5)
+        found, _ = ivf.search_rows(rows, k=5)
+
+        assert not ivf.is_exact
+        overlap = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(expected, found)])
+        assert overlap > 0.95
+
+    def test_similar_pairs_are_undirected_and_thresholded(self):
+        """Pairs are keyed (min_id, max_id) and filtered by threshold."""
+        vectors = np.array([[1, 0], [0.95, 0.05], [0, 1]], dtype=np.float32)
+        index = SimilarityIndex([7, 3, 9], vectors)
+
+        pairs = index.similar_pairs(np.arange(3), k=2, threshold=0.9)
+
+        assert list(pairs) == [(3, 7)]
+
+
+class TestGenerateSimilarEdges:
+
+    @pytest.mark.asyncio
+    async def test_full_run_creates_top_k_pairs(self, nodes):
+        """The first run links every node to neighbours above threshold."""
+        session = FakeSession(nodes, events=[SimpleNamespace(id=50, entity_id=1)])
+        service = GraphSyncService(session, embedding_client=MagicMock())
+
+        created = await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+
+        assert created == 2
+        assert set(session.edges) == {(1, 2), (3, 4)}
+        assert session.state["similar_edges:acme"]["last_event_id"] == 50
+
+    @pytest.mark.asyncio
+    async def test_incremental_run_only_touches_changed_nodes(self, nodes):
+        """Later runs re-query changed nodes and diff their edges in place."""
+        session = FakeSession(nodes, events=[SimpleNamespace(id=50, entity_id=1)])
+        service = GraphSyncService(session, embedding_client=MagicMock())
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+        untouched_id = session.edges[(3, 4)][0]
+
+        nodes[4]["embedding"] = _vec(0.98, 0.05, 0)  # node 5 now resembles 1
+        session.events.append(SimpleNamespace(id=51, entity_id=5))
+        session.statements.clear()
+
+        created = await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+
+        assert created == 2
+        assert set(session.edges) == {(1, 2), (3, 4), (1, 5), (2, 5)}
+        assert session.edges[(3, 4)][0] == untouched_id
+        assert not any(q.startswith("DELETE") for q in session.statements)
+
+    @pytest.mark.asyncio
+    async def test_incremental_keeps_edges_owned_by_unchanged_nodes(self):
+        """An edge in an unchanged node's top_k survives a change to its other end."""
+        nodes = [
+            {"id": 1, "embedding": _vec(1, 0, 0)},
+            {"id": 2, "embedding": _vec(0.99, 0.1, 0)},
+            {"id": 3, "embedding": _vec(0.9, 0.3, 0)},  # top-1 is 2, but 2's top-1 is 1
+        ]
+        session = FakeSession(nodes, events=[SimpleNamespace(id=50, entity_id=1)])
+        service = GraphSyncService(session, embedding_client=MagicMock())
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9, top_k=1)
+        assert set(session.edges) == {(1, 2), (2, 3)}
+
+        session.events.append(SimpleNamespace(id=51, entity_id=2))
+        session.statements.clear()
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9, top_k=1)
+
+        assert set(session.edges) == {(1, 2), (2, 3)}
+        assert not any(q.startswith("DELETE") for q in session.statements)
+
+    @pytest.mark.asyncio
+    async def test_incremental_runs_match_a_full_run(self):
+        """Random moves applied incrementally give the same edges as a rebuild."""
+        rng = np.random.default_rng(7)
+        nodes = [{"id": i, "embedding": _vec(*rng.normal(size=4))} for i in range(1, 41)]
+        session = FakeSession(nodes, events=[SimpleNamespace(id=50, entity_id=1)])
+        service = GraphSyncService(session, embedding_client=MagicMock())
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.3, top_k=3)
+
+        for event_id in range(51, 56):
+            node = nodes[int(rng.integers(0, len(nodes)))]
+            node["embedding"] = _vec(*rng.normal(size=4))
+            session.events.append(SimpleNamespace(id=event_id, entity_id=node["id"]))
+            await service.generate_similar_edges(["acme"], similarity_threshold=0.3, top_k=3)
+
+            rebuilt = FakeSession(nodes)
+            await GraphSyncService(rebuilt, embedding_client=MagicMock()).generate_similar_edges(
+                ["acme"], similarity_threshold=0.3, top_k=3, full=True
+            )
+            assert set(session.edges) == set(rebuilt.edges)
+
+    @pytest.mark.asyncio
+    async def test_pairs_across_requested_tenants_only(self, nodes):
+        """Nodes pair across the requested tenants; edges to other tenants are kept."""
+        nodes[1]["tenant_id"] = "shared"
+        nodes[3]["tenant_id"] = "globex"
+        session = FakeSession(nodes, edges={(3, 4): (7, 0.98)})
+        service = GraphSyncService(session, embedding_client=MagicMock())
+
+        await service.generate_similar_edges(["acme", "shared"], similarity_threshold=0.9)
+
+        assert set(session.edges) == {(1, 2), (3, 4)}
+        assert "similar_edges:acme,shared" in session.state
+
+    @pytest.mark.asyncio
+    async def test_late_committed_event_below_watermark_is_picked_up(self, nodes):
+        """A node event with an id below the last run's watermark is not skipped."""
+        session = FakeSession(nodes, events=[SimpleNamespace(id=50, entity_id=1)])
+        service = GraphSyncService(session, embedding_client=MagicMock())
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+
+        nodes[4]["embedding"] = _vec(0.98, 0.05, 0)
+        session.events.append(SimpleNamespace(id=49, entity_id=5))
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+
+        assert set(session.edges) == {(1, 2), (3, 4), (1, 5), (2, 5)}
+
+    @pytest.mark.asyncio
+    async def test_unpublished_node_loses_edges(self, nodes):
+        """Edges of nodes that left the index are deleted."""
+        session = FakeSession(nodes, events=[SimpleNamespace(id=50, entity_id=1)])
+        service = GraphSyncService(session, embedding_client=MagicMock())
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+
+        nodes[1]["published"] = False
+        session.events.append(SimpleNamespace(id=51, entity_id=2))
+
+        await service.generate_similar_edges(["acme"], similarity_threshold=0.9)
+
+        assert set(session.edges) == {(3, 4)}
+
+
+@pytest.fixture
+def tagged_nodes():
+    return [
+        {"id": 1, "tags": ["po", "approval", "erp"]},
+        {"id": 2, "tags": ["po", "approval"]},
+        {"id": 3, "tags": ["po", "invoice"]},
+        {"id": 4, "tags": ["invoice", "erp", "po"]},
+    ]
+
+
+class TestTagIndex:
+
+    def test_pairs_from_merged_postings(self, tagged_nodes):
+        """Shared counts come from posting lists, each pair reported once."""
+        index = TagIndex()
+        for node in tagged_nodes:
+            index.add(node["id"], node["tags"])
+
+        assert index.pairs(2) == {(1, 2): 2, (1, 4): 2, (3, 4): 2}
+        assert index.pairs(2, {2}) == {(1, 2): 2}
+
+    def test_readding_node_replaces_postings(self):
+        """Re-adding a node drops its old tags from the index."""
+        index = TagIndex()
+        index.add(1, ["a", "b"])
+        index.add(1, ["c"])
+
+        assert "a" not in index.postings
+        assert index.postings["c"] == [1]
+
+
+class TestGenerateSharedTagEdges:
+
+    @pytest.mark.asyncio
+    async def test_full_then_incremental(self, tagged_nodes):
+        """Only changed nodes are recounted and unchanged edges are kept."""
+        session = FakeSession(tagged_nodes, events=[SimpleNamespace(id=10, entity_id=1)])
+        service = GraphSyncService(session)
+
+        created = await service.generate_shared_tag_edges(["acme"])
+        assert created == 3
+        kept_id = session.edges[(1, 4)][0]
+
+        tagged_nodes[1]["tags"] = ["invoice"]
+        session.events.append(SimpleNamespace(id=11, entity_id=2))
+        await service.generate_shared_tag_edges(["acme"])
+
+        assert set(session.edges) == {(1, 4), (3, 4)}
+        assert session.edges[(1, 4)][0] == kept_id
+        assert session.edges[(1, 4)][1] == pytest.approx(0.4)
+
+    @pytest.mark.asyncio
+    async def test_pairs_across_requested_tenants_only(self, tagged_nodes):
+        """Tags pair nodes across the requested tenants; edges to other tenants are kept."""
+        tagged_nodes[0]["tenant_id"] = "shared"
+        tagged_nodes[2]["tenant_id"] = "globex"
+        session = FakeSession(tagged_nodes, edges={(3, 4): (7, 0.4)})
+        service = GraphSyncService(session)
+
+        await service.generate_shared_tag_edges(["acme", "shared"])
+
+        assert set(session.edges) == {(1, 2), (1, 4), (3, 4)}
+
+    @pytest.mark.asyncio
+    async def test_late_committed_event_below_watermark_is_recounted(self, tagged_nodes):
+        """A node event with an id below the last run's watermark is not skipped."""
+        session = FakeSession(tagged_nodes, events=[SimpleNamespace(id=10, entity_id=1)])
+        service = GraphSyncService(session)
+        await service.generate_shared_tag_edges(["acme"])
+
+        tagged_nodes[1]["tags"] = ["invoice"]
+        session.events.append(SimpleNamespace(id=9, entity_id=2))
+        await service.generate_shared_tag_edges(["acme"])
+
+        assert set(session.edges) == {(1, 4), (3, 4)}
+
+    @pytest.mark.asyncio
+    async def test_single_node_sync_diffs_edges(self, tagged_nodes):
+        """The per-node path only inserts and deletes what changed."""
+        session = FakeSession(tagged_nodes, edges={(1, 2): (7, 0.4), (2, 3): (8, 0.4)})
+        service = GraphSyncService(session)
+
+        await service.sync_shared_tag_edges_for_node(2, ["po", "approval"], "acme")
+
+        assert session.edges == {(1, 2): (7, 0.4)}
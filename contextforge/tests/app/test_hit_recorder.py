@@ -0,0 +1,136 @@
+"""Tests for write-behind knowledge hit recording."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import hit_recorder
+from app.services.hit_recorder import HitRecorder, hit_row
+from app.services.metrics_service import HitRecord, MetricsService
+
+
+class FakeSession:
+    """Records executemany batches and commits; can be made slow or failing."""
+
+    def __init__(self, store, delay=0.0, fail=False):
+        self.store = store
+        self.delay = delay
+        self.fail = fail
+
+    async def execute(self, statement, params=None):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        assert "knowledge_hits" in str(statement)
+        self.store["batches"].append(list(params))
+        return MagicMock()
+
+    async def commit(self):
+        self.store["commits"] += 1
+
+
+def _factory(store, **kwargs):
+    class Context:
+        async def __aenter__(self):
+            return FakeSession(store, **kwargs)
+
+        async def __aexit__(self, *exc):
+            return False
+
+    return Context
+
+
+@pytest.fixture
+def store():
+    return {"batches": [], "commits": 0}
+
+
+def _rows(count):
+    return [hit_row(node_id, "reset mfa", 0.5, "hybrid") for node_id in range(count)]
+
+
+class TestHitRecorder:
+
+    @pytest.mark.asyncio
+    async def test_recording_does_not_wait_for_the_database(self, store):
+        """record() returns immediately; a background flush writes one batch."""
+        recorder = HitRecorder(_factory(store, delay=0.5), batch_size=100, flush_interval=0.01)
+        recorder.start()
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert recorder.record(_rows(3)) == 3
+        assert loop.time() - started < 0.01
+        assert store["batches"] == []
+
+        await recorder.stop()
+        assert [len(batch) for batch in store["batches"]] == [3]
+        assert recorder.stats()["written"] == 3
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_before_interval(self, store):
+        """Reaching batch_size wakes the flusher; rows go out in batch_size chunks."""
+        recorder = HitRecorder(_factory(store), batch_size=4, flush_interval=60)
+        recorder.start()
+
+        recorder.record(_rows(10))
+        await asyncio.sleep(0.05)
+
+        assert [len(batch) for batch in store["batches"]] == [4, 4, 2]
+        assert store["commits"] == 3
+        await recorder.stop()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_samples_then_drops(self, store):
+        """Past half the queue only sample_rate is kept; past max_queue hits are dropped."""
+        recorder = HitRecorder(_factory(store), max_queue=10, sample_rate=0.0)
+
+        accepted = recorder.record(_rows(8))
+        recorder.sample_rate = 1.0
+        accepted += recorder.record(_rows(8))
+
+        assert accepted == 10
+        stats = recorder.stats()
+        assert (stats["queued"], stats["sampled_out"], stats["dropped"]) == (10, 3, 3)
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_counted_not_retried(self, store):
+        """A database error loses only that batch and never reaches the caller."""
+        recorder = HitRecorder(_factory(store, fail=True), batch_size=2)
+        recorder.record(_rows(3))
+
+        assert await recorder.flush() == 0
+
+        assert recorder.stats()["failed"] == 2
+        assert len(recorder) == 1
+
+
+class TestRecordHitsBatch:
+
+    @pytest.mark.asyncio
+    async def test_queues_on_running_recorder(self, store, monkeypatch):
+        """With a recorder running, the request session is never touched."""
+        recorder = HitRecorder(_factory(store))
+        monkeypatch.setattr(hit_recorder, "_hit_recorder", recorder)
+        session = MagicMock()
+        service = MetricsService(session, ["acme"])
+
+        count = await service.record_hits_batch(
+            [HitRecord(1, 0.9, "hybrid"), HitRecord(2, 0.4, "hybrid")], "reset mfa", username="ann"
+        )
+
+        assert count == 2
+        session.execute.assert_not_called()
+        await recorder.flush()
+        assert [(r["node_id"], r["user_id"]) for r in store["batches"][0]] == [(1, "ann"), (2, "ann")]
+
+    @pytest.mark.asyncio
+    async def test_inserts_inline_without_recorder(self, store):
+        """Without a recorder the hits are written on the caller's session in one batch."""
+        service = MetricsService(FakeSession(store), ["acme"])
+
+        await service.record_hits_batch([HitRecord(1, 0.9, "hybrid")], "reset mfa")
+
+        assert [r["user_id"] for r in store["batches"][0]] == ["default"]
+        assert store["commits"] == 1
@@ -0,0 +1,158 @@
+"""Tests for knowledge hit rollups."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.hit_rollup_service import (
+    HitRollupService,
+    ROLLUP_EPOCH,
+    floor_day,
+    floor_hour,
+    window_params,
+)
+
+
+class FakeSession:
+    """Answers the rollup job's queries and records the ranges it aggregates."""
+
+    def __init__(self, first_hit=None, state=None, locked=True):
+        self.first_hit = first_hit
+        self.state = dict(state or {})
+        self.locked = locked
+        self.rolled = []
+        self.commits = 0
+
+    def _result(self, scalar=None, one=None):
+        result = MagicMock()
+        result.scalar.return_value = scalar
+        result.fetchone.return_value = one
+        return result
+
+    async def execute(self, statement, params=None):
+        query = " ".join(str(statement).split())
+        params = params or {}
+
+        if "pg_try_advisory_xact_lock" in query:
+            return self._result(scalar=self.locked)
+        if query.startswith("SELECT settings"):
+            state = self.state.get(params["category"])
+            return self._result(one=SimpleNamespace(settings=state) if state else None)
+        if query.startswith("INSERT INTO") and "system_settings" in query:
+            self.state[params["category"]] = json.loads(params["settings"])
+            return self._result()
+        if "MIN(hit_at)" in query:
+            return self._result(scalar=self.first_hit)
+        if "knowledge_hit_rollups " in query:
+            self.rolled.append((params["granularity"], params["start"], params["end"]))
+        return self._result()
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _settled():
+    return floor_hour(datetime.now(timezone.utc) - timedelta(seconds=120))
+
+
+class TestWindowParams:
+
+    def test_window_rounds_to_hour_and_next_day(self):
+        start = datetime(2025, 3, 4, 10, 30, tzinfo=timezone.utc)
+        hour_mark = datetime(2025, 3, 10, 7, tzinfo=timezone.utc)
+        day_mark = datetime(2025, 3, 10, tzinfo=timezone.utc)
+
+        params = window_params(start, hour_mark, day_mark)
+
+        assert params["window_start"] == datetime(2025, 3, 4, 10, tzinfo=timezone.utc)
+        assert params["window_day"] == datetime(2025, 3, 5, tzinfo=timezone.utc)
+        assert (params["hour_mark"], params["day_mark"]) == (hour_mark, day_mark)
+
+    def test_day_aligned_start_and_missing_watermarks(self):
+        """Without watermarks every piece but the raw one is empty."""
+        start = datetime(2025, 3, 4, tzinfo=timezone.utc)
+
+        params = window_params(start, None, None)
+
+        assert params["window_day"] == start
+        assert params["hour_mark"] == params["day_mark"] == ROLLUP_EPOCH
+        assert window_params(None, None, None)["window_start"] == ROLLUP_EPOCH
+
+
+class TestRollUp:
+
+    @pytest.mark.asyncio
+    async def test_first_run_rolls_up_from_first_hit(self):
+        settled = _settled()
+        first_hit = settled - timedelta(days=2, minutes=30)
+        session = FakeSession(first_hit=first_hit)
+
+        stats = await HitRollupService(session).roll_up(max_hours=1000)
+
+        assert session.rolled == [
+            ("hour", floor_hour(first_hit), settled),
+            ("day", floor_day(first_hit), floor_day(settled)),
+        ]
+        assert session.state["hit_rollups"] == {
+            "hour": settled.isoformat(),
+            "day": floor_day(settled).isoformat(),
+        }
+        assert stats["hours_rolled"] == 49
+        assert session.commits == 1
+
+    @pytest.mark.asyncio
+    async def test_catch_up_is_bounded_and_resumes(self):
+        """max_hours limits one run; the next run continues from the watermark."""
+        settled = _settled()
+        hour_mark = settled - timedelta(hours=10)
+        session = FakeSession(state={"hit_rollups": {
+            "hour": hour_mark.isoformat(),
+            "day": floor_day(hour_mark).isoformat(),
+        }})
+        service = HitRollupService(session)
+
+        first = await service.roll_up(max_hours=6)
+        second = await service.roll_up(max_hours=6)
+
+        hour_ranges = [(start, end) for granularity, start, end in session.rolled if granularity == "hour"]
+        assert hour_ranges == [
+            (hour_mark, hour_mark + timedelta(hours=6)),
+            (hour_mark + timedelta(hours=6), settled),
+        ]
+        assert (first["hours_rolled"], second["hours_rolled"]) == (6, 4)
+        assert datetime.fromisoformat(session.state["hit_rollups"]["hour"]) == settled
+
+    @pytest.mark.asyncio
+    async def test_up_to_date_watermark_rolls_nothing(self):
+        settled = _settled()
+        session = FakeSession(state={"hit_rollups": {
+            "hour": settled.isoformat(),
+            "day": floor_day(settled).isoformat(),
+        }})
+
+        stats = await HitRollupService(session).roll_up()
+
+        assert session.rolled == []
+        assert (stats["hours_rolled"], stats["days_rolled"]) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_skips_while_another_worker_holds_the_lock(self):
+        session = FakeSession(first_hit=_settled() - timedelta(days=1), locked=False)
+
+        stats = await HitRollupService(session).roll_up()
+
+        assert stats["skipped"] is True
+        assert session.rolled == []
+        assert session.state == {}
+
+    @pytest.mark.asyncio
+    async def test_no_hits_leaves_watermarks_unset(self):
+        session = FakeSession()
+
+        await HitRollupService(session).roll_up()
+
+        assert session.rolled == []
+        assert "hit_rollups" not in session.state
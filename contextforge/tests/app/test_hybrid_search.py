@@ -0,0 +1,171 @@
+"""Tests for client-side RRF fusion in NodeService.hybrid_search."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import node_service
+from app.services.node_service import NodeService
+from app.services.search_cache import SearchResultCache
+
+
+ROW_FIELDS = ("id", "tenant_id", "node_type", "title", "summary", "content", "tags", "dataset_name", "field_path")
+
+
+class FakeSession:
+    """Serves the BM25 leg, the pgvector leg and row hydration with per-leg delays."""
+
+    def __init__(self, state, delays=None):
+        self.state = state
+        self.delays = delays or {}
+
+    async def execute(self, statement, params=None):
+        query = " ".join(str(statement).split())
+        result = MagicMock()
+        if "hybrid_search_nodes" in query:
+            self.state["sql_params"] = params
+            result.fetchall.return_value = []
+            return result
+        if "ts_rank_cd" in query:
+            leg, rows = "bm25", [SimpleNamespace(id=i, score=s) for i, s in [(3, 0.5), (1, 0.2)]]
+        elif "node_variants" in query:
+            leg, rows = "vector", [
+                SimpleNamespace(id=1, source="node", score=0.9),
+                SimpleNamespace(id=2, source="node", score=0.7),
+                SimpleNamespace(id=2, source="variant", score=0.8),
+            ]
+        else:
+            result.fetchall.return_value = [
+                SimpleNamespace(id=i, _mapping={
+                    **dict.fromkeys(ROW_FIELDS), "id": i, "tenant_id": "acme",
+                    "node_type": "faq", "title": f"Node {i}", "content": {}, "tags": [],
+                })
+                for i in params["ids"]
+            ]
+            return result
+
+        self.state["active"] += 1
+        self.state["max_active"] = max(self.state["max_active"], self.state["active"])
+        try:
+            await asyncio.sleep(self.delays.get(leg, 0.1))
+        finally:
+            self.state["active"] -= 1
+        self.state["legs"].append((leg, id(self)))
+        result.fetchall.return_value = rows
+        return result
+
+
+class SessionFactory:
+    def __init__(self, state, delays=None):
+        self.state = state
+        self.delays = delays
+        self.sessions = []
+
+    def __call__(self):
+        factory = self
+
+        class Context:
+            async def __aenter__(self):
+                factory.sessions.append(FakeSession(factory.state, factory.delays))
+                return factory.sessions[-1]
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Context()
+
+
+@pytest.fixture
+def state():
+    return {"active": 0, "max_active": 0, "legs": []}
+
+
+@pytest.fixture(autouse=True)
+def client_mode(monkeypatch):
+    monkeypatch.setattr(node_service.settings, "HYBRID_SEARCH_MODE", "client")
+    monkeypatch.setattr(node_service.settings, "VECTOR_INDEX_ENABLED", False)
+
+
+class TestClientHybridSearch:
+
+    @pytest.mark.asyncio
+    async def test_legs_run_concurrently_and_fuse_like_sql(self, state, monkeypatch):
+        """BM25 and vector legs overlap on their own sessions; RRF uses HYBRID_RRF_K."""
+        monkeypatch.setattr(node_service.settings, "HYBRID_RRF_K", 10)
+        factory = SessionFactory(state)
+        service = NodeService(FakeSession(state), session_factory=factory)
+
+        started = time.perf_counter()
+        results = await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0], limit=3)
+
+        assert time.perf_counter() - started < 0.18
+        assert state["max_active"] == 2
+        assert {session for _, session in state["legs"]} == {id(s) for s in factory.sessions}
+        assert [r.node.id for r in results] == [1, 2, 3]
+        top, variant, _ = results
+        assert (top.bm25_rank, top.vector_rank) == (2, 1)
+        assert top.rrf_score == pytest.approx(0.4 / (10 + 2) + 0.6 / (10 + 1))
+        assert (variant.vector_rank, variant.match_source) == (2, "variant")
+        stats = service.last_search_stats
+        assert stats["mode"] == "client"
+        assert stats["legs"]["bm25"]["hits"] == 2 and stats["legs"]["vector"]["hits"] == 2
+        assert stats["legs"]["vector"]["ms"] >= 100
+
+    @pytest.mark.asyncio
+    async def test_leg_missing_budget_is_dropped(self, state, monkeypatch):
+        """With HYBRID_LEG_TIMEOUT_MS a slow leg is cancelled and BM25 ranks alone."""
+        monkeypatch.setattr(node_service.settings, "HYBRID_LEG_TIMEOUT_MS", 100)
+        factory = SessionFactory(state, delays={"bm25": 0.01, "vector": 1.0})
+        service = NodeService(FakeSession(state), session_factory=factory)
+
+        started = time.perf_counter()
+        results = await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0])
+
+        assert time.perf_counter() - started < 0.5
+        assert [(r.node.id, r.vector_rank) for r in results] == [(3, None), (1, None)]
+        assert service.last_search_stats["legs"]["vector"]["timed_out"] is True
+
+    @pytest.mark.asyncio
+    async def test_results_missing_a_leg_are_not_cached(self, state, monkeypatch):
+        """Partial results from a timed-out leg are returned but the next search runs again."""
+        monkeypatch.setattr(node_service.settings, "HYBRID_LEG_TIMEOUT_MS", 100)
+        factory = SessionFactory(state, delays={"bm25": 0.01, "vector": 1.0})
+        cache = SearchResultCache()
+        cache.sync = AsyncMock()
+        service = NodeService(FakeSession(state), search_cache=cache, session_factory=factory)
+
+        await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0])
+        factory.delays = {"bm25": 0.01, "vector": 0.01}
+        await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0])
+        await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0])
+
+        assert [leg for leg, _ in state["legs"]].count("bm25") == 2
+        assert len(cache) == 1 and cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_without_session_factory_legs_take_turns(self, state):
+        """The request session is never used by both legs at once; zero-weight legs are skipped."""
+        session = FakeSession(state, delays={"bm25": 0.01, "vector": 0.01})
+        service = NodeService(session)
+
+        await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0])
+        bm25_only = await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0], vector_weight=0)
+
+        assert state["max_active"] == 1
+        assert [leg for leg, _ in state["legs"]] == ["bm25", "vector", "bm25"]
+        assert [r.node.id for r in bm25_only] == [3, 1]
+
+    @pytest.mark.asyncio
+    async def test_sql_mode_passes_rrf_k(self, state, monkeypatch):
+        """hybrid_search_nodes gets the configured rrf_k."""
+        monkeypatch.setattr(node_service.settings, "HYBRID_SEARCH_MODE", "sql")
+        monkeypatch.setattr(node_service.settings, "HYBRID_RRF_K", 30)
+        service = NodeService(FakeSession(state))
+
+        await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0])
+
+        assert state["sql_params"]["rrf_k"] == 30
+        assert service.last_search_stats["mode"] == "sql"
@@ -0,0 +1,156 @@
+"""Tests for concurrent knowledge/schema retrieval in LLMContextService."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.enums import NodeType
+from app.schemas.llm_context import LLMContextRequest
+from app.services import llm_context_service
+from app.services.llm_context_service import LLMContextService
+
+
+def _fake_session():
+    result = MagicMock()
+    result.fetchall.return_value = []
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.rollback = AsyncMock()
+    return session
+
+
+class SessionFactory:
+    def __init__(self):
+        self.sessions = []
+
+    def __call__(self):
+        factory = self
+
+        class Context:
+            async def __aenter__(self):
+                factory.sessions.append(_fake_session())
+                return factory.sessions[-1]
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Context()
+
+
+class FakeSearch:
+    """Stands in for NodeService.hybrid_search and records how it was called."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, node_service, query_text, user_tenant_ids, node_types=None, query_embedding=None, **kwargs):
+        schema = NodeType.SCHEMA_FIELD in node_types
+        self.calls.append((node_service.session, query_embedding))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delays.get("schema" if schema else "knowledge", 0.15))
+        finally:
+            self.active -= 1
+        node = SimpleNamespace(
+            id=2 if schema else 1,
+            node_type=NodeType.SCHEMA_FIELD if schema else NodeType.FAQ,
+            title="orders.status" if schema else "How do I approve a PO?",
+            summary=None,
+            content={"answer": "Use the approvals page."},
+            tags=[],
+            dataset_name="orders",
+        )
+        return [SimpleNamespace(node=node, rrf_score=0.5)]
+
+    def method(self):
+        async def hybrid_search(node_service, *args, **kwargs):
+            return await self(node_service, *args, **kwargs)
+        return hybrid_search
+
+
+@pytest.fixture
+def embedding_client():
+    client = MagicMock()
+    client.embed = AsyncMock(return_value=[0.1, 0.2])
+    return client
+
+
+def _request(**overrides):
+    values = dict(query="approve PO", tenant_ids=["acme"], include_schema=True, expand_graph=False)
+    values.update(overrides)
+    return LLMContextRequest(**values)
+
+
+class TestGetLLMContext:
+
+    @pytest.mark.asyncio
+    async def test_halves_run_concurrently_on_own_sessions(self, monkeypatch, embedding_client):
+        """Both halves overlap, use separate sessions and share one embedding."""
+        search = FakeSearch()
+        monkeypatch.setattr(llm_context_service.NodeService, "hybrid_search", search.method())
+        factory = SessionFactory()
+        service = LLMContextService(_fake_session(), embedding_client, session_factory=factory)
+
+        started = time.perf_counter()
+        response = await service.get_llm_context(_request())
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.25
+        assert search.max_active == 2
+        assert {id(session) for session, _ in search.calls} == {id(s) for s in factory.sessions}
+        assert len(factory.sessions) == 2
+        assert all(embedding == [0.1, 0.2] for _, embedding in search.calls)
+        embedding_client.embed.assert_awaited_once()
+        assert response.knowledge.total_faqs == 1
+        assert response.schema_context.total_fields == 1
+        assert response.partial is False
+
+    @pytest.mark.asyncio
+    async def test_slow_half_is_dropped_after_budget(self, monkeypatch, embedding_client):
+        """A half that misses timeout_ms is omitted and the response is partial."""
+        search = FakeSearch(delays={"knowledge": 0.01, "schema": 1.0})
+        monkeypatch.setattr(llm_context_service.NodeService, "hybrid_search", search.method())
+        service = LLMContextService(_fake_session(), embedding_client, session_factory=SessionFactory())
+
+        started = time.perf_counter()
+        response = await service.get_llm_context(_request(timeout_ms=150))
+
+        assert time.perf_counter() - started < 0.5
+        assert response.partial is True
+        assert response.knowledge.total_faqs == 1
+        assert response.schema_context is None
+        assert response.debug["timed_out"] == ["schema"]
+
+    @pytest.mark.asyncio
+    async def test_graph_loaded_once_for_both_halves(self, monkeypatch, embedding_client):
+        """Graph expansion in both halves shares a single load."""
+        monkeypatch.setattr(llm_context_service.NodeService, "hybrid_search", FakeSearch().method())
+        load_graph = AsyncMock()
+        monkeypatch.setattr(llm_context_service.GraphService, "load_graph", load_graph)
+        monkeypatch.setattr(llm_context_service.GraphService, "neighbor_candidates", lambda *args, **kwargs: [])
+        service = LLMContextService(_fake_session(), embedding_client, session_factory=SessionFactory())
+
+        await service.get_llm_context(_request(expand_graph=True))
+
+        load_graph.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_without_session_factory_halves_take_turns(self, monkeypatch, embedding_client):
+        """The request session is never used by both halves at once."""
+        search = FakeSearch(delays={"knowledge": 0.02, "schema": 0.02})
+        monkeypatch.setattr(llm_context_service.NodeService, "hybrid_search", search.method())
+        session = _fake_session()
+        service = LLMContextService(session, embedding_client)
+
+        response = await service.get_llm_context(_request())
+
+        assert search.max_active == 1
+        assert {id(s) for s, _ in search.calls} == {id(session)}
+        assert response.schema_context.total_fields == 1
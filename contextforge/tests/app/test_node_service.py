@@ -0,0 +1,167 @@
+"""Tests for NodeService re-embedding."""
+
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.clients.embedding_client import EmbeddingClient
+from app.clients.embedding_cache import embedding_cache_key
+from app.core.config import settings
+from app.services.node_service import NodeService
+
+
+class FakeEmbeddingClient(EmbeddingClient):
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    @property
+    def expected_dimension(self) -> int:
+        return 2
+
+    async def embed(self, text):
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.fail_on and self.fail_on in texts:
+            raise RuntimeError("provider error")
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class FakeSession:
+    """Serves knowledge_nodes pages by keyset and records writes."""
+
+    def __init__(self, rows, checkpoint=None):
+        self.rows = rows
+        self.checkpoint = checkpoint
+        self.updates = []
+        self.checkpoints = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        query = str(statement)
+        result = MagicMock()
+        if "FROM unnest" in query:
+            self.updates.append(params)
+        elif "INSERT INTO" in query and "system_settings" in query:
+            self.checkpoints.append(json.loads(params["settings"])["last_id"])
+        elif "DELETE FROM" in query:
+            self.checkpoint = None
+        elif "system_settings" in query:
+            result.fetchone.return_value = (
+                SimpleNamespace(settings={"last_id": self.checkpoint}) if self.checkpoint else None
+            )
+        else:
+            page = [r for r in self.rows if r.id > params["after_id"]][:params["limit"]]
+            result.fetchall.return_value = page
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _row(node_id, answer="answer", embedding_key=None):
+    return SimpleNamespace(
+        id=node_id,
+        title=f"Question {node_id}",
+        content={"answer": answer},
+        node_type="faq",
+        embedding_key=embedding_key,
+    )
+
+
+def _key(row, client):
+    return embedding_cache_key(
+        NodeService(None)._build_embed_text(row.title, row.content, row.node_type),
+        settings.EMBEDDING_MODEL,
+        client.expected_dimension,
+    )
+
+
+class TestReembedNodes:
+
+    @pytest.mark.asyncio
+    async def test_batches_with_bulk_updates_and_checkpoints(self):
+        """Pages go through embed_batch and are written with one UPDATE each."""
+        client = FakeEmbeddingClient()
+        session = FakeSession([_row(i) for i in range(1, 8)])
+        service = NodeService(session, client)
+
+        stats = await service.reembed_nodes(["acme"], batch_size=3, concurrency=2)
+
+        assert [len(b) for b in client.batches] == [3, 3, 1]
+        assert [u["ids"] for u in session.updates] == [[1, 2, 3], [4, 5, 6], [7]]
+        assert session.checkpoints == [3, 6, 7]
+        assert session.checkpoint is None
+        assert stats["updated"] == 7
+        assert stats["last_id"] == 7
+        assert client.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_checkpoint(self):
+        """A stored checkpoint skips already processed ids."""
+        client = FakeEmbeddingClient()
+        session = FakeSession([_row(i) for i in range(1, 6)], checkpoint=3)
+        service = NodeService(session, client)
+
+        stats = await service.reembed_nodes(["acme"], batch_size=10)
+
+        assert stats["resumed_from"] == 3
+        assert [u["ids"] for u in session.updates] == [[4, 5]]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_nodes_are_not_reembedded(self):
+        """Nodes whose stored embedding_key matches make no provider call."""
+        client = FakeEmbeddingClient()
+        rows = [_row(1), _row(2)]
+        rows[0].embedding_key = _key(rows[0], client)
+        session = FakeSession(rows)
+        service = NodeService(session, client)
+
+        stats = await service.reembed_nodes(["acme"])
+
+        assert stats["unchanged"] == 1
+        assert len(client.batches) == 1 and len(client.batches[0]) == 1
+        assert session.updates[0]["ids"] == [2]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_counts_errors_and_continues(self):
+        """A provider error fails only its own page."""
+        client = FakeEmbeddingClient(fail_on=NodeService(None)._build_embed_text("Question 1", {"answer": "x"}, "faq"))
+        session = FakeSession([_row(1, answer="x"), _row(2), _row(3)])
+        service = NodeService(session, client)
+
+        stats = await service.reembed_nodes(["acme"], batch_size=1)
+
+        assert stats["errors"] == 1
+        assert stats["updated"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_cancels_requests_in_flight(self):
+        """Pages already sent to embed_batch are cancelled, not leaked, on failure."""
+        class StallingClient(FakeEmbeddingClient):
+            async def embed_batch(self, texts):
+                if self.batches:
+                    self.batches.append(list(texts))
+                    await asyncio.Event().wait()
+                return await super().embed_batch(texts)
+
+        client = StallingClient()
+        session = FakeSession([_row(i) for i in range(1, 6)])
+        session.commit = MagicMock(side_effect=RuntimeError("connection lost"))
+        service = NodeService(session, client)
+
+        with pytest.raises(RuntimeError):
+            await service.reembed_nodes(["acme"], batch_size=1, concurrency=3)
+
+        assert len(client.batches) == 3
+        assert asyncio.all_tasks() == {asyncio.current_task()}
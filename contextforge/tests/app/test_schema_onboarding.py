@@ -0,0 +1,73 @@
+"""Tests for bulk schema_field node creation in QueryForgeService."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.queryforge_service import QueryForgeService
+
+
+class FakeSession:
+    """Hands out sequential IDs for node INSERTs (returned in reverse) and records edge INSERTs."""
+
+    def __init__(self):
+        self.next_id = 100
+        self.node_inserts = []
+        self.edge_inserts = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        query = " ".join(str(statement).split())
+        result = MagicMock()
+        if "knowledge_nodes" in query:
+            self.node_inserts.append(params)
+            ids = list(range(self.next_id, self.next_id + len(params["paths"])))
+            self.next_id += len(ids)
+            result.fetchall.return_value = [
+                SimpleNamespace(id=i, field_path=path) for i, path in zip(ids, params["paths"])
+            ][::-1]
+        else:
+            self.edge_inserts.append(params)
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        raise AssertionError("bulk onboarding should not refresh nodes")
+
+
+def _fields(count):
+    return [
+        SimpleNamespace(path=f"orders.col_{i}", description=f"Column {i}", field_type="text")
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fields_are_embedded_and_inserted_in_batches(monkeypatch):
+    """Each chunk costs one embed_batch call and one INSERT per table; ids keep field order."""
+    from app.services import queryforge_service
+    monkeypatch.setattr(queryforge_service.settings, "ONBOARD_BATCH_SIZE", 2)
+
+    session = FakeSession()
+    embedding_client = MagicMock(expected_dimension=2)
+    embedding_client.embed_batch = AsyncMock(side_effect=lambda texts: [[0.1, 0.2] for _ in texts])
+    service = QueryForgeService(session=session, embedding_client=embedding_client)
+
+    node_ids = await service._create_schema_field_nodes(
+        tenant_id="acme",
+        dataset_name="orders",
+        schema_index_id=7,
+        unified_fields=_fields(5),
+        tags=["erp"],
+        created_by="alice",
+    )
+
+    assert node_ids == [100, 101, 102, 103, 104]
+    assert embedding_client.embed_batch.await_count == 3
+    assert [len(p["paths"]) for p in session.node_inserts] == [2, 2, 1]
+    assert session.node_inserts[0]["embeddings"][0] == "[0.1,0.2]"
+    assert [p["targets"] for p in session.edge_inserts] == [[100, 101], [102, 103], [104]]
+    assert all(p["source_id"] == 7 for p in session.edge_inserts)
+    assert session.commits == 1
@@ -0,0 +1,153 @@
+"""Tests for the hybrid search result cache."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import search_cache as module
+from app.services.node_service import NodeService
+from app.services.search_cache import SearchResultCache
+
+
+class FakeSession:
+    """Serves hybrid_search_nodes rows and graph_events watermarks."""
+
+    def __init__(self):
+        self.searches = 0
+        self.last_event_id = 10
+        # graph_events node rows as (id, tenant_id)
+        self.events = []
+        # graph_events variant rows as (id, node_id), resolved via node_tenants
+        self.variant_events = []
+        self.node_tenants = {}
+
+    async def execute(self, statement, params=None):
+        query = " ".join(str(statement).split())
+        result = MagicMock()
+        if "hybrid_search_nodes" in query:
+            self.searches += 1
+            result.fetchall.return_value = [SimpleNamespace(
+                id=self.searches, tenant_id="acme", node_type="faq", title="Reset MFA",
+                summary=None, content={}, tags=[], dataset_name=None, field_path=None,
+                bm25_rank=1, vector_rank=1, bm25_score=1.0, vector_score=1.0,
+                rrf_score=0.5, match_source="both",
+            )]
+        elif "floor" in (params or {}):
+            events = list(self.events)
+            if "'variant'" in query and "knowledge_nodes" in query:
+                events += [(event_id, self.node_tenants.get(node_id)) for event_id, node_id in self.variant_events]
+            result.fetchall.return_value = [
+                SimpleNamespace(id=event_id, tenant_id=tenant_id)
+                for event_id, tenant_id in sorted(events, key=lambda e: e[0])
+                if event_id > params["floor"]
+            ]
+        else:
+            result.scalar.return_value = self.last_event_id
+        return result
+
+
+def _embedder(vectors):
+    client = MagicMock()
+    client.embed = AsyncMock(side_effect=lambda text: vectors[text])
+    return client
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+class TestSearchResultCache:
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_is_served_from_cache(self, session):
+        """Queries differing only in case and spacing share one database search."""
+        cache = SearchResultCache()
+        service = NodeService(session, _embedder({"reset mfa": [1, 0], "  Reset   MFA ": [1, 0]}), cache)
+
+        first = await service.hybrid_search("reset mfa", ["acme"])
+        second = await service.hybrid_search("  Reset   MFA ", ["acme"])
+        other_tenants = await service.hybrid_search("reset mfa", ["acme", "shared"])
+
+        assert session.searches == 2
+        assert second[0].node.id == first[0].node.id
+        assert other_tenants[0].node.id != first[0].node.id
+        assert cache.hits == 1
+        assert service.embedding_client.embed.await_count == 2
+
+    @pytest.mark.parametrize("has_numpy", [True, False])
+    @pytest.mark.asyncio
+    async def test_semantic_tier_reuses_close_queries(self, session, monkeypatch, has_numpy):
+        """A near-identical embedding with the same filters reuses the cached results."""
+        monkeypatch.setattr(module, "HAS_NUMPY", has_numpy)
+        cache = SearchResultCache(semantic_threshold=0.95)
+        vectors = {"reset mfa": [1, 0], "how to reset mfa": [0.99, 0.05], "vpn down": [0, 1]}
+        service = NodeService(session, _embedder(vectors), cache)
+
+        await service.hybrid_search("reset mfa", ["acme"])
+        await service.hybrid_search("how to reset mfa", ["acme"])
+        await service.hybrid_search("vpn down", ["acme"])
+        await service.hybrid_search("how to reset mfa", ["acme"], limit=5)
+
+        assert session.searches == 3
+        assert cache.semantic_hits == 1
+        assert cache.misses == 3
+
+    @pytest.mark.asyncio
+    async def test_graph_events_invalidate_affected_tenants(self, session):
+        """Node changes in a tenant drop only the entries that include it."""
+        cache = SearchResultCache(sync_interval=0)
+        service = NodeService(session, _embedder({"reset mfa": [1, 0]}), cache)
+        await service.hybrid_search("reset mfa", ["acme"])
+        await service.hybrid_search("reset mfa", ["globex"])
+
+        session.last_event_id = 11
+        session.events = [(11, "acme"), (11, None)]
+        await service.hybrid_search("reset mfa", ["globex"])
+        await service.hybrid_search("reset mfa", ["acme"])
+
+        assert session.searches == 3
+        assert cache.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_late_committed_event_below_watermark_invalidates(self, session):
+        """An event whose id is below the watermark but committed later is still seen."""
+        cache = SearchResultCache(sync_interval=0)
+        service = NodeService(session, _embedder({"reset mfa": [1, 0]}), cache)
+        await service.hybrid_search("reset mfa", ["acme"])
+
+        session.events = [(12, "globex")]
+        await service.hybrid_search("reset mfa", ["acme"])
+        session.events = [(11, "acme"), (12, "globex")]
+        await service.hybrid_search("reset mfa", ["acme"])
+        await service.hybrid_search("reset mfa", ["acme"])
+
+        assert session.searches == 2
+        assert cache.invalidations == 1
+
+    @pytest.mark.asyncio
+    async def test_variant_events_invalidate_the_node_tenant(self, session):
+        """A variant change drops entries for the tenant of the variant's node."""
+        cache = SearchResultCache(sync_interval=0)
+        service = NodeService(session, _embedder({"reset mfa": [1, 0]}), cache)
+        await service.hybrid_search("reset mfa", ["acme"])
+        await service.hybrid_search("reset mfa", ["globex"])
+
+        session.node_tenants = {7: "acme"}
+        session.variant_events = [(11, 7)]
+        await service.hybrid_search("reset mfa", ["globex"])
+        await service.hybrid_search("reset mfa", ["acme"])
+
+        assert session.searches == 3
+        assert cache.invalidations == 1
+
+    def test_fill_racing_an_invalidation_is_not_stored(self):
+        """Results read before an invalidation never enter the cache."""
+        cache = SearchResultCache()
+        generation = cache.generation(["acme"])
+        cache.invalidate_tenants(["acme"])
+
+        cache.put("key", "scope", ["acme"], [], generation=generation)
+
+        assert len(cache) == 0
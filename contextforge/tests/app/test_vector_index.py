@@ -0,0 +1,255 @@
+"""Tests for the in-process vector index and the local hybrid search path."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.services import vector_index
+from app.services.node_service import NodeService
+from app.services.similarity_index import SimilarityIndex
+from app.services.vector_index import (
+    NODE,
+    VARIANT,
+    clear_vector_indexes,
+    vector_search,
+)
+
+
+def _vec(*values):
+    return "[" + ",".join(str(v) for v in values) + "]"
+
+
+def _node(node_id, embedding, tenant_id="acme", node_type="faq", tags=(), status="published"):
+    return {
+        "id": node_id, "tenant_id": tenant_id, "node_type": node_type, "tags": list(tags),
+        "status": status, "is_deleted": False, "embedding": embedding,
+        "title": f"Node {node_id}", "summary": None, "content": {},
+        "dataset_name": None, "field_path": None,
+    }
+
+
+class FakeSession:
+    """Answers index builds, graph_events polls, the BM25 leg and row hydration."""
+
+    def __init__(self, nodes, variants=(), events=(), bm25=()):
+        self.nodes = {n["id"]: n for n in nodes}
+        self.variants = list(variants)
+        self.events = list(events)
+        self.bm25 = list(bm25)
+        self.statements = []
+
+    def _result(self, rows=(), scalar=None):
+        result = MagicMock()
+        result.fetchall.return_value = list(rows)
+        result.scalar.return_value = scalar
+        return result
+
+    async def execute(self, statement, params=None):
+        query = " ".join(str(statement).split())
+        self.statements.append(query)
+        if "MAX(id)" in query:
+            return self._result(scalar=max([e.id for e in self.events], default=0))
+        if "FROM" in query and "graph_events" in query:
+            return self._result([e for e in self.events if e.id > params["since"]][:params["limit"]])
+        if "node_variants" in query:
+            rows = [
+                SimpleNamespace(id=v["id"], node_id=v["node_id"], embedding=v["embedding"])
+                for v in self.variants
+                if self.nodes[v["node_id"]]["tenant_id"] == params["tenant_id"] and v["id"] > params["after_id"]
+            ]
+            return self._result(rows)
+        if "embedding::text" in query:
+            rows = [
+                SimpleNamespace(**n) for n in self.nodes.values()
+                if n["tenant_id"] == params["tenant_id"] and n["id"] > params["after_id"]
+            ]
+            return self._result(rows)
+        if "ts_rank_cd" in query:
+            return self._result([SimpleNamespace(id=i, score=s) for i, s in self.bm25])
+        if "hybrid_search_nodes" in query:
+            raise AssertionError("pgvector path used")
+        rows = [
+            SimpleNamespace(id=n["id"], _mapping={k: n[k] for k in (
+                "id", "tenant_id", "node_type", "title", "summary", "content", "tags",
+                "dataset_name", "field_path",
+            )})
+            for n in self.nodes.values()
+            if n["id"] in params["ids"] and n["status"] == "published"
+        ]
+        return self._result(rows)
+
+
+def _event(event_id, event_type, payload):
+    return SimpleNamespace(
+        id=event_id,
+        event_type=event_type,
+        entity_type=event_type.split("_")[0],
+        entity_id=payload["id"],
+        payload=payload,
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_indexes(monkeypatch):
+    clear_vector_indexes()
+    monkeypatch.setattr(vector_index.settings, "VECTOR_INDEX_SYNC_INTERVAL", 0)
+    yield
+    clear_vector_indexes()
+
+
+@pytest.fixture
+def nodes():
+    return [
+        _node(1, _vec(1, 0, 0), tags=["mfa"]),
+        _node(2, _vec(0.9, 0.1, 0), node_type="playbook"),
+        _node(3, _vec(0, 1, 0)),
+        _node(4, _vec(0, 0, 1), tenant_id="globex"),
+    ]
+
+
+class TestSimilarityIndexSearchVector:
+
+    def test_ivf_matches_exact_with_mask(self):
+        """Query-vector search agrees between exact and IVF, honouring the row mask."""
+        rng = np.random.default_rng(1)
+        centers = rng.normal(size=(20, 16))
+        vectors = centers[rng.integers(0, 20, 3000)] + 0.05 * rng.normal(size=(3000, 16))
+        allowed = np.arange(3000) % 3 != 0
+        exact = SimilarityIndex(range(3000), vectors)
+        ivf = SimilarityIndex(range(3000), vectors, exact_max=100, nprobe=16)
+
+        overlaps = []
+        for query in vectors[:40] + 0.01:
+            expected, _ = exact.search_vector(query, 10, allowed)
+            found, sims = ivf.search_vector(query, 10, allowed)
+            assert allowed[found].all()
+            assert (np.diff(sims) <= 0).all()
+            overlaps.append(len(set(expected) & set(found)) / 10)
+
+        assert np.mean(overlaps) > 0.95
+
+
+class TestTenantVectorIndex:
+
+    @pytest.mark.asyncio
+    async def test_search_matches_hybrid_search_nodes_ranking(self, nodes):
+        """Node and variant rows rank together and each node keeps its best row."""
+        session = FakeSession(nodes, variants=[{"id": 50, "node_id": 3, "embedding": _vec(0.95, 0.05, 0)}])
+
+        hits = await vector_search(session, ["acme"], [1, 0, 0], limit=3)
+
+        assert [(h.node_id, h.rank, h.source) for h in hits] == [
+            (1, 1, NODE), (3, 2, VARIANT), (2, 3, NODE),
+        ]
+        assert hits[0].score == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_filters_and_tenants(self, nodes):
+        """Type and tag filters apply per node; only the requested tenants are searched."""
+        session = FakeSession(nodes)
+
+        by_type = await vector_search(session, ["acme"], [1, 0, 0], 5, node_types=["playbook"])
+        by_tag = await vector_search(session, ["acme"], [1, 0, 0], 5, tags=["mfa"])
+        both = await vector_search(session, ["acme", "globex"], [0, 0, 1], 1)
+
+        assert [h.node_id for h in by_type] == [2]
+        assert [h.node_id for h in by_tag] == [1]
+        assert [h.node_id for h in both] == [4]
+
+    @pytest.mark.asyncio
+    async def test_graph_events_keep_index_current(self, nodes):
+        """Embedding updates, unpublishing and variants are applied from graph_events."""
+        session = FakeSession(nodes)
+        await vector_search(session, ["acme"], [1, 0, 0], 5)
+
+        session.events += [
+            _event(1, "node_updated", _node(3, _vec(1, 0.01, 0))),
+            _event(2, "node_updated", _node(1, _vec(1, 0, 0), status="draft")),
+            _event(3, "variant_created", {"id": 60, "node_id": 2, "embedding": _vec(1, 0, 0)}),
+        ]
+        hits = await vector_search(session, ["acme"], [1, 0, 0], 5)
+
+        assert [(h.node_id, h.source) for h in hits] == [(2, VARIANT), (3, NODE)]
+
+        session.events.append(_event(4, "variant_deleted", {"id": 60, "node_id": 2}))
+        index = vector_index._indexes["acme"]
+        before = await vector_search(session, ["acme"], [1, 0, 0], 5)
+        index.compact()
+        after = await vector_search(session, ["acme"], [1, 0, 0], 5)
+
+        assert [h.node_id for h in before] == [3, 2] == [h.node_id for h in after]
+
+    @pytest.mark.asyncio
+    async def test_compaction_runs_in_background(self, nodes, monkeypatch):
+        """The current base keeps serving while compacting; events wait for the swap."""
+        monkeypatch.setattr(vector_index, "COMPACT_MIN_ROWS", 0)
+        session = FakeSession(nodes)
+        await vector_search(session, ["acme"], [1, 0, 0], 5)
+        index = vector_index._indexes["acme"]
+        base = index._base
+
+        session.events.append(_event(1, "node_updated", _node(3, _vec(0, 0, 1))))
+        await vector_search(session, ["acme"], [1, 0, 0], 5)
+        session.events.append(_event(2, "node_updated", _node(1, _vec(0, 1, 0), tags=["mfa"])))
+        hits = await vector_search(session, ["acme"], [0, 1, 0], 1)
+
+        assert index.busy and index._base is base
+        assert index.last_event_id == 1
+        assert [h.node_id for h in hits] == [2]
+
+        await index._maintenance
+        hits = await vector_search(session, ["acme"], [0, 1, 0], 1)
+
+        assert index._base is not base
+        assert index.last_event_id == 2
+        assert [h.node_id for h in hits] == [1]
+
+    @pytest.mark.asyncio
+    async def test_variant_embedding_set_after_insert_is_indexed(self, nodes):
+        """Variants are inserted without an embedding; the follow-up update is applied."""
+        session = FakeSession(nodes)
+        await vector_search(session, ["acme"], [1, 0, 0], 5)
+
+        session.events += [
+            _event(1, "variant_created", {"id": 60, "node_id": 2, "embedding": None}),
+            _event(2, "variant_updated", {"id": 60, "node_id": 2, "embedding": _vec(0, 0, 1)}),
+        ]
+        hits = await vector_search(session, ["acme"], [0, 0, 1], 5)
+
+        assert (hits[0].node_id, hits[0].source) == (2, VARIANT)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_memory_mapped_and_replays_new_events(self, nodes, tmp_path, monkeypatch):
+        """A worker loads the saved snapshot and only replays events after it."""
+        monkeypatch.setattr(vector_index.settings, "VECTOR_INDEX_DIR", str(tmp_path))
+        session = FakeSession(nodes)
+        await vector_search(session, ["acme"], [1, 0, 0], 5)
+        clear_vector_indexes()
+
+        session.events.append(_event(1, "node_created", _node(5, _vec(0, 1, 0.1))))
+        session.statements.clear()
+        hits = await vector_search(session, ["acme"], [0, 1, 0], 2)
+
+        assert isinstance(vector_index._indexes["acme"]._base.vectors, np.memmap)
+        assert not any("embedding::text" in q for q in session.statements)
+        assert [h.node_id for h in hits] == [3, 5]
+
+
+class TestLocalHybridSearch:
+
+    @pytest.mark.asyncio
+    async def test_vector_leg_runs_in_process(self, nodes, monkeypatch):
+        """Postgres serves only BM25 and row data; RRF matches the SQL function."""
+        monkeypatch.setattr(vector_index.settings, "VECTOR_INDEX_ENABLED", True)
+        session = FakeSession(nodes, bm25=[(3, 0.5), (1, 0.2)])
+        service = NodeService(session)
+
+        results = await service.hybrid_search("reset mfa", ["acme"], query_embedding=[1, 0, 0], limit=2)
+
+        assert [r.node.id for r in results] == [1, 3]
+        top = results[0]
+        assert (top.bm25_rank, top.vector_rank) == (2, 1)
+        assert top.rrf_score == pytest.approx(0.4 / (60 + 2) + 0.6 / (60 + 1))
+        assert results[1].match_source == NODE
@@ -0,0 +1,124 @@
+"""Tests for the BM25 field index."""
+import pytest
+
+from app.contextforge.graph import bm25_index
+from app.contextforge.graph.bm25_index import BM25FieldIndex
+from app.contextforge.schema.field_schema import FieldSpec
+
+
+def _field(name, description, aliases=None):
+    return FieldSpec(name=name, qualified_name=name, description=description, aliases=aliases or [])
+
+
+@pytest.fixture
+def index():
+    index = BM25FieldIndex()
+    index.add_field(_field("PurchaseOrder.Status", "Approval status of the purchase order", ["state"]))
+    index.add_field(_field("PurchaseOrder.Amount", "Total order amount"))
+    index.add_field(_field("Invoice.Status", "Payment status of the invoice"))
+    index.add_field(_field("Vendor.Name", "Supplier legal name"))
+    return index
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "postings"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(bm25_index, "HAS_NUMPY", request.param)
+    return request.param
+
+
+class TestBM25FieldIndex:
+
+    def test_search_ranks_matching_fields(self, index, backend):
+        """Fields sharing more query terms rank first."""
+        results = index.search("purchase order status", top_k=3)
+
+        assert results[0].field_path == "PurchaseOrder.Status"
+        assert {r.field_path for r in results} >= {"PurchaseOrder.Amount", "Invoice.Status"}
+        assert "status" in results[0].matched_terms
+        assert all(r.score > 0 for r in results)
+
+    def test_scores_match_per_document_formula(self, index, backend):
+        """Vectorised scores equal the per-document BM25 formula."""
+        for result in index.search("invoice payment status", top_k=10):
+            assert result.score == pytest.approx(
+                index.get_field_score(result.field_path, "invoice payment status")
+            )
+
+    def test_top_k_and_unknown_terms(self, index, backend):
+        """top_k limits results and queries with no known terms return nothing."""
+        assert len(index.search("status", top_k=1)) == 1
+        assert index.search("warehouse bin", top_k=5) == []
+
+    def test_remove_field_updates_postings_and_stats(self, index, backend):
+        """Removed fields disappear from results and corpus statistics."""
+        assert index.remove_field("Invoice.Status")
+        assert not index.remove_field("Invoice.Status")
+
+        assert index.document_count == 3
+        assert "invoice" not in index._doc_freqs
+        assert [r.field_path for r in index.search("invoice status")] == ["PurchaseOrder.Status"]
+
+    def test_re_adding_field_replaces_document(self, index, backend):
+        """Adding an indexed path again replaces its document."""
+        index.add_field(_field("Vendor.Name", "Supplier trading name"))
+
+        assert index.document_count == 4
+        assert index.search("legal") == []
+        assert index.search("trading")[0].field_path == "Vendor.Name"
+
+    def test_compaction_keeps_results(self, index, backend, monkeypatch):
+        """Compacting removed slots does not change search results."""
+        monkeypatch.setattr(BM25FieldIndex, "COMPACT_MIN_REMOVED", 1)
+        before = [(r.field_path, r.score) for r in index.search("vendor name", top_k=5)]
+
+        index.remove_field("PurchaseOrder.Amount")
+        index.remove_field("Invoice.Status")
+
+        assert len(index._documents) == 2
+        after = [(r.field_path, r.score) for r in index.search("vendor name", top_k=5)]
+        assert [p for p, _ in after] == [p for p, _ in before]
+
+
+def _endpoint(path, description, param_description):
+    from app.contextforge.schema.api_schema import EndpointSpec, ParameterSpec
+
+    return EndpointSpec(
+        path=path,
+        method="GET",
+        description=description,
+        parameters=[ParameterSpec(name="status", location="query", description=param_description)],
+    )
+
+
+def _status_path():
+    return _endpoint("/", "", "").parameters[0].get_qualified_name()
+
+
+class TestDuplicatePaths:
+
+    @pytest.fixture
+    def endpoints(self):
+        index = BM25FieldIndex()
+        index.add_endpoint(_endpoint("/api/orders", "List orders", "Order fulfilment state"))
+        index.add_endpoint(_endpoint("/api/invoices", "List invoices", "Invoice payment state"))
+        return index
+
+    def test_parameters_sharing_a_path_are_all_indexed(self, endpoints, backend):
+        """query.status on two endpoints gives two documents, both searchable."""
+        assert endpoints.document_count == 2
+        assert [r.field_path for r in endpoints.search("orders fulfilment")] == [_status_path()]
+        assert [r.field_path for r in endpoints.search("invoices payment")] == [_status_path()]
+
+    def test_re_adding_an_endpoint_keeps_other_endpoints(self, endpoints, backend):
+        """Re-indexing one endpoint replaces only that endpoint's parameters."""
+        endpoints.add_endpoint(_endpoint("/api/orders", "List orders", "Order shipping state"))
+
+        assert endpoints.document_count == 2
+        assert endpoints.search("fulfilment") == []
+        assert endpoints.search("payment")[0].field_path == _status_path()
+
+    def test_remove_field_drops_every_document_with_the_path(self, endpoints, backend):
+        assert endpoints.remove_field(_status_path())
+
+        assert endpoints.document_count == 0
+        assert not endpoints.has_documents()
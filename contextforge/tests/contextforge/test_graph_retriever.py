@@ -0,0 +1,105 @@
+"""Tests for fusion search in GraphContextRetriever."""
+import time
+
+import pytest
+
+from app.contextforge.graph.schema_graph import SchemaGraph, SearchResult
+from app.contextforge.retrieval.graph_retriever import (
+    GraphContextRetriever,
+    GraphRetrievalConfig,
+)
+
+
+def _result(*fields):
+    return SearchResult(
+        matched_concepts=[],
+        matched_fields=list(fields),
+        expanded_fields=set(fields),
+        adjacency={},
+        traversal_path=[],
+        hop_count=1,
+    )
+
+
+def _leg(fields, delay=0.0, error=None):
+    def search(*args, **kwargs):
+        time.sleep(delay)
+        if error:
+            raise error
+        return _result(*fields)
+    return search
+
+
+@pytest.fixture
+def retriever():
+    retriever = GraphContextRetriever(
+        SchemaGraph(),
+        config=GraphRetrievalConfig(
+            strategy="fusion", parallel_fusion=True, fusion_leg_timeout=1.0
+        ),
+    )
+    retriever.value_index.has_values = lambda: True
+    retriever.value_index.has_pronouns = lambda: True
+    retriever.bm25_index.has_documents = lambda: True
+    retriever._concept_search = _leg(["Order.Status"])
+    retriever._value_search = _leg(["Order.Status", "Order.Amount"])
+    retriever._pronoun_search = _leg(["Order.Requester"])
+    retriever._bm25_search = _leg(["Order.Amount"])
+    return retriever
+
+
+class TestFusionSearch:
+
+    def test_legs_run_concurrently(self, retriever):
+        """Fusion latency tracks the slowest leg, not the sum of legs."""
+        for name in ("_concept_search", "_value_search", "_pronoun_search", "_bm25_search"):
+            fields = getattr(retriever, name)().matched_fields
+            setattr(retriever, name, _leg(fields, delay=0.2))
+
+        started = time.perf_counter()
+        result = retriever._fusion_search("my pending orders", ["pending"], None, 1, 10)
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.6
+        assert result.field_scores["Order.Status"] == pytest.approx(0.65)
+        assert result.field_scores["Order.Amount"] == pytest.approx(0.55)
+
+    def test_matches_sequential_mode(self, retriever):
+        """Concurrent and sequential fusion produce the same scores."""
+        concurrent = retriever._fusion_search("my orders", ["orders"], None, 1, 10)
+        retriever.config.parallel_fusion = False
+        sequential = retriever._fusion_search("my orders", ["orders"], None, 1, 10)
+
+        assert concurrent.field_scores == sequential.field_scores
+
+    def test_slow_leg_is_dropped(self, retriever):
+        """A leg that misses the timeout is fused without."""
+        retriever.config.fusion_leg_timeout = 0.1
+        retriever._pronoun_search = _leg(["Order.Requester"], delay=0.5)
+
+        started = time.perf_counter()
+        result = retriever._fusion_search("my orders", ["orders"], None, 1, 10)
+
+        assert time.perf_counter() - started < 0.4
+        assert "Order.Requester" not in result.field_scores
+        assert "Order.Status" in result.field_scores
+        assert result.dropped_legs == {"pronoun": "timeout"}
+
+    def test_failing_leg_is_dropped(self, retriever):
+        """An exception in one leg does not fail the fused search."""
+        retriever._bm25_search = _leg([], error=RuntimeError("index closed"))
+
+        result = retriever._fusion_search("my orders", ["orders"], None, 1, 10)
+
+        assert result.field_scores["Order.Amount"] == pytest.approx(0.35)
+        assert result.dropped_legs == {"bm25": "error"}
+
+    def test_sequential_without_timeout_by_default(self, retriever):
+        """Fusion only runs concurrently, and only drops slow legs, when configured."""
+        retriever.config = GraphRetrievalConfig(strategy="fusion")
+        retriever._pronoun_search = _leg(["Order.Requester"], delay=0.2)
+
+        result = retriever._fusion_search("my orders", ["orders"], None, 1, 10)
+
+        assert "Order.Requester" in result.field_scores
+        assert result.dropped_legs == {}
@@ -0,0 +1 @@
+"""Ticket pipeline tests."""
@@ -0,0 +1,188 @@
+"""Tests for concurrent TicketPipeline batches."""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from pipeline import service
+from pipeline.models import PipelineConfig, TicketData
+from pipeline.service import TicketPipeline, _cluster_leaders
+
+
+class FakeSearchService:
+    def __init__(self, session, embedding_client):
+        self.session = session
+
+    async def simple_vector_search(self, query, limit, knowledge_types=None):
+        await self.session.execute("SELECT similar")
+        return []
+
+
+class FakeSession:
+    """Tracks how many statements run at once."""
+
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.next_id = 0
+
+    async def execute(self, statement, params=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.next_id += 1
+        result = MagicMock()
+        result.scalar_one.return_value = self.next_id
+        return result
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class FakeInferenceClient:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return json.dumps({"question": "How do I reset MFA?", "answer": "Use the admin console.", "confidence": 0.9})
+
+
+def _ticket(i, subject="MFA reset"):
+    return TicketData(
+        ticket_id=f"T-{i}",
+        subject=subject,
+        body="User cannot log in after replacing their phone and needs MFA reset.",
+        resolution="Reset MFA from the admin console and re-enrolled the device.",
+        created_at=datetime(2024, 1, 1),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fake_search(monkeypatch):
+    monkeypatch.setattr(service, "SearchService", FakeSearchService)
+
+
+class TestProcessBatch:
+
+    @pytest.mark.asyncio
+    async def test_workers_overlap_llm_calls(self):
+        """LLM calls overlap up to llm_concurrency while DB stages stay serial."""
+        session, llm = FakeSession(), FakeInferenceClient()
+        config = PipelineConfig(max_workers=10, llm_concurrency=5)
+        pipeline = TicketPipeline(session, MagicMock(), llm, config)
+
+        started = time.perf_counter()
+        stats = await pipeline.process_batch([_ticket(i) for i in range(20)])
+        elapsed = time.perf_counter() - started
+
+        assert stats.processed == stats.total_tickets == 20
+        assert stats.new_items == 20
+        assert llm.max_active == 5
+        assert session.max_active == 1
+        assert elapsed < 20 * llm.delay / 2
+
+    @pytest.mark.asyncio
+    async def test_session_factory_allows_concurrent_db_stages(self):
+        """Each worker gets its own session, so DB stages can overlap."""
+        sessions = []
+
+        class SessionContext:
+            async def __aenter__(self):
+                sessions.append(FakeSession())
+                return sessions[-1]
+
+            async def __aexit__(self, *exc):
+                return False
+
+        config = PipelineConfig(max_workers=4, db_concurrency=4)
+        pipeline = TicketPipeline(
+            FakeSession(), MagicMock(), FakeInferenceClient(delay=0), config,
+            session_factory=SessionContext,
+        )
+
+        stats = await pipeline.process_batch([_ticket(i) for i in range(8)])
+
+        assert stats.new_items == 8
+        assert len(sessions) == 4
+
+    @pytest.mark.asyncio
+    async def test_async_iterator_input_emits_progress(self):
+        """Streamed tickets are counted as read and stats are emitted incrementally."""
+        async def stream():
+            for i in range(12):
+                yield _ticket(i)
+
+        snapshots = []
+        config = PipelineConfig(max_workers=3, stats_interval=5)
+        pipeline = TicketPipeline(FakeSession(delay=0), MagicMock(), FakeInferenceClient(delay=0), config)
+
+        stats = await pipeline.process_batch(stream(), on_progress=snapshots.append)
+
+        assert [s.processed for s in snapshots] == [5, 10, 12]
+        assert snapshots[-1].completed_at is not None
+        assert stats.total_tickets == 12
+        assert stats.avg_confidence == pytest.approx(0.9)
+
+
+class SubjectEmbeddingClient:
+    """Embeds tickets by subject so equal subjects are exact duplicates."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def embed_batch(self, texts):
+        self.calls += 1
+        axes = {"VPN outage": [1.0, 0.0, 0.0], "MFA reset": [0.0, 1.0, 0.0]}
+        return [axes.get(t.split("\n")[0], [0.0, 0.0, 1.0]) for t in texts]
+
+
+class TestBatchDedup:
+
+    @pytest.mark.parametrize("has_numpy", [True, False])
+    def test_cluster_leaders(self, monkeypatch, has_numpy):
+        """Later rows join the first leader they are similar enough to."""
+        monkeypatch.setattr(service, "HAS_NUMPY", has_numpy)
+        vectors = [[1, 0], [0, 1], [0.99, 0.05], [0.05, 0.99], [0.7, 0.7]]
+
+        leaders = _cluster_leaders(vectors, threshold=0.95)
+
+        assert [leader for leader, _ in leaders] == [0, 1, 0, 1, 4]
+        assert leaders[2][1] == pytest.approx(0.9987, abs=1e-3)
+
+    @pytest.mark.asyncio
+    async def test_only_cluster_representatives_reach_the_llm(self):
+        """An incident storm costs one analysis per distinct issue."""
+        tickets = [_ticket(i, "VPN outage") for i in range(6)] + [_ticket(6), _ticket(7)]
+        embedding_client, llm = SubjectEmbeddingClient(), FakeInferenceClient(delay=0)
+        config = PipelineConfig(batch_size=10)
+        pipeline = TicketPipeline(FakeSession(delay=0), embedding_client, llm, config)
+        calls = []
+        original = pipeline._analyze_ticket
+
+        async def analyze(ticket):
+            calls.append(ticket.ticket_id)
+            return await original(ticket)
+        pipeline._analyze_ticket = analyze
+
+        stats = await pipeline.process_batch(tickets)
+
+        assert sorted(calls) == ["T-0", "T-6"]
+        assert embedding_client.calls == 1
+        assert stats.processed == 8
+        assert stats.batch_duplicates == 6
+        assert stats.new_items == 2